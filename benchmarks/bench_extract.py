@@ -0,0 +1,99 @@
+"""
+bench_extract.py
+================
+
+Compara los backends de lectura de `extract_csv` ('pandas' y 'pyarrow')
+sobre archivos sintéticos con la forma del dataset MINSAL, reportando
+tiempo de parseo y memoria residente.
+
+Cada medición corre en un subproceso propio, de modo que el pico de RSS
+(VmHWM) de un backend no contamine al otro.
+
+Uso:
+    python -m benchmarks.bench_extract --rows 1000000 5000000
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_raw_csv
+
+
+def _rss_mb() -> float:
+    """
+    Pico de memoria residente del proceso en MB.
+
+    Se usa VmHWM de /proc porque ru_maxrss conserva el pico del proceso
+    padre a través de fork/exec; fuera de Linux se cae a ru_maxrss.
+    """
+    try:
+        for linea in Path("/proc/self/status").read_text().splitlines():
+            if linea.startswith("VmHWM:"):
+                return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def medir_backend(path: Path, backend: str) -> dict:
+    """
+    Mide una lectura con `extract_csv` en el proceso actual.
+    """
+    import src.extract as extract
+
+    extract.RAW_DIR = path.parent
+    rss_inicial = _rss_mb()
+
+    inicio = time.perf_counter()
+    df = extract.extract_csv(path.name, backend=backend)
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "backend": backend,
+        "rows": len(df),
+        "parse_s": round(duracion, 4),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "delta_rss_mb": round(_rss_mb() - rss_inicial, 1),
+        "df_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de backends de extract_csv")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--backends", nargs="+", default=["pandas", "pyarrow"])
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "BACKEND"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        path, backend = args.worker
+        print(json.dumps(medir_backend(Path(path), backend)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = generate_raw_csv(Path(tmp) / f"synthetic_{rows}.csv", rows)
+            for backend in args.backends:
+                salida = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_extract", "--worker", str(path), backend],
+                    check=True, capture_output=True, text=True,
+                )
+                r = json.loads(salida.stdout.strip().splitlines()[-1])
+                print(
+                    f"filas={r['rows']:>10,} | {r['backend']:<8} | parse {r['parse_s']:7.3f} s"
+                    f" | pico RSS {r['peak_rss_mb']:8.1f} MB (+{r['delta_rss_mb']:.1f})"
+                    f" | DataFrame {r['df_mb']:8.1f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+bench_gcs_upload.py
+===================
+
+Compara la carga de un archivo grande a GCS en un único stream contra la
+carga paralela por slices + compose, usando el stand-in local `FakeClient`
+con latencia y ancho de banda por stream simulados (sin red ni credenciales).
+
+Uso:
+    python -m benchmarks.bench_gcs_upload --size-mb 256 --workers 1 4 8 16
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_gcs import FakeClient
+from src.load_gcs import BUCKET_NAME, upload_composite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga paralela a GCS (offline)")
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--slice-mb", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--stream-mbps", type=float, default=50.0, help="MB/s por stream simulado")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="latencia simulada por request")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local_file = Path(tmp) / "transformed.csv"
+        local_file.write_bytes(os.urandom(args.size_mb * 1024 * 1024))
+        expected = local_file.read_bytes()
+
+        for workers in args.workers:
+            client = FakeClient(
+                latency_s=args.latency_ms / 1000,
+                stream_bandwidth_bps=args.stream_mbps * 1024 * 1024,
+            )
+            bucket = client.bucket(BUCKET_NAME)
+            object_path = "transformed/bench.csv"
+
+            inicio = time.perf_counter()
+            if workers == 1:
+                bucket.blob(object_path).upload_from_filename(local_file)
+            else:
+                upload_composite(bucket, local_file, object_path, args.slice_mb * 1024 * 1024, workers)
+            duracion = time.perf_counter() - inicio
+
+            assert bucket.get_blob(object_path).download_as_bytes() == expected
+            print(
+                f"{args.size_mb} MB | workers={workers:>3} | {duracion:7.2f} s"
+                f" | {args.size_mb / duracion:8.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
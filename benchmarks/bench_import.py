@@ -0,0 +1,169 @@
+"""
+bench_import.py
+===============
+
+Costo de arranque de los módulos del pipeline, medido con `python -X importtime`
+en un intérprete nuevo por repetición (sin módulos ya cacheados en memoria).
+
+Por cada módulo se informa el tiempo acumulado de su import (mediana de las
+repeticiones), las dependencias más costosas que arrastra y si carga alguna
+de las librerías pesadas de `HEAVY_MODULES`, que sólo deben importarse cuando
+corre la etapa que las usa. También se mide `python -m src.main --help`
+completo.
+
+Termina con código 1 si algún módulo carga una librería pesada o si su
+import supera `--budget-ms`, para usarlo como guardia en CI.
+
+Uso:
+    python -m benchmarks.bench_import --repeat 5 --budget-ms 150
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Módulos de entrada del pipeline (CLI y etapas)
+MODULES = ("src.main", "src.runner", "src.extract", "src.transform", "src.load_gcs", "src.inspect_csv")
+
+# Librerías que no deben cargarse al importar los módulos del pipeline
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "google_crc32c",
+    "google.auth",
+    "google.cloud.storage",
+    "google.cloud.bigquery",
+    "grpc",
+)
+
+DEFAULT_BUDGET_MS = 150.0
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Interpreta la salida de `-X importtime` en orden de aparición:
+    [(módulo, propio_us, acumulado_us, profundidad)]. Cada módulo aparece
+    después de los que importó, con mayor profundidad.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        if own.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            entries.append((name.strip(), int(own), int(cumulative), depth))
+    return entries
+
+
+def dependencies(entries: list, module: str) -> list:
+    """
+    Módulos cargados por el import de `module` (su subárbol), sin contar
+    los que ya cargó el arranque del intérprete.
+    """
+    names = [entry[0] for entry in entries]
+    index = names.index(module)
+    depth = entries[index][3]
+
+    children = []
+    for entry in reversed(entries[:index]):
+        if entry[3] <= depth:
+            break
+        children.append(entry)
+    return children
+
+
+def import_profile(module: str) -> list:
+    """
+    Importa `module` en un intérprete nuevo y retorna la salida interpretada
+    de `-X importtime`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd = BASE_DIR, capture_output = True, text = True, check = True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def heavy_imports(entries: list) -> list:
+    """
+    Librerías de HEAVY_MODULES (o sus submódulos) presentes en `entries`.
+    """
+    names = {entry[0] for entry in entries}
+    return sorted(
+        heavy for heavy in HEAVY_MODULES
+        if any(name == heavy or name.startswith(f"{heavy}.") for name in names)
+    )
+
+
+def measure_module(module: str, repeat: int = 5, top: int = 5) -> dict:
+    """
+    Mediana del tiempo de import de `module` en `repeat` intérpretes nuevos,
+    sus `top` dependencias más costosas y las librerías pesadas que carga.
+    """
+    runs = [import_profile(module) for _ in range(repeat)]
+    profile = runs[-1]
+
+    cumulative = [next(e[2] for e in run if e[0] == module) for run in runs]
+    costosas = sorted(dependencies(profile, module), key = lambda entry: entry[2], reverse = True)
+    return {
+        "module": module,
+        "import_ms": round(statistics.median(cumulative) / 1000, 1),
+        "heavy": heavy_imports(profile),
+        "top": [(name, round(us / 1000, 1)) for name, _, us, _ in costosas[:top]],
+    }
+
+
+def measure_cli_help(repeat: int = 5) -> float:
+    """
+    Mediana en ms de `python -m src.main --help` completo (intérprete incluido).
+    """
+    tiempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "src.main", "--help"],
+            cwd = BASE_DIR, capture_output = True, check = True,
+        )
+        tiempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tiempos) * 1000, 1)
+
+
+def main(argv = None) -> int:
+    parser = argparse.ArgumentParser(description = "Tiempo de import de los módulos del pipeline")
+    parser.add_argument("--modules", nargs = "+", default = list(MODULES))
+    parser.add_argument("--repeat", type = int, default = 5)
+    parser.add_argument(
+        "--budget-ms", type = float, default = DEFAULT_BUDGET_MS,
+        help = "tiempo de import máximo por módulo antes de considerarlo regresión"
+    )
+    args = parser.parse_args(argv)
+
+    fallas = []
+    for module in args.modules:
+        r = measure_module(module, args.repeat)
+        top = ", ".join(f"{name} {ms} ms" for name, ms in r["top"][:3])
+        print(f"{module:<18} {r['import_ms']:8.1f} ms | pesados: {r['heavy'] or '-'} | {top}")
+        if r["heavy"]:
+            fallas.append(f"{module} importa {r['heavy']}")
+        if r["import_ms"] > args.budget_ms:
+            fallas.append(f"{module} tarda {r['import_ms']} ms (> {args.budget_ms} ms)")
+
+    print(f"{'src.main --help':<18} {measure_cli_help(args.repeat):8.1f} ms (proceso completo)")
+
+    for falla in fallas:
+        print(f"REGRESIÓN: {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
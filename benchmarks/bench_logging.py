@@ -0,0 +1,98 @@
+"""
+bench_logging.py
+================
+
+Mide el costo por registro del logging del pipeline bajo un volumen alto de
+mensajes por bloque (un registro con campos estructurados por bloque
+procesado, dentro de una etapa de `src.metrics`).
+
+Compara los formatos text y json, escribiendo en el thread que emite (como
+el antiguo `logging.basicConfig`) o a través de la cola de `src.logger`
+(QueueHandler + QueueListener). Para cada variante se informa el costo en
+el thread del pipeline (µs por registro) y el tiempo total hasta que todos
+los registros quedaron escritos en el archivo de salida.
+
+Uso:
+    python -m benchmarks.bench_logging --records 100000 --repeat 3
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.logger import configure_logging
+from src.metrics import stage, start_run
+
+VARIANTS = (
+    ("text", False),
+    ("text", True),
+    ("json", False),
+    ("json", True),
+)
+
+
+def _emit(logger, records: int) -> None:
+    with stage("bench.chunks"):
+        for i in range(records):
+            logger.info(
+                f"Bloque {i} procesado",
+                extra={"chunk": i, "rows_in": 100_000, "rows_out": 99_871, "wall_s": 0.0123},
+            )
+
+
+def _drain(logger) -> None:
+    for handler in logger.handlers:
+        records = getattr(handler, "queue", None)
+        while records is not None and not records.empty():
+            time.sleep(0.001)
+
+
+def measure(path: Path, fmt: str, use_queue: bool, records: int, repeat: int) -> tuple:
+    """
+    (µs por registro en el thread que emite, µs por registro hasta escribirlo),
+    la mejor de `repeat` repeticiones.
+    """
+    emit_best = total_best = float("inf")
+    with open(path, "w", encoding="utf-8") as stream:
+        logger = configure_logging(fmt, "INFO", stream=stream, use_queue=use_queue)
+        for _ in range(repeat):
+            inicio = time.perf_counter()
+            _emit(logger, records)
+            emit_s = time.perf_counter() - inicio
+            _drain(logger)
+            stream.flush()
+            total_s = time.perf_counter() - inicio
+            emit_best = min(emit_best, emit_s)
+            total_best = min(total_best, total_s)
+        # cierra la cola de esta variante antes de cerrar el archivo
+        configure_logging("text", "WARNING", use_queue=False)
+    return emit_best / records * 1e6, total_best / records * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del costo por registro del logging")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por variante (se informa la mejor)")
+    args = parser.parse_args(argv)
+
+    start_run("bench-logging")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, use_queue in VARIANTS:
+            path = Path(tmp) / f"{fmt}-{use_queue}.log"
+            emit_us, total_us = measure(path, fmt, use_queue, args.records, args.repeat)
+            lines = sum(1 for _ in open(path, encoding="utf-8"))
+            results.append((fmt, "cola" if use_queue else "síncrono", emit_us, total_us, lines))
+
+    print(f"{args.records:,} registros por repetición")
+    print(f"{'formato':<8} {'escritura':<10} {'µs/reg (pipeline)':>18} {'µs/reg (total)':>15} {'líneas':>8}")
+    for fmt, mode, emit_us, total_us, lines in results:
+        print(f"{fmt:<8} {mode:<10} {emit_us:18.2f} {total_us:15.2f} {lines:8,}")
+
+
+if __name__ == "__main__":
+    main()
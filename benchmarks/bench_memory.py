@@ -0,0 +1,103 @@
+"""
+bench_memory.py
+===============
+
+Reporte de memoria del pipeline completo (extract -> transform -> load CSV)
+con el dataset transformado en modo normal y en modo compacto
+(`transform_dataset(compact=True)`), sobre archivos sintéticos con la forma
+del dataset MINSAL.
+
+Por cada modo se informa la memoria del DataFrame (deep) después del
+extract y del transform, y el pico de RSS del proceso al terminar cada
+etapa. Cada modo corre en un subproceso propio para que los picos de RSS
+no se mezclen.
+
+Uso:
+    python -m benchmarks.bench_memory --rows 1000000 --backend pyarrow
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic import generate_raw_csv
+
+MODES = ("normal", "compact")
+
+
+def _df_mb(df) -> float:
+    return round(df.memory_usage(deep = True).sum() / 1024**2, 1)
+
+
+def medir_pipeline(path: Path, backend: str, compact: bool) -> dict:
+    """
+    Ejecuta extract, transform y load CSV en el proceso actual y retorna
+    la memoria de cada etapa.
+    """
+    import src.extract as extract
+    from src.load import load_csv
+    from src.metrics import records, stage, start_run
+    from src.transform import transform_chunk
+
+    extract.RAW_DIR = path.parent
+    start_run()
+    resultado = {"mode": "compact" if compact else "normal", "backend": backend}
+
+    with stage("bench.extract"):
+        df = extract.extract_csv(path.name, backend = backend)
+    resultado["extract_df_mb"] = _df_mb(df)
+
+    with stage("bench.transform"):
+        df = transform_chunk(df, compact = compact)
+    resultado["transform_df_mb"] = _df_mb(df)
+
+    with tempfile.TemporaryDirectory() as tmp, stage("bench.load"):
+        load_csv(df, output_dir = Path(tmp), file_name = "bench.csv")
+
+    for record in records():
+        if record["stage"].startswith("bench."):
+            nombre = record["stage"].removeprefix("bench.")
+            resultado[f"{nombre}_s"] = record["wall_s"]
+            resultado[f"{nombre}_peak_rss_mb"] = record["peak_rss_mb"]
+    resultado["rows"] = len(df)
+    return resultado
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Reporte de memoria del pipeline en modo normal y compacto")
+    parser.add_argument("--rows", type = int, nargs = "+", default = [1_000_000])
+    parser.add_argument("--backend", choices = ("pandas", "pyarrow"), default = "pandas")
+    parser.add_argument("--worker", nargs = 2, metavar = ("PATH", "MODE"), help = argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        path, mode = args.worker
+        print(json.dumps(medir_pipeline(Path(path), args.backend, mode == "compact")))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = generate_raw_csv(Path(tmp) / f"synthetic_{rows}.csv", rows)
+            for mode in MODES:
+                salida = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_memory", "--backend", args.backend,
+                     "--worker", str(path), mode],
+                    check = True, capture_output = True, text = True,
+                )
+                r = json.loads(salida.stdout.strip().splitlines()[-1])
+                print(
+                    f"filas={r['rows']:>10,} | {r['mode']:<7} | DataFrame extract {r['extract_df_mb']:8.1f} MB"
+                    f" -> transform {r['transform_df_mb']:8.1f} MB | pico RSS extract {r['extract_peak_rss_mb']:8.1f}"
+                    f" / transform {r['transform_peak_rss_mb']:8.1f} / load {r['load_peak_rss_mb']:8.1f} MB"
+                    f" | transform {r['transform_s']:.2f} s | load {r['load_s']:.2f} s"
+                )
+
+
+if __name__ == "__main__":
+    main()
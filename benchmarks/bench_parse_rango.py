@@ -0,0 +1,65 @@
+"""
+bench_parse_rango.py
+====================
+
+Compara la derivación de EDAD_MIN / EDAD_MAX fila a fila
+(`apply` + `parse_rango`) contra la versión vectorizada `parse_rangos`
+sobre archivos sintéticos con la forma del dataset MINSAL.
+
+Uso:
+    python -m benchmarks.bench_parse_rango --rows 1000000 2000000
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_raw_csv
+from src.transform import parse_rango, parse_rangos
+
+
+def rangos_apply(grupos: pd.Series) -> pd.DataFrame:
+    """Camino original: un pd.Series por fila."""
+    return grupos.apply(lambda x: pd.Series(parse_rango(x)))
+
+
+def medir(func, grupos: pd.Series) -> float:
+    inicio = time.perf_counter()
+    func(grupos)
+    return time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark apply vs parse_rangos")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument(
+        "--skip-apply",
+        action="store_true",
+        help="omite el camino fila a fila (tarda minutos sobre 1M+ filas)",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = generate_raw_csv(Path(tmp) / f"synthetic_{rows}.csv", rows)
+            grupos = pd.read_csv(path, sep="|", usecols=["GRUPO_EDAD"])["GRUPO_EDAD"].str.strip()
+
+            t_vector = medir(parse_rangos, grupos)
+            print(f"filas={rows:>10,} | parse_rangos: {t_vector:8.3f} s")
+
+            if not args.skip_apply:
+                t_apply = medir(rangos_apply, grupos)
+                print(
+                    f"filas={rows:>10,} | apply:        {t_apply:8.3f} s"
+                    f" | speedup x{t_apply / t_vector:,.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
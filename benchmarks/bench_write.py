@@ -0,0 +1,83 @@
+"""
+bench_write.py
+==============
+
+Compara el throughput de `write_csv` (escritura atómica por bloques) sin
+compresión y con gzip y zstd a distintos niveles, sobre el dataset
+transformado de un CSV sintético.
+
+Para cada variante se informa el tiempo, el throughput sobre los bytes del
+CSV sin comprimir (MB/s), el tamaño final y la razón de compresión; como
+referencia se mide también `df.to_csv` directo a la ruta final.
+
+Uso:
+    python -m benchmarks.bench_write --rows 1000000 --gzip-levels 1 6 9 --zstd-levels 1 3 9
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.synthetic import generate_raw_csv
+from src import extract
+from src.load import CSV_COMPRESSIONS, write_csv
+from src.transform import transform_dataset
+
+
+def _measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - inicio)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escritura CSV por nivel de compresión")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--zstd-levels", type=int, nargs="+", default=[1, 3, 9])
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por variante (se informa la mejor)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        generate_raw_csv(tmp / "raw" / "bench.csv", args.rows)
+        with patch.object(extract, "RAW_DIR", tmp / "raw"):
+            df = transform_dataset("bench.csv", use_cache=False)
+
+        reference = tmp / "to_csv.csv"
+        to_csv_s = _measure(lambda: df.to_csv(reference, index=False), args.repeat)
+        raw_bytes = reference.stat().st_size
+
+        variants = [(None, None)]
+        variants += [("gzip", level) for level in args.gzip_levels]
+        variants += [("zstd", level) for level in args.zstd_levels]
+
+        print(f"{args.rows:,} filas | CSV sin comprimir: {raw_bytes / 1024 / 1024:.1f} MB")
+        print(f"{'variante':<12} {'tiempo (s)':>10} {'MB/s':>8} {'tamaño (MB)':>12} {'razón':>7}")
+        print(f"{'to_csv':<12} {to_csv_s:10.3f} {raw_bytes / 1024 / 1024 / to_csv_s:8.1f} {raw_bytes / 1024 / 1024:12.1f} {1:7.2f}")
+
+        for compression, level in variants:
+            path = tmp / f"bench.csv{CSV_COMPRESSIONS.get(compression, '')}"
+            written = {}
+            seconds = _measure(
+                lambda: written.update(file=write_csv(df, path, compression=compression, level=level)),
+                args.repeat,
+            )
+            size = written["file"].size
+            name = f"{compression}-{level}" if compression else "ninguna"
+            print(
+                f"{name:<12} {seconds:10.3f} {raw_bytes / 1024 / 1024 / seconds:8.1f}"
+                f" {size / 1024 / 1024:12.1f} {raw_bytes / size:7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
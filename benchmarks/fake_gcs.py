@@ -0,0 +1,269 @@
+"""
+fake_gcs.py
+===========
+
+Stand-in local y en memoria del subconjunto de `google.cloud.storage` que usa
+el pipeline (Client -> Bucket -> Blob), para probar y medir la carga a GCS sin
+credenciales ni red.
+
+Los blobs exponen `crc32c`, `md5_hash` y `size` calculados igual que GCS
+(base64 big-endian), de modo que la lógica que compara metadata remota con
+archivos locales se comporta como contra el servicio real. La metadata
+propia (`metadata`) se guarda al subir o componer el objeto, o con `patch`.
+
+Para benchmarks, el cliente puede simular latencia por request y un ancho de
+banda máximo por stream de subida (`latency_s`, `stream_bandwidth_bps`).
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import base64
+import hashlib
+import io
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import google_crc32c
+
+
+class FakeBlob:
+    """
+    Objeto de un FakeBucket. La metadata se refresca al subir contenido o al
+    obtenerlo mediante `list_blobs` / `get_blob`.
+    """
+
+    def __init__(self, name: str, bucket: "FakeBucket"):
+        self.name = name
+        self.bucket = bucket
+        self.crc32c: Optional[str] = None
+        self.md5_hash: Optional[str] = None
+        self.size: Optional[int] = None
+        self.metadata: Optional[dict] = None
+
+    # ----- metadata -----
+
+    def _load_metadata(self) -> "FakeBlob":
+        data = self.bucket._objects.get(self.name)
+        self.metadata = self.bucket._metadata.get(self.name)
+        if data is None:
+            self.crc32c = self.md5_hash = self.size = None
+        else:
+            self.crc32c = base64.b64encode(google_crc32c.Checksum(data).digest()).decode()
+            self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+            self.size = len(data)
+        return self
+
+    def reload(self) -> None:
+        if self.name not in self.bucket._objects:
+            raise FileNotFoundError(f"gs://{self.bucket.name}/{self.name}")
+        self._load_metadata()
+
+    def exists(self) -> bool:
+        return self.name in self.bucket._objects
+
+    def patch(self) -> None:
+        if self.name not in self.bucket._objects:
+            raise FileNotFoundError(f"gs://{self.bucket.name}/{self.name}")
+        self.bucket._set_metadata(self.name, self.metadata)
+
+    # ----- escritura -----
+
+    def upload_from_string(self, data, content_type: Optional[str] = None) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.bucket._put(self.name, bytes(data), metadata = self.metadata)
+        self._load_metadata()
+
+    def upload_from_file(self, file_obj, size: Optional[int] = None, **kwargs) -> None:
+        data = file_obj.read() if size is None else file_obj.read(size)
+        self.upload_from_string(data)
+
+    def upload_from_filename(self, filename, **kwargs) -> None:
+        self.upload_from_string(Path(filename).read_bytes())
+
+    # ----- lectura / borrado -----
+
+    def open(self, mode: str = "rb", chunk_size: Optional[int] = None, **kwargs):
+        """
+        Sólo soporta 'wb': retorna un writer resumable que crea el objeto al
+        cerrarse y que puede cancelarse con `terminate()`.
+        """
+        if mode != "wb":
+            raise ValueError("FakeBlob.open sólo soporta mode='wb'")
+        writer = FakeBlobWriter(self, chunk_size)
+        self.bucket.client.writers.append(writer)
+        return writer
+
+    def compose(self, sources) -> None:
+        """
+        Concatena server-side los objetos `sources` en este blob
+        (GCS admite hasta 32 fuentes por llamada).
+        """
+        if len(sources) > 32:
+            raise ValueError("compose admite a lo sumo 32 objetos fuente")
+        data = b"".join(source.download_as_bytes() for source in sources)
+        self.bucket._put(self.name, data, simulate_network = False, metadata = self.metadata)
+        self._load_metadata()
+
+    def download_as_bytes(self) -> bytes:
+        if self.name not in self.bucket._objects:
+            raise FileNotFoundError(f"gs://{self.bucket.name}/{self.name}")
+        return self.bucket._objects[self.name]
+
+    def download_to_filename(self, filename) -> None:
+        Path(filename).write_bytes(self.download_as_bytes())
+
+    def delete(self) -> None:
+        with self.bucket._lock:
+            self.bucket._metadata.pop(self.name, None)
+            if self.bucket._objects.pop(self.name, None) is None:
+                raise FileNotFoundError(f"gs://{self.bucket.name}/{self.name}")
+
+
+class FakeBlobWriter(io.RawIOBase):
+    """
+    Equivalente a `google.cloud.storage.fileio.BlobWriter`: acumula lo
+    escrito y sólo crea el objeto al cerrar. La latencia y el ancho de banda
+    simulados se aplican en cada escritura, como los requests de un upload
+    resumable, y no al cerrar. `max_buffered` registra el mayor tamaño
+    recibido en una sola escritura, útil para verificar que la
+    serialización se hace por bloques.
+    """
+
+    def __init__(self, blob: FakeBlob, chunk_size: Optional[int] = None):
+        self.blob = blob
+        self.chunk_size = chunk_size
+        self.max_buffered = 0
+        self._parts = []
+        self._terminated = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.blob.bucket.client._simulate_transfer(len(data))
+        self._parts.append(bytes(data))
+        self.max_buffered = max(self.max_buffered, len(data))
+        return len(data)
+
+    def terminate(self) -> None:
+        self._terminated = True
+        self._parts = []
+        super().close()
+
+    def close(self) -> None:
+        if not self.closed and not self._terminated:
+            self.blob.bucket._put(
+                self.blob.name, b"".join(self._parts), simulate_network = False, metadata = self.blob.metadata
+            )
+            self.blob._load_metadata()
+        super().close()
+
+
+class FakeBucket:
+    """
+    Bucket en memoria: nombre de objeto -> bytes (y su metadata propia).
+    """
+
+    def __init__(self, name: str, client: "FakeClient"):
+        self.name = name
+        self.client = client
+        self._objects: Dict[str, bytes] = {}
+        self._metadata: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _put(self, name: str, data: bytes, simulate_network: bool = True, metadata: Optional[dict] = None) -> None:
+        if simulate_network:
+            self.client._simulate_transfer(len(data))
+        if self.client._should_fail(name):
+            raise ConnectionError(f"Fallo simulado al subir gs://{self.name}/{name}")
+        with self._lock:
+            self._objects[name] = data
+            self.client.uploads += 1
+        #como en GCS, un objeto nuevo reemplaza también la metadata anterior
+        self._set_metadata(name, metadata)
+
+    def _set_metadata(self, name: str, metadata: Optional[dict]) -> None:
+        with self._lock:
+            if metadata:
+                self._metadata[name] = dict(metadata)
+            else:
+                self._metadata.pop(name, None)
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(name, self)
+
+    def get_blob(self, name: str) -> Optional[FakeBlob]:
+        if name not in self._objects:
+            return None
+        return FakeBlob(name, self)._load_metadata()
+
+    def list_blobs(self, prefix: Optional[str] = None) -> Iterator[FakeBlob]:
+        with self._lock:
+            names = sorted(self._objects)
+        for name in names:
+            if prefix is None or name.startswith(prefix):
+                yield FakeBlob(name, self)._load_metadata()
+
+
+class FakeClient:
+    """
+    Reemplazo de `storage.Client`. `uploads` cuenta las escrituras de objetos
+    recibidas, útil para verificar que una carga se omitió; `writers` guarda
+    los writers resumables abiertos.
+
+    Parámetros de simulación:
+    - latency_s: segundos fijos por cada subida.
+    - stream_bandwidth_bps: bytes/s máximos de un stream de subida.
+    - fail_uploads: fragmento de nombre de objeto cuyas subidas fallan.
+    - max_failures: cantidad de fallos a simular antes de aceptar subidas
+      (None = fallan siempre).
+    """
+
+    def __init__(
+        self,
+        project: str = "fake-project",
+        latency_s: float = 0.0,
+        stream_bandwidth_bps: Optional[float] = None,
+        fail_uploads: Optional[str] = None,
+        max_failures: Optional[int] = None,
+    ):
+        self.project = project
+        self.latency_s = latency_s
+        self.stream_bandwidth_bps = stream_bandwidth_bps
+        self.fail_uploads = fail_uploads
+        self.max_failures = max_failures
+        self.failures = 0
+        self.uploads = 0
+        self.writers = []
+        self._buckets: Dict[str, FakeBucket] = {}
+        self._lock = threading.Lock()
+
+    def _should_fail(self, name: str) -> bool:
+        if not self.fail_uploads or self.fail_uploads not in name:
+            return False
+        with self._lock:
+            if self.max_failures is not None and self.failures >= self.max_failures:
+                return False
+            self.failures += 1
+            return True
+
+    def _simulate_transfer(self, n_bytes: int) -> None:
+        delay = self.latency_s
+        if self.stream_bandwidth_bps:
+            delay += n_bytes / self.stream_bandwidth_bps
+        if delay:
+            time.sleep(delay)
+
+    def bucket(self, name: str) -> FakeBucket:
+        with self._lock:
+            if name not in self._buckets:
+                self._buckets[name] = FakeBucket(name, self)
+            return self._buckets[name]
+
+    def list_blobs(self, bucket_or_name, prefix: Optional[str] = None) -> Iterator[FakeBlob]:
+        name = bucket_or_name if isinstance(bucket_or_name, str) else bucket_or_name.name
+        return self.bucket(name).list_blobs(prefix = prefix)
@@ -0,0 +1,316 @@
+"""
+run_benchmarks.py
+=================
+
+Suite de benchmarks del pipeline sobre archivos sintéticos con la forma del
+dataset MINSAL (ver `benchmarks/synthetic.py`).
+
+Cada etapa (extract, extract_cached, transform, transform_parallel, load,
+inspect) se mide por separado y en un
+subproceso propio, de modo que el pico de memoria de una etapa no contamine
+a las demás. `extract_cached` mide `extract_csv` leyendo desde el caché Arrow
+del parseo (ver `src/parse_cache.py`), precargado fuera de la medición, y
+`transform_parallel` el transform en un pool de un proceso por CPU (su cpu_s
+sólo incluye al proceso principal). La medición usa `src.metrics.stage` (tiempo de pared, CPU,
+pico de RSS y, con --trace-memory, pico de tracemalloc); los insumos de cada
+etapa (p. ej. el DataFrame extraído para transform) se preparan fuera de la
+etapa medida.
+
+Los resultados se guardan como JSON en `benchmarks/results/<commit>.json`,
+y el subcomando `compare` contrasta dos resultados y termina con código 1
+si alguna métrica empeoró más allá del umbral, para usarlo en CI.
+
+Uso:
+    python -m benchmarks.run_benchmarks run --rows 100000 1000000 --repeat 3
+    python -m benchmarks.run_benchmarks compare a3d0137 HEAD --threshold 0.15
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, UTC
+from pathlib import Path
+
+from benchmarks.synthetic import generate_raw_csv
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+STAGES = ("extract", "extract_cached", "transform", "transform_parallel", "load", "inspect")
+
+# métricas comparadas y diferencia absoluta mínima para considerarla
+# regresión (evita falsos positivos por ruido en etapas muy cortas)
+COMPARED_METRICS = {
+    "wall_s": 0.05,
+    "cpu_s": 0.05,
+    "peak_rss_mb": 10.0,
+}
+DEFAULT_THRESHOLD = 0.10
+
+
+#==================
+#Medición (subproceso)
+#==================
+
+def measure_stage(path: Path, stage_name: str, backend: str = "pandas", trace_memory: bool = False) -> dict:
+    """
+    Mide una etapa del pipeline sobre `path` en el proceso actual.
+    """
+    import tracemalloc
+
+    import src.extract as extract
+    from src import parse_cache
+    from src.inspect_csv import inspect_csv
+    from src.load import load_csv
+    from src.metrics import stage, start_run
+    from src.transform import transform_chunk, transform_parallel
+
+    extract.RAW_DIR = path.parent
+    start_run()
+
+    df = None
+    if stage_name in ("transform", "transform_parallel", "load"):
+        df = extract.extract_csv(path.name, backend = backend)
+    if stage_name == "load":
+        df = transform_chunk(df)
+
+    cache_dir = tempfile.TemporaryDirectory()
+    parse_cache.CACHE_DIR = Path(cache_dir.name)
+    if stage_name == "extract_cached":
+        extract.extract_csv(path.name, backend = backend, use_cache = True)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    with cache_dir, tempfile.TemporaryDirectory() as tmp, stage(f"bench.{stage_name}") as record:
+        if stage_name == "extract":
+            record["rows_out"] = len(extract.extract_csv(path.name, backend = backend))
+        elif stage_name == "extract_cached":
+            record["rows_out"] = len(extract.extract_csv(path.name, backend = backend, use_cache = True))
+        elif stage_name == "transform":
+            record["rows_out"] = len(transform_chunk(df))
+        elif stage_name == "transform_parallel":
+            record["rows_out"] = len(transform_parallel(df, workers = os.cpu_count() or 1))
+        elif stage_name == "load":
+            record["bytes_written"] = load_csv(df, output_dir = Path(tmp), file_name = "bench.csv").stat().st_size
+        elif stage_name == "inspect":
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                inspect_csv(path)
+        else:
+            raise ValueError(f"Etapa inválida: {stage_name}. Opciones: {STAGES}")
+
+    return {
+        key: record.get(key)
+        for key in ("wall_s", "cpu_s", "peak_rss_mb", "rss_delta_mb", "tracemalloc_peak_mb", "rows_out", "bytes_written")
+    }
+
+
+def _run_worker(path: Path, stage_name: str, backend: str, trace_memory: bool) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.run_benchmarks", "worker", str(path), stage_name, "--backend", backend]
+    if trace_memory:
+        cmd.append("--trace-memory")
+    salida = subprocess.run(cmd, check = True, capture_output = True, text = True, cwd = BASE_DIR)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+#==================
+#Resultados
+#==================
+
+def git_commit() -> str:
+    """
+    Commit actual abreviado (con sufijo `-dirty` si hay cambios sin commitear),
+    o 'unknown' fuera de un repositorio git.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check = True, capture_output = True, text = True, cwd = BASE_DIR,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            check = True, capture_output = True, text = True, cwd = BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run_suite(
+    rows_list,
+    stages = STAGES,
+    backend: str = "pandas",
+    repeat: int = 1,
+    trace_memory: bool = False,
+    data_dir = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Ejecuta la suite y retorna el documento de resultados.
+
+    Con `repeat` > 1 se conserva el mejor tiempo (mínimo) y el mayor pico de
+    memoria de las repeticiones. Con `data_dir` los archivos sintéticos se
+    reutilizan entre corridas.
+    """
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(data_dir or tmp)
+        for rows in rows_list:
+            path = data_dir / f"synthetic_{rows}_s{seed}.csv"
+            if not path.exists():
+                print(f"Generando {rows:,} filas sintéticas en {path}", file = sys.stderr)
+                generate_raw_csv(path, rows, seed)
+
+            for stage_name in stages:
+                medidas = [_run_worker(path, stage_name, backend, trace_memory) for _ in range(repeat)]
+                r = {
+                    "stage": stage_name,
+                    "rows": rows,
+                    "backend": backend,
+                    "wall_s": min(m["wall_s"] for m in medidas),
+                    "cpu_s": min(m["cpu_s"] for m in medidas),
+                    "peak_rss_mb": max(m["peak_rss_mb"] for m in medidas),
+                    "rss_delta_mb": max(m["rss_delta_mb"] for m in medidas),
+                    "tracemalloc_peak_mb": medidas[0]["tracemalloc_peak_mb"],
+                    "bytes_written": medidas[0]["bytes_written"],
+                }
+                resultados.append(r)
+                print(
+                    f"filas={rows:>11,} | {stage_name:<18} | wall {r['wall_s']:8.3f} s | cpu {r['cpu_s']:8.3f} s"
+                    f" | pico RSS {r['peak_rss_mb']:8.1f} MB"
+                )
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(UTC).isoformat(timespec = "seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": resultados,
+    }
+
+
+def save_results(doc: dict, results_dir: Path = RESULTS_DIR) -> Path:
+    results_dir.mkdir(parents = True, exist_ok = True)
+    path = results_dir / f"{doc['commit']}.json"
+    path.write_text(json.dumps(doc, indent = 2) + "\n", encoding = "utf-8")
+    return path
+
+
+def load_results(ref: str, results_dir: Path = RESULTS_DIR) -> dict:
+    """
+    Carga un resultado por ruta o por commit (`HEAD` o un hash abreviado).
+    """
+    path = Path(ref)
+    if not path.is_file():
+        if ref == "HEAD":
+            ref = git_commit()
+        path = results_dir / f"{ref}.json"
+    if not path.is_file():
+        raise FileNotFoundError(f"No existen resultados para {ref} en {results_dir}")
+    return json.loads(path.read_text(encoding = "utf-8"))
+
+
+def compare_results(base: dict, head: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compara dos documentos de resultados por (etapa, filas, backend).
+
+    Retorna la lista de regresiones: métricas de `head` que superan a las de
+    `base` en más de `threshold` (relativo) y en más del mínimo absoluto de
+    `COMPARED_METRICS`.
+    """
+    base_index = {(r["stage"], r["rows"], r["backend"]): r for r in base["results"]}
+    regresiones = []
+
+    for r in head["results"]:
+        anterior = base_index.get((r["stage"], r["rows"], r["backend"]))
+        if anterior is None:
+            continue
+        for metric, minimo in COMPARED_METRICS.items():
+            antes, ahora = anterior.get(metric), r.get(metric)
+            if antes is None or ahora is None:
+                continue
+            if ahora - antes > minimo and ahora > antes * (1 + threshold):
+                regresiones.append({
+                    "stage": r["stage"],
+                    "rows": r["rows"],
+                    "backend": r["backend"],
+                    "metric": metric,
+                    "base": antes,
+                    "head": ahora,
+                    "change": round(ahora / antes - 1, 4) if antes else None,
+                })
+    return regresiones
+
+
+#==================
+#CLI
+#==================
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Suite de benchmarks del pipeline ETL")
+    sub = parser.add_subparsers(dest = "command", required = True)
+
+    run = sub.add_parser("run", help = "mide las etapas y guarda los resultados del commit actual")
+    run.add_argument("--rows", type = int, nargs = "+", default = [100_000, 1_000_000])
+    run.add_argument("--stages", nargs = "+", choices = STAGES, default = list(STAGES))
+    run.add_argument("--backend", choices = ("pandas", "pyarrow"), default = "pandas")
+    run.add_argument("--repeat", type = int, default = 1)
+    run.add_argument("--seed", type = int, default = 0)
+    run.add_argument("--trace-memory", action = "store_true", help = "agrega el pico de tracemalloc (más lento)")
+    run.add_argument("--data-dir", type = Path, help = "reutiliza los CSV sintéticos entre corridas")
+    run.add_argument("--results-dir", type = Path, default = RESULTS_DIR)
+
+    compare = sub.add_parser("compare", help = "compara dos resultados y falla si hay regresiones")
+    compare.add_argument("base", help = "commit o ruta del resultado base")
+    compare.add_argument("head", nargs = "?", default = "HEAD", help = "commit o ruta del resultado nuevo")
+    compare.add_argument("--threshold", type = float, default = DEFAULT_THRESHOLD)
+    compare.add_argument("--results-dir", type = Path, default = RESULTS_DIR)
+
+    worker = sub.add_parser("worker")
+    worker.add_argument("path", type = Path)
+    worker.add_argument("stage", choices = STAGES)
+    worker.add_argument("--backend", default = "pandas")
+    worker.add_argument("--trace-memory", action = "store_true")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        print(json.dumps(measure_stage(args.path, args.stage, args.backend, args.trace_memory)))
+        return 0
+
+    if args.command == "run":
+        doc = run_suite(
+            args.rows, args.stages, backend = args.backend, repeat = args.repeat,
+            trace_memory = args.trace_memory, data_dir = args.data_dir, seed = args.seed,
+        )
+        print(f"Resultados guardados en {save_results(doc, args.results_dir)}")
+        return 0
+
+    base = load_results(args.base, args.results_dir)
+    head = load_results(args.head, args.results_dir)
+    regresiones = compare_results(base, head, args.threshold)
+
+    print(f"base = {base['commit']} | head = {head['commit']} | umbral = {args.threshold:.0%}")
+    for r in regresiones:
+        print(
+            f"REGRESIÓN {r['stage']:<18} filas={r['rows']:>11,} | {r['metric']:<12}"
+            f" {r['base']:.3f} -> {r['head']:.3f} ({r['change']:+.1%})"
+        )
+    if not regresiones:
+        print("Sin regresiones")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
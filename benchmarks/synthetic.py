@@ -0,0 +1,160 @@
+"""
+synthetic.py
+============
+
+Generador determinista de archivos con la forma del dataset MINSAL
+(`def_semana_epidemiologica.csv`), para medir el pipeline con volúmenes
+mayores a los fixtures de `tests/data`.
+
+Las filas recorren la grilla año -> región -> sexo -> grupo etario -> semana
+(la semana varía más rápido, como en el archivo original). Cada año tiene 52
+o 53 semanas según el calendario ISO, y se usan las 16 regiones, ambos
+códigos de SEXO y las etiquetas reales de GRUPO_EDAD. El archivo se escribe
+por bloques, por lo que el tamaño no depende de la memoria disponible
+(de 100 mil a 50 millones de filas o más).
+
+Uso:
+    python -m benchmarks.synthetic --rows 5000000 --output data/raw/synthetic.csv
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "ANO_ESTADISTICO",
+    "SEMANA_ESTADISTICA",
+    "GRUPO_EDAD",
+    "SEXO",
+    "REGION",
+    "POBLACION",
+    "MUERTES_OBS",
+]
+
+GRUPOS_EDAD = ["0 a 14", "15 a 39", "40 a 64", "65 a 79", "80 +"]
+
+SEXOS = [1, 2]
+
+REGIONES = [
+    "De Arica y Parinacota",
+    "De Tarapacá",
+    "De Antofagasta",
+    "De Atacama",
+    "De Coquimbo",
+    "De Valparaíso",
+    "Metropolitana de Santiago",
+    "Del Libertador B. O'Higgins",
+    "Del Maule",
+    "De Ñuble",
+    "Del Bíobío",
+    "De La Araucanía",
+    "De Los Ríos",
+    "De Los Lagos",
+    "De Aisén del Gral. C. Ibáñez del Campo",
+    "De Magallanes y de La Antártica Chilena",
+]
+
+ANO_INICIAL = 2010
+
+# filas por semana de un año: grupos etarios x sexos x regiones
+FILAS_POR_SEMANA = len(GRUPOS_EDAD) * len(SEXOS) * len(REGIONES)
+
+
+def semanas_del_ano(ano: int) -> int:
+    """
+    Cantidad de semanas (52 o 53) del año según el calendario ISO.
+    """
+    return date(ano, 12, 28).isocalendar()[1]
+
+
+def _bloques_por_ano(filas_hasta: int):
+    """
+    Semanas e índice de fila inicial de cada año necesario para cubrir
+    `filas_hasta` filas.
+    """
+    semanas, inicios = [], []
+    total, ano = 0, ANO_INICIAL
+    while total < filas_hasta:
+        inicios.append(total)
+        semanas.append(semanas_del_ano(ano))
+        total += semanas[-1] * FILAS_POR_SEMANA
+        ano += 1
+    return np.asarray(semanas, dtype=np.int64), np.asarray(inicios, dtype=np.int64)
+
+
+def generate_frame(start: int, rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Genera las filas [start, start + rows) de la grilla sintética.
+
+    El resultado depende sólo de `start`, `rows` y `seed`, por lo que un
+    mismo tamaño, semilla y tamaño de bloque producen siempre el mismo
+    archivo.
+    """
+    i = np.arange(start, start + rows, dtype=np.int64)
+
+    semanas, inicios = _bloques_por_ano(start + rows)
+    ano = np.searchsorted(inicios, i, side="right") - 1
+    semanas_ano = semanas[ano]
+
+    offset = i - inicios[ano]
+    semana, resto = offset % semanas_ano, offset // semanas_ano
+    grupo, resto = resto % len(GRUPOS_EDAD), resto // len(GRUPOS_EDAD)
+    sexo, region = resto % len(SEXOS), resto // len(SEXOS)
+
+    # la semilla por bloque se deriva de la posición para mantener determinismo
+    rng = np.random.default_rng([seed, start])
+    poblacion = rng.integers(1_000, 500_000, size=rows)
+    muertes = rng.poisson(lam=np.maximum(poblacion / 20_000, 0.1))
+
+    return pd.DataFrame({
+        "ANO_ESTADISTICO": ano + ANO_INICIAL,
+        "SEMANA_ESTADISTICA": semana + 1,
+        "GRUPO_EDAD": np.asarray(GRUPOS_EDAD, dtype=object)[grupo],
+        "SEXO": np.asarray(SEXOS)[sexo],
+        "REGION": np.asarray(REGIONES, dtype=object)[region],
+        "POBLACION": poblacion,
+        "MUERTES_OBS": muertes,
+    }, columns=COLUMNS)
+
+
+def generate_raw_csv(
+    path: Path,
+    rows: int,
+    seed: int = 0,
+    chunk_size: int = 1_000_000,
+) -> Path:
+    """
+    Escribe un CSV sintético delimitado por '|' con `rows` filas.
+
+    Retorna el Path del archivo generado.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for start in range(0, rows, chunk_size):
+            chunk = generate_frame(start, min(chunk_size, rows - start), seed)
+            chunk.to_csv(f, sep="|", index=False, header=start == 0)
+
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un CSV sintético con la forma del dataset MINSAL")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    path = generate_raw_csv(args.output, args.rows, args.seed)
+    print(f"{args.rows:,} filas escritas en {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+cdc.py
+======
+
+Change data capture entre versiones del dataset transformado.
+
+`load_csv_to_gcs` guarda un snapshot completo `<base>_<YYYY-MM-DD>.csv` por
+ejecución. Esta etapa compara el snapshot nuevo con la versión anterior del
+bucket y publica junto a él sólo las filas que cambiaron:
+
+    transformed/<base>_<YYYY-MM-DD>.csv          snapshot completo
+    transformed/<base>_<YYYY-MM-DD>_cdc.csv.gz   delta respecto de la versión anterior
+
+El delta es un CSV gzip con las columnas del snapshot precedidas por
+`CDC_OP`: 'I' (fila nueva), 'U' (fila con otros valores; se emite la
+versión nueva) o 'D' (fila eliminada; se emite la versión anterior).
+
+Cada fila se identifica por su llave natural (ANO_ESTADISTICO,
+SEMANA_ESTADISTICA, GRUPO_EDAD, SEXO, REGION). Por bloque se calculan de
+forma vectorizada dos hashes de 64 bits: el de la llave y el de los valores
+(sin FECHA_CARGA, que cambia en cada carga). De la versión anterior sólo se
+mantienen en memoria esos dos arreglos ordenados por llave (16 bytes por
+fila); el snapshot nuevo se recorre por bloques y se cruza con
+`np.searchsorted`. Las filas eliminadas se recuperan con una segunda pasada
+por bloques sobre la versión anterior.
+
+Uso (dos snapshots locales):
+    python -m src.cdc anterior.csv nuevo.csv --output delta.csv.gz
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+from src.extract import DEFAULT_CHUNK_SIZE
+from src.gcs_client import get_bucket
+from src.load_bq import KEY_COLUMNS
+from src.load_gcs import BUCKET_NAME, latest_version_blob
+from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = setup_logger()
+
+# Columnas que no cuentan como cambio (se recalculan en cada carga)
+IGNORED_COLUMNS = ("FECHA_CARGA",)
+
+OPERATION_COLUMN = "CDC_OP"
+INSERT, UPDATE, DELETE = "I", "U", "D"
+
+CDC_SUFFIX = "_cdc.csv.gz"
+
+
+def _normalized(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    Columnas con una representación estable para el hash, sin importar
+    cómo se leyó el bloque: numéricas como float64 (enteros, enteros
+    nullable y enteros pequeños de `compact_frame` hashean igual que al
+    releer el CSV) y el resto como texto.
+    """
+    import pandas as pd
+    from pandas.api.types import is_numeric_dtype
+
+    out = {}
+    for column in columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(values.cat.categories.dtype)
+        out[column] = values.astype("float64") if is_numeric_dtype(values) else values.astype(object)
+    return pd.DataFrame(out)
+
+
+def row_hashes(df: pd.DataFrame) -> tuple:
+    """
+    (hash de la llave natural, hash de los valores) por fila, como arreglos
+    uint64.
+    """
+    from pandas.util import hash_pandas_object
+
+    missing = set(KEY_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas de la llave natural: {sorted(missing)}")
+
+    values = [c for c in df.columns if c not in KEY_COLUMNS and c not in IGNORED_COLUMNS]
+    keys = hash_pandas_object(_normalized(df, KEY_COLUMNS), index = False).to_numpy()
+    rows = hash_pandas_object(_normalized(df, values), index = False).to_numpy()
+    return keys, rows
+
+
+class SnapshotIndex:
+    """
+    Hashes de llave y de valores de un snapshot, ordenados por llave, y las
+    llaves vistas en el snapshot nuevo (para detectar eliminaciones).
+    """
+
+    def __init__(self, keys: np.ndarray, rows: np.ndarray):
+        import numpy as np
+
+        order = np.argsort(keys, kind = "stable")
+        self.keys = keys[order]
+        self.rows = rows[order]
+        self.seen = np.zeros(len(self.keys), dtype = bool)
+
+        duplicated = int((self.keys[1:] == self.keys[:-1]).sum())
+        if duplicated:
+            raise ValueError(f"La versión anterior tiene {duplicated} llaves naturales repetidas")
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> "SnapshotIndex":
+        import numpy as np
+
+        keys, rows = [], []
+        for chunk in chunks:
+            k, r = row_hashes(chunk)
+            keys.append(k)
+            rows.append(r)
+
+        empty = np.empty(0, dtype = np.uint64)
+        return cls(np.concatenate(keys) if keys else empty, np.concatenate(rows) if rows else empty)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def classify(self, chunk: pd.DataFrame) -> np.ndarray:
+        """
+        Operación CDC de cada fila de un bloque del snapshot nuevo: 'I', 'U'
+        o '' (sin cambios). Marca sus llaves como vistas.
+        """
+        import numpy as np
+
+        keys, rows = row_hashes(chunk)
+        ops = np.full(len(chunk), "", dtype = object)
+        if len(self.keys) == 0:
+            ops[:] = INSERT
+            return ops
+
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[pos] == keys
+        self.seen[pos[found]] = True
+
+        ops[~found] = INSERT
+        ops[found & (self.rows[pos] != rows)] = UPDATE
+        return ops
+
+    def deleted_mask(self, chunk: pd.DataFrame) -> np.ndarray:
+        """
+        Filas de un bloque de la versión anterior cuya llave no apareció en
+        el snapshot nuevo.
+        """
+        import numpy as np
+
+        keys, _ = row_hashes(chunk)
+        return np.isin(keys, self.keys[~self.seen])
+
+
+def diff_chunks(
+    previous: Callable[[], Iterable[pd.DataFrame]],
+    current: Iterable[pd.DataFrame],
+) -> Iterator[pd.DataFrame]:
+    """
+    Bloques del delta entre dos snapshots leídos por bloques: primero las
+    filas nuevas y actualizadas (en el orden del snapshot nuevo) y luego
+    las eliminadas. `previous` es una función que retorna un iterador nuevo
+    de bloques de la versión anterior, porque se recorre dos veces.
+    """
+    index = SnapshotIndex.from_chunks(previous())
+
+    for chunk in current:
+        ops = index.classify(chunk)
+        changed = ops != ""
+        if changed.any():
+            yield chunk.loc[changed].assign(**{OPERATION_COLUMN: ops[changed]})
+
+    if index.seen.all():
+        return
+    for chunk in previous():
+        mask = index.deleted_mask(chunk)
+        if mask.any():
+            yield chunk.loc[mask].assign(**{OPERATION_COLUMN: DELETE})
+
+
+def _read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Bloques de un snapshot CSV como texto, tal como está escrito: ambos
+    snapshots hashean igual y el delta reproduce los valores sin cambios de
+    formato (p. ej. enteros con nulos que pandas leería como float).
+    """
+    import pandas as pd
+
+    with pd.read_csv(path, chunksize = chunk_size, dtype = str, keep_default_na = False) as reader:
+        yield from reader
+
+
+@instrumented("cdc_delta")
+def cdc_delta(previous_path: Path, current_path: Path, output_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Escribe en `output_path` (CSV gzip) el delta entre dos snapshots CSV
+    locales, leyéndolos por bloques de `chunk_size` filas.
+
+    Retorna el resumen: filas insertadas, actualizadas y eliminadas.
+    """
+    import pandas as pd
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser mayor a 0")
+
+    columns = list(pd.read_csv(current_path, nrows = 0).columns)
+    summary = {INSERT: 0, UPDATE: 0, DELETE: 0}
+
+    output_path.parent.mkdir(parents = True, exist_ok = True)
+    with gzip.open(output_path, "wt", encoding = "utf-8", newline = "") as f:
+        pd.DataFrame(columns = [OPERATION_COLUMN, *columns]).to_csv(f, index = False)
+        delta = diff_chunks(
+            lambda: _read_chunks(previous_path, chunk_size),
+            _read_chunks(current_path, chunk_size),
+        )
+        for chunk in delta:
+            chunk[[OPERATION_COLUMN, *columns]].to_csv(f, index = False, header = False)
+            for op, count in chunk[OPERATION_COLUMN].value_counts().items():
+                summary[op] += int(count)
+
+    result = {"inserted": summary[INSERT], "updated": summary[UPDATE], "deleted": summary[DELETE]}
+    annotate(rows_out = sum(summary.values()), bytes_written = output_path.stat().st_size)
+    logger.info(f"Delta CDC generado | {output_path} | {result}")
+    return result
+
+
+@instrumented("load_cdc_to_gcs")
+def load_cdc_to_gcs(base_file_name: str, snapshot_uri: str, local_path: Path,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+    """
+    Calcula el delta del snapshot `snapshot_uri` (cuyo contenido es
+    `local_path`) respecto de la versión anterior del bucket y lo sube
+    junto a él como `<snapshot>_cdc.csv.gz`.
+
+    Retorna la URI gs:// del delta, o None si no hay versión anterior (la
+    primera carga es el propio snapshot).
+    """
+    prefix = f"gs://{BUCKET_NAME}/"
+    if not snapshot_uri.startswith(prefix) or not snapshot_uri.endswith(".csv"):
+        raise ValueError(f"URI de snapshot CSV inválida: {snapshot_uri}")
+    object_path = snapshot_uri.removeprefix(prefix)
+
+    bucket = get_bucket(BUCKET_NAME)
+    previous = latest_version_blob(bucket, base_file_name, before = object_path)
+    if previous is None:
+        logger.info(f"Sin versión anterior de {base_file_name} en GCS, se omite el delta CDC")
+        return None
+
+    logger.info(f"Delta CDC | gs://{BUCKET_NAME}/{previous.name} -> {snapshot_uri}")
+    cdc_path = f"{object_path.removesuffix('.csv')}{CDC_SUFFIX}"
+    with tempfile.TemporaryDirectory() as tmp:
+        previous_path = Path(tmp) / "previous.csv"
+        previous.download_to_filename(previous_path)
+
+        delta_path = Path(tmp) / Path(cdc_path).name
+        summary = cdc_delta(previous_path, Path(local_path), delta_path, chunk_size)
+        bucket.blob(cdc_path).upload_from_filename(delta_path)
+
+    annotate(**summary)
+    logger.info(f"Delta CDC cargado en GCS | gs://{BUCKET_NAME}/{cdc_path}")
+    return f"gs://{BUCKET_NAME}/{cdc_path}"
+
+
+def main(argv = None) -> None:
+    parser = argparse.ArgumentParser(description = "Delta CDC entre dos snapshots CSV transformados")
+    parser.add_argument("previous", type = Path, help = "snapshot anterior")
+    parser.add_argument("current", type = Path, help = "snapshot nuevo")
+    parser.add_argument("--output", type = Path, required = True, help = "delta CSV gzip de salida")
+    parser.add_argument("--chunk-size", type = int, default = DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(cdc_delta(args.previous, args.current, args.output, args.chunk_size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+checkpoint.py
+=============
+
+Manifiesto de ejecución del pipeline para reanudar corridas interrumpidas.
+
+Por cada dataset de salida se guarda en data/checkpoints/<dataset>.json un
+registro por etapa completada de `main()`, con:
+- la huella de sus entradas (hash de un dict con el contenido del raw, los
+  parámetros de la corrida y el hash del artefacto de la etapa anterior);
+- el artefacto producido (ruta local o URI gs:// / tabla BigQuery) y el
+  hash de su contenido, si es local.
+
+Al volver a ejecutar, una etapa se omite si su huella coincide con la
+registrada y su artefacto local sigue existiendo con el mismo contenido; la
+corrida continúa desde la primera etapa incompleta. Como cada etapa incluye
+en su huella el hash del artefacto anterior, una etapa que se rehace con
+otro resultado invalida a las siguientes.
+
+Los hashes de archivos locales son CRC32C; para no releer archivos grandes
+se guardan junto a su tamaño y mtime, y sólo se recalculan si cambian.
+
+Uso (limpieza de checkpoints obsoletos):
+    python -m src.checkpoint list
+    python -m src.checkpoint clean [--older-than-days N] [--all]
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Optional
+
+from src.logger import setup_logger
+from src.parse_cache import source_crc32c
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Directorio de los manifiestos de ejecución
+CHECKPOINT_DIR = BASE_DIR / "data" / "checkpoints"
+
+# Antigüedad a partir de la cual `clean` considera obsoleto un manifiesto
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def fingerprint(inputs: dict) -> str:
+    """
+    Huella estable de un dict de entradas (sha256 del JSON ordenado).
+    """
+    payload = json.dumps(inputs, sort_keys = True, default = str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _stat_key(path: Path) -> list:
+    """
+    (ruta relativa, tamaño, mtime) de los archivos de un artefacto; sirve
+    para detectar cambios sin leer el contenido.
+    """
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.is_file())
+        return [[p.relative_to(path).as_posix(), p.stat().st_size, p.stat().st_mtime_ns] for p in files]
+    stat = path.stat()
+    return [[path.name, stat.st_size, stat.st_mtime_ns]]
+
+
+def content_hash(path: Path) -> str:
+    """
+    CRC32C (hex) de un archivo, o de un directorio como hash de la lista
+    ordenada de (ruta relativa, CRC32C) de sus archivos.
+    """
+    if not path.is_dir():
+        return source_crc32c(path)
+
+    digest = hashlib.sha256()
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(f"{file.relative_to(path).as_posix()}:{source_crc32c(file)}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent = 2, default = str), encoding = "utf-8")
+    os.replace(tmp, path)
+
+
+class RunManifest:
+    """
+    Etapas completadas de un dataset de salida.
+
+    Uso:
+        manifest = RunManifest("def_semana_epidemiologica_transformed")
+        inputs = {"raw": manifest.file_hash(raw_path), ...}
+        record = manifest.completed("transform", inputs)
+        if record is None:
+            path = ...  # ejecuta la etapa
+            manifest.complete("transform", inputs, path)
+
+    Con `force = True` se ignoran las etapas registradas (todas se rehacen)
+    y el manifiesto se reescribe con las nuevas.
+    """
+
+    def __init__(self, name: str, force: bool = False):
+        self.name = name
+        self.force = force
+        self.path = CHECKPOINT_DIR / f"{name}.json"
+        self.data = {"name": name, "stages": {}, "files": {}}
+
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding = "utf-8"))
+            except (OSError, ValueError):
+                logger.warning(f"Manifiesto de checkpoints ilegible, se descarta: {self.path}")
+            else:
+                self.data["files"] = data.get("files", {})
+                if not force:
+                    self.data["stages"] = data.get("stages", {})
+
+    @property
+    def stages(self) -> dict:
+        return self.data["stages"]
+
+    def file_hash(self, path: Path) -> Optional[str]:
+        """
+        Hash del contenido de `path` (archivo o directorio), reutilizando el
+        valor guardado si tamaño y mtime no cambiaron. None si no existe.
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        key = str(path.resolve())
+        stat = _stat_key(path)
+        cached = self.data["files"].get(key)
+        if cached and cached["stat"] == stat:
+            return cached["hash"]
+
+        value = content_hash(path)
+        self.data["files"][key] = {"stat": stat, "hash": value}
+        return value
+
+    def completed(self, stage: str, inputs: dict) -> Optional[dict]:
+        """
+        Registro de `stage` si se completó con las mismas entradas y su
+        artefacto local (si lo tiene) no cambió; None si hay que ejecutarla.
+        """
+        record = self.stages.get(stage)
+        if record is None or record["inputs"] != fingerprint(inputs):
+            return None
+
+        if record.get("artifact_hash") is not None:
+            if self.file_hash(Path(record["artifact"])) != record["artifact_hash"]:
+                logger.info(f"Checkpoint invalidado, el artefacto cambió | etapa = {stage} | {record['artifact']}")
+                return None
+
+        logger.info(f"Checkpoint vigente, etapa omitida | etapa = {stage} | artefacto: {record['artifact']}")
+        return record
+
+    def complete(self, stage: str, inputs: dict, artifact, **extra) -> dict:
+        """
+        Registra `stage` como completada con `artifact` (ruta local o
+        identificador remoto) y la guarda de inmediato en el manifiesto.
+        """
+        local = isinstance(artifact, Path)
+        record = {
+            "inputs": fingerprint(inputs),
+            "artifact": str(artifact),
+            "artifact_hash": self.file_hash(artifact) if local else None,
+            "completed_at": datetime.now(UTC).isoformat(timespec = "seconds"),
+            **extra,
+        }
+        self.stages[stage] = record
+        self.save()
+        return record
+
+    def save(self) -> Path:
+        CHECKPOINT_DIR.mkdir(parents = True, exist_ok = True)
+        self.data["updated_at"] = datetime.now(UTC).isoformat(timespec = "seconds")
+        _write_json(self.path, self.data)
+        return self.path
+
+
+def _is_stale(data: dict, max_age_days: float) -> bool:
+    """
+    Un manifiesto es obsoleto si es más antiguo que `max_age_days`, si
+    `updated_at` falta o no es una fecha ISO, o si alguno de sus artefactos
+    locales ya no existe.
+    """
+    try:
+        age_s = time.time() - datetime.fromisoformat(data["updated_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return True
+    if age_s > max_age_days * 86400:
+        return True
+
+    return any(
+        record.get("artifact_hash") is not None and not Path(record["artifact"]).exists()
+        for record in data.get("stages", {}).values()
+    )
+
+
+def clean(max_age_days: float = DEFAULT_MAX_AGE_DAYS, remove_all: bool = False) -> list:
+    """
+    Elimina los manifiestos obsoletos (o todos con `remove_all`) y retorna
+    las rutas eliminadas. Los manifiestos ilegibles también se eliminan.
+    """
+    if not CHECKPOINT_DIR.exists():
+        return []
+
+    removed = []
+    for path in sorted(CHECKPOINT_DIR.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding = "utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        if remove_all or _is_stale(data, max_age_days):
+            path.unlink()
+            removed.append(path)
+
+    for tmp in CHECKPOINT_DIR.glob("*.json.tmp"):
+        tmp.unlink()
+
+    logger.info(f"Checkpoints eliminados: {len(removed)} | directorio: {CHECKPOINT_DIR}")
+    return removed
+
+
+def main(argv = None) -> None:
+    parser = argparse.ArgumentParser(description = "Manifiestos de checkpoints del pipeline")
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    commands.add_parser("list", help = "lista los manifiestos y sus etapas completadas")
+
+    clean_parser = commands.add_parser("clean", help = "elimina manifiestos obsoletos")
+    clean_parser.add_argument(
+        "--older-than-days", type = float, default = DEFAULT_MAX_AGE_DAYS,
+        help = "antigüedad máxima de un manifiesto vigente"
+    )
+    clean_parser.add_argument("--all", dest = "remove_all", action = "store_true", help = "elimina todos")
+    args = parser.parse_args(argv)
+
+    if args.command == "clean":
+        for path in clean(args.older_than_days, args.remove_all):
+            print(f"eliminado {path}")
+        return
+
+    for path in sorted(CHECKPOINT_DIR.glob("*.json")) if CHECKPOINT_DIR.exists() else []:
+        try:
+            data = json.loads(path.read_text(encoding = "utf-8"))
+        except (OSError, ValueError):
+            print(f"{path.stem} | ilegible (se elimina con `clean`)")
+            continue
+        print(f"{data.get('name', path.stem)} | actualizado {data.get('updated_at')}")
+        for stage, record in data.get("stages", {}).items():
+            print(f"  {stage:<20} {record['completed_at']}  {record['artifact']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,13 @@ Validación de existencia y extracción del archivo
 
 Responsabilidades:
 - Verificar existencia del archivo.
-- Leer el CSV con separador esperado.
+- Leer el CSV con separador esperado (backend pandas o pyarrow tipado).
 - Validar que el archivo no esté vacío.
 - Validar esquema mínimo requerido.
+- Entregar el archivo por bloques de filas (modo streaming).
+- Reutilizar el parseo previo del archivo desde el caché Arrow (opcional).
+- Aplicar las reglas de calidad de datos y separar filas inválidas a
+  cuarentena (opcional, ver `src/quality.py`).
 
 
 Proyecto: ETL Datos Públicos
@@ -17,10 +21,17 @@ Fecha: 3 de enero de 2026.
 
 '''
 
-import pandas as pd
+from __future__ import annotations
+
 from pathlib import Path
-from pandas.errors import EmptyDataError
+from typing import TYPE_CHECKING, Iterator, Optional
+from src import parse_cache
+from src.quality import QUALITY_MODES, QualityGate
 from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = setup_logger()
 
@@ -30,19 +41,89 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Directorio donde se almacenan los CSV crudos
 RAW_DIR = BASE_DIR / "data" / "raw"
 
+# Tamaño de bloque por defecto para el modo streaming
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Esquema esperado: columna -> dtype compacto de pandas
+COLUMN_DTYPES = {
+    "ANO_ESTADISTICO": "int16",
+    "SEMANA_ESTADISTICA": "int8",
+    "GRUPO_EDAD": "category",
+    "SEXO": "int8",
+    "REGION": "category",
+    "POBLACION": "int32",
+    "MUERTES_OBS": "int32",
+}
+
 # Esquema mínimo esperado
-EXPECTED_COLUMNS = {
-    "ANO_ESTADISTICO",
-    "SEMANA_ESTADISTICA",
-    "GRUPO_EDAD",
-    "SEXO",
-    "REGION",
-    "POBLACION",
-    "MUERTES_OBS",
+EXPECTED_COLUMNS = set(COLUMN_DTYPES)
+
+# dtypes de las columnas enteras que entregan extract_csv y extract_csv_chunks:
+# enteros nullable, para que un nulo no convierta la columna a float (10 -> 10.0)
+# y ambos modos escriban el mismo CSV; las categóricas no se fijan porque cada
+# bloque tendría sus propias categorías
+INTEGER_DTYPES = {
+    column: dtype.capitalize() for column, dtype in COLUMN_DTYPES.items()
+    if dtype.startswith("int")
 }
 
+# Backends de lectura disponibles
+# - pandas: motor C de pandas con inferencia de tipos (comportamiento original).
+# - pyarrow: parser CSV multihilo de Arrow con el esquema tipado COLUMN_DTYPES.
+BACKENDS = ("pandas", "pyarrow")
 
-def extract_csv(file_name: str) -> pd.DataFrame:
+
+def arrow_schema() -> dict:
+    """
+    Traduce COLUMN_DTYPES a tipos de Arrow para el parser CSV.
+
+    Las columnas categóricas se leen como diccionario (índices int32 sobre
+    strings), que pandas convierte directamente a `category`.
+    """
+    import pyarrow as pa
+
+    tipos = {
+        "int8": pa.int8(),
+        "int16": pa.int16(),
+        "int32": pa.int32(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }
+    return {column: tipos[dtype] for column, dtype in COLUMN_DTYPES.items()}
+
+
+def _read_csv_pyarrow(file_path: Path) -> pd.DataFrame:
+    """
+    Lee el CSV con el parser multihilo de Arrow aplicando el esquema tipado.
+
+    Los errores de Arrow se traducen a las excepciones de pandas que ya
+    documenta `extract_csv`, para que el backend sea intercambiable.
+    """
+    import pyarrow as pa
+    from pandas.errors import EmptyDataError, ParserError
+    from pyarrow import csv as pa_csv
+
+    try:
+        table = pa_csv.read_csv(
+            file_path,
+            read_options = pa_csv.ReadOptions(use_threads = True),
+            parse_options = pa_csv.ParseOptions(delimiter = '|'),
+            convert_options = pa_csv.ConvertOptions(column_types = arrow_schema()),
+        )
+    except pa.ArrowInvalid as e:
+        if file_path.stat().st_size == 0:
+            raise EmptyDataError("No columns to parse from file") from e
+        raise ParserError(str(e)) from e
+
+    return table.to_pandas()
+
+
+@instrumented("extract_csv")
+def extract_csv(
+    file_name: str,
+    backend: str = "pandas",
+    use_cache: bool = False,
+    quality: str = "off",
+) -> pd.DataFrame:
     """
     Carga un archivo CSV desde el directorio raw y valida su estructura básica.
 
@@ -50,33 +131,95 @@ def extract_csv(file_name: str) -> pd.DataFrame:
     ----------
     file_name : str
         Nombre del archivo CSV a cargar.
+    backend : str
+        'pandas' (motor C con inferencia de tipos) o 'pyarrow'
+        (parser multihilo con el esquema tipado COLUMN_DTYPES).
+    use_cache : bool
+        Si es True, reutiliza la tabla parseada guardada en el caché Arrow
+        (`src.parse_cache`) mientras el archivo raw no cambie; en caso
+        contrario parsea el CSV y guarda el resultado validado en el caché
+        (si la escritura falla sólo se registra una advertencia).
+    quality : str
+        'off', 'quarantine' (las filas que violan las reglas de calidad se
+        separan a cuarentena) o 'fail' (además se levanta ValueError).
     
     Retorna
     -------
     pd.DataFrame
-        DataFrame con los datos crudos validados.
+        DataFrame con los datos crudos validados (sin las filas en
+        cuarentena cuando `quality` está activo), con las columnas enteras
+        en los dtypes nullable de INTEGER_DTYPES (igual que el modo streaming).
 
     Excepciones
     -----------
     FileNotFoundError
         Si el archivo no existe.
     ValueError
-        Si el CSV no cumple con el esquema esperado.
+        Si el CSV no cumple con el esquema esperado, el backend o el modo de
+        calidad no existen, hay filas inválidas con `quality = 'fail'`, o
+        con `quality = 'off'` una columna entera tiene texto.
     EmptyDataError
         Si el archivo está vacío.
+    ParserError
+        Si el backend pyarrow no puede interpretar el archivo.
     PermissionError
         Si no se puede leer el archivo por permisos.
     """
 
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de lectura inválido: {backend}. Opciones: {BACKENDS}")
+    if quality not in QUALITY_MODES:
+        raise ValueError(f"Modo de calidad inválido: {quality}. Opciones: {QUALITY_MODES}")
+
     file_path = RAW_DIR / file_name #construye la ruta completa al archivo
     
     if not file_path.exists():
         logger.error(f"No se encontró el archivo raw: {file_path}")
         raise FileNotFoundError(file_path)
 
-    logger.info(f"Cargando archivo RAW: {file_path}")
+    df = parse_cache.load(file_path, backend) if use_cache else None
+    if df is None:
+        df = _read_validated(file_path, file_name, backend)
+        if use_cache:
+            _store_cache(file_path, backend, df)
+
+    if quality != "off":
+        gate = QualityGate(file_name, quality)
+        df = gate.filter(df)
+        gate.close()
+        annotate(rows_quarantined = gate.rows_quarantined)
+
+    return df.astype(INTEGER_DTYPES)
+
+
+def _store_cache(file_path: Path, backend: str, df: pd.DataFrame) -> None:
+    """
+    Guarda `df` en el caché de parseo. Es un atajo para las ejecuciones
+    siguientes: si no se puede escribir (disco lleno, permisos, columnas que
+    Arrow no sabe convertir) se registra una advertencia y la extracción
+    continúa con el DataFrame ya parseado.
+    """
+    import pyarrow as pa
+
+    try:
+        parse_cache.store(file_path, backend, df)
+    except (OSError, pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        logger.warning(f"No se pudo guardar el caché de parseo | {file_path.name} | {e}")
+
+
+def _read_validated(file_path: Path, file_name: str, backend: str) -> pd.DataFrame:
+    """
+    Parsea el CSV con `backend` y valida que tenga filas y el esquema mínimo.
+    """
+    import pandas as pd
+    from pandas.errors import EmptyDataError
+
+    logger.info(f"Cargando archivo RAW: {file_path} | backend = {backend}")
     try:
-        df = pd.read_csv(file_path, sep = '|') #lee el .csv '|' separador
+        if backend == "pyarrow":
+            df = _read_csv_pyarrow(file_path)
+        else:
+            df = pd.read_csv(file_path, sep = '|') #lee el .csv '|' separador
     except EmptyDataError:
         logger.error(f"El archivo {file_name} está vacío")
         raise
@@ -105,3 +248,111 @@ def extract_csv(file_name: str) -> pd.DataFrame:
     logger.info(f"CSV cargado correctamente | Filas = {len(df)} | Columnas = {len(df.columns)}")
 
     return df
+
+
+def extract_csv_chunks(
+    file_name: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    quality: str = "off",
+) -> Iterator[pd.DataFrame]:
+    """
+    Variante streaming de `extract_csv`: entrega el archivo raw por bloques
+    de `chunk_size` filas, sin cargarlo completo en memoria.
+
+    El esquema se valida sólo contra el encabezado, antes de leer datos,
+    por lo que los errores de estructura se levantan al llamar la función
+    y no al iterar.
+
+    Las columnas numéricas se leen con los enteros nullable de
+    INTEGER_DTYPES en lugar de inferir el tipo en cada bloque: un nulo no
+    convierte el bloque a float (10 -> 10.0), y todos los bloques tienen
+    los mismos dtypes. Con `quality` activo el tipo se infiere, para que
+    las reglas puedan enviar a cuarentena los valores no numéricos, y las
+    filas válidas (sin nulos) se convierten a esos mismos dtypes.
+
+    Parámetros
+    ----------
+    file_name : str
+        Nombre del archivo CSV a cargar.
+    chunk_size : int
+        Cantidad de filas por bloque.
+    quality : str
+        Modo de calidad de datos, igual que en `extract_csv`; las reglas se
+        evalúan bloque a bloque y el reporte se escribe al terminar.
+
+    Retorna
+    -------
+    Iterator[pd.DataFrame]
+        Iterador de bloques con los datos crudos.
+
+    Excepciones
+    -----------
+    FileNotFoundError
+        Si el archivo no existe.
+    ValueError
+        Si el encabezado no cumple el esquema esperado, si `chunk_size`
+        no es positivo, o (al iterar) si el archivo no contiene filas o,
+        con `quality = 'off'`, una columna numérica tiene texto.
+    EmptyDataError
+        Si el archivo está vacío.
+    """
+    import pandas as pd
+    from pandas.errors import EmptyDataError
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser mayor a 0")
+    if quality not in QUALITY_MODES:
+        raise ValueError(f"Modo de calidad inválido: {quality}. Opciones: {QUALITY_MODES}")
+
+    file_path = RAW_DIR / file_name
+
+    if not file_path.exists():
+        logger.error(f"No se encontró el archivo raw: {file_path}")
+        raise FileNotFoundError(file_path)
+
+    logger.info(f"Cargando archivo RAW por bloques: {file_path} | chunk_size = {chunk_size}")
+    try:
+        header = pd.read_csv(file_path, sep = '|', nrows = 0) #sólo encabezado
+    except EmptyDataError:
+        logger.error(f"El archivo {file_name} está vacío")
+        raise
+
+    missing_columns = EXPECTED_COLUMNS - set(header.columns)
+    if missing_columns:
+        logger.error(
+                f"CSV inválido. Columnas faltantes: {missing_columns}"
+        )
+        raise ValueError(
+            f"El archivo {file_name} no cumple el esquema que se espera..."
+            f"Columnas faltantes: {missing_columns}"
+        )
+
+    gate = QualityGate(file_name, quality) if quality != "off" else None
+
+    # con reglas de calidad se infiere el tipo, para que el texto inválido llegue a la cuarentena
+    reader = pd.read_csv(file_path, sep = '|', chunksize = chunk_size, dtype = None if gate else INTEGER_DTYPES)
+
+    return _iter_chunks(reader, file_name, gate)
+
+
+def _iter_chunks(reader, file_name: str, gate: Optional[QualityGate] = None) -> Iterator[pd.DataFrame]:
+    """
+    Recorre el lector por bloques, cerrándolo al terminar, y valida que
+    el archivo haya contenido al menos una fila. Con `gate`, cada bloque
+    pasa por las reglas de calidad y las filas válidas se convierten a
+    INTEGER_DTYPES antes de entregarse.
+    """
+    total_rows = 0
+    with reader:
+        for chunk in reader:
+            total_rows += len(chunk)
+            yield gate.filter(chunk).astype(INTEGER_DTYPES) if gate else chunk
+
+    if gate:
+        gate.close()
+
+    if total_rows == 0:
+        logger.error(f"El Archivo {file_name} no contiene filas")
+        raise ValueError("El archivo csv está vacío")
+
+    logger.info(f"CSV leído por bloques correctamente | Filas = {total_rows}")
@@ -0,0 +1,130 @@
+"""
+gcs_client.py
+=============
+
+Administra un único cliente autenticado de Google Cloud Storage por proceso,
+compartido por todas las cargas del pipeline.
+
+Crear un `storage.Client()` por carga repite el descubrimiento de
+credenciales, la obtención del token y el armado de la sesión HTTP. Este
+módulo crea el cliente de forma perezosa la primera vez que se necesita,
+con un pool de conexiones dimensionado para cargas concurrentes, y cachea
+los handles de bucket.
+
+Responsabilidades:
+- Crear (lazy) y reutilizar el cliente por proceso (se recrea tras un fork).
+- Compartir un pool de conexiones HTTP ajustado entre threads.
+- Permitir inyectar un cliente alternativo (ej: `benchmarks.fake_gcs.FakeClient`
+  en tests y benchmarks).
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from src.logger import setup_logger
+
+logger = setup_logger()
+
+#Pool HTTP compartido: debe cubrir los workers de la carga paralela
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+_lock = threading.Lock()
+_client = None
+_client_pid: Optional[int] = None
+_buckets = {}
+
+
+def _create_client():
+    """
+    Crea el cliente de GCS con credenciales de entorno (ADC) y una sesión
+    autorizada con pool de conexiones ampliado.
+    """
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+
+    credentials, project = google.auth.default(scopes = storage.Client.SCOPE)
+
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections = POOL_CONNECTIONS, pool_maxsize = POOL_MAXSIZE)
+    session.mount("https://", adapter)
+
+    logger.info(f"Cliente GCS creado | proyecto = {project} | pool = {POOL_MAXSIZE}")
+    return storage.Client(project = project, credentials = credentials, _http = session)
+
+
+def get_client():
+    """
+    Retorna el cliente de GCS del proceso, creándolo en el primer uso.
+
+    Las sesiones HTTP no sobreviven a un fork, por lo que en un proceso
+    hijo se crea un cliente nuevo.
+    """
+    global _client, _client_pid
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = _create_client()
+            _client_pid = os.getpid()
+            _buckets.clear()
+        return _client
+
+
+def get_bucket(name: str):
+    """
+    Retorna el handle de bucket `name` del cliente compartido (cacheado).
+    """
+    client = get_client()
+    with _lock:
+        if name not in _buckets:
+            _buckets[name] = client.bucket(name)
+        return _buckets[name]
+
+
+def set_client(client) -> None:
+    """
+    Reemplaza el cliente del proceso (hook de inyección para tests o
+    para usar un cliente configurado externamente).
+    """
+    global _client, _client_pid
+
+    with _lock:
+        _client = client
+        _client_pid = os.getpid() if client is not None else None
+        _buckets.clear()
+
+
+def reset_client() -> None:
+    """
+    Descarta el cliente actual; el próximo `get_client()` crea uno nuevo.
+    """
+    set_client(None)
+
+
+@contextmanager
+def use_client(client) -> Iterator:
+    """
+    Usa `client` dentro del bloque y restaura el cliente previo al salir.
+
+        with use_client(FakeClient()):
+            load_csv_to_gcs("dataset")
+    """
+    global _client, _client_pid
+
+    with _lock:
+        previous = (_client, _client_pid, dict(_buckets))
+    set_client(client)
+    try:
+        yield client
+    finally:
+        with _lock:
+            _client, _client_pid = previous[0], previous[1]
+            _buckets.clear()
+            _buckets.update(previous[2])
@@ -2,46 +2,324 @@
 inspect_csv.py
 ==============
 
-Inspección exploratoria de archivos CSV crudos.
+Perfilado exploratorio de archivos CSV crudos en una sola pasada.
 
-Este módulo permite cargar un archivo CSV desde el directorio `data/raw` y mostrar información básica
-sobre su contenido: dimensiones, tipos de datos, estadísticas descriptivas y valores nulos por columna.
-Está pensado como una herramienta de diagnóstico rápido para validar la estructura y calidad de los datos
-antes de su transformación en el pipeline ETL.
+El archivo se recorre por bloques y, por cada columna, se acumulan en
+memoria acotada (independiente del tamaño del archivo):
+- conteo de valores no nulos y nulos;
+- mínimo, máximo, media y desviación estándar (algoritmo de Welford,
+  combinando los estadísticos de cada bloque con la fórmula de Chan);
+- cantidad aproximada de valores distintos (HyperLogLog, error ~0.8 %);
+- valores más frecuentes (resumen Misra-Gries; los conteos son exactos
+  mientras la columna tenga menos de `TOP_K_CAPACITY` valores distintos).
+
+Todos los cálculos por bloque son vectorizados. El resultado es un dict
+serializable a JSON, que el CLI imprime o guarda, pensado como diagnóstico
+de la estructura y calidad de los datos antes de transformarlos, y que se
+registra como etapa `inspect_csv` en las métricas del pipeline.
+
+Uso:
+    python -m src.inspect_csv [archivo.csv] [--output perfil.json] [--chunk-size N]
 
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez. N.
 Fecha: 9 de enero de 2026.
 """
 
-import pandas as pd
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
 
-RAW_DIR = Path("../data/raw")
+RAW_DIR = BASE_DIR / "data" / "raw"
 CSV_FILE = "def_semana_epidemiologica.csv"
 FILE_PATH = RAW_DIR / CSV_FILE
 
-def inspect_csv(file_path: Path):
+DEFAULT_CHUNK_SIZE = 200_000
 
-    print(f"Cargando csv desde: {file_path}")
-    df = pd.read_csv(file_path, sep= '|')
+# Valores más frecuentes reportados por columna
+DEFAULT_TOP_K = 10
 
-    print("\n --dimensiones--")
-    print(f"Filas: {df.shape[0]}, Columnas: {df.shape[1]}")
+# Contadores que mantiene el resumen Misra-Gries por columna
+TOP_K_CAPACITY = 1_000
 
-    print("\n --info--")
-    print(df.info())
+# Precisión de HyperLogLog: 2**14 registros (16 KB por columna)
+HLL_PRECISION = 14
 
-    print("\n --estadisticas numéricas--")
-    print(df.describe())
+# Filas de ejemplo incluidas en el perfil
+HEAD_ROWS = 5
 
-    print("\n --valores nulos por columna--")
-    print(df.isnull().sum())
 
-    print(df.head())
+def _py(value):
+    """
+    Convierte escalares de numpy/pandas a tipos nativos para JSON.
+    """
+    import numpy as np
 
-if __name__ == "__main__":
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class HyperLogLog:
+    """
+    Estimador de cardinalidad con `2**precision` registros de un byte.
+    Recibe hashes de 64 bits ya calculados (vectorizado).
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        import numpy as np
+
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype = np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        import numpy as np
+
+        if not len(hashes):
+            return
+        hashes = hashes.astype(np.uint64, copy = False)
+        index = (hashes & np.uint64(self.m - 1)).astype(np.int64)
+        w = hashes >> np.uint64(self.p)
+
+        # rango = posición del bit 1 menos significativo de w (ceros finales + 1)
+        lowest = w & (~w + np.uint64(1))
+        with np.errstate(divide = "ignore"):
+            rank = np.log2(lowest.astype(np.float64))
+        rank = np.where(w == 0, 64 - self.p, rank) + 1
+
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def estimate(self) -> int:
+        import numpy as np
+
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m**2 / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return int(round(self.m * math.log(self.m / zeros)))
+        return int(round(raw))
+
+
+class ColumnProfile:
+    """
+    Estadísticos acumulados de una columna a lo largo de los bloques.
+    """
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K):
+        import pandas as pd
+
+        self.top_k = top_k
+        self.dtypes = []
+        self.numeric = None
+        self.count = 0
+        self.nulls = 0
+        self.non_numeric = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.numeric_count = 0
+        self.integral = True
+        self.hll = HyperLogLog()
+        self.counters = pd.Series(dtype = "float64")
+        self.pruned = False
+
+    def update(self, values: pd.Series) -> None:
+        import pandas as pd
+
+        dtype = str(values.dtype)
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+
+        nulls = int(values.isna().sum())
+        self.nulls += nulls
+        self.count += len(values) - nulls
+        values = values.dropna()
+        if values.empty:
+            return
 
-    inspect_csv(FILE_PATH)
+        # el tipo se fija con el primer bloque que tiene valores
+        if self.numeric is None:
+            self.numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
 
-    
+        if self.numeric:
+            numbers = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors = "coerce")
+            numbers = numbers.astype("float64")
+            self.non_numeric += int(numbers.isna().sum())
+            values = numbers.dropna()
+            self._update_moments(values.to_numpy())
+            if values.empty:
+                return
+            self.integral = self.integral and bool((values % 1 == 0).all())
+        else:
+            # texto: tipos mezclados se comparan como string
+            values = values.astype(str)
+
+        self._update_min_max(values)
+        self.hll.add_hashes(pd.util.hash_pandas_object(values, index = False).to_numpy())
+        self._update_top(values)
+
+    def _update_moments(self, x: np.ndarray) -> None:
+        n_b = len(x)
+        if not n_b:
+            return
+        mean_b = float(x.mean())
+        m2_b = float(((x - mean_b) ** 2).sum())
+
+        n_a = self.numeric_count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta**2 * n_a * n_b / n
+        self.numeric_count = n
+
+    def _update_min_max(self, values: pd.Series) -> None:
+        low, high = values.min(), values.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def _update_top(self, values: pd.Series) -> None:
+        """
+        Resumen Misra-Gries combinable: se suman los conteos del bloque y,
+        si se supera la capacidad, se resta a todos el conteo del primer
+        contador excedente y se descartan los que quedan en cero.
+        """
+        counts = values.value_counts(sort = False)
+        merged = self.counters.add(counts.astype("float64"), fill_value = 0)
+        if len(merged) > TOP_K_CAPACITY:
+            threshold = merged.nlargest(TOP_K_CAPACITY + 1).iloc[-1]
+            merged = merged - threshold
+            merged = merged[merged > 0]
+            self.pruned = True
+        self.counters = merged
+
+    def _value(self, value):
+        # columnas numéricas sin decimales se reportan como enteros
+        value = _py(value)
+        if self.numeric and self.integral and isinstance(value, float):
+            return int(value)
+        return value
+
+    def to_dict(self) -> dict:
+        result = {
+            "dtypes": self.dtypes,
+            "count": self.count,
+            "nulls": self.nulls,
+            "min": self._value(self.min),
+            "max": self._value(self.max),
+            "distinct_approx": self.hll.estimate(),
+        }
+        if self.numeric:
+            result["mean"] = _py(self.mean) if self.numeric_count else None
+            result["stddev"] = (
+                _py(math.sqrt(self.m2 / (self.numeric_count - 1))) if self.numeric_count > 1 else None
+            )
+            result["non_numeric"] = self.non_numeric
+
+        top = self.counters.sort_values(ascending = False, kind = "stable").head(self.top_k)
+        result["top"] = [{"value": self._value(value), "count": int(count)} for value, count in top.items()]
+        result["top_exact"] = not self.pruned
+        return result
+
+
+@instrumented("inspect_csv")
+def inspect_csv(
+    file_path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    top_k: int = DEFAULT_TOP_K,
+    sep: str = "|",
+) -> dict:
+    """
+    Perfila el CSV `file_path` en una sola pasada por bloques.
+
+    Retorna un dict serializable a JSON con el resumen del archivo y el
+    perfil de cada columna.
+
+    Excepciones
+    -----------
+    FileNotFoundError
+        Si el archivo no existe.
+    EmptyDataError
+        Si el archivo está vacío.
+    ParserError
+        Si el archivo está malformado.
+    """
+    import pandas as pd
+
+    file_path = Path(file_path)
+    if not file_path.exists():
+        logger.error(f"No se encontró el archivo a inspeccionar: {file_path}")
+        raise FileNotFoundError(file_path)
+
+    logger.info(f"Perfilando csv: {file_path} | chunk_size = {chunk_size}")
+    start = time.perf_counter()
+
+    columns = {}
+    head = []
+    rows = 0
+    with pd.read_csv(file_path, sep = sep, chunksize = chunk_size) as reader:
+        for chunk in reader:
+            if not columns:
+                columns = {column: ColumnProfile(top_k) for column in chunk.columns}
+                head = json.loads(chunk.head(HEAD_ROWS).to_json(orient = "records", force_ascii = False))
+            rows += len(chunk)
+            for column, profile in columns.items():
+                profile.update(chunk[column])
+
+    profile = {
+        "file": str(file_path),
+        "bytes": file_path.stat().st_size,
+        "rows": rows,
+        "columns": len(columns),
+        "chunk_size": chunk_size,
+        "profile": {column: p.to_dict() for column, p in columns.items()},
+        "head": head,
+        "elapsed_s": round(time.perf_counter() - start, 4),
+    }
+
+    annotate(rows_in = rows)
+    logger.info(f"Perfil completado | Filas = {rows} | Columnas = {len(columns)} | {profile['elapsed_s']} s")
+    return profile
+
+
+def main(argv = None) -> dict:
+    parser = argparse.ArgumentParser(description = "Perfil de un CSV crudo en una pasada (JSON)")
+    parser.add_argument("file", nargs = "?", type = Path, default = FILE_PATH)
+    parser.add_argument("--output", type = Path, help = "archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--chunk-size", type = int, default = DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--top-k", type = int, default = DEFAULT_TOP_K)
+    args = parser.parse_args(argv)
+
+    profile = inspect_csv(args.file, chunk_size = args.chunk_size, top_k = args.top_k)
+    text = json.dumps(profile, indent = 2, ensure_ascii = False, default = str)
+
+    if args.output:
+        args.output.parent.mkdir(parents = True, exist_ok = True)
+        args.output.write_text(text + "\n", encoding = "utf-8")
+        logger.info(f"Perfil guardado en {args.output}")
+    else:
+        print(text)
+    return profile
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,15 @@
 load.py
 =======
 Módulo responsable de persistir datasets transformados
-en el filesystem local.
+en el filesystem local, como CSV o como dataset Parquet
+(opcionalmente particionado estilo Hive).
+
+Los CSV se escriben con `write_csv`: serialización por bloques a un archivo
+temporal a través de un buffer grande, compresión opcional (gzip o zstd),
+fsync y rename atómico. Un proceso interrumpido nunca deja un CSV truncado
+en la ruta final; a lo sumo queda el temporal `<archivo>.part`. El tamaño y
+el CRC32C se calculan mientras se escribe y quedan registrados para que la
+carga a GCS no tenga que releer el archivo (ver `written_crc32c`).
 
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez N.
@@ -10,38 +18,311 @@ Fecha: 3 de enero de 2026.
 
 """
 
-import pandas as pd
+from __future__ import annotations
+
+import base64
+import io
+import os
+import shutil
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence, Tuple, Union
 from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = setup_logger()
 
-def load_csv(df: pd.DataFrame, output_dir: Path, file_name: str) -> Path:
+#Formatos de salida soportados
+OUTPUT_FORMATS = ("csv", "parquet")
+
+#Columnas categóricas que se escriben con dictionary encoding en Parquet
+DICTIONARY_COLUMNS = ("GRUPO_EDAD", "SEXO", "REGION")
+
+#Columnas de fecha: en Parquet se escriben como date32 (DATE en BigQuery),
+#también cuando llegan como datetime64 desde el modo compacto
+DATE_COLUMNS = ("FECHA_CARGA",)
+
+#Columnas por las que se permite particionar el dataset Parquet
+PARTITION_COLUMNS = ("ANO_ESTADISTICO", "REGION")
+
+#Filas máximas por row group en Parquet
+DEFAULT_ROW_GROUP_SIZE = 128_000
+
+#Compresiones soportadas para CSV y la extensión que agregan al archivo
+CSV_COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+#Nivel por defecto de cada compresión
+DEFAULT_COMPRESSION_LEVELS = {"gzip": 6, "zstd": 3}
+
+#Tamaño del buffer de escritura de los CSV
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+#Filas serializadas por bloque al escribir un CSV
+DEFAULT_WRITE_ROWS = 100_000
+
+#Archivos escritos por `write_csv` en este proceso: ruta -> (tamaño, mtime_ns, crc32c)
+_WRITTEN = {}
+
+
+@dataclass(frozen = True)
+class WrittenFile:
+    """
+    Resultado de `write_csv`.
+
+    - path: archivo final.
+    - size: bytes escritos (comprimidos, si corresponde).
+    - crc32c: CRC32C de esos bytes en el formato de la metadata de GCS.
+    - rows: filas de datos escritas (sin el encabezado).
+    """
+    path: Path
+    size: int
+    crc32c: str
+    rows: int
+
+
+class _ChecksumWriter(io.RawIOBase):
+    """
+    Stream de escritura que calcula el CRC32C y cuenta los bytes que pasan
+    hacia el archivo.
+    """
+
+    def __init__(self, raw):
+        import google_crc32c
+
+        self._raw = raw
+        self.checksum = google_crc32c.Checksum()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        view = memoryview(data)
+        while view:
+            view = view[self._raw.write(view):]
+        self.checksum.update(data)
+        self.size += len(data)
+        return len(data)
+
+
+def _csv_blocks(data, chunk_rows: int):
+    """
+    Bloques de a lo sumo `chunk_rows` filas de un DataFrame o de un
+    iterable de DataFrames.
+    """
+    import pandas as pd
+
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    for chunk in chunks:
+        if not isinstance(chunk, pd.DataFrame):
+            raise TypeError("Cada bloque debe ser un DataFrame")
+        for start in range(0, len(chunk), chunk_rows):
+            yield chunk.iloc[start:start + chunk_rows]
+
+
+def _compressor(compression: Optional[str], level: Optional[int]):
+    """
+    (encode, finish) de la compresión: `encode` transforma cada bloque
+    serializado y `finish` retorna los bytes finales del stream.
+    """
+    if compression == "gzip":
+        #wbits = 31: contenedor gzip con mtime 0, el mismo contenido produce los mismos bytes
+        stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return stream.compress, stream.flush
+    if compression == "zstd":
+        import pyarrow as pa
+
+        #un frame zstd por bloque; los frames concatenados son un stream válido
+        codec = pa.Codec("zstd", compression_level = level)
+        return (lambda payload: codec.compress(payload, asbytes = True)), bytes
+    return (lambda payload: payload), bytes
+
+
+def _fsync_dir(directory: Path) -> None:
+    """
+    Persiste la entrada del directorio tras el rename (no disponible en
+    todos los sistemas).
     """
-    Guarda un DataFrame como CSV en el directorio indicado.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_csv(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    output_path: Path,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    chunk_rows: int = DEFAULT_WRITE_ROWS,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+) -> WrittenFile:
+    """
+    Escribe un DataFrame (o un iterable de bloques) como CSV en
+    `output_path` de forma atómica.
+
+    Cada bloque de `chunk_rows` filas se serializa y se escribe (con el
+    encabezado sólo en el primero) sobre `<output_path>.part` a través de un
+    buffer de `buffer_size` bytes. Al terminar se hace fsync y se renombra
+    a `output_path`; si algo falla, el temporal se elimina y el archivo
+    final, si existía, queda intacto.
+
+    Parámetros:
+    - compression: None, 'gzip' o 'zstd'. La extensión de `output_path` no
+      se modifica (ver CSV_COMPRESSIONS). zstd usa el codec de pyarrow.
+    - level: nivel de compresión (por defecto DEFAULT_COMPRESSION_LEVELS).
+
+    Sin compresión el archivo es idéntico byte a byte a
+    `df.to_csv(output_path, index = False)`.
+
+    Retorna:
+    - WrittenFile con el tamaño y el CRC32C de los bytes escritos.
+
+    Excepciones:
+    - ValueError si la compresión no es soportada o no hay filas.
+    - TypeError si algún bloque no es un DataFrame.
+    """
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows debe ser mayor a 0")
+
+    def payloads():
+        header = True
+        for block in _csv_blocks(data, chunk_rows):
+            yield block.to_csv(index = False, header = header).encode("utf-8"), len(block)
+            header = False
+
+    return write_csv_payloads(payloads(), output_path, compression, level, buffer_size)
+
+
+def write_csv_payloads(
+    payloads: Iterable[Tuple[bytes, int]],
+    output_path: Path,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+) -> WrittenFile:
+    """
+    Variante de `write_csv` para bloques ya serializados: cada elemento de
+    `payloads` es (bytes del CSV, filas del bloque), con el encabezado sólo
+    en el primero. La escritura es la misma (temporal `.part`, buffer,
+    compresión opcional, fsync, rename atómico y CRC32C registrado), de
+    modo que quien serializa una vez puede reutilizar los bytes, p. ej. el
+    writer de `src.pipeline`, que también los sube a GCS.
+
+    Si `payloads` levanta una excepción, el temporal se elimina y el
+    archivo final, si existía, queda intacto.
+    """
+    if compression is not None and compression not in CSV_COMPRESSIONS:
+        raise ValueError(f"Compresión no soportada: {compression}. Opciones: {tuple(CSV_COMPRESSIONS)}")
+    if compression is not None and level is None:
+        level = DEFAULT_COMPRESSION_LEVELS[compression]
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents = True, exist_ok = True)
+    part = output_path.with_name(output_path.name + ".part")
+
+    rows = 0
+    try:
+        with open(part, "wb", buffering = 0) as raw:
+            counter = _ChecksumWriter(raw)
+            sink = io.BufferedWriter(counter, buffer_size = buffer_size)
+            try:
+                encode, finish = _compressor(compression, level)
+                for payload, block_rows in payloads:
+                    sink.write(encode(payload))
+                    rows += block_rows
+                sink.write(finish())
+                sink.flush()
+                os.fsync(raw.fileno())
+            finally:
+                #con el stream cerrado, el buffer ya no intenta escribir al descartarse
+                counter.close()
+
+        if rows == 0:
+            raise ValueError("No se recibieron filas para escribir")
+
+        os.replace(part, output_path)
+    except BaseException:
+        part.unlink(missing_ok = True)
+        raise
+    _fsync_dir(output_path.parent)
+
+    written = WrittenFile(
+        path = output_path,
+        size = counter.size,
+        crc32c = base64.b64encode(counter.checksum.digest()).decode("ascii"),
+        rows = rows,
+    )
+    stat = output_path.stat()
+    _WRITTEN[str(output_path.resolve())] = (stat.st_size, stat.st_mtime_ns, written.crc32c)
+    return written
+
+
+def written_crc32c(path: Path) -> Optional[str]:
+    """
+    CRC32C registrado por `write_csv` para `path`, o None si el archivo no
+    fue escrito por este proceso o cambió desde entonces (tamaño o mtime).
+    """
+    entry = _WRITTEN.get(str(Path(path).resolve()))
+    if entry is None:
+        return None
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    size, mtime_ns, crc32c = entry
+    if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+        return None
+    return crc32c
+
+
+@instrumented("load_csv")
+def load_csv(
+    df: pd.DataFrame,
+    output_dir: Path,
+    file_name: str,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+) -> Path:
+    """
+    Guarda un DataFrame como CSV en el directorio indicado, de forma
+    atómica (ver `write_csv`).
 
     Parámetros:
     - df: DataFrame transformado
     - output_dir: Path donde se guardará el archivo
-    - file_name: nombre del archivo CSV final
+    - file_name: nombre del archivo CSV final (con la extensión de la
+      compresión, si corresponde)
+    - compression, level: compresión opcional ('gzip' o 'zstd') y su nivel
 
     Retorna:
     - Path al archivo CSV creado.
     """
 
+    import pandas as pd
+
     #Validaciones
     if not isinstance(df, pd.DataFrame):
         raise TypeError("Debe ser un DataFrame")
     if df.empty:
         raise ValueError("El DataFrame está vacío")
 
-    # Crea el directorio si no existe
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     output_path = output_dir / file_name
 
-    # Guarda el DataFrame
-    df.to_csv(output_path, index=False, encoding = "utf-8")
+    # Guarda el DataFrame (crea el directorio si no existe)
+    written = write_csv(df, output_path, compression = compression, level = level)
+    annotate(rows_out = len(df), bytes_written = written.size)
 
     logger.info(
             f"Archivo cargado correctamente *local* |"
@@ -51,3 +332,214 @@ def load_csv(df: pd.DataFrame, output_dir: Path, file_name: str) -> Path:
 
     return output_path
 
+
+@instrumented("load_csv_chunks")
+def load_csv_chunks(
+    chunks: Iterable[pd.DataFrame],
+    output_dir: Path,
+    file_name: str,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+) -> Path:
+    """
+    Variante streaming de `load_csv`: escribe los bloques de forma
+    incremental sobre un único CSV, con el encabezado sólo en el primero.
+
+    Sin compresión, el archivo resultante es idéntico byte a byte al que
+    produce `load_csv` con el DataFrame completo.
+
+    Parámetros:
+    - chunks: iterable de DataFrames transformados
+    - output_dir: Path donde se guardará el archivo
+    - file_name: nombre del archivo CSV final
+    - compression, level: compresión opcional ('gzip' o 'zstd') y su nivel
+
+    Retorna:
+    - Path al archivo CSV creado.
+    """
+
+    output_path = output_dir / file_name
+
+    written = write_csv(chunks, output_path, compression = compression, level = level)
+    rows = written.rows
+
+    annotate(rows_in = rows, rows_out = rows, bytes_written = written.size)
+
+    logger.info(
+            f"Archivo cargado correctamente por bloques *local* |"
+            f"Ruta: {output_path} |"
+            f"Filas: {rows} | Bytes: {written.size}"
+    )
+
+    return output_path
+
+
+def load_parquet(
+    df: pd.DataFrame,
+    output_dir: Path,
+    dataset_name: str,
+    partition_cols: Optional[Sequence[str]] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "snappy",
+) -> Path:
+    """
+    Guarda un DataFrame como dataset Parquet comprimido en `output_dir/dataset_name`.
+
+    Parámetros:
+    - df: DataFrame transformado
+    - output_dir: Path donde se creará el directorio del dataset
+    - dataset_name: nombre del directorio del dataset
+    - partition_cols: columnas de particionado Hive (subconjunto de PARTITION_COLUMNS),
+      ej: ['ANO_ESTADISTICO'] -> ANO_ESTADISTICO=2010/part-00000-0.parquet
+    - row_group_size: filas máximas por row group
+    - compression: códec Parquet (snappy, zstd, gzip, ...)
+
+    Retorna:
+    - Path al directorio del dataset (árbol de particiones).
+    """
+
+    import pandas as pd
+
+    #Validaciones
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("Debe ser un DataFrame")
+    if df.empty:
+        raise ValueError("El DataFrame está vacío")
+
+    return load_parquet_chunks(
+        [df], output_dir, dataset_name,
+        partition_cols = partition_cols,
+        row_group_size = row_group_size,
+        compression = compression,
+    )
+
+
+def _arrow_table(chunk: pd.DataFrame):
+    """
+    Tabla Arrow de un bloque, con las DATE_COLUMNS como date32 aunque el
+    bloque las traiga como datetime64 (modo compacto), para que el esquema
+    Parquet coincida con el de BigQuery (`src.load_bq.TABLE_SCHEMA`).
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(chunk, preserve_index = False)
+    for column in DATE_COLUMNS:
+        if column in table.column_names and pa.types.is_timestamp(table.schema.field(column).type):
+            index = table.schema.get_field_index(column)
+            table = table.set_column(index, column, table[column].cast(pa.date32()))
+    return table
+
+
+def _replace_dir(source: Path, target: Path) -> None:
+    """
+    Reemplaza el directorio `target` por `source`. Como os.replace no
+    reemplaza directorios con contenido, el anterior se mueve a
+    `<target>.old` y se elimina después del rename; si el rename falla,
+    se restaura.
+    """
+    old = target.with_name(target.name + ".old")
+    if old.exists():
+        shutil.rmtree(old)
+    if target.exists():
+        os.replace(target, old)
+    try:
+        os.replace(source, target)
+    except BaseException:
+        if old.exists():
+            os.replace(old, target)
+        raise
+    shutil.rmtree(old, ignore_errors = True)
+
+
+@instrumented("load_parquet")
+def load_parquet_chunks(
+    chunks: Iterable[pd.DataFrame],
+    output_dir: Path,
+    dataset_name: str,
+    partition_cols: Optional[Sequence[str]] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "snappy",
+) -> Path:
+    """
+    Variante streaming de `load_parquet`: cada bloque se escribe como
+    uno o más archivos `part-<n>-<i>.parquet` dentro del mismo dataset.
+
+    El directorio del dataset se reemplaza completo en cada ejecución,
+    para no mezclar particiones de corridas anteriores. Los bloques se
+    escriben en `<dataset_name>.part` y el reemplazo ocurre al final: si
+    algún bloque falla, el dataset anterior queda intacto.
+
+    Retorna:
+    - Path al directorio del dataset.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partition_cols = list(partition_cols or [])
+    invalid = set(partition_cols) - set(PARTITION_COLUMNS)
+    if invalid:
+        raise ValueError(
+            f"Columnas de particionado no soportadas: {invalid}. Opciones: {PARTITION_COLUMNS}"
+        )
+    if row_group_size <= 0:
+        raise ValueError("row_group_size debe ser mayor a 0")
+
+    #se escribe en un directorio hermano y se reemplaza al final: si falla, el dataset anterior queda intacto
+    dataset_dir = output_dir / dataset_name
+    part_dir = dataset_dir.with_name(dataset_name + ".part")
+    if part_dir.exists():
+        shutil.rmtree(part_dir)
+    part_dir.mkdir(parents=True)
+
+    try:
+        rows = 0
+        columns = 0
+        for n, chunk in enumerate(chunks):
+            if not isinstance(chunk, pd.DataFrame):
+                raise TypeError("Cada bloque debe ser un DataFrame")
+            if chunk.empty:
+                continue
+
+            missing = set(partition_cols) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"Columnas de particionado inexistentes: {missing}")
+
+            table = _arrow_table(chunk)
+            file_options = ds.ParquetFileFormat().make_write_options(
+                compression = compression,
+                use_dictionary = [c for c in DICTIONARY_COLUMNS if c in chunk.columns],
+            )
+            ds.write_dataset(
+                table,
+                part_dir,
+                format = "parquet",
+                file_options = file_options,
+                partitioning = partition_cols or None,
+                partitioning_flavor = "hive" if partition_cols else None,
+                basename_template = f"part-{n:05d}-{{i}}.parquet",
+                max_rows_per_group = row_group_size,
+                min_rows_per_group = min(row_group_size, len(chunk)),
+                existing_data_behavior = "overwrite_or_ignore",
+            )
+            rows += len(chunk)
+            columns = len(chunk.columns)
+
+        if rows == 0:
+            raise ValueError("No se recibieron filas para escribir")
+
+        _replace_dir(part_dir, dataset_dir)
+    except BaseException:
+        shutil.rmtree(part_dir, ignore_errors = True)
+        raise
+
+    annotate(rows_in = rows, rows_out = rows)
+
+    logger.info(
+            f"Dataset Parquet cargado correctamente *local* |"
+            f"Ruta: {dataset_dir} |"
+            f"Particiones: {partition_cols or 'ninguna'} |"
+            f"Filas: {rows} | Columnas: {columns}"
+    )
+
+    return dataset_dir
@@ -0,0 +1,298 @@
+"""
+load_bq.py
+==========
+
+Carga del dataset transformado desde GCS (capa transformed) hacia una tabla
+de BigQuery, para que las consultas analíticas lean sólo las particiones
+necesarias en lugar de escanear los CSV versionados completos.
+
+La tabla destino:
+- se particiona por rango entero sobre ANO_ESTADISTICO (una partición por
+  año; BigQuery sólo permite particionar por una columna);
+- se clusteriza por SEMANA_ESTADISTICA, REGION y SEXO, de modo que los
+  filtros por semana dentro de un año leen sólo los bloques de esa semana.
+
+Estrategias de escritura (`BQ_STRATEGIES`):
+- append: load job WRITE_APPEND directo sobre la tabla; pensado para los
+  deltas incrementales sin lookback, que sólo traen semanas nuevas.
+- merge: load job a una tabla staging y MERGE por la llave natural sobre la
+  tabla destino, restringido a los años presentes en el staging (sólo se
+  reescriben esas particiones). Es idempotente: reprocesar una semana
+  (lookback, reintentos) actualiza las filas en vez de duplicarlas. La llave
+  se compara con IS NOT DISTINCT FROM, porque sus columnas admiten nulos y
+  en SQL `NULL = NULL` no es verdadero.
+
+El cliente de BigQuery se crea de forma perezosa (uno por proceso) y puede
+reemplazarse con `set_bq_client` / `use_bq_client`, por ejemplo por
+`tests.fake_bq.FakeBigQueryClient` para probar la etapa sin red.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+logger = setup_logger()
+
+BQ_STRATEGIES = ("append", "merge")
+
+# Columna de particionado por rango entero y su rango [inicio, fin) de años
+PARTITION_FIELD = "ANO_ESTADISTICO"
+PARTITION_RANGE = (1900, 2101, 1)
+
+CLUSTERING_FIELDS = ["SEMANA_ESTADISTICA", "REGION", "SEXO"]
+
+# Llave natural de una fila del dataset transformado
+KEY_COLUMNS = ("ANO_ESTADISTICO", "SEMANA_ESTADISTICA", "GRUPO_EDAD", "SEXO", "REGION")
+
+# Esquema de la capa transformed: columna -> tipo BigQuery
+TABLE_SCHEMA = {
+    "ANO_ESTADISTICO": "INT64",
+    "SEMANA_ESTADISTICA": "INT64",
+    "GRUPO_EDAD": "STRING",
+    "SEXO": "STRING",
+    "REGION": "STRING",
+    "POBLACION": "INT64",
+    "MUERTES_OBS": "INT64",
+    "EDAD_MIN": "INT64",
+    "EDAD_MAX": "INT64",
+    "EDAD_PROMEDIO": "FLOAT64",
+    "FECHA_CARGA": "DATE",
+}
+
+# Sufijo de las tablas staging de la estrategia merge
+STAGING_SUFFIX = "__staging"
+
+_lock = threading.Lock()
+_client = None
+_client_pid: Optional[int] = None
+
+
+#==================
+#Cliente
+#==================
+
+def get_bq_client():
+    """
+    Retorna el cliente de BigQuery del proceso, creándolo en el primer uso
+    con credenciales de entorno (ADC). En un proceso hijo se crea uno nuevo.
+    """
+    global _client, _client_pid
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            from google.cloud import bigquery
+
+            _client = bigquery.Client()
+            _client_pid = os.getpid()
+            logger.info(f"Cliente BigQuery creado | proyecto = {_client.project}")
+        return _client
+
+
+def set_bq_client(client) -> None:
+    """
+    Reemplaza el cliente del proceso (hook de inyección para tests).
+    """
+    global _client, _client_pid
+
+    with _lock:
+        _client = client
+        _client_pid = os.getpid() if client is not None else None
+
+
+@contextmanager
+def use_bq_client(client) -> Iterator:
+    """
+    Usa `client` dentro del bloque y restaura el cliente previo al salir.
+
+        with use_bq_client(FakeBigQueryClient()):
+            load_gcs_to_bigquery(uri, "dataset.tabla")
+    """
+    with _lock:
+        previous = (_client, _client_pid)
+    set_bq_client(client)
+    try:
+        yield client
+    finally:
+        set_bq_client(previous[0])
+
+
+#==================
+#Definiciones
+#==================
+
+def table_schema() -> list:
+    from google.cloud import bigquery
+
+    return [bigquery.SchemaField(name, field_type) for name, field_type in TABLE_SCHEMA.items()]
+
+
+def target_table(table_id: str):
+    """
+    Definición de la tabla destino: esquema, particionado por año y clustering.
+    """
+    from google.cloud import bigquery
+
+    table = bigquery.Table(table_id, schema = table_schema())
+    table.range_partitioning = bigquery.RangePartitioning(
+        field = PARTITION_FIELD,
+        range_ = bigquery.PartitionRange(*PARTITION_RANGE),
+    )
+    table.clustering_fields = CLUSTERING_FIELDS
+    return table
+
+
+def load_job_config(file_format: str, write_disposition: str, source_uri_prefix: Optional[str] = None):
+    """
+    Configuración del load job desde GCS.
+
+    Parquet es autodescriptivo; para CSV se fija el esquema y se omite el
+    encabezado. Con `source_uri_prefix` el dataset Parquet se lee como
+    particionado Hive (las columnas de partición vienen en la ruta).
+    """
+    from google.cloud import bigquery
+
+    config = bigquery.LoadJobConfig(
+        write_disposition = write_disposition,
+        schema = table_schema(),
+    )
+    if file_format == "parquet":
+        config.source_format = bigquery.SourceFormat.PARQUET
+        if source_uri_prefix:
+            hive = bigquery.HivePartitioningOptions()
+            hive.mode = "AUTO"
+            hive.source_uri_prefix = source_uri_prefix
+            config.hive_partitioning = hive
+    else:
+        config.source_format = bigquery.SourceFormat.CSV
+        config.skip_leading_rows = 1
+    return config
+
+
+def merge_sql(target_id: str, staging_id: str) -> str:
+    """
+    Script MERGE del staging sobre la tabla destino por la llave natural.
+
+    Los años del staging se guardan primero en una variable: BigQuery poda
+    particiones con variables de script, pero no con una subconsulta en la
+    condición del MERGE, por lo que sólo se leen y reescriben esos años
+    (más la partición de año nulo). La llave se compara con
+    IS NOT DISTINCT FROM para que una fila con nulos en la llave se
+    actualice en lugar de insertarse de nuevo en cada carga.
+    """
+    columns = list(TABLE_SCHEMA)
+    values = [c for c in columns if c not in KEY_COLUMNS]
+
+    on = "\n  AND ".join(f"T.{c} IS NOT DISTINCT FROM S.{c}" for c in KEY_COLUMNS)
+    update = ",\n    ".join(f"{c} = S.{c}" for c in values)
+
+    return (
+        f"DECLARE anos ARRAY<INT64> DEFAULT "
+        f"(SELECT ARRAY_AGG(DISTINCT {PARTITION_FIELD} IGNORE NULLS) FROM `{staging_id}`);\n"
+        f"MERGE `{target_id}` T\n"
+        f"USING `{staging_id}` S\n"
+        f"ON (T.{PARTITION_FIELD} IN UNNEST(anos) OR T.{PARTITION_FIELD} IS NULL)\n"
+        f"  AND {on}\n"
+        f"WHEN MATCHED THEN UPDATE SET\n"
+        f"    {update}\n"
+        f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)})\n"
+        f"  VALUES ({', '.join(f'S.{c}' for c in columns)})"
+    )
+
+
+#==================
+#Carga
+#==================
+
+@instrumented("load_gcs_to_bigquery")
+def load_gcs_to_bigquery(
+    source_uri: str,
+    table_id: str,
+    file_format: str = "csv",
+    strategy: str = "merge",
+    hive_partitioned: bool = False,
+) -> str:
+    """
+    Carga el objeto (o prefijo Parquet) `source_uri` de GCS en la tabla
+    `table_id` de BigQuery.
+
+    ------------
+    Parámetros.
+    ------------
+    source_uri: str
+        -> URI gs:// retornada por `load_csv_to_gcs` / `load_dataframe_to_gcs`.
+           Para Parquet, el prefijo del dataset (terminado en '/').
+    table_id: str
+        -> 'dataset.tabla' o 'proyecto.dataset.tabla'.
+    file_format: str
+        -> 'csv' o 'parquet'.
+    strategy: str
+        -> 'append' o 'merge' (ver BQ_STRATEGIES).
+    hive_partitioned: bool
+        -> el dataset Parquet está particionado estilo Hive.
+
+    ------------
+    Retorna.
+    ------------
+    ID completo de la tabla destino (proyecto.dataset.tabla).
+
+    ------------
+    Execpciones.
+    ------------
+    ValueError -> si la estrategia, el formato o la URI no son válidos.
+    """
+    if strategy not in BQ_STRATEGIES:
+        raise ValueError(f"Estrategia de carga BigQuery inválida: {strategy}. Opciones: {BQ_STRATEGIES}")
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Formato no soportado: {file_format}")
+    if not source_uri.startswith("gs://"):
+        raise ValueError(f"URI de origen inválida: {source_uri}")
+
+    from google.cloud import bigquery
+
+    client = get_bq_client()
+    if table_id.count(".") == 1:
+        table_id = f"{client.project}.{table_id}"
+
+    prefix = None
+    if file_format == "parquet":
+        prefix = source_uri.rstrip("/") + "/"
+        source_uri = f"{prefix}*"
+    hive_prefix = prefix if hive_partitioned else None
+
+    logger.info(f"Inicio de carga a BigQuery | {source_uri} -> {table_id} | estrategia = {strategy}")
+
+    # la tabla se crea con particionado y clustering antes de la primera carga
+    client.create_table(target_table(table_id), exists_ok = True)
+
+    if strategy == "append":
+        job = client.load_table_from_uri(
+            source_uri, table_id,
+            job_config = load_job_config(file_format, bigquery.WriteDisposition.WRITE_APPEND, hive_prefix),
+        )
+        job.result()
+        rows = job.output_rows
+    else:
+        staging_id = f"{table_id}{STAGING_SUFFIX}_{uuid.uuid4().hex[:8]}"
+        try:
+            job = client.load_table_from_uri(
+                source_uri, staging_id,
+                job_config = load_job_config(file_format, bigquery.WriteDisposition.WRITE_TRUNCATE, hive_prefix),
+            )
+            job.result()
+            rows = job.output_rows
+            client.query(merge_sql(table_id, staging_id)).result()
+        finally:
+            client.delete_table(staging_id, not_found_ok = True)
+
+    annotate(rows_out = rows)
+    logger.info(f"Carga a BigQuery completada | {table_id} | filas cargadas = {rows}")
+
+    return table_id
@@ -4,7 +4,29 @@ load_gcs.py
 
 Módulo responsable de cargar dataset transformados desde el filesystem local
 hacia Google Cloud Storage(Data Lake), aplicando versionado temporal mediante
-fecha de ejecución
+fecha de ejecución.
+
+Soporta un CSV único (`<base>_<fecha>.csv`) o un dataset Parquet, cuyo árbol
+de particiones se sube bajo el prefijo `<base>_<fecha>/`.
+
+Antes de subir un CSV se compara el CRC32C local con el de la última versión
+existente en el bucket; si coinciden, la transferencia se omite. Si el CSV lo
+escribió `src.load.write_csv` en este mismo proceso, se reutiliza el CRC32C
+calculado durante la escritura en lugar de releer el archivo. Como cada fila
+lleva FECHA_CARGA, el CRC32C sólo coincide dentro del mismo día: por eso cada
+versión guarda además en su metadata un hash del contenido sin las columnas
+que se recalculan en cada carga (`content_hash`), y una ejecución de otro día
+con los mismos datos también se omite. Los CSV
+comprimidos (`--compression`) se versionan como `<base>_<fecha>.csv.gz` o
+`.csv.zst`.
+
+Los archivos grandes pueden subirse en paralelo: se dividen en slices que se
+cargan concurrentemente como objetos temporales y luego se componen
+server-side (compose) en el objeto versionado final.
+
+También es posible subir un DataFrame (o un iterador de bloques) directo a
+GCS, serializando un bloque a la vez sobre un upload resumable, sin pasar por
+un archivo local.
 
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez. N.
@@ -12,10 +34,25 @@ Fecha: 3 de enero de 2026.
 
 """
 
+from __future__ import annotations
+
+import base64
+import math
+import re
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, UTC
-from google.cloud import storage
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+from src.gcs_client import get_bucket
+from src.load import CSV_COMPRESSIONS, written_crc32c
 from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = setup_logger()
 #=================
@@ -28,7 +65,40 @@ BUCKET_NAME = "etl-dp-bucket"
 GCS_LAYER = "transformed"
 LOCAL_TRANSFORMED_DIR = BASE_DIR / "data" / "transformed"
 
-def load_csv_to_gcs(base_file_name: str) -> None:
+#Tamaño de bloque para calcular checksums sin leer el archivo completo
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+#Llave de la metadata del objeto con el hash del contenido (ver `content_hash`)
+CONTENT_HASH_METADATA = "etl-content-hash"
+
+#Contadores de cargas del proceso: 'uploaded' y 'skipped'
+UPLOAD_STATS = Counter()
+
+#Carga paralela (composite upload)
+DEFAULT_SLICE_SIZE = 64 * 1024 * 1024
+DEFAULT_SLICE_RETRIES = 3
+#espera base (segundos) del backoff exponencial entre reintentos
+RETRY_BACKOFF_S = 0.5
+#prefijo de los objetos temporales de cada slice
+TMP_PARTS_PREFIX = "_tmp_parts"
+#límite de objetos fuente por llamada a compose en GCS
+COMPOSE_MAX_SOURCES = 32
+
+#Carga directa desde memoria
+#filas serializadas por bloque
+DEFAULT_SERIALIZE_ROWS = 100_000
+#tamaño de cada request del upload resumable (múltiplo de 256 KiB)
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+
+@instrumented("load_csv_to_gcs")
+def load_csv_to_gcs(
+    base_file_name: str,
+    file_format: str = "csv",
+    skip_unchanged: bool = True,
+    parallel_workers: int = 1,
+    slice_size: int = DEFAULT_SLICE_SIZE,
+    compression: Optional[str] = None,
+) -> str:
     """
     Carga archivo csv transformado al bucket de GCS, agregando
     la fecha de ejecución al nombre del archivo para versionado.
@@ -39,6 +109,21 @@ def load_csv_to_gcs(base_file_name: str) -> None:
     base_file_name: str
         -> Nombre base del archivo csv sin extensión ni fecha.
            ej: 'def_semana_epidemiologica_transformed'
+    file_format: str
+        -> 'csv' (archivo único) o 'parquet' (directorio del dataset,
+           con todas sus particiones).
+    skip_unchanged: bool
+        -> si es True (CSV), omite la carga cuando el CRC32C local, o el
+           hash del contenido sin FECHA_CARGA (`content_hash`), coincide
+           con el de la última versión existente en el bucket.
+    parallel_workers: int
+        -> con más de 1 worker, los CSV mayores a `slice_size` se suben en
+           paralelo por slices y se componen en GCS.
+    slice_size: int
+        -> tamaño en bytes de cada slice de la carga paralela.
+    compression: str
+        -> compresión del CSV local ('gzip' o 'zstd'): se sube
+           `<base>.csv.gz` (o `.csv.zst`) como `<base>_<fecha>.csv.gz`.
     
     ------------
     Flujo.
@@ -46,22 +131,40 @@ def load_csv_to_gcs(base_file_name: str) -> None:
     1.- Valida la existencia del archivo local.
     2.- Genera nombre versionado con fecha (YYYY-MM-DD).
     3.- Enlaza a GCS.
-    4.- Carga el archivo al Data Lake (layer: transformed).
+    4.- Compara CRC32C local vs. última versión remota y, si difieren, el
+        hash del contenido sin FECHA_CARGA (skip si no cambió).
+    5.- Carga el archivo al Data Lake (layer: transformed), con el hash del
+        contenido en la metadata del objeto.
+
+    ------------
+    Retorna.
+    ------------
+    URI gs:// del objeto cargado (o del prefijo, para Parquet). Si la carga
+    se omitió, la URI de la versión existente con el mismo contenido.
 
     ------------
     Execpciones.
     ------------
     FileNotFileFoundError -> si el archivo csv no existe.
+    ValueError -> si el formato no es soportado.
     """
    
+    if file_format == "parquet":
+        return load_parquet_to_gcs(base_file_name)
+    if file_format != "csv":
+        raise ValueError(f"Formato no soportado: {file_format}")
+    if compression is not None and compression not in CSV_COMPRESSIONS:
+        raise ValueError(f"Compresión no soportada: {compression}. Opciones: {tuple(CSV_COMPRESSIONS)}")
+
     logger.info("Inicio de carga de dataset a Google Cloud Storage")
 
     #fecha de ejecución en formato ISO(8601)
-    execution_date = datetime.now(UTC).strftime("%Y-%m-%d")
+    execution_date = _execution_date()
 
     #rutas de archivos
-    local_file_path = LOCAL_TRANSFORMED_DIR / f"{base_file_name}.csv"
-    gcs_file_name = f"{base_file_name}_{execution_date}.csv"
+    extension = f"csv{CSV_COMPRESSIONS.get(compression, '')}"
+    local_file_path = LOCAL_TRANSFORMED_DIR / f"{base_file_name}.{extension}"
+    gcs_file_name = f"{base_file_name}_{execution_date}.{extension}"
     gcs_object_path = f"{GCS_LAYER}/{gcs_file_name}"
 
     #Validación de existencia local
@@ -71,15 +174,347 @@ def load_csv_to_gcs(base_file_name: str) -> None:
 
     logger.info(f"Archivo origen validado | Ruta local: {local_file_path}")
 
-    #cliente GCS con credenciales de entorno
-    client = storage.Client()
-    bucket = client.bucket(BUCKET_NAME)
-    blob = bucket.blob(gcs_object_path)
+    #bucket del cliente GCS compartido (credenciales de entorno)
+    bucket = get_bucket(BUCKET_NAME)
+
+    #skip si el contenido es idéntico a la última versión cargada
+    metadata = None
+    if skip_unchanged:
+        local_crc32c = file_crc32c(local_file_path)
+        latest = latest_version_blob(bucket, base_file_name, extension)
+        unchanged = latest is not None and latest.crc32c == local_crc32c
+
+        #otro día: mismo contenido salvo FECHA_CARGA
+        local_hash = None
+        if not unchanged:
+            local_hash = content_hash(local_file_path)
+            metadata = {CONTENT_HASH_METADATA: local_hash}
+            unchanged = latest is not None and (latest.metadata or {}).get(CONTENT_HASH_METADATA) == local_hash
+
+        if unchanged:
+            UPLOAD_STATS["skipped"] += 1
+            annotate(bytes_written = 0, skipped = True)
+            logger.info(
+                f"Carga omitida, contenido sin cambios | crc32c = {local_crc32c} |"
+                f" hash contenido = {local_hash} |"
+                f" versión vigente: gs://{BUCKET_NAME}/{latest.name} |"
+                f" omitidas en el proceso: {UPLOAD_STATS['skipped']}"
+            )
+            return f"gs://{BUCKET_NAME}/{latest.name}"
 
     #carga del archivo
-    blob.upload_from_filename(local_file_path)
+    if parallel_workers > 1 and local_file_path.stat().st_size > slice_size:
+        upload_composite(bucket, local_file_path, gcs_object_path, slice_size, parallel_workers, metadata = metadata)
+    else:
+        blob = bucket.blob(gcs_object_path)
+        blob.metadata = metadata
+        blob.upload_from_filename(local_file_path)
+    UPLOAD_STATS["uploaded"] += 1
+    annotate(bytes_written = local_file_path.stat().st_size, skipped = False)
 
     logger.info(f"Archivo cargado correctamente en GCS | gs://{BUCKET_NAME}/{gcs_object_path}")
+
+    return f"gs://{BUCKET_NAME}/{gcs_object_path}"
+
+
+@instrumented("load_dataframe_to_gcs")
+def load_dataframe_to_gcs(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    base_file_name: str,
+    chunk_size: int = DEFAULT_SERIALIZE_ROWS,
+) -> str:
+    """
+    Serializa un DataFrame (o un iterador de bloques) como CSV directamente
+    sobre un upload resumable de GCS, sin archivo local intermedio.
+
+    Sólo un bloque de `chunk_size` filas está serializado en memoria a la
+    vez; el writer envía requests de RESUMABLE_CHUNK_SIZE bytes. El objeto
+    resultante es idéntico al que produciría `load_csv` + `load_csv_to_gcs`.
+
+    ------------
+    Parámetros.
+    ------------
+    data: DataFrame transformado, o iterable de bloques transformados.
+    base_file_name: nombre base del objeto, sin extensión ni fecha.
+    chunk_size: filas por bloque al serializar un DataFrame completo.
+
+    ------------
+    Retorna.
+    ------------
+    URI gs:// del objeto cargado.
+
+    ------------
+    Execpciones.
+    ------------
+    ValueError -> si no hay filas que cargar.
+    """
+    import pandas as pd
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser mayor a 0")
+
+    logger.info("Inicio de carga directa de dataset a Google Cloud Storage")
+
+    gcs_object_path = f"{GCS_LAYER}/{base_file_name}_{_execution_date()}.csv"
+
+    if isinstance(data, pd.DataFrame):
+        chunks = (data.iloc[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+    else:
+        chunks = data
+
+    blob = get_bucket(BUCKET_NAME).blob(gcs_object_path)
+
+    rows = 0
+    written = 0
+    header = True
+    writer = blob.open("wb", chunk_size = RESUMABLE_CHUNK_SIZE, ignore_flush = True)
+    try:
+        for chunk in chunks:
+            payload = chunk.to_csv(index = False, header = header).encode("utf-8")
+            writer.write(payload)
+            written += len(payload)
+            header = False
+            rows += len(chunk)
+
+        if rows == 0:
+            raise ValueError("No se recibieron filas para cargar")
+    except BaseException:
+        #se cancela el upload resumable para no finalizar un objeto parcial
+        writer.terminate()
+        raise
+
+    writer.close()
+    UPLOAD_STATS["uploaded"] += 1
+    annotate(rows_in = rows, rows_out = rows, bytes_written = written)
+
+    logger.info(
+        f"Dataset cargado correctamente en GCS sin archivo local |"
+        f" gs://{BUCKET_NAME}/{gcs_object_path} | Filas: {rows}"
+    )
+
+    return f"gs://{BUCKET_NAME}/{gcs_object_path}"
+
+
+def upload_composite(
+    bucket,
+    local_file_path: Path,
+    object_path: str,
+    slice_size: int = DEFAULT_SLICE_SIZE,
+    workers: int = 8,
+    retries: int = DEFAULT_SLICE_RETRIES,
+    metadata: Optional[dict] = None,
+):
+    """
+    Sube un archivo dividido en slices de `slice_size` bytes desde un pool de
+    `workers` threads y los compone server-side en `object_path`, con la
+    metadata `metadata`.
+
+    Cada slice se reintenta hasta `retries` veces con backoff exponencial.
+    Los objetos temporales se eliminan siempre al terminar, también cuando
+    la carga falla, para no dejar basura en el bucket.
+
+    Retorna el blob final.
+    """
+    if slice_size <= 0:
+        raise ValueError("slice_size debe ser mayor a 0")
+
+    size = local_file_path.stat().st_size
+    n_slices = max(1, math.ceil(size / slice_size))
+    tmp_prefix = f"{TMP_PARTS_PREFIX}/{object_path}/{uuid.uuid4().hex}"
+
+    logger.info(
+        f"Carga paralela iniciada | {size} bytes | slices = {n_slices} |"
+        f" slice_size = {slice_size} | workers = {workers}"
+    )
+
+    def upload_slice(index: int):
+        blob = bucket.blob(f"{tmp_prefix}/part-{index:05d}")
+        offset = index * slice_size
+        length = min(slice_size, size - offset)
+
+        for attempt in range(1, retries + 1):
+            try:
+                with open(local_file_path, "rb") as f:
+                    f.seek(offset)
+                    blob.upload_from_file(f, size = length)
+                return blob
+            except Exception as e:
+                if attempt == retries:
+                    logger.error(f"Slice {index} falló tras {retries} intentos: {e}")
+                    raise
+                logger.warning(f"Reintentando slice {index} ({attempt}/{retries}): {e}")
+                time.sleep(RETRY_BACKOFF_S * 2 ** (attempt - 1))
+
+    temporaries = []
+    try:
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            futures = [pool.submit(upload_slice, i) for i in range(n_slices)]
+            # se espera a todos los slices antes de limpiar, aunque alguno falle
+            errors = [f.exception() for f in futures]
+            temporaries.extend(f.result() for f, e in zip(futures, errors) if e is None)
+            for error in errors:
+                if error is not None:
+                    raise error
+
+        final_blob = _compose_tree(bucket, temporaries, object_path, tmp_prefix, metadata)
+    finally:
+        _delete_blobs(temporaries)
+
+    logger.info(f"Carga paralela completada | gs://{BUCKET_NAME}/{object_path}")
+    return final_blob
+
+
+def _compose_tree(bucket, parts: list, object_path: str, tmp_prefix: str, metadata: Optional[dict] = None):
+    """
+    Compone `parts` en `object_path` respetando el límite de 32 fuentes por
+    compose: mientras haya más, se agrupan en objetos intermedios. Los
+    intermedios se agregan a `parts` para que el llamador los elimine.
+    """
+    level = 0
+    current = list(parts)
+    while len(current) > COMPOSE_MAX_SOURCES:
+        grouped = []
+        for g in range(0, len(current), COMPOSE_MAX_SOURCES):
+            intermediate = bucket.blob(f"{tmp_prefix}/compose-{level}-{g // COMPOSE_MAX_SOURCES:05d}")
+            intermediate.compose(current[g:g + COMPOSE_MAX_SOURCES])
+            parts.append(intermediate)
+            grouped.append(intermediate)
+        current = grouped
+        level += 1
+
+    final_blob = bucket.blob(object_path)
+    final_blob.metadata = metadata
+    final_blob.compose(current)
+    return final_blob
+
+
+def _delete_blobs(blobs: list) -> None:
+    """
+    Elimina objetos temporales sin interrumpir por errores individuales.
+    """
+    for blob in blobs:
+        try:
+            blob.delete()
+        except Exception as e:
+            logger.warning(f"No se pudo eliminar el objeto temporal {blob.name}: {e}")
+
+
+def file_crc32c(file_path: Path, block_size: int = CHECKSUM_BLOCK_SIZE) -> str:
+    """
+    CRC32C de un archivo en el formato de la metadata de GCS (base64 de los
+    4 bytes big-endian), leyendo por bloques para no cargarlo en memoria.
+
+    Si el archivo lo escribió `write_csv` en este proceso y no cambió desde
+    entonces, se reutiliza el CRC32C calculado durante la escritura.
+    """
+    import google_crc32c
+
+    cached = written_crc32c(file_path)
+    if cached is not None:
+        return cached
+
+    checksum = google_crc32c.Checksum()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            checksum.update(block)
+
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+def content_hash(file_path: Path, chunk_rows: int = DEFAULT_SERIALIZE_ROWS) -> str:
+    """
+    Hash (hex) del contenido de un CSV transformado sin las columnas que se
+    recalculan en cada carga (`src.cdc.IGNORED_COLUMNS`, es decir,
+    FECHA_CARGA). Lee el archivo por bloques como texto, descomprimiendo
+    gzip o zstd según la extensión, y combina con CRC32C los hashes por fila
+    de `hash_pandas_object`, igual que el CDC compara valores.
+    """
+    import google_crc32c
+    import pandas as pd
+    import pyarrow as pa
+    from pandas.util import hash_pandas_object
+    from src.cdc import IGNORED_COLUMNS
+
+    checksum = google_crc32c.Checksum()
+    with pa.input_stream(str(file_path), compression = "detect") as stream, \
+         pd.read_csv(stream, chunksize = chunk_rows, dtype = str, keep_default_na = False) as reader:
+        for i, chunk in enumerate(reader):
+            chunk = chunk.drop(columns = [c for c in IGNORED_COLUMNS if c in chunk.columns])
+            if i == 0:
+                checksum.update("|".join(chunk.columns).encode("utf-8"))
+            checksum.update(hash_pandas_object(chunk, index = False).to_numpy().tobytes())
+
+    return checksum.digest().hex()
+
+
+def latest_version_blob(bucket, base_file_name: str, extension: str = "csv", before: Optional[str] = None):
+    """
+    Retorna el blob de la versión más reciente `<base>_<YYYY-MM-DD>.<ext>`
+    en la capa transformed, o None si no existe ninguna. Con `before` (nombre
+    de un objeto versionado) sólo considera las versiones anteriores a él.
+
+    Las fechas ISO ordenan lexicográficamente, por lo que basta con el
+    mayor nombre que calce con el patrón de versionado.
+    """
+    prefix = f"{GCS_LAYER}/{base_file_name}_"
+    pattern = re.compile(rf"^{re.escape(prefix)}\d{{4}}-\d{{2}}-\d{{2}}\.{re.escape(extension)}$")
+
+    latest = None
+    for blob in bucket.list_blobs(prefix = prefix):
+        if before is not None and blob.name >= before:
+            continue
+        if pattern.match(blob.name) and (latest is None or blob.name > latest.name):
+            latest = blob
+
+    return latest
+
+
+def load_parquet_to_gcs(base_file_name: str) -> str:
+    """
+    Carga el árbol de particiones de un dataset Parquet transformado,
+    conservando la estructura Hive bajo un prefijo versionado por fecha:
+
+        transformed/<base>_<YYYY-MM-DD>/ANO_ESTADISTICO=2010/part-00000-0.parquet
+
+    Retorna la URI gs:// del prefijo del dataset.
+    """
+    logger.info("Inicio de carga de dataset Parquet a Google Cloud Storage")
+
+    execution_date = _execution_date()
+
+    local_dir = LOCAL_TRANSFORMED_DIR / base_file_name
+    gcs_prefix = f"{GCS_LAYER}/{base_file_name}_{execution_date}"
+
+    if not local_dir.is_dir():
+        logger.error(f"No se ha encontrado el dataset transformado: {local_dir}")
+        raise FileNotFoundError(local_dir)
+
+    files = sorted(local_dir.rglob("*.parquet"))
+    if not files:
+        logger.error(f"El dataset {local_dir} no contiene archivos Parquet")
+        raise FileNotFoundError(local_dir)
+
+    logger.info(f"Dataset origen validado | Ruta local: {local_dir} | Archivos: {len(files)}")
+
+    bucket = get_bucket(BUCKET_NAME)
+
+    for file_path in files:
+        object_path = f"{gcs_prefix}/{file_path.relative_to(local_dir).as_posix()}"
+        bucket.blob(object_path).upload_from_filename(file_path)
+    annotate(bytes_written = sum(f.stat().st_size for f in files))
+
+    logger.info(
+        f"Dataset cargado correctamente en GCS | gs://{BUCKET_NAME}/{gcs_prefix}/ | Archivos: {len(files)}"
+    )
+
+    return f"gs://{BUCKET_NAME}/{gcs_prefix}/"
+
+
+def _execution_date() -> str:
+    """
+    Fecha de ejecución en formato ISO (8601), usada para versionar objetos.
+    """
+    return datetime.now(UTC).strftime("%Y-%m-%d")
     
 
 
@@ -5,20 +5,255 @@ logger.py
 Configura y retorna un logger estándar para el proyecto ETL,
 permite trazabilidad y compatibilidad con Cloud Logging.
 
+Dos formatos de salida:
+    - text: `fecha | nivel | logger | mensaje` (por defecto).
+    - json: una línea JSON por registro con los campos que Cloud Logging
+      reconoce (severity, message, timestamp, sourceLocation y labels) más
+      el contexto de la ejecución (run_id, stage) y los campos pasados en
+      `extra` (wall_s, cpu_s, rows_in, rows_out, bytes_written, ...).
+
+Los registros se encolan con un `QueueHandler` y un `QueueListener` los
+formatea y escribe en su propio thread, de modo que la E/S hacia stdout,
+stderr o archivos no ocurre en el thread del pipeline. El contexto (run_id,
+etapa activa) se captura en el thread que emite el registro.
+
+`configure_logging` es idempotente: con la misma configuración no hace
+nada, y con otra reemplaza la anterior sin duplicar handlers. El formato y
+el nivel por defecto se leen de ETL_LOG_FORMAT y ETL_LOG_LEVEL.
+
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez. N.
 Fecha: 3 de enero de 2026.
 
 '''
 
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Callable, Optional, TextIO, Union
+
+LOGGER_NAME = "etl-datos-publicos"
+
+LOG_FORMATS = ("text", "json")
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+#Variables de entorno con el formato y el nivel por defecto
+LOG_FORMAT_ENV = "ETL_LOG_FORMAT"
+LOG_LEVEL_ENV = "ETL_LOG_LEVEL"
+
+#Campos propios de LogRecord; el resto de sus atributos viene de `extra` o del contexto
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+#Campos del contexto que además se publican como labels de Cloud Logging
+LABEL_FIELDS = ("run_id",)
+
+#Funciones que retornan campos de contexto para cada registro (ver `add_context_provider`)
+_context_providers = []
+
+#Configuración vigente: logger, handler de la cola, listener y parámetros
+_config = {}
+_config_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatea cada registro como una línea JSON para Cloud Logging.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(timespec = "milliseconds"),
+            "severity": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+            "logging.googleapis.com/sourceLocation": {
+                "file": record.pathname,
+                "line": record.lineno,
+                "function": record.funcName,
+            },
+        }
+        fields = {
+            key: value for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and value is not None
+        }
+        entry.update(fields)
+
+        labels = {key: str(fields[key]) for key in LABEL_FIELDS if key in fields}
+        if labels:
+            entry["logging.googleapis.com/labels"] = labels
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["stack_trace"] = record.exc_text
+
+        return json.dumps(entry, default = str, ensure_ascii = False)
+
+
+class _ContextFilter(logging.Filter):
+    """
+    Agrega a cada registro los campos de los proveedores de contexto, sin
+    reemplazar los que ya trae en `extra`. Corre en el thread que emite.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for provider in _context_providers:
+            for key, value in provider().items():
+                if value is not None and key not in record.__dict__:
+                    setattr(record, key, value)
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que conserva los campos estructurados y el traceback del
+    registro, dejando el formateo al thread del listener. El registro se
+    encola sin copiarlo: el logger no propaga y éste es su único handler.
+    """
 
-def setup_logger(level: int = logging.INFO) -> logging.Logger:
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-    logging.basicConfig(level = level, format = "%(asctime)s | %(levelname)s | %(name)s | %(message)s")
-    logger = logging.getLogger("etl-datos-publicos")
+
+def add_context_provider(provider: Callable[[], dict]) -> None:
+    """
+    Registra una función que retorna campos de contexto (p. ej. run_id y la
+    etapa activa) que se agregan a cada registro. Registrarla dos veces no
+    tiene efecto.
+    """
+    if provider not in _context_providers:
+        _context_providers.append(provider)
+
+
+def _formatter(fmt: str) -> logging.Formatter:
+    return JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+
+
+def _stop_listener() -> None:
+    """
+    Detiene el listener vigente, escribiendo antes los registros pendientes.
+    """
+    listener = _config.get("listener")
+    if listener is not None:
+        listener.stop()
+        _config["listener"] = None
+
+
+def configure_logging(
+    fmt: Optional[str] = None,
+    level: Union[int, str, None] = None,
+    stream: Optional[TextIO] = None,
+    file: Optional[Path] = None,
+    use_queue: bool = True,
+) -> logging.Logger:
+    """
+    Configura el logger del proyecto y lo retorna.
+
+    Parámetros:
+    - fmt: 'text' o 'json' (por defecto ETL_LOG_FORMAT, o 'text').
+    - level: nivel mínimo (por defecto ETL_LOG_LEVEL, o INFO).
+    - stream: stream de salida (por defecto sys.stderr).
+    - file: si se indica, los registros también se agregan a ese archivo.
+    - use_queue: si es False, los handlers escriben en el thread que emite
+      (sin QueueHandler), útil para depurar o medir.
+
+    Llamarla de nuevo con los mismos parámetros no hace nada; con otros,
+    reemplaza la configuración anterior (escribiendo antes sus registros
+    pendientes).
+    """
+    fmt = fmt or os.getenv(LOG_FORMAT_ENV, "text")
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Formato de log inválido: {fmt}. Opciones: {LOG_FORMATS}")
+    level = level if level is not None else os.getenv(LOG_LEVEL_ENV, logging.INFO)
+    level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(level, int):
+        raise ValueError(f"Nivel de log inválido: {level}")
+    stream = stream or sys.stderr
+
+    key = (fmt, level, id(stream), str(file) if file else None, use_queue)
+    logger = logging.getLogger(LOGGER_NAME)
+
+    with _config_lock:
+        if _config.get("key") == key:
+            return logger
+
+        _stop_listener()
+        for handler in _config.get("installed", ()):
+            logger.removeHandler(handler)
+        for handler in _config.get("handlers", ()):
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+
+        handlers = [logging.StreamHandler(stream)]
+        if file is not None:
+            Path(file).parent.mkdir(parents = True, exist_ok = True)
+            handlers.append(logging.FileHandler(file, encoding = "utf-8"))
+        for handler in handlers:
+            handler.setFormatter(_formatter(fmt))
+
+        listener = None
+        if use_queue:
+            records = queue.SimpleQueue()
+            installed = [_QueueHandler(records)]
+            listener = logging.handlers.QueueListener(records, *handlers)
+            listener.start()
+        else:
+            installed = handlers
+        for handler in installed:
+            handler.addFilter(_ContextFilter())
+            logger.addHandler(handler)
+
+        logger.setLevel(level)
+        # el logger tiene sus propios handlers: no se duplica en el root
+        logger.propagate = False
+        _config.update(key = key, installed = installed, handlers = handlers, listener = listener)
 
     return logger
 
 
+def setup_logger(level: Optional[int] = None) -> logging.Logger:
+    """
+    Logger del proyecto; lo configura con los valores por defecto sólo la
+    primera vez (las siguientes llamadas no cambian la configuración).
+    """
+    if not _config:
+        configure_logging(level = level)
+    return logging.getLogger(LOGGER_NAME)
+
+
+def _restart_after_fork() -> None:
+    """
+    El thread del listener no sobrevive a un fork: el proceso hijo encola
+    sus registros en una cola nueva con su propio listener.
+    """
+    global _config_lock
+
+    _config_lock = threading.Lock()
+    if _config.get("listener") is None:
+        return
+    records = queue.SimpleQueue()
+    for handler in _config["installed"]:
+        handler.queue = records
+    _config["listener"] = logging.handlers.QueueListener(records, *_config["handlers"])
+    _config["listener"].start()
+
+    # los workers de multiprocessing terminan con os._exit, sin atexit
+    if "multiprocessing" in sys.modules:
+        from multiprocessing import util
+        util.Finalize(None, _stop_listener, exitpriority = 0)
+
 
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child = _restart_after_fork)
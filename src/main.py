@@ -6,6 +6,17 @@ Orquestador ETL, etapas:
     1.- Transformación de datos(transform).
     2.- Carga local del dataset transformado.
     3.- Carga del dataset tranformado al Data Lake(GCS)
+    4.- Rollups (tablas agregadas) calculados en el transform (opcional).
+    5.- Delta CDC respecto de la versión anterior en GCS (opcional).
+    6.- Carga desde GCS a una tabla particionada de BigQuery (opcional).
+
+Modos de ejecución:
+    - batch: el dataset completo se procesa en memoria (por defecto).
+    - streaming: el archivo raw se procesa por bloques de filas y se
+      escribe de forma incremental, con memoria acotada.
+    - pipelined: como streaming, pero lectura, transform, escritura y carga
+      a GCS corren a la vez en threads unidos por colas acotadas
+      (ver `src/pipeline.py`).
 
 Proyecto: ETL Datos Públicos.
 Autor: E. Henríquez N.
@@ -14,22 +25,165 @@ Fecha: 3 de enero de 2026.
 """
 
 from pathlib import Path
+import argparse
+import itertools
 import os
 import sys
 
-from src.transform import transform_dataset
-from src.load import load_csv
-from src.load_gcs import load_csv_to_gcs
-from src.logger import setup_logger
+from src import extract
+from src.cdc import load_cdc_to_gcs
+from src.checkpoint import RunManifest
+from src.extract import BACKENDS, DEFAULT_CHUNK_SIZE
+from src.transform import SPLIT_COLUMNS, transform_dataset, transform_dataset_chunks
+from src.load import (
+    CSV_COMPRESSIONS,
+    DEFAULT_ROW_GROUP_SIZE,
+    OUTPUT_FORMATS,
+    PARTITION_COLUMNS,
+    load_csv,
+    load_csv_chunks,
+    load_parquet,
+    load_parquet_chunks,
+)
+from src.load_bq import BQ_STRATEGIES, load_gcs_to_bigquery
+from src.load_gcs import DEFAULT_SLICE_SIZE, load_csv_to_gcs, load_dataframe_to_gcs
+from src.logger import LOG_FORMATS, configure_logging, setup_logger
+from src.metrics import path_size, run_metrics, stage
+from src.pipeline import DEFAULT_QUEUE_SIZE, run_pipelined
+from src.quality import QUALITY_MODES
+from src.rollups import (
+    ROLLUPS,
+    ROLLUPS_SUFFIX,
+    RollupAccumulator,
+    load_rollups_to_gcs,
+    read_rollups,
+    select_rollups,
+    write_rollups,
+)
+from src.watermark import WatermarkTracker, read_watermark, shift_watermark, write_watermark
 
 logger = setup_logger()
 
-def main():
+# ======================
+# CONFIGURACIÓN
+# ======================
+BASE_DIR = Path(__file__).resolve().parent.parent
+INPUT_FILE = "def_semana_epidemiologica.csv"
+OUTPUT_DIR = BASE_DIR / "data" / "transformed"
+BASE_OUTPUT_FILE = "def_semana_epidemiologica_transformed"
+
+MODES = ("batch", "streaming", "pipelined")
+
+def main(
+    mode: str = "batch",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: str = "pandas",
+    output_format: str = "csv",
+    partition_cols = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    incremental: bool = False,
+    full_refresh: bool = False,
+    lookback_weeks: int = 0,
+    upload_workers: int = 1,
+    upload_slice_size: int = DEFAULT_SLICE_SIZE,
+    keep_local: bool = True,
+    trace_memory: bool = False,
+    use_cache: bool = True,
+    transform_workers: int = 1,
+    transform_split_by: str = "ANO_ESTADISTICO",
+    compact: bool = False,
+    quality: str = "off",
+    bq_table = None,
+    bq_strategy: str = "merge",
+    force: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    cdc: bool = False,
+    rollups = None,
+    compression = None,
+):
     """
     Orquesta el pipeline ETL completo:
     Transform -> Load local -> Load GCP
+
+    Parámetros:
+    - mode: 'batch' (dataset completo en memoria), 'streaming' (por bloques)
+      o 'pipelined' (por bloques, con las etapas superpuestas).
+    - chunk_size: filas por bloque en modo streaming y pipelined.
+    - backend: lector del CSV raw en modo batch ('pandas' o 'pyarrow').
+    - output_format: 'csv' (archivo único) o 'parquet' (dataset columnar).
+    - partition_cols: columnas de particionado Hive para Parquet.
+    - row_group_size: filas por row group para Parquet.
+    - incremental: procesa sólo las semanas posteriores al watermark guardado
+      y genera/sube un delta (`<base>_delta`) en vez del snapshot completo.
+    - full_refresh: ignora el watermark, procesa todo el histórico y lo
+      reinicia con la última semana presente.
+    - lookback_weeks: semanas ya procesadas que se vuelven a emitir en modo
+      incremental, para recoger revisiones tardías de la fuente.
+    - upload_workers: threads de la carga paralela a GCS (1 = stream único).
+    - upload_slice_size: bytes por slice en la carga paralela.
+    - keep_local: si es False, el CSV se serializa por bloques directo a GCS
+      (upload resumable) sin escribir el archivo en data/transformed.
+    - trace_memory: activa tracemalloc para medir el pico de memoria de
+      Python por etapa en las métricas de la ejecución.
+    - use_cache: en modo batch reutiliza el parseo del CSV raw guardado en
+      el caché Arrow (data/cache) mientras el archivo no cambie.
+    - transform_workers: procesos del transform en modo batch (1 = serial).
+    - transform_split_by: columna por la que se particiona el transform
+      paralelo ('ANO_ESTADISTICO' o 'REGION').
+    - compact: representación compacta en memoria del dataset transformado
+      (categóricas, enteros pequeños, FECHA_CARGA datetime64).
+    - quality: reglas de calidad del raw ('off', 'quarantine' o 'fail'). Por
+      defecto 'off' (se cargan todas las filas); con 'quarantine' las filas
+      inválidas quedan en data/quality y no se cargan.
+    - bq_table: tabla BigQuery destino ('dataset.tabla'); si se indica, el
+      objeto cargado en GCS se carga también en BigQuery.
+    - bq_strategy: 'merge' (upsert por llave natural, idempotente) o
+      'append' (agrega las filas del delta).
+    - force: ignora el manifiesto de checkpoints y ejecuta todas las etapas.
+    - queue_size: bloques máximos en cada cola entre etapas (modo pipelined).
+    - cdc: publica junto al snapshot en GCS el delta (filas insertadas,
+      actualizadas y eliminadas) respecto de la versión anterior
+      (ver `src/cdc.py`). Sólo para snapshots CSV completos con archivo local.
+    - rollups: nombres de las tablas agregadas (ver `src/rollups.py`) que se
+      calculan en la misma pasada del transform, se escriben en
+      `<base>_rollups/` junto con su checkpoint y luego se cargan a GCS.
+    - compression: compresión del CSV local y del objeto en GCS ('gzip' o
+      'zstd'; ver `src.load.write_csv`). zstd no es legible por BigQuery.
+
+    Cada etapa completada se registra en data/checkpoints/<dataset>.json con
+    la huella de sus entradas y el hash de su artefacto; al volver a ejecutar
+    se omiten las etapas cuyas entradas no cambiaron y la corrida continúa
+    desde la primera etapa incompleta (ver `src.checkpoint`).
+
+    Cada ejecución agrega sus métricas por etapa (tiempo, CPU, memoria,
+    filas y bytes) a data/metrics/pipeline_metrics.jsonl.
+
+    Todos los modos producen el mismo archivo transformado.
     """
-    logger.info("Inicio del pipeline ETL")
+    if mode not in MODES:
+        raise ValueError(f"Modo de ejecución inválido: {mode}. Opciones: {MODES}")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Formato de salida inválido: {output_format}. Opciones: {OUTPUT_FORMATS}")
+    if not keep_local and output_format != "csv":
+        raise ValueError("La carga directa a GCS sin archivo local sólo soporta formato csv")
+    if mode == "pipelined" and output_format != "csv":
+        raise ValueError("El modo pipelined sólo soporta formato csv")
+    if cdc and (output_format != "csv" or not keep_local):
+        raise ValueError("El delta CDC requiere formato csv con archivo local")
+    if compression is not None:
+        if compression not in CSV_COMPRESSIONS:
+            raise ValueError(f"Compresión inválida: {compression}. Opciones: {tuple(CSV_COMPRESSIONS)}")
+        if output_format != "csv" or not keep_local or mode == "pipelined":
+            raise ValueError("La compresión requiere formato csv con archivo local en modo batch o streaming")
+        if cdc:
+            raise ValueError("El delta CDC requiere el snapshot CSV sin comprimir")
+        if bq_table and compression != "gzip":
+            raise ValueError("BigQuery sólo carga CSV sin comprimir o gzip")
+    rollup_acc = RollupAccumulator(select_rollups(rollups)) if rollups else None
+    if bq_strategy not in BQ_STRATEGIES:
+        raise ValueError(f"Estrategia de carga BigQuery inválida: {bq_strategy}. Opciones: {BQ_STRATEGIES}")
+
+    logger.info(f"Inicio del pipeline ETL | modo = {mode}")
 
     #=======================
     #VALIDACION CREDENCIALES
@@ -41,41 +195,425 @@ def main():
     # ======================
     # CONFIGURACIÓN
     # ======================
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    input_file = "def_semana_epidemiologica.csv"
-    output_dir = BASE_DIR /"data" / "transformed"
-    base_output_file = "def_semana_epidemiologica_transformed"
+    input_file = INPUT_FILE
+    output_dir = OUTPUT_DIR
+    base_output_file = BASE_OUTPUT_FILE
+
+    with run_metrics(trace_memory = trace_memory):
+        # ======================
+        # INCREMENTAL (WATERMARK)
+        # ======================
+        watermark = None
+        if incremental and not full_refresh:
+            watermark = read_watermark(base_output_file)
+        since = shift_watermark(watermark, lookback_weeks) if watermark else None
+
+        # sólo las corridas con watermark generan un delta; la primera carga y
+        # el full refresh generan el snapshot completo
+        output_name = f"{base_output_file}_delta" if since else base_output_file
+        tracker = WatermarkTracker(watermark)
+
+        if since:
+            logger.info(f"Modo incremental | watermark = {watermark} | reproceso desde {since}")
+
+        # ======================
+        # CHECKPOINTS
+        # ======================
+        # transform y load local (o la carga directa a GCS) forman un solo
+        # checkpoint, porque el DataFrame transformado sólo persiste como archivo
+        manifest = RunManifest(output_name, force = force)
+        raw_hash = manifest.file_hash(extract.RAW_DIR / input_file)
+        resumable = not force and raw_hash is not None
+        transform_inputs = {
+            "raw": raw_hash,
+            "since": since,
+            "mode": mode,
+            "output_format": output_format,
+            "partition_cols": partition_cols,
+            "row_group_size": row_group_size,
+            "compact": compact,
+            "quality": quality,
+            "keep_local": keep_local,
+        }
+        if rollups:
+            # los rollups se calculan en el transform: pedirlos lo vuelve a ejecutar
+            transform_inputs["rollups"] = sorted(rollups)
+        if compression:
+            transform_inputs["compression"] = compression
+        first_stage = "transform" if keep_local else "load_gcs"
+        done = manifest.completed(first_stage, transform_inputs) if resumable else None
+
+        pipelined = None
+        if done:
+            if done.get("watermark"):
+                tracker.watermark = tuple(done["watermark"])
+        elif mode == "pipelined":
+            # ======================
+            # TRANSFORM + LOAD LOCAL + LOAD GCS (etapas superpuestas)
+            # ======================
+            logger.info("Etapa pipelined iniciada")
+            with stage("main.pipelined") as m:
+                pipelined = run_pipelined(
+                    input_file,
+                    output_name,
+                    output_dir = output_dir if keep_local else None,
+                    chunk_size = chunk_size,
+                    since = since,
+                    compact = compact,
+                    quality = quality,
+                    tracker = tracker,
+                    queue_size = queue_size,
+                    rollups = rollup_acc,
+                )
+                if pipelined is not None:
+                    m.update(rows_out = pipelined.rows, busy_s = pipelined.busy_s, max_in_flight = pipelined.max_in_flight)
+            if pipelined is None:
+                logger.info("Sin semanas nuevas posteriores al watermark, no hay nada que cargar")
+                return
+        else:
+            data = _transform(
+                mode, input_file, chunk_size, backend, since, use_cache,
+                transform_workers, transform_split_by, compact, quality, tracker,
+                track_watermark = incremental or full_refresh, rollups = rollup_acc,
+            )
+            if data is None:
+                logger.info("Sin semanas nuevas posteriores al watermark, no hay nada que cargar")
+                return
+
+        if keep_local:
+            if done:
+                output_path = Path(done["artifact"])
+            elif pipelined:
+                output_path = pipelined.output_path
+                _write_local_rollups(rollup_acc, output_dir, output_name)
+                manifest.complete("transform", transform_inputs, output_path, watermark = tracker.watermark)
+            else:
+                # ======================
+                # LOAD LOCAL
+                # ======================
+                logger.info("Etapa Load Local iniciada")
+                with stage("main.transform_load_local" if mode == "streaming" else "main.load_local") as m:
+                    output_path = _load_local(
+                        data, output_format, output_dir, output_name, partition_cols, row_group_size,
+                        streaming = mode == "streaming", compression = compression,
+                    )
+                    m["bytes_written"] = path_size(output_path)
+                _write_local_rollups(rollup_acc, output_dir, output_name)
+                manifest.complete("transform", transform_inputs, output_path, watermark = tracker.watermark)
+
+            #=======================
+            #LOAD GCS
+            #=======================
+            gcs_inputs = {
+                "artifact": manifest.stages["transform"]["artifact_hash"],
+                "output_format": output_format,
+            }
+            gcs_done = manifest.completed("load_gcs", gcs_inputs) if resumable and not pipelined else None
+            if pipelined:
+                gcs_uri = pipelined.gcs_uri
+                manifest.complete("load_gcs", gcs_inputs, gcs_uri)
+            elif gcs_done:
+                gcs_uri = gcs_done["artifact"]
+            else:
+                logger.info("Etapa Load GCS iniciada")
+
+                with stage("main.load_gcs"):
+                    gcs_uri = load_csv_to_gcs(
+                        output_name,
+                        file_format = output_format,
+                        parallel_workers = upload_workers,
+                        slice_size = upload_slice_size,
+                        compression = compression,
+                    )
+                manifest.complete("load_gcs", gcs_inputs, gcs_uri)
+        elif done:
+            gcs_uri = done["artifact"]
+        elif pipelined:
+            gcs_uri = pipelined.gcs_uri
+            _write_local_rollups(rollup_acc, output_dir, output_name)
+            manifest.complete("load_gcs", transform_inputs, gcs_uri, watermark = tracker.watermark)
+        else:
+            #=======================
+            #LOAD GCS DIRECTO (sin archivo local)
+            #=======================
+            logger.info("Etapa Load GCS directa iniciada")
+            with stage("main.load_gcs_direct"):
+                gcs_uri = load_dataframe_to_gcs(data, output_name, chunk_size = chunk_size)
+            _write_local_rollups(rollup_acc, output_dir, output_name)
+            manifest.complete("load_gcs", transform_inputs, gcs_uri, watermark = tracker.watermark)
+
+        if rollup_acc:
+            #=======================
+            #ROLLUPS
+            #=======================
+            rollup_inputs = {"transform": manifest.stages[first_stage]["inputs"], "rollups": sorted(rollups)}
+            if not (resumable and manifest.completed("rollups", rollup_inputs)):
+                if rollup_acc.rows:
+                    tables = rollup_acc.tables()
+                else:
+                    # transform omitido por checkpoint: los rollups se escribieron junto a él
+                    rollups_dir = output_dir / f"{output_name}{ROLLUPS_SUFFIX}"
+                    tables = read_rollups(rollups_dir, rollups)
+                    if tables is None:
+                        raise FileNotFoundError(
+                            f"Faltan los rollups locales en {rollups_dir}; use --force para recalcularlos"
+                        )
+
+                logger.info("Etapa Rollups iniciada")
+                with stage("main.rollups"):
+                    rollups_uri = load_rollups_to_gcs(tables, output_name)
+                manifest.complete("rollups", rollup_inputs, rollups_uri)
+
+        if cdc and since:
+            logger.warning("El delta CDC sólo aplica a snapshots completos, se omite en modo incremental")
+        elif cdc:
+            #=======================
+            #CDC (delta respecto de la versión anterior)
+            #=======================
+            cdc_inputs = {
+                "gcs_uri": gcs_uri,
+                "artifact": manifest.stages["transform"]["artifact_hash"],
+            }
+            if not (resumable and manifest.completed("cdc", cdc_inputs)):
+                logger.info("Etapa CDC iniciada")
+                with stage("main.cdc"):
+                    cdc_uri = load_cdc_to_gcs(output_name, gcs_uri, output_path, chunk_size = chunk_size)
+                if cdc_uri is not None:
+                    manifest.complete("cdc", cdc_inputs, cdc_uri)
+
+        if bq_table:
+            #=======================
+            #LOAD BIGQUERY
+            #=======================
+            bq_inputs = {
+                "gcs_uri": gcs_uri,
+                "table": bq_table,
+                "strategy": bq_strategy,
+                "hive_partitioned": bool(partition_cols),
+            }
+            if not (resumable and manifest.completed("load_bq", bq_inputs)):
+                logger.info("Etapa Load BigQuery iniciada")
+                with stage("main.load_bq"):
+                    table_id = load_gcs_to_bigquery(
+                        gcs_uri,
+                        bq_table,
+                        file_format = output_format,
+                        strategy = bq_strategy,
+                        hive_partitioned = bool(partition_cols),
+                    )
+                manifest.complete("load_bq", bq_inputs, table_id)
+
+        #el watermark se persiste sólo después de una carga exitosa
+        if incremental or full_refresh:
+            write_watermark(base_output_file, tracker.watermark)
+
+        logger.info("Pipeline  ETL finalizado correctamente")
+
+
+def _transform(
+    mode, input_file, chunk_size, backend, since, use_cache,
+    workers, split_by, compact, quality, tracker, track_watermark = False, rollups = None,
+):
+    """
+    Etapa transform. En modo streaming retorna el iterador perezoso de
+    bloques (se ejecuta junto con la carga). Retorna None si, con watermark,
+    no hay semanas nuevas que cargar.
+    """
+    if mode == "streaming":
+        # ======================
+        # TRANSFORM (por bloques, perezoso: se ejecuta junto con la carga)
+        # ======================
+        logger.info("Etapa transform por bloques iniciada")
+        data = tracker.track(transform_dataset_chunks(
+            input_file, chunk_size, since = since, compact = compact, quality = quality, rollups = rollups
+        ))
+
+        if since:
+            first = next(data, None)
+            if first is None:
+                return None
+            data = itertools.chain([first], data)
+        return data
 
     # ======================
     # TRANSFORM
     # ======================
     logger.info("Etapa transform iniciada")
-    df_transformed = transform_dataset(input_file)
+    with stage("main.transform") as m:
+        data = transform_dataset(
+            input_file,
+            backend = backend,
+            since = since,
+            use_cache = use_cache,
+            workers = workers,
+            split_by = split_by,
+            compact = compact,
+            quality = quality,
+            rollups = rollups,
+        )
+        m["rows_out"] = len(data)
+
+    if since and data.empty:
+        return None
+    if track_watermark:
+        tracker.update(data)
+    return data
+
+
+def _write_local_rollups(rollup_acc, output_dir, output_name) -> None:
+    """
+    Escribe los rollups acumulados en el transform antes de registrar su
+    checkpoint, para que una ejecución reanudada (que omite el transform)
+    pueda cargarlos a GCS. Se escriben también sin archivo local del
+    dataset (--no-local): son unos pocos KB.
+    """
+    if rollup_acc is not None:
+        write_rollups(rollup_acc.tables(), output_dir, output_name)
 
-    # ======================
-    # LOAD LOCAL
-    # ======================
 
-    logger.info("Etapa Load Local iniciada")
-    load_csv(
-        df = df_transformed,
+def _load_local(
+    data, output_format, output_dir, name, partition_cols, row_group_size, streaming = False, compression = None,
+):
+    """
+    Persiste el dataset transformado (DataFrame o bloques) en el formato pedido.
+    """
+    if output_format == "parquet":
+        writer = load_parquet_chunks if streaming else load_parquet
+        return writer(
+            data,
+            output_dir = output_dir,
+            dataset_name = name,
+            partition_cols = partition_cols,
+            row_group_size = row_group_size,
+        )
+
+    writer = load_csv_chunks if streaming else load_csv
+    return writer(
+        data,
         output_dir = output_dir,
-        file_name = f"{base_output_file}.csv"
+        file_name = f"{name}.csv{CSV_COMPRESSIONS.get(compression, '')}",
+        compression = compression,
     )
 
-    #=======================
-    #LOAD GCS
-    #=======================
-    logger.info("Etapa Load GCS iniciada")
-    
-    load_csv_to_gcs(base_output_file)
-    
-    logger.info("Pipeline  ETL finalizado correctamente")
+
+def parse_args(argv = None) -> argparse.Namespace:
+    """
+    Argumentos de línea de comandos del pipeline.
+    """
+    parser = argparse.ArgumentParser(description = "Pipeline ETL Datos Públicos")
+    parser.add_argument(
+        "--mode", choices = MODES, default = "batch",
+        help = "batch: dataset completo en memoria | streaming: por bloques |"
+               " pipelined: por bloques con lectura, transform y carga superpuestas"
+    )
+    parser.add_argument(
+        "--chunk-size", type = int, default = DEFAULT_CHUNK_SIZE,
+        help = "filas por bloque en modo streaming y pipelined"
+    )
+    parser.add_argument(
+        "--queue-size", type = int, default = DEFAULT_QUEUE_SIZE,
+        help = "bloques máximos en cada cola entre etapas (modo pipelined)"
+    )
+    parser.add_argument(
+        "--backend", choices = BACKENDS, default = "pandas",
+        help = "lector del CSV raw en modo batch"
+    )
+    parser.add_argument(
+        "--format", dest = "output_format", choices = OUTPUT_FORMATS, default = "csv",
+        help = "formato del dataset transformado"
+    )
+    parser.add_argument(
+        "--compression", choices = tuple(CSV_COMPRESSIONS),
+        help = "comprime el CSV transformado (local y en GCS)"
+    )
+    parser.add_argument(
+        "--partition-by", dest = "partition_cols", nargs = "+", choices = PARTITION_COLUMNS,
+        help = "columnas de particionado Hive (sólo Parquet)"
+    )
+    parser.add_argument(
+        "--row-group-size", type = int, default = DEFAULT_ROW_GROUP_SIZE,
+        help = "filas por row group (sólo Parquet)"
+    )
+    parser.add_argument(
+        "--incremental", action = "store_true",
+        help = "procesa sólo semanas posteriores al watermark"
+    )
+    parser.add_argument(
+        "--full-refresh", action = "store_true",
+        help = "ignora el watermark y reprocesa todo el histórico"
+    )
+    parser.add_argument(
+        "--lookback-weeks", type = int, default = 0,
+        help = "semanas ya procesadas que se reprocesan en modo incremental"
+    )
+    parser.add_argument(
+        "--upload-workers", type = int, default = 1,
+        help = "threads para la carga paralela por slices a GCS"
+    )
+    parser.add_argument(
+        "--upload-slice-size", type = int, default = DEFAULT_SLICE_SIZE,
+        help = "bytes por slice en la carga paralela a GCS"
+    )
+    parser.add_argument(
+        "--no-local", dest = "keep_local", action = "store_false",
+        help = "sube el CSV directo a GCS sin escribir el archivo local"
+    )
+    parser.add_argument(
+        "--trace-memory", action = "store_true",
+        help = "mide el pico de memoria de Python por etapa (tracemalloc)"
+    )
+    parser.add_argument(
+        "--no-cache", dest = "use_cache", action = "store_false",
+        help = "ignora el caché Arrow del CSV raw y vuelve a parsearlo (modo batch)"
+    )
+    parser.add_argument(
+        "--transform-workers", type = int, default = 1,
+        help = "procesos para el transform paralelo en modo batch (1 = serial)"
+    )
+    parser.add_argument(
+        "--transform-split-by", choices = SPLIT_COLUMNS, default = "ANO_ESTADISTICO",
+        help = "columna por la que se particiona el transform paralelo"
+    )
+    parser.add_argument(
+        "--compact", action = "store_true",
+        help = "dataset transformado con categóricas y enteros pequeños (menos memoria)"
+    )
+    parser.add_argument(
+        "--quality", choices = QUALITY_MODES, default = "off",
+        help = "reglas de calidad del raw: off | quarantine (separa filas inválidas) | fail"
+    )
+    parser.add_argument(
+        "--force", action = "store_true",
+        help = "ignora los checkpoints de corridas anteriores y ejecuta todas las etapas"
+    )
+    parser.add_argument(
+        "--cdc", action = "store_true",
+        help = "publica en GCS el delta (I/U/D) respecto de la versión anterior del snapshot"
+    )
+    parser.add_argument(
+        "--rollups", nargs = "+", choices = tuple(ROLLUPS),
+        help = "tablas agregadas que se calculan en el transform y se cargan junto al dataset"
+    )
+    parser.add_argument(
+        "--bq-table",
+        help = "tabla BigQuery destino (dataset.tabla); sin este argumento no se carga a BigQuery"
+    )
+    parser.add_argument(
+        "--bq-strategy", choices = BQ_STRATEGIES, default = "merge",
+        help = "merge: upsert por llave natural | append: agrega las filas"
+    )
+    parser.add_argument(
+        "--log-format", choices = LOG_FORMATS,
+        help = "text | json (Cloud Logging); por defecto ETL_LOG_FORMAT o text"
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    options = vars(parse_args())
+    configure_logging(options.pop("log_format"))
     try:
-        main()
+        main(**options)
     except Exception:
         logger.error("Ejecucion del pipeline fallida")
         raise
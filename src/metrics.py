@@ -0,0 +1,322 @@
+"""
+metrics.py
+==========
+
+Instrumentación de etapas del pipeline ETL.
+
+Cada etapa registra tiempo de pared, tiempo de CPU, memoria (pico de RSS y,
+si tracemalloc está activo, el pico de memoria asignada por Python), filas
+de entrada/salida y bytes escritos. Al final de cada ejecución los registros
+se agregan como JSON lines a `data/metrics/pipeline_metrics.jsonl`, con una
+línea por etapa más un resumen de la ejecución, de modo que distintas
+corridas puedan compararse.
+
+Uso:
+    with stage("main.transform") as m:
+        df = transform_dataset(...)
+        m["rows_out"] = len(df)
+
+    @instrumented("load_csv")
+    def load_csv(df, ...): ...
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.logger import add_context_provider, setup_logger
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Directorio y archivo donde se acumulan las métricas de cada ejecución
+METRICS_DIR = BASE_DIR / "data" / "metrics"
+METRICS_FILE = "pipeline_metrics.jsonl"
+
+_state = threading.local()
+_run = {"run_id": None, "started_at": None, "records": []}
+_run_lock = threading.Lock()
+
+
+#==================
+#Memoria
+#==================
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb() -> float:
+    """
+    Memoria residente actual del proceso en MB (0 si no está disponible).
+    """
+    return _proc_status_mb("VmRSS") or 0.0
+
+
+def peak_rss_mb() -> float:
+    """
+    Pico de memoria residente del proceso en MB. Usa VmHWM de /proc y,
+    fuera de Linux, ru_maxrss (0 si tampoco está disponible, p. ej. en
+    Windows, donde no existe el módulo `resource`).
+    """
+    peak = _proc_status_mb("VmHWM")
+    if peak is None:
+        try:
+            import resource
+        except ImportError:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return peak
+
+
+#==================
+#Ejecución
+#==================
+
+def start_run(run_id: Optional[str] = None) -> str:
+    """
+    Inicia una nueva ejecución: descarta registros previos y fija su run_id.
+    """
+    with _run_lock:
+        _run["run_id"] = run_id or uuid.uuid4().hex[:12]
+        _run["started_at"] = datetime.now(UTC).isoformat(timespec = "seconds")
+        _run["records"] = []
+    return _run["run_id"]
+
+
+def merge_records(worker_records: list) -> None:
+    """
+    Agrega a la ejecución actual los registros de etapas medidas en otro
+    proceso (p. ej. los workers spawn de `src.runner`), con el run_id actual.
+    """
+    with _run_lock:
+        _run["records"].extend({**record, "run_id": _run["run_id"]} for record in worker_records)
+
+
+def current_run_id() -> Optional[str]:
+    return _run["run_id"]
+
+
+def records() -> list:
+    """
+    Registros de etapas finalizadas en la ejecución actual.
+    """
+    with _run_lock:
+        return list(_run["records"])
+
+
+def _stack() -> list:
+    if not hasattr(_state, "stack"):
+        _state.stack = []
+    return _state.stack
+
+
+def _log_context() -> dict:
+    """
+    run_id y etapa activa del thread actual, para los registros de log.
+    """
+    stack = _stack()
+    return {"run_id": _run["run_id"], "stage": stack[-1]["stage"] if stack else None}
+
+
+add_context_provider(_log_context)
+
+
+def annotate(**fields) -> None:
+    """
+    Agrega campos (rows_out, bytes_written, ...) a la etapa activa más
+    interna del thread actual. Sin etapa activa no hace nada.
+    """
+    stack = _stack()
+    if stack:
+        stack[-1].update(fields)
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None) -> Iterator[dict]:
+    """
+    Mide una etapa. El dict entregado puede completarse con `rows_out`,
+    `bytes_written` u otros campos antes de salir del bloque.
+    """
+    stack = _stack()
+    record = {
+        "run_id": _run["run_id"],
+        "stage": name,
+        "parent": stack[-1]["stage"] if stack else None,
+        "rows_in": rows_in,
+        "rows_out": None,
+        "bytes_written": None,
+    }
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["_tm_peak"] = max(stack[-1].get("_tm_peak", 0), peak)
+        tracemalloc.reset_peak()
+        record["_tm_start"] = record["_tm_peak"] = current
+
+    rss_start = rss_mb()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    stack.append(record)
+
+    status = "ok"
+    try:
+        yield record
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        stack.pop()
+        record["wall_s"] = round(time.perf_counter() - wall_start, 6)
+        record["cpu_s"] = round(time.process_time() - cpu_start, 6)
+        record["rss_delta_mb"] = round(rss_mb() - rss_start, 2)
+        record["peak_rss_mb"] = round(peak_rss_mb(), 2)
+        record["status"] = status
+
+        if tracing and tracemalloc.is_tracing():
+            peak = max(record.pop("_tm_peak"), tracemalloc.get_traced_memory()[1])
+            record["tracemalloc_peak_mb"] = round((peak - record.pop("_tm_start")) / 1024**2, 3)
+            if stack:
+                stack[-1]["_tm_peak"] = max(stack[-1].get("_tm_peak", 0), peak)
+        record.pop("_tm_start", None)
+        record.pop("_tm_peak", None)
+
+        with _run_lock:
+            _run["records"].append(record)
+
+        logger.info(
+            f"Métricas etapa {name} | {status} | wall = {record['wall_s']:.3f} s |"
+            f" cpu = {record['cpu_s']:.3f} s | filas = {record['rows_in']} -> {record['rows_out']} |"
+            f" bytes = {record['bytes_written']}",
+            extra = {
+                key: record[key]
+                for key in ("stage", "parent", "status", "wall_s", "cpu_s", "rows_in", "rows_out", "bytes_written")
+            },
+        )
+
+
+def path_size(path) -> Optional[int]:
+    """
+    Bytes de un archivo o de todos los archivos de un directorio.
+    Retorna None si `path` no es un Path existente.
+    """
+    if isinstance(path, Path):
+        if path.is_file():
+            return path.stat().st_size
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return None
+
+
+def _rows_of(value) -> Optional[int]:
+    if hasattr(value, "shape") and hasattr(value, "columns"):
+        return len(value)
+    return None
+
+
+def instrumented(name: str):
+    """
+    Decorador que mide la función como etapa `name`. Infiere `rows_in` del
+    primer argumento DataFrame, `rows_out` de un DataFrame retornado y
+    `bytes_written` de un Path retornado.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = next(
+                (_rows_of(v) for v in (*args, *kwargs.values()) if _rows_of(v) is not None),
+                None,
+            )
+
+            with stage(name, rows_in = rows_in) as record:
+                result = func(*args, **kwargs)
+                if record["bytes_written"] is None:
+                    record["bytes_written"] = path_size(result)
+                if record["rows_out"] is None:
+                    record["rows_out"] = _rows_of(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def write_metrics(path: Optional[Path] = None, status: str = "ok") -> Path:
+    """
+    Agrega las métricas de la ejecución actual como JSON lines: una línea
+    por etapa (`type = stage`) y una línea de resumen (`type = run_summary`).
+    """
+    path = path or METRICS_DIR / METRICS_FILE
+    path.parent.mkdir(parents = True, exist_ok = True)
+
+    stage_records = records()
+    summary = {
+        "type": "run_summary",
+        "run_id": _run["run_id"],
+        "started_at": _run["started_at"],
+        "finished_at": datetime.now(UTC).isoformat(timespec = "seconds"),
+        "status": status,
+        "stages": len(stage_records),
+        "wall_s": round(sum(r["wall_s"] for r in stage_records if r["parent"] is None), 6),
+        "cpu_s": round(sum(r["cpu_s"] for r in stage_records if r["parent"] is None), 6),
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in stage_records), default = None),
+        "bytes_written": sum(r["bytes_written"] or 0 for r in stage_records if r["parent"] is None),
+    }
+
+    with open(path, "a", encoding = "utf-8") as f:
+        for record in stage_records:
+            f.write(json.dumps({"type": "stage", **record}, default = str) + "\n")
+        f.write(json.dumps(summary, default = str) + "\n")
+
+    logger.info(f"Métricas de la ejecución {summary['run_id']} escritas en {path}")
+    return path
+
+
+@contextmanager
+def run_metrics(
+    run_id: Optional[str] = None,
+    path: Optional[Path] = None,
+    trace_memory: bool = False,
+) -> Iterator[str]:
+    """
+    Enmarca una ejecución completa: la inicia y, al salir (con éxito o con
+    error), escribe sus métricas con el estado correspondiente. Un error al
+    escribirlas sólo se registra como advertencia, para no ocultar el error
+    de la ejecución ni hacer fallar una ejecución exitosa.
+
+    Con `trace_memory` se activa tracemalloc durante la ejecución para
+    registrar el pico de memoria de Python por etapa (tiene costo).
+    """
+    run_id = start_run(run_id)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    status = "error"
+    try:
+        yield run_id
+        status = "ok"
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            write_metrics(path, status = status)
+        except OSError as e:
+            logger.warning(f"No se pudieron escribir las métricas de la ejecución {run_id} | {e}")
@@ -0,0 +1,280 @@
+"""
+parse_cache.py
+==============
+
+Caché del CSV raw ya parseado, en formato Arrow IPC (Feather v2).
+
+El archivo raw no cambia entre actualizaciones semanales, pero `extract_csv`
+lo vuelve a parsear en cada ejecución. Tras la primera lectura validada, la
+tabla tipada se guarda en data/cache y las ejecuciones siguientes la leen
+con memory-map, de modo que el inicio del transform deja de depender de la
+velocidad del parser CSV. La lectura de la tabla Arrow no copia datos, pero
+su conversión a DataFrame (`to_pandas`) sí los copia a memoria de pandas:
+lo que se ahorra es el parseo, no la copia.
+
+Cada entrada se identifica por el archivo de origen, el backend de lectura,
+la versión del parseo (`parser_version`: esquema y versiones de los parsers)
+y el CRC32C de su contenido, y guarda además su tamaño y mtime:
+- si tamaño y mtime coinciden con una entrada, se usa sin recalcular el hash;
+- si sólo coincide el tamaño (p. ej. el archivo se volvió a descargar igual),
+  se calcula el CRC32C y se reutiliza la entrada si el contenido es el mismo;
+- en otro caso la entrada está obsoleta y se reemplaza en la siguiente lectura.
+
+Al guardar se eliminan las versiones obsoletas del mismo origen (de otro
+contenido o de otra versión del parseo) y, si el
+caché supera `max_bytes`, las entradas menos usadas recientemente.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from src.logger import setup_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Directorio donde se guardan las tablas parseadas
+CACHE_DIR = BASE_DIR / "data" / "cache"
+
+# Tamaño máximo del caché en bytes (sólo cuentan los archivos .arrow)
+DEFAULT_MAX_CACHE_BYTES = 4 * 1024**3
+
+# Tamaño de bloque para calcular el CRC32C del archivo raw
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Versión del formato de las entradas; se incrementa cuando cambia la forma
+# de parsear o validar el raw en `src.extract` sin que cambie su esquema
+CACHE_VERSION = 1
+
+
+def source_crc32c(path: Path) -> str:
+    """
+    CRC32C (hex) del contenido de `path`, leído por bloques.
+    """
+    import google_crc32c
+
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            checksum.update(block)
+    return checksum.digest().hex()
+
+
+def parser_version() -> str:
+    """
+    Versión del parseo que produjo una entrada: CACHE_VERSION más un hash
+    del esquema (COLUMN_DTYPES) y de las versiones de pandas y pyarrow.
+    Si cualquiera cambia, las entradas anteriores dejan de coincidir y el
+    raw se vuelve a parsear en lugar de entregar tipos desactualizados.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    from src.extract import COLUMN_DTYPES
+
+    schema = json.dumps([COLUMN_DTYPES, pd.__version__, pa.__version__], sort_keys = True)
+    return f"v{CACHE_VERSION}-{hashlib.sha1(schema.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _source_prefix(source: Path, backend: str) -> str:
+    """
+    Prefijo común a todas las entradas de `source` y `backend`: el nombre
+    más un hash de la ruta resuelta, para que archivos homónimos de
+    distintos directorios no compartan (ni expulsen) entradas.
+    """
+    path_hash = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:12]
+    return f"{source.stem}.{path_hash}.{backend}."
+
+
+def _entry_prefix(source: Path, backend: str) -> str:
+    """
+    Prefijo de las entradas vigentes de `source`: el de `_source_prefix`
+    más la versión del parseo.
+    """
+    return f"{_source_prefix(source, backend)}{parser_version()}."
+
+
+def _entry_paths(prefix: str, crc: str):
+    data = CACHE_DIR / f"{prefix}{crc}.arrow"
+    return data, data.with_suffix(".json")
+
+
+def _entries(prefix: str):
+    """
+    Metadatos de las entradas existentes para un origen y backend.
+    """
+    if not CACHE_DIR.exists():
+        return []
+
+    entries = []
+    for meta_path in CACHE_DIR.glob(f"{prefix}*.json"):
+        try:
+            meta = json.loads(meta_path.read_text(encoding = "utf-8"))
+        except (OSError, ValueError):
+            continue
+        entries.append(meta)
+    return entries
+
+
+def _remove(data_path: Path) -> None:
+    for path in (data_path, data_path.with_suffix(".json")):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _find_entry(source: Path, backend: str) -> Optional[dict]:
+    """
+    Busca una entrada vigente para el estado actual de `source`.
+    """
+    stat = source.stat()
+    candidates = [e for e in _entries(_entry_prefix(source, backend)) if e["size"] == stat.st_size]
+    if not candidates:
+        return None
+
+    for entry in candidates:
+        if entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry
+
+    # mismo tamaño pero distinto mtime: se decide por el contenido
+    crc = source_crc32c(source)
+    for entry in candidates:
+        if entry["crc32c"] == crc:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            _, meta_path = _entry_paths(_entry_prefix(source, backend), crc)
+            _write_json(meta_path, entry)
+            return entry
+    return None
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent = 2), encoding = "utf-8")
+    os.replace(tmp, path)
+
+
+def load(source: Path, backend: str) -> Optional[pd.DataFrame]:
+    """
+    Retorna el DataFrame cacheado para `source` leído con `backend`, o None
+    si no hay una entrada vigente. Una entrada ilegible se descarta.
+    """
+    import pyarrow as pa
+
+    entry = _find_entry(source, backend)
+    if entry is None:
+        return None
+
+    data_path, _ = _entry_paths(_entry_prefix(source, backend), entry["crc32c"])
+    try:
+        with pa.memory_map(str(data_path), "r") as mm:
+            table = pa.ipc.open_file(mm).read_all()
+            df = table.to_pandas()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Entrada de caché inválida, se descarta | {data_path} | {e}")
+        _remove(data_path)
+        return None
+
+    # el mtime de la entrada registra su último uso (orden de expulsión)
+    os.utime(data_path)
+
+    logger.info(f"Caché de parseo utilizado | {data_path.name} | Filas = {len(df)}")
+    return df
+
+
+def store(source: Path, backend: str, df: pd.DataFrame, max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> Path:
+    """
+    Guarda `df` (ya validado) como entrada de caché de `source`.
+
+    La escritura es atómica (archivo temporal + rename) y sin compresión,
+    para que la lectura con memory-map no requiera descomprimir. Luego elimina
+    las versiones obsoletas del mismo origen y aplica el límite de tamaño.
+    """
+    import pyarrow as pa
+
+    CACHE_DIR.mkdir(parents = True, exist_ok = True)
+    stat = source.stat()
+    crc = source_crc32c(source)
+    prefix = _entry_prefix(source, backend)
+    data_path, meta_path = _entry_paths(prefix, crc)
+
+    table = pa.Table.from_pandas(df, preserve_index = False)
+    tmp = data_path.with_name(data_path.name + ".tmp")
+    try:
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, data_path)
+    except BaseException:
+        tmp.unlink(missing_ok = True)
+        raise
+
+    _write_json(meta_path, {
+        "source": source.name,
+        "backend": backend,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "crc32c": crc,
+        "rows": len(df),
+        "created_at": datetime.now(UTC).isoformat(timespec = "seconds"),
+    })
+
+    for obsolete in CACHE_DIR.glob(f"{_source_prefix(source, backend)}*.json"):
+        if obsolete != meta_path:
+            logger.info(f"Versión obsoleta eliminada del caché | {obsolete.stem}")
+            _remove(obsolete.with_suffix(".arrow"))
+
+    evict(max_bytes, keep = data_path)
+
+    logger.info(f"Caché de parseo guardado | {data_path.name} | {data_path.stat().st_size} bytes")
+    return data_path
+
+
+def evict(max_bytes: int = DEFAULT_MAX_CACHE_BYTES, keep: Optional[Path] = None) -> int:
+    """
+    Elimina las entradas menos usadas recientemente hasta que el caché
+    ocupe a lo más `max_bytes`. `keep` nunca se elimina.
+
+    Retorna la cantidad de entradas eliminadas.
+    """
+    if not CACHE_DIR.exists():
+        return 0
+
+    files = sorted(CACHE_DIR.glob("*.arrow"), key = lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+
+    removed = 0
+    for path in files:
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        total -= path.stat().st_size
+        _remove(path)
+        removed += 1
+        logger.info(f"Entrada expulsada del caché por tamaño | {path.name}")
+    return removed
+
+
+def clear() -> int:
+    """
+    Elimina todas las entradas del caché. Retorna la cantidad eliminada.
+    """
+    if not CACHE_DIR.exists():
+        return 0
+
+    files = list(CACHE_DIR.glob("*.arrow"))
+    for path in files:
+        _remove(path)
+    return len(files)
@@ -0,0 +1,326 @@
+"""
+pipeline.py
+===========
+
+Modo pipelined del ETL: lectura, transform, escritura y carga a GCS se
+ejecutan a la vez sobre bloques del archivo raw, en lugar de una etapa
+después de la otra.
+
+    reader ──▶ [cola] ──▶ transform ──▶ [cola] ──▶ writer ──▶ [cola] ──▶ uploader
+    (raw por bloques)     (transform_chunk)        (CSV local +           (upload resumable
+                                                    serialización)          a GCS)
+
+Cada etapa corre en su propio thread y se comunica con la siguiente por una
+cola acotada (`queue_size` bloques). Si una etapa es más lenta, las colas se
+llenan y las anteriores se bloquean (backpressure): a lo sumo hay
+~3 * queue_size + 4 bloques en memoria, sin importar el tamaño del archivo.
+El tiempo total tiende al de la etapa más lenta y no a la suma de todas:
+mientras se sube un bloque, los siguientes ya se están leyendo y
+transformando. El parseo CSV, las operaciones vectorizadas de pandas y la
+subida por red liberan el GIL la mayor parte del tiempo, por lo que bastan
+threads.
+
+Si cualquier etapa falla, las demás se detienen, el upload resumable se
+cancela (no queda un objeto parcial en el bucket), la escritura local se
+interrumpe y su temporal `.part` se elimina sin tocar el CSV local anterior
+(ver `src.load.write_csv_payloads`), y se relanza el error original. Si el
+CSV local ya se había completado cuando falla la subida, queda escrito, igual
+que en el modo batch, donde `load_csv` termina antes de `load_csv_to_gcs`.
+
+El CSV local se escribe con `write_csv_payloads`, igual que `load_csv`:
+rename atómico tras fsync y CRC32C registrado para `written_crc32c`.
+
+El CSV local y el objeto en GCS son idénticos byte a byte a los del modo
+batch (`load_csv` + `load_csv_to_gcs`).
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from src.extract import DEFAULT_CHUNK_SIZE, extract_csv_chunks
+from src.gcs_client import get_bucket
+from src.load import write_csv_payloads
+from src.load_gcs import BUCKET_NAME, GCS_LAYER, RESUMABLE_CHUNK_SIZE, UPLOAD_STATS, _execution_date
+from src.logger import setup_logger
+from src.rollups import RollupAccumulator
+from src.transform import transform_chunk
+from src.watermark import Watermark, WatermarkTracker, filter_after_watermark
+
+logger = setup_logger()
+
+# Bloques máximos en cada cola entre etapas
+DEFAULT_QUEUE_SIZE = 2
+
+# Intervalo (s) con que una etapa bloqueada revisa si otra etapa falló
+POLL_INTERVAL_S = 0.1
+
+STAGES = ("reader", "transform", "writer", "uploader")
+
+# Marca de fin de datos entre etapas
+_END = object()
+
+
+class _Aborted(Exception):
+    """
+    Otra etapa falló; la etapa actual se detiene sin reportar error propio.
+    """
+
+
+@dataclass(frozen = True)
+class PipelineResult:
+    """
+    Resultado de una ejecución pipelined.
+
+    - output_path: CSV local (None si no se conservó copia local).
+    - gcs_uri: objeto cargado en GCS.
+    - rows: filas cargadas.
+    - busy_s: segundos de trabajo efectivo de cada etapa (sin esperas en
+      las colas); el tiempo total se acerca al mayor de ellos.
+    - max_in_flight: mayor cantidad de bloques leídos y aún no subidos.
+    """
+    output_path: Optional[Path]
+    gcs_uri: str
+    rows: int
+    wall_s: float
+    busy_s: dict = field(default_factory = dict)
+    max_in_flight: int = 0
+
+
+class _Pipeline:
+    """
+    Estado compartido entre los threads de las etapas.
+    """
+
+    def __init__(self, queue_size: int):
+        self.raw = queue.Queue(maxsize = queue_size)
+        self.transformed = queue.Queue(maxsize = queue_size)
+        self.payloads = queue.Queue(maxsize = queue_size)
+        self.stop = threading.Event()
+        self.errors = []
+        self.busy = dict.fromkeys(STAGES, 0.0)
+        self.read = 0
+        self.uploaded = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def put(self, q: queue.Queue, item) -> None:
+        while True:
+            if self.stop.is_set():
+                raise _Aborted
+            try:
+                q.put(item, timeout = POLL_INTERVAL_S)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, q: queue.Queue):
+        while True:
+            if self.stop.is_set():
+                raise _Aborted
+            try:
+                return q.get(timeout = POLL_INTERVAL_S)
+            except queue.Empty:
+                continue
+
+    def count(self, read: int = 0, uploaded: int = 0) -> None:
+        with self._lock:
+            self.read += read
+            self.uploaded += uploaded
+            self.max_in_flight = max(self.max_in_flight, self.read - self.uploaded)
+
+    def thread(self, name: str, target) -> threading.Thread:
+        def run():
+            try:
+                target()
+            except _Aborted:
+                pass
+            except BaseException as e:
+                logger.error(f"Etapa {name} del pipeline fallida: {e}")
+                self.errors.append(e)
+                self.stop.set()
+
+        return threading.Thread(target = run, name = f"pipeline-{name}", daemon = True)
+
+
+def run_pipelined(
+    file_name: str,
+    base_file_name: str,
+    output_dir: Optional[Path] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    since: Optional[Watermark] = None,
+    compact: bool = False,
+    quality: str = "off",
+    tracker: Optional[WatermarkTracker] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    rollups: Optional[RollupAccumulator] = None,
+) -> Optional[PipelineResult]:
+    """
+    Transforma `file_name` por bloques y lo carga a GCS como
+    `<base_file_name>_<fecha>.csv`, con todas las etapas en paralelo.
+
+    Parámetros:
+    - output_dir: si se indica, también se escribe `<base_file_name>.csv`
+      en ese directorio (si no, la carga es directa, sin archivo local).
+    - chunk_size: filas por bloque.
+    - since: watermark (año, semana); sólo se cargan filas posteriores.
+    - compact, quality: igual que en `transform_dataset_chunks`.
+    - tracker: acumula el watermark de las filas transformadas.
+    - queue_size: bloques máximos en cada cola entre etapas.
+    - rollups: acumula las tablas agregadas en el thread del transform.
+
+    Retorna None si, con `since`, no hay filas nuevas (no se crea ningún
+    archivo ni objeto).
+
+    Excepciones:
+    - Las de `extract_csv_chunks` (archivo inexistente, esquema inválido)
+      se levantan antes de iniciar los threads.
+    - ValueError si el archivo no tiene filas que cargar.
+    """
+    if queue_size <= 0:
+        raise ValueError("queue_size debe ser mayor a 0")
+
+    chunks = extract_csv_chunks(file_name, chunk_size, quality = quality)
+    fecha_carga = date.today()
+    gcs_object_path = f"{GCS_LAYER}/{base_file_name}_{_execution_date()}.csv"
+    output_path = Path(output_dir) / f"{base_file_name}.csv" if output_dir is not None else None
+    state = _Pipeline(queue_size)
+    result = {"rows": 0}
+
+    logger.info(
+        f"Pipeline por etapas iniciado | {file_name} -> gs://{BUCKET_NAME}/{gcs_object_path} |"
+        f" chunk_size = {chunk_size} | queue_size = {queue_size}"
+    )
+
+    def reader():
+        try:
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, _END)
+                state.busy["reader"] += time.perf_counter() - start
+                if chunk is _END:
+                    break
+                state.count(read = 1)
+                state.put(state.raw, chunk)
+        finally:
+            chunks.close()
+        state.put(state.raw, _END)
+
+    def transform():
+        while (chunk := state.get(state.raw)) is not _END:
+            start = time.perf_counter()
+            if since is not None:
+                chunk = filter_after_watermark(chunk, since).copy()
+            if not chunk.empty:
+                chunk = transform_chunk(chunk, fecha_carga, compact)
+                if tracker is not None:
+                    tracker.update(chunk)
+                if rollups is not None:
+                    rollups.update(chunk)
+            state.busy["transform"] += time.perf_counter() - start
+
+            if chunk.empty:
+                #bloque sin filas posteriores al watermark: no avanza a la carga
+                state.count(uploaded = 1)
+                continue
+            state.put(state.transformed, chunk)
+        state.put(state.transformed, _END)
+
+    def writer():
+        #el tiempo ocupado excluye las esperas en las colas; incluye la escritura local
+        start = time.perf_counter()
+        waited = 0.0
+
+        def wait(operation, *args):
+            nonlocal waited
+            begin = time.perf_counter()
+            try:
+                return operation(*args)
+            finally:
+                waited += time.perf_counter() - begin
+
+        def payloads():
+            header = True
+            while (chunk := wait(state.get, state.transformed)) is not _END:
+                payload = chunk.to_csv(index = False, header = header).encode("utf-8")
+                header = False
+                result["rows"] += len(chunk)
+                wait(state.put, state.payloads, payload)
+                yield payload, len(chunk)
+
+        try:
+            if output_path is None:
+                for _ in payloads():
+                    pass
+            else:
+                #sin filas no se crea el archivo local (ver el retorno None con `since`)
+                blocks = payloads()
+                first = next(blocks, None)
+                if first is not None:
+                    write_csv_payloads(itertools.chain([first], blocks), output_path)
+        finally:
+            state.busy["writer"] += time.perf_counter() - start - waited
+        state.put(state.payloads, _END)
+
+    def uploader():
+        blob_writer = None
+        try:
+            while (payload := state.get(state.payloads)) is not _END:
+                start = time.perf_counter()
+                if blob_writer is None:
+                    blob = get_bucket(BUCKET_NAME).blob(gcs_object_path)
+                    blob_writer = blob.open("wb", chunk_size = RESUMABLE_CHUNK_SIZE, ignore_flush = True)
+                blob_writer.write(payload)
+                state.busy["uploader"] += time.perf_counter() - start
+                state.count(uploaded = 1)
+
+            if blob_writer is not None:
+                start = time.perf_counter()
+                blob_writer.close()
+                state.busy["uploader"] += time.perf_counter() - start
+        except BaseException:
+            #se cancela el upload resumable para no finalizar un objeto parcial
+            if blob_writer is not None:
+                blob_writer.terminate()
+            raise
+
+    start = time.perf_counter()
+    threads = [state.thread(name, target) for name, target in zip(STAGES, (reader, transform, writer, uploader))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - start
+
+    if state.errors:
+        raise state.errors[0]
+
+    rows = result["rows"]
+    if rows == 0:
+        if since is not None:
+            return None
+        raise ValueError("No se recibieron filas para cargar")
+
+    UPLOAD_STATS["uploaded"] += 1
+    busy = {name: round(seconds, 4) for name, seconds in state.busy.items()}
+    logger.info(
+        f"Pipeline por etapas completado | gs://{BUCKET_NAME}/{gcs_object_path} | Filas: {rows} |"
+        f" {wall_s:.2f} s | ocupación por etapa (s): {busy} | bloques en vuelo (máx): {state.max_in_flight}"
+    )
+
+    return PipelineResult(
+        output_path = output_path,
+        gcs_uri = f"gs://{BUCKET_NAME}/{gcs_object_path}",
+        rows = rows,
+        wall_s = round(wall_s, 4),
+        busy_s = busy,
+        max_in_flight = state.max_in_flight,
+    )
@@ -0,0 +1,360 @@
+"""
+quality.py
+==========
+
+Reglas de calidad de datos del archivo raw, evaluadas en la etapa extract.
+
+Cada regla es una expresión vectorizada sobre columnas completas que marca
+las filas válidas; todas las reglas se evalúan en una sola pasada sobre el
+DataFrame (o sobre cada bloque en modo streaming), sin recorrer filas en
+Python. Por cada regla se cuentan las violaciones y se guardan filas de
+muestra, y las filas que violan alguna regla se escriben en un archivo de
+cuarentena con la lista de reglas incumplidas.
+
+Modos (`QUALITY_MODES`):
+- off: sin validación (comportamiento original).
+- quarantine: las filas inválidas se separan a cuarentena y el pipeline
+  continúa con las válidas.
+- fail: igual que quarantine, pero se levanta ValueError si hay filas
+  inválidas.
+
+Salidas en data/quality:
+- <archivo>_quality.json: conteos y muestras por regla.
+- <archivo>_quarantine.csv: filas inválidas más la columna REGLAS_INCUMPLIDAS
+  (sólo si hubo filas inválidas).
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Sequence
+
+from src.logger import setup_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Directorio de reportes y archivos de cuarentena
+QUALITY_DIR = BASE_DIR / "data" / "quality"
+
+QUALITY_MODES = ("off", "quarantine", "fail")
+
+# Filas de muestra que se guardan por regla
+DEFAULT_SAMPLE_SIZE = 5
+
+# Columna agregada a las filas en cuarentena
+RULES_COLUMN = "REGLAS_INCUMPLIDAS"
+
+NUMERIC_COLUMNS = ("ANO_ESTADISTICO", "SEMANA_ESTADISTICA", "SEXO", "POBLACION", "MUERTES_OBS")
+
+
+@dataclass(frozen = True)
+class Rule:
+    """
+    Regla de calidad: `check` recibe el DataFrame y retorna una Serie
+    booleana alineada con sus filas, True para las filas válidas.
+    """
+    name: str
+    description: str
+    check: Callable[[pd.DataFrame], pd.Series]
+
+
+#==================
+#Expresiones
+#==================
+
+def _num(df: pd.DataFrame, column: str) -> pd.Series:
+    """
+    Columna como número; los valores no numéricos quedan nulos.
+    """
+    import pandas as pd
+
+    values = df[column]
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    return pd.to_numeric(values, errors = "coerce")
+
+
+def _null_or(df: pd.DataFrame, column: str, valid: pd.Series) -> pd.Series:
+    # los nulos se reportan sólo en `campos_obligatorios`
+    return df[column].isna() | valid
+
+
+def _required(df: pd.DataFrame) -> pd.Series:
+    from src.extract import COLUMN_DTYPES
+
+    return df[list(COLUMN_DTYPES)].notna().all(axis = 1)
+
+
+def _numeric_types(df: pd.DataFrame) -> pd.Series:
+    """
+    Valores enteros y dentro del rango del tipo de su columna en
+    COLUMN_DTYPES (p. ej. int8 para SEMANA_ESTADISTICA), para que la
+    conversión a INTEGER_DTYPES después del filtro no falle con 3.5 o con
+    un año fuera de int16.
+    """
+    import numpy as np
+    import pandas as pd
+    from src.extract import COLUMN_DTYPES
+
+    valid = pd.Series(True, index = df.index)
+    for column in NUMERIC_COLUMNS:
+        values = _num(df, column)
+        bounds = np.iinfo(COLUMN_DTYPES[column])
+        valid &= df[column].isna() | ((values % 1 == 0) & values.between(bounds.min, bounds.max))
+    return valid
+
+
+def _parseable(etiqueta) -> bool:
+    from src.transform import parse_rango
+
+    try:
+        return parse_rango(etiqueta)[0] is not None
+    except ValueError:
+        return False
+
+
+def _grupo_edad_parseable(df: pd.DataFrame) -> pd.Series:
+    """
+    Evalúa `parse_rango` una vez por etiqueta distinta y propaga el
+    resultado a las filas con los códigos de la factorización.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, etiquetas = pd.factorize(df["GRUPO_EDAD"])
+    parseables = np.array([_parseable(etiqueta) for etiqueta in etiquetas] + [True], dtype = bool)
+    # codes == -1 (nulo) toma el último elemento (True)
+    return pd.Series(parseables[codes], index = df.index)
+
+
+def _sexo_conocido(df: pd.DataFrame) -> pd.Series:
+    from src.transform import SEXO_MAP
+
+    return _null_or(df, "SEXO", _num(df, "SEXO").isin(list(SEXO_MAP)))
+
+
+RULES = (
+    Rule(
+        "campos_obligatorios", "todas las columnas del esquema tienen valor",
+        _required,
+    ),
+    Rule(
+        "tipos_numericos", "año, semana, sexo, población y muertes son enteros dentro del rango de su tipo",
+        _numeric_types,
+    ),
+    Rule(
+        "ano_valido", "ANO_ESTADISTICO >= 1900",
+        lambda df: _null_or(df, "ANO_ESTADISTICO", _num(df, "ANO_ESTADISTICO") >= 1900),
+    ),
+    Rule(
+        "semana_rango", "SEMANA_ESTADISTICA entre 1 y 53",
+        lambda df: _null_or(df, "SEMANA_ESTADISTICA", _num(df, "SEMANA_ESTADISTICA").between(1, 53)),
+    ),
+    Rule(
+        "sexo_conocido", "SEXO es un código conocido (1 = M, 2 = F)",
+        _sexo_conocido,
+    ),
+    Rule(
+        "grupo_edad_valido", "GRUPO_EDAD tiene la forma 'N a M' o 'N +'",
+        _grupo_edad_parseable,
+    ),
+    Rule(
+        "poblacion_no_negativa", "POBLACION >= 0",
+        lambda df: _null_or(df, "POBLACION", _num(df, "POBLACION") >= 0),
+    ),
+    Rule(
+        "muertes_no_negativas", "MUERTES_OBS >= 0",
+        lambda df: _null_or(df, "MUERTES_OBS", _num(df, "MUERTES_OBS") >= 0),
+    ),
+    Rule(
+        "muertes_menor_o_igual_poblacion", "MUERTES_OBS <= POBLACION",
+        lambda df: ~(_num(df, "MUERTES_OBS") > _num(df, "POBLACION")),
+    ),
+)
+
+
+def _numeric_valid(valid: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte a número las columnas numéricas que quedaron como texto por
+    culpa de las filas en cuarentena. Las filas válidas ya pasaron
+    `tipos_numericos` y `campos_obligatorios`, por lo que la conversión no
+    genera nulos ni decimales y el transform recibe los mismos tipos que con un archivo
+    limpio (p. ej. SEXO 1/2 y no '1'/'2').
+    """
+    import pandas as pd
+
+    columns = [
+        column for column in NUMERIC_COLUMNS
+        if column in valid.columns and not pd.api.types.is_numeric_dtype(valid[column])
+    ]
+    if not columns:
+        return valid
+    return valid.assign(**{column: pd.to_numeric(valid[column]) for column in columns})
+
+
+#==================
+#Evaluación
+#==================
+
+class QualityGate:
+    """
+    Evalúa las reglas sobre uno o más DataFrames de un mismo archivo
+    (el dataset completo o sus bloques), acumulando conteos y muestras,
+    y escribiendo las filas inválidas en el archivo de cuarentena.
+
+    Uso:
+        gate = QualityGate("def_semana_epidemiologica.csv", "quarantine")
+        for chunk in chunks:
+            yield gate.filter(chunk)
+        gate.close()
+    """
+
+    def __init__(
+        self,
+        source: str,
+        mode: str = "quarantine",
+        rules: Sequence[Rule] = RULES,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+    ):
+        if mode not in QUALITY_MODES or mode == "off":
+            raise ValueError(f"Modo de calidad inválido: {mode}. Opciones: {QUALITY_MODES[1:]}")
+
+        self.source = source
+        self.mode = mode
+        self.rules = tuple(rules)
+        self.sample_size = sample_size
+
+        self.rows = 0
+        self.rows_quarantined = 0
+        self.violations = {rule.name: 0 for rule in self.rules}
+        self.samples = {rule.name: [] for rule in self.rules}
+
+        stem = Path(source).stem
+        self.report_path = QUALITY_DIR / f"{stem}_quality.json"
+        self.quarantine_path = QUALITY_DIR / f"{stem}_quarantine.csv"
+
+        # se descarta la cuarentena de una ejecución anterior
+        self.quarantine_path.unlink(missing_ok = True)
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Retorna una matriz booleana (filas x reglas) con True donde la fila
+        viola la regla.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {rule.name: ~rule.check(df).to_numpy(dtype = bool) for rule in self.rules},
+            index = df.index,
+        )
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Evalúa las reglas sobre `df`, registra violaciones y muestras,
+        escribe las filas inválidas en cuarentena y retorna las válidas.
+
+        En modo 'fail' levanta ValueError si `df` contiene filas inválidas
+        (después de escribir el reporte y la cuarentena).
+        """
+        violations = self.evaluate(df)
+        invalid = violations.to_numpy().any(axis = 1)
+
+        self.rows += len(df)
+        counts = violations.sum()
+        for rule in self.rules:
+            count = int(counts[rule.name])
+            self.violations[rule.name] += count
+
+            missing = self.sample_size - len(self.samples[rule.name])
+            if count and missing > 0:
+                sample = df[violations[rule.name].to_numpy()].head(missing)
+                self.samples[rule.name].extend(
+                    {"fila": int(i), **row} for i, row in zip(sample.index, sample.to_dict("records"))
+                )
+
+        if not invalid.any():
+            return df
+
+        self._quarantine(df[invalid], violations[invalid])
+
+        if self.mode == "fail":
+            self.close()
+            raise ValueError(
+                f"El archivo {self.source} no cumple las reglas de calidad: "
+                f"{self.rows_quarantined} filas inválidas. Ver {self.report_path}"
+            )
+
+        return _numeric_valid(df[~invalid])
+
+    def _quarantine(self, bad: pd.DataFrame, violations: pd.DataFrame) -> None:
+        # nombres de reglas incumplidas por fila, concatenados por columna (sin loop por fila)
+        import numpy as np
+        import pandas as pd
+
+        names = np.full(len(bad), "", dtype = object)
+        for rule in self.rules:
+            names = names + np.where(violations[rule.name].to_numpy(), rule.name + ";", "")
+
+        bad = bad.assign(**{RULES_COLUMN: pd.Series(names, index = bad.index).str.rstrip(";")})
+
+        QUALITY_DIR.mkdir(parents = True, exist_ok = True)
+        header = not self.quarantine_path.exists()
+        bad.to_csv(self.quarantine_path, mode = "a", header = header, index = False, sep = "|")
+        self.rows_quarantined += len(bad)
+
+    def report(self) -> dict:
+        return {
+            "source": self.source,
+            "mode": self.mode,
+            "rows": self.rows,
+            "rows_valid": self.rows - self.rows_quarantined,
+            "rows_quarantined": self.rows_quarantined,
+            "quarantine_file": str(self.quarantine_path) if self.rows_quarantined else None,
+            "rules": {
+                rule.name: {
+                    "description": rule.description,
+                    "violations": self.violations[rule.name],
+                    "samples": self.samples[rule.name],
+                }
+                for rule in self.rules
+            },
+            "created_at": datetime.now(UTC).isoformat(timespec = "seconds"),
+        }
+
+    def close(self) -> dict:
+        """
+        Escribe el reporte JSON, registra el resumen en el log y lo retorna.
+        """
+        report = self.report()
+        QUALITY_DIR.mkdir(parents = True, exist_ok = True)
+        self.report_path.write_text(json.dumps(report, indent = 2, default = str), encoding = "utf-8")
+
+        for name, count in self.violations.items():
+            if count:
+                logger.warning(f"Regla de calidad incumplida | {name} | filas = {count}")
+        logger.info(
+            f"Calidad de datos | {self.source} | filas = {self.rows} |"
+            f" en cuarentena = {self.rows_quarantined} | reporte: {self.report_path}"
+        )
+        return report
+
+
+def check_quality(df: pd.DataFrame, source: str, mode: str = "quarantine") -> pd.DataFrame:
+    """
+    Aplica las reglas al DataFrame completo y retorna sólo las filas válidas.
+    """
+    gate = QualityGate(source, mode)
+    valid = gate.filter(df)
+    gate.close()
+    return valid
@@ -0,0 +1,159 @@
+"""
+registry.py
+===========
+
+Registro de datasets del pipeline: qué archivos raw de data/raw se procesan
+en un mismo job, con qué esquema, qué transformación y hacia qué salida.
+
+El registro es un JSON (por defecto config/datasets.json) con la forma:
+
+    {
+      "datasets": [
+        {
+          "name": "defunciones_semanales",
+          "input": "def_semana_epidemiologica.csv",
+          "schema": ["ANO_ESTADISTICO", "SEMANA_ESTADISTICA", ...],
+          "transform": "semana_epidemiologica",
+          "output": "def_semana_epidemiologica_transformed",
+          "format": "csv",
+          "partition_by": [],
+          "compact": false,
+          "quality": "off",
+          "bq_table": null
+        }
+      ]
+    }
+
+Sólo `name`, `input` y `output` son obligatorios. El registro se valida
+completo al cargarlo (nombres y salidas únicas, transformación conocida,
+esquema compatible con la transformación), para fallar antes de iniciar
+cualquier pipeline.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.load import OUTPUT_FORMATS, PARTITION_COLUMNS
+from src.logger import setup_logger
+from src.quality import QUALITY_MODES
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+REGISTRY_FILE = BASE_DIR / "config" / "datasets.json"
+
+# Transformaciones disponibles -> columnas raw que requieren
+TRANSFORMS = {
+    # transform_dataset: semanas epidemiológicas MINSAL (ver src/transform.py)
+    "semana_epidemiologica": (
+        "ANO_ESTADISTICO",
+        "SEMANA_ESTADISTICA",
+        "GRUPO_EDAD",
+        "SEXO",
+        "REGION",
+        "POBLACION",
+        "MUERTES_OBS",
+    ),
+}
+
+
+@dataclass(frozen = True)
+class DatasetSpec:
+    """
+    Configuración de un dataset del registro.
+    """
+    name: str
+    input: str
+    output: str
+    transform: str = "semana_epidemiologica"
+    schema: Tuple[str, ...] = TRANSFORMS["semana_epidemiologica"]
+    format: str = "csv"
+    partition_by: Tuple[str, ...] = ()
+    compact: bool = False
+    quality: str = "off"
+    bq_table: Optional[str] = None
+
+    def validate(self) -> None:
+        if self.transform not in TRANSFORMS:
+            raise ValueError(
+                f"Dataset {self.name}: transformación desconocida {self.transform}. Opciones: {tuple(TRANSFORMS)}"
+            )
+        missing = set(TRANSFORMS[self.transform]) - set(self.schema)
+        if missing:
+            raise ValueError(
+                f"Dataset {self.name}: el esquema no incluye las columnas que requiere "
+                f"{self.transform}: {sorted(missing)}"
+            )
+        if self.format not in OUTPUT_FORMATS:
+            raise ValueError(f"Dataset {self.name}: formato inválido {self.format}. Opciones: {OUTPUT_FORMATS}")
+        if self.quality not in QUALITY_MODES:
+            raise ValueError(f"Dataset {self.name}: modo de calidad inválido {self.quality}. Opciones: {QUALITY_MODES}")
+        if self.partition_by and self.format != "parquet":
+            raise ValueError(f"Dataset {self.name}: partition_by sólo aplica al formato parquet")
+        invalid = set(self.partition_by) - set(PARTITION_COLUMNS)
+        if invalid:
+            raise ValueError(
+                f"Dataset {self.name}: columnas de particionado no soportadas {sorted(invalid)}. Opciones: {PARTITION_COLUMNS}"
+            )
+
+
+def parse_registry(data: dict) -> List[DatasetSpec]:
+    """
+    Construye y valida las especificaciones a partir del dict del registro.
+    """
+    entries = data.get("datasets")
+    if not entries:
+        raise ValueError("El registro no contiene datasets")
+
+    specs = []
+    for entry in entries:
+        missing = {"name", "input", "output"} - set(entry)
+        if missing:
+            raise ValueError(f"Entrada del registro sin campos obligatorios {sorted(missing)}: {entry}")
+        unknown = set(entry) - set(DatasetSpec.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Dataset {entry['name']}: campos desconocidos {sorted(unknown)}")
+
+        values = dict(entry)
+        for key in ("schema", "partition_by"):
+            if key in values:
+                values[key] = tuple(values[key])
+        spec = DatasetSpec(**values)
+        spec.validate()
+        specs.append(spec)
+
+    for key in ("name", "output"):
+        seen = [getattr(spec, key) for spec in specs]
+        duplicated = sorted({value for value in seen if seen.count(value) > 1})
+        if duplicated:
+            raise ValueError(f"Valores de '{key}' repetidos en el registro: {duplicated}")
+
+    return specs
+
+
+def load_registry(path: Optional[Path] = None, names: Optional[List[str]] = None) -> List[DatasetSpec]:
+    """
+    Lee el registro JSON y retorna las especificaciones validadas, en el
+    orden del archivo. Con `names` retorna sólo esos datasets.
+    """
+    path = Path(path or REGISTRY_FILE)
+    if not path.exists():
+        logger.error(f"No se encontró el registro de datasets: {path}")
+        raise FileNotFoundError(path)
+
+    specs = parse_registry(json.loads(path.read_text(encoding = "utf-8")))
+
+    if names:
+        unknown = set(names) - {spec.name for spec in specs}
+        if unknown:
+            raise ValueError(f"Datasets no registrados: {sorted(unknown)}")
+        specs = [spec for spec in specs if spec.name in names]
+
+    logger.info(f"Registro de datasets cargado | {path} | datasets = {[spec.name for spec in specs]}")
+    return specs
@@ -0,0 +1,205 @@
+"""
+rollups.py
+==========
+
+Tablas agregadas (rollups) del dataset transformado, calculadas en la misma
+pasada del transform para que los dashboards lean unos pocos KB en lugar de
+recorrer el dataset completo.
+
+Cada rollup agrupa por sus columnas llave y suma MUERTES_OBS y POBLACION
+(ignorando nulos; una llave sin ningún valor queda nula);
+TASA_MORTALIDAD = MUERTES_OBS / POBLACION se calcula sobre esas sumas. Las
+sumas se pueden combinar entre bloques, por lo que el mismo acumulador
+sirve para el modo batch (un único DataFrame) y para los modos streaming y
+pipelined (un bloque a la vez): cada bloque se agrega y se suma a lo
+acumulado, y la tasa se calcula al final.
+
+Las columnas llave de texto se convierten una sola vez por bloque a
+categóricas (en el modo compacto ya lo son) y se agrupa con
+`observed = True` sobre sus códigos, compartidos por todos los rollups.
+
+Salidas, junto al dataset de detalle:
+    data/transformed/<base>_rollups/<rollup>.csv
+    gs://<bucket>/transformed/<base>_rollups_<YYYY-MM-DD>/<rollup>.csv
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple
+from src.gcs_client import get_bucket
+from src.load_gcs import BUCKET_NAME, GCS_LAYER, _execution_date
+from src.logger import setup_logger
+from src.metrics import annotate, instrumented
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = setup_logger()
+
+MEASURES = ("MUERTES_OBS", "POBLACION")
+RATE_COLUMN = "TASA_MORTALIDAD"
+
+ROLLUPS_SUFFIX = "_rollups"
+
+
+@dataclass(frozen = True)
+class Rollup:
+    """
+    Tabla agregada: `name` (nombre del archivo) y columnas llave `keys`.
+    """
+    name: str
+    keys: Tuple[str, ...]
+
+
+# Rollups disponibles (configurables por nombre desde main: --rollups)
+ROLLUPS = {
+    rollup.name: rollup
+    for rollup in (
+        Rollup("muertes_region_semana", ("ANO_ESTADISTICO", "SEMANA_ESTADISTICA", "REGION")),
+        Rollup("muertes_grupo_edad_ano", ("ANO_ESTADISTICO", "GRUPO_EDAD")),
+        Rollup("muertes_region_ano", ("ANO_ESTADISTICO", "REGION")),
+    )
+}
+
+
+def select_rollups(names: Optional[Iterable[str]] = None) -> list:
+    """
+    Rollups de `names` (todos si es None), validando que existan.
+    """
+    if names is None:
+        return list(ROLLUPS.values())
+
+    unknown = set(names) - set(ROLLUPS)
+    if unknown:
+        raise ValueError(f"Rollups desconocidos: {sorted(unknown)}. Opciones: {tuple(ROLLUPS)}")
+    return [ROLLUPS[name] for name in names]
+
+
+class RollupAccumulator:
+    """
+    Acumula los rollups de los bloques que pasan por `update`, para usarse
+    dentro del transform (ver `transform_dataset` y `transform_dataset_chunks`).
+
+    Uso:
+        rollups = RollupAccumulator(select_rollups())
+        df = transform_dataset(file_name, rollups = rollups)
+        tables = rollups.tables()
+    """
+
+    def __init__(self, rollups: Sequence[Rollup]):
+        if not rollups:
+            raise ValueError("Se requiere al menos un rollup")
+        self.rollups = list(rollups)
+        self.rows = 0
+        self._sums: Dict[str, pd.DataFrame] = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        import pandas as pd
+
+        if df.empty:
+            return
+
+        columns = {key for rollup in self.rollups for key in rollup.keys}
+        keys = {
+            column: df[column] if df[column].dtype != object else df[column].astype("category")
+            for column in columns
+        }
+        # enteros nullable: con quality = 'off' las medidas pueden traer nulos
+        measures = df[list(MEASURES)].astype("Int64")
+
+        for rollup in self.rollups:
+            grouped = measures.groupby([keys[key] for key in rollup.keys], observed = True, sort = False)
+            partial = _plain_index(grouped.sum(min_count = 1))
+            previous = self._sums.get(rollup.name)
+            if previous is not None:
+                # las llaves categóricas de cada bloque pueden tener otras
+                # categorías, por lo que los parciales se combinan por valor
+                partial = pd.concat([previous, partial]).groupby(level = list(rollup.keys)).sum(min_count = 1)
+            self._sums[rollup.name] = partial
+        self.rows += len(df)
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        """
+        Rollups acumulados, ordenados por sus llaves, con TASA_MORTALIDAD.
+        """
+        import pandas as pd
+
+        tables = {}
+        for rollup in self.rollups:
+            sums = self._sums.get(rollup.name)
+            if sums is None:
+                sums = pd.DataFrame(columns = [*rollup.keys, *MEASURES]).set_index(list(rollup.keys))
+            table = sums.sort_index().reset_index()
+            for column in MEASURES:
+                # int64 salvo que alguna llave haya quedado sin valores
+                if not table[column].isna().any():
+                    table[column] = table[column].astype("int64")
+            rate = table["MUERTES_OBS"] / table["POBLACION"].where(table["POBLACION"] != 0)
+            table[RATE_COLUMN] = rate.astype("float64")
+            tables[rollup.name] = table
+        return tables
+
+
+def _plain_index(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reemplaza los niveles categóricos del índice por sus valores.
+    """
+    import pandas as pd
+
+    keys = list(df.index.names)
+    frame = df.reset_index()
+    for key in keys:
+        if isinstance(frame[key].dtype, pd.CategoricalDtype):
+            frame[key] = frame[key].astype(frame[key].cat.categories.dtype)
+    return frame.set_index(keys)
+
+
+def write_rollups(tables: Dict[str, pd.DataFrame], output_dir: Path, base_name: str) -> Path:
+    """
+    Escribe cada rollup como `<output_dir>/<base_name>_rollups/<rollup>.csv`
+    y retorna el directorio.
+    """
+    rollups_dir = Path(output_dir) / f"{base_name}{ROLLUPS_SUFFIX}"
+    rollups_dir.mkdir(parents = True, exist_ok = True)
+    for name, table in tables.items():
+        table.to_csv(rollups_dir / f"{name}.csv", index = False)
+
+    logger.info(f"Rollups escritos *local* | {rollups_dir} | {list(tables)}")
+    return rollups_dir
+
+
+def read_rollups(rollups_dir: Path, names: Iterable[str]) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Rollups escritos por `write_rollups`, o None si falta alguno.
+    """
+    import pandas as pd
+
+    paths = {name: Path(rollups_dir) / f"{name}.csv" for name in names}
+    if not all(path.exists() for path in paths.values()):
+        return None
+    return {name: pd.read_csv(path) for name, path in paths.items()}
+
+
+@instrumented("load_rollups_to_gcs")
+def load_rollups_to_gcs(tables: Dict[str, pd.DataFrame], base_name: str) -> str:
+    """
+    Sube los rollups bajo el prefijo versionado
+    `transformed/<base_name>_rollups_<YYYY-MM-DD>/` y retorna su URI.
+    """
+    prefix = f"{GCS_LAYER}/{base_name}{ROLLUPS_SUFFIX}_{_execution_date()}"
+    bucket = get_bucket(BUCKET_NAME)
+
+    written = 0
+    for name, table in tables.items():
+        payload = table.to_csv(index = False).encode("utf-8")
+        bucket.blob(f"{prefix}/{name}.csv").upload_from_string(payload, content_type = "text/csv")
+        written += len(payload)
+    annotate(rows_out = sum(len(table) for table in tables.values()), bytes_written = written)
+
+    logger.info(f"Rollups cargados en GCS | gs://{BUCKET_NAME}/{prefix}/ | {list(tables)} | {written} bytes")
+    return f"gs://{BUCKET_NAME}/{prefix}/"
@@ -0,0 +1,419 @@
+"""
+runner.py
+=========
+
+Ejecuta en un mismo job los pipelines de todos los datasets del registro
+(`src/registry.py`), de forma concurrente e independiente entre sí.
+
+Por dataset:
+    1.- Transform + load local (CPU): en un pool de procesos (spawn), para
+        que los transforms de distintos datasets corran en paralelo real.
+        Las métricas de etapas de cada worker vuelven con su resultado y se
+        agregan a las de la ejecución del proceso principal.
+    2.- Load GCS (+ BigQuery si el dataset tiene `bq_table`) (I/O): en un
+        pool de threads del proceso principal.
+
+Un único thread coordinador agenda las etapas: un dataset pasa a la carga
+apenas termina su transform, sin esperar a los demás. `max_concurrent`
+limita cuántos datasets hay en curso a la vez (en cualquier etapa), y con
+ello la memoria y los archivos abiertos del job; los pools se dimensionan
+con `cpu_workers` y `upload_workers` dentro de ese límite.
+
+Cada dataset usa el mismo manifiesto de checkpoints que `main()`
+(`src/checkpoint.py`), con las mismas huellas de entrada, de modo que un
+job reanudado omite las etapas ya completadas. El error de un dataset no
+detiene a los demás; al final se retorna un resumen por dataset (estado,
+filas, artefactos, etapas omitidas y tiempos).
+
+Uso:
+    python -m src.runner [--registry config/datasets.json] [--datasets a b]
+                         [--max-concurrent 4] [--cpu-workers 2] [--upload-workers 4]
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from src import extract, load_gcs
+from src.checkpoint import RunManifest
+from src.load import DEFAULT_ROW_GROUP_SIZE
+from src.load_bq import load_gcs_to_bigquery
+from src.load_gcs import load_csv_to_gcs
+from src.logger import setup_logger
+from src.metrics import current_run_id, merge_records, records, run_metrics, stage, start_run
+from src.registry import DatasetSpec, load_registry
+
+logger = setup_logger()
+
+# Datasets en curso a la vez (límite global del job)
+DEFAULT_MAX_CONCURRENT = 4
+
+# Procesos para las etapas CPU y threads para las cargas
+DEFAULT_CPU_WORKERS = os.cpu_count() or 1
+DEFAULT_UPLOAD_WORKERS = 4
+
+
+def read_header(path: Path, sep: str = "|") -> List[str]:
+    """
+    Columnas del encabezado de un CSV, sin leer el resto del archivo.
+    """
+    with open(path, encoding = "utf-8") as f:
+        return [column.strip() for column in f.readline().rstrip("\r\n").split(sep)]
+
+
+def _transform_function(name: str):
+    from src.transform import transform_dataset
+
+    return {"semana_epidemiologica": transform_dataset}[name]
+
+
+def _transform_job(
+    spec: DatasetSpec, raw_dir: str, output_dir: str, backend: str, use_cache: bool, run_id: Optional[str] = None,
+) -> dict:
+    """
+    Etapa CPU de un dataset (corre en un proceso hijo): transform y
+    escritura del dataset transformado en `output_dir`.
+
+    Las métricas de etapas del proceso hijo se retornan en `records` para
+    que el proceso principal las agregue a su ejecución (`merge_records`).
+    """
+    from src.load import load_csv, load_parquet
+
+    extract.RAW_DIR = Path(raw_dir)
+    # el worker se reutiliza entre datasets: cada job parte con registros vacíos
+    start_run(run_id)
+    start = time.perf_counter()
+
+    with stage(f"runner.{spec.name}.transform"):
+        df = _transform_function(spec.transform)(
+            spec.input, backend = backend, use_cache = use_cache, compact = spec.compact, quality = spec.quality,
+        )
+        if spec.format == "parquet":
+            path = load_parquet(df, Path(output_dir), spec.output, partition_cols = list(spec.partition_by))
+        else:
+            path = load_csv(df, Path(output_dir), f"{spec.output}.csv")
+
+    return {
+        "artifact": str(path),
+        "rows": len(df),
+        "transform_s": round(time.perf_counter() - start, 4),
+        "records": records(),
+    }
+
+
+def _upload_job(spec: DatasetSpec, result: dict, bq_strategy: str) -> dict:
+    """
+    Etapa I/O de un dataset (corre en un thread): carga a GCS, salvo que
+    `result` ya traiga la URI de un checkpoint, y luego a BigQuery.
+
+    Los resultados se escriben en `result` a medida que se obtienen, para
+    que el coordinador registre los checkpoints de lo que sí se completó
+    aunque una etapa posterior falle.
+    """
+    start = time.perf_counter()
+    try:
+        if result.get("gcs_uri") is None:
+            with stage(f"runner.{spec.name}.load_gcs"):
+                result["gcs_uri"] = load_csv_to_gcs(spec.output, file_format = spec.format)
+            result["gcs_done"] = True
+
+        if spec.bq_table and not result.get("bq_skipped"):
+            with stage(f"runner.{spec.name}.load_bq"):
+                result["bq_table"] = load_gcs_to_bigquery(
+                    result["gcs_uri"],
+                    spec.bq_table,
+                    file_format = spec.format,
+                    strategy = bq_strategy,
+                    hive_partitioned = bool(spec.partition_by),
+                )
+            result["bq_done"] = True
+    finally:
+        result["upload_s"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+class _DatasetRun:
+    """
+    Estado de un dataset dentro del job: manifiesto, huellas y resumen.
+    """
+
+    def __init__(self, spec: DatasetSpec, raw_dir: Path, force: bool, bq_strategy: str):
+        self.spec = spec
+        self.started = time.perf_counter()
+        self.manifest = RunManifest(spec.output, force = force)
+        self.resumable = False
+        self.bq_strategy = bq_strategy
+        self.upload = {}
+        self.summary = {
+            "dataset": spec.name,
+            "status": "running",
+            "rows": None,
+            "artifact": None,
+            "gcs_uri": None,
+            "bq_table": None,
+            "skipped": [],
+            "transform_s": None,
+            "upload_s": None,
+            "total_s": None,
+            "error": None,
+        }
+
+        raw_path = raw_dir / spec.input
+        if not raw_path.exists():
+            raise FileNotFoundError(raw_path)
+        missing = set(spec.schema) - set(read_header(raw_path))
+        if missing:
+            raise ValueError(f"El archivo {spec.input} no tiene las columnas del esquema: {sorted(missing)}")
+
+        raw_hash = self.manifest.file_hash(raw_path)
+        self.resumable = not force and raw_hash is not None
+        # mismas entradas que registra main() en modo batch con archivo local
+        self.transform_inputs = {
+            "raw": raw_hash,
+            "since": None,
+            "mode": "batch",
+            "output_format": spec.format,
+            "partition_cols": list(spec.partition_by) or None,
+            "row_group_size": DEFAULT_ROW_GROUP_SIZE,
+            "compact": spec.compact,
+            "quality": spec.quality,
+            "keep_local": True,
+        }
+
+    def transform_checkpoint(self) -> Optional[dict]:
+        if not self.resumable:
+            return None
+        record = self.manifest.completed("transform", self.transform_inputs)
+        if record:
+            self.summary["skipped"].append("transform")
+            self.summary["artifact"] = record["artifact"]
+        return record
+
+    def transform_done(self, result: dict) -> None:
+        self.summary.update(rows = result["rows"], artifact = result["artifact"], transform_s = result["transform_s"])
+        self.manifest.complete("transform", self.transform_inputs, Path(result["artifact"]))
+
+    def gcs_inputs(self) -> dict:
+        return {
+            "artifact": self.manifest.stages["transform"]["artifact_hash"],
+            "output_format": self.spec.format,
+        }
+
+    def bq_inputs(self, gcs_uri: str) -> dict:
+        return {
+            "gcs_uri": gcs_uri,
+            "table": self.spec.bq_table,
+            "strategy": self.bq_strategy,
+            "hive_partitioned": bool(self.spec.partition_by),
+        }
+
+    def upload_checkpoints(self) -> bool:
+        """
+        Prepara `self.upload` con las etapas de carga ya completadas.
+        Retorna True si no queda ninguna por ejecutar.
+        """
+        gcs = self.manifest.completed("load_gcs", self.gcs_inputs()) if self.resumable else None
+        if gcs is None:
+            return False
+        self.upload["gcs_uri"] = gcs["artifact"]
+        self.summary["skipped"].append("load_gcs")
+
+        if not self.spec.bq_table:
+            return True
+        if self.manifest.completed("load_bq", self.bq_inputs(gcs["artifact"])):
+            self.upload["bq_skipped"] = True
+            self.summary["skipped"].append("load_bq")
+            return True
+        return False
+
+    def upload_done(self) -> None:
+        """
+        Registra los checkpoints de las cargas completadas (también si la
+        carga terminó con error a mitad de camino).
+        """
+        result = self.upload
+        if result.get("gcs_done"):
+            self.manifest.complete("load_gcs", self.gcs_inputs(), result["gcs_uri"])
+        if result.get("bq_done"):
+            self.manifest.complete("load_bq", self.bq_inputs(result["gcs_uri"]), result["bq_table"])
+        self.summary.update(
+            gcs_uri = result.get("gcs_uri"),
+            bq_table = result.get("bq_table"),
+            upload_s = result.get("upload_s"),
+        )
+
+    def finish(self, error: Optional[BaseException] = None) -> dict:
+        self.summary["status"] = "error" if error else "ok"
+        self.summary["error"] = f"{type(error).__name__}: {error}" if error else None
+        self.summary["total_s"] = round(time.perf_counter() - self.started, 4)
+        log = logger.error if error else logger.info
+        log(f"Dataset {self.spec.name} finalizado | estado = {self.summary['status']}"
+            f" | omitidas = {self.summary['skipped']} | {self.summary['total_s']} s"
+            + (f" | {self.summary['error']}" if error else ""))
+        return self.summary
+
+
+def run_datasets(
+    specs: Sequence[DatasetSpec],
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    cpu_workers: int = DEFAULT_CPU_WORKERS,
+    upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+    upload: bool = True,
+    force: bool = False,
+    backend: str = "pandas",
+    use_cache: bool = True,
+    bq_strategy: str = "merge",
+) -> List[dict]:
+    """
+    Ejecuta los pipelines de `specs` de forma concurrente y retorna el
+    resumen de cada dataset, en el orden de `specs`.
+
+    Parámetros:
+    - max_concurrent: datasets en curso a la vez (límite global).
+    - cpu_workers: procesos para transform + load local.
+    - upload_workers: threads para las cargas a GCS/BigQuery.
+    - upload: si es False, sólo se ejecutan las etapas locales.
+    - force: ignora los checkpoints de ejecuciones anteriores.
+    - backend, use_cache: lectura del raw (ver `extract_csv`).
+    - bq_strategy: estrategia de carga BigQuery ('merge' o 'append').
+    """
+    if max_concurrent < 1 or cpu_workers < 1 or upload_workers < 1:
+        raise ValueError("max_concurrent, cpu_workers y upload_workers deben ser mayores a 0")
+
+    import multiprocessing
+
+    raw_dir = extract.RAW_DIR
+    output_dir = load_gcs.LOCAL_TRANSFORMED_DIR
+    pending = deque(specs)
+    summaries = {}
+    running = {}
+    in_flight = 0
+
+    logger.info(
+        f"Runner iniciado | datasets = {len(specs)} | max_concurrent = {max_concurrent} |"
+        f" cpu_workers = {cpu_workers} | upload_workers = {upload_workers}"
+    )
+
+    # spawn: el proceso principal tiene threads de carga activos, y hacer fork
+    # con threads en curso puede heredar locks tomados (logging, sockets)
+    processes = ProcessPoolExecutor(
+        max_workers = max(1, min(cpu_workers, max_concurrent, len(specs))),
+        mp_context = multiprocessing.get_context("spawn"),
+    )
+    threads = ThreadPoolExecutor(max_workers = max(1, min(upload_workers, max_concurrent, len(specs))))
+
+    def finish(run: _DatasetRun, error: Optional[BaseException] = None) -> None:
+        nonlocal in_flight
+        summaries[run.spec.name] = run.finish(error)
+        in_flight -= 1
+
+    def start_upload(run: _DatasetRun) -> None:
+        if not upload or run.upload_checkpoints():
+            run.upload_done()
+            finish(run)
+            return
+        running[threads.submit(_upload_job, run.spec, run.upload, bq_strategy)] = (run, "upload")
+
+    with processes, threads:
+        while pending or running:
+            while pending and in_flight < max_concurrent:
+                spec = pending.popleft()
+                in_flight += 1
+                try:
+                    run = _DatasetRun(spec, raw_dir, force, bq_strategy)
+                except Exception as e:
+                    summaries[spec.name] = {"dataset": spec.name, "status": "error", "error": f"{type(e).__name__}: {e}"}
+                    logger.error(f"Dataset {spec.name} no iniciado: {e}")
+                    in_flight -= 1
+                    continue
+
+                if run.transform_checkpoint():
+                    start_upload(run)
+                else:
+                    future = processes.submit(
+                        _transform_job, spec, str(raw_dir), str(output_dir), backend, use_cache, current_run_id(),
+                    )
+                    running[future] = (run, "transform")
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when = FIRST_COMPLETED)
+            for future in done:
+                run, phase = running.pop(future)
+                error = future.exception()
+                if phase == "transform":
+                    if error:
+                        finish(run, error)
+                    else:
+                        result = future.result()
+                        merge_records(result.pop("records", []))
+                        run.transform_done(result)
+                        start_upload(run)
+                else:
+                    run.upload_done()
+                    finish(run, error)
+
+    return [summaries[spec.name] for spec in specs]
+
+
+def print_summary(summaries: List[dict]) -> None:
+    for s in summaries:
+        rows = "-" if s.get("rows") is None else f"{s['rows']:,}"
+        print(
+            f"{s['dataset']:<30} {s['status']:<6} filas={rows:>12} |"
+            f" transform {s.get('transform_s') or 0:8.2f} s | carga {s.get('upload_s') or 0:8.2f} s |"
+            f" total {s.get('total_s') or 0:8.2f} s | omitidas: {', '.join(s.get('skipped') or []) or '-'}"
+            + (f" | {s['error']}" if s.get("error") else "")
+        )
+
+
+def main(argv = None) -> int:
+    parser = argparse.ArgumentParser(description = "Ejecuta los pipelines de los datasets del registro")
+    parser.add_argument("--registry", type = Path, help = "registro JSON (por defecto config/datasets.json)")
+    parser.add_argument("--datasets", nargs = "+", help = "sólo estos datasets del registro")
+    parser.add_argument("--max-concurrent", type = int, default = DEFAULT_MAX_CONCURRENT)
+    parser.add_argument("--cpu-workers", type = int, default = DEFAULT_CPU_WORKERS)
+    parser.add_argument("--upload-workers", type = int, default = DEFAULT_UPLOAD_WORKERS)
+    parser.add_argument("--skip-upload", dest = "upload", action = "store_false", help = "sólo etapas locales")
+    parser.add_argument("--force", action = "store_true", help = "ignora los checkpoints")
+    parser.add_argument("--backend", choices = extract.BACKENDS, default = "pandas")
+    parser.add_argument("--no-cache", dest = "use_cache", action = "store_false")
+    parser.add_argument("--summary-output", type = Path, help = "archivo JSON con el resumen por dataset")
+    args = parser.parse_args(argv)
+
+    if args.upload and not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+        logger.error("Credenciales de GCP no configuradas")
+        raise SystemExit("Credenciales GCP Faltantes")
+
+    specs = load_registry(args.registry, args.datasets)
+    with run_metrics():
+        summaries = run_datasets(
+            specs,
+            max_concurrent = args.max_concurrent,
+            cpu_workers = args.cpu_workers,
+            upload_workers = args.upload_workers,
+            upload = args.upload,
+            force = args.force,
+            backend = args.backend,
+            use_cache = args.use_cache,
+        )
+
+    print_summary(summaries)
+    if args.summary_output:
+        args.summary_output.parent.mkdir(parents = True, exist_ok = True)
+        args.summary_output.write_text(json.dumps(summaries, indent = 2), encoding = "utf-8")
+
+    return 1 if any(s["status"] != "ok" for s in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
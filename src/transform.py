@@ -12,20 +12,63 @@ Las transformaciones incluyen:
 - Creación de métricas auxiliares
 - Incorporación de metadatos de carga.
 
+El modo compacto (`compact=True`) entrega las columnas de texto como
+categóricas, los enteros con el dtype más pequeño y FECHA_CARGA como
+datetime64, reduciendo la memoria del DataFrame transformado.
+
+El modo batch puede ejecutarse en paralelo (`workers` > 1): el dataset se
+divide por ANO_ESTADISTICO o REGION, cada partición se transforma en un
+pool de procesos y el resultado se reensambla en el orden original.
+
 Proyecto: ETL Datos Públicos.
 Autor: E. Henríquez N.
 Fecha: 3 de enero de 2026.
 
 '''
 
-import pandas as pd
+from __future__ import annotations
+
+import os
+import tempfile
 from datetime import date
-from typing import Tuple, Optional
-from src.extract import extract_csv
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+
+from src.extract import DEFAULT_CHUNK_SIZE, extract_csv, extract_csv_chunks
+from src.rollups import RollupAccumulator
+from src.watermark import Watermark, filter_after_watermark
 from src.logger import setup_logger
+from src.metrics import instrumented
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = setup_logger()
 
+# Columnas por las que se puede dividir el transform paralelo
+SPLIT_COLUMNS = ("ANO_ESTADISTICO", "REGION")
+
+# Mapeo de SEXO numérico a categórico
+SEXO_MAP = {1: "M", 2: "F"}
+
+# dtypes del modo compacto; los enteros se reducen sólo si los valores caben
+COMPACT_DTYPES = {
+    "ANO_ESTADISTICO": "int16",
+    "SEMANA_ESTADISTICA": "int8",
+    "GRUPO_EDAD": "category",
+    "SEXO": "category",
+    "REGION": "category",
+    "POBLACION": "int32",
+    "MUERTES_OBS": "int32",
+    "EDAD_MIN": "Int8",
+    "EDAD_MAX": "Int8",
+    "EDAD_PROMEDIO": "Float32",
+}
+
+# Directorio de intercambio entre procesos: /dev/shm (memoria compartida)
+# si existe, o el temporal del sistema en otro caso
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
 def parse_rango(rango: str) -> Tuple[Optional[int],Optional [int]]:
     """
     Convierte un rango de edad en edad mínima y máxima.
@@ -49,44 +92,115 @@ def parse_rango(rango: str) -> Tuple[Optional[int],Optional [int]]:
     return None, None
 
 
-def transform_dataset(file_name: str) -> pd.DataFrame:
+def parse_rangos(grupos: pd.Series) -> pd.DataFrame:
     """
-    Ejecuta todas las transformaciones del dataset epidemiológico.
-    Retorna un DataFrame transformado.
+    Versión vectorizada de `parse_rango` para una columna completa.
 
-    Incluye:
-    - Limpieza de columnas categóricas.
-    - Normalización de valores de sexo.
-    - Transformación de rangos etarios en variables numéricas.
-    - Cálculo de edad promedio.
-    - Incorporación de fecha de carga.
+    El dataset contiene sólo un puñado de etiquetas distintas de GRUPO_EDAD,
+    por lo que se factoriza la columna, se parsea cada etiqueta única una sola
+    vez con `parse_rango` y el resultado se propaga a todas las filas mediante
+    los códigos enteros de la factorización.
 
+    Parámetros
+    ----------
+    grupos : pd.Series
+        Columna GRUPO_EDAD (ya limpia de espacios).
+
+    Retorna
+    -------
+    pd.DataFrame
+        DataFrame con columnas EDAD_MIN y EDAD_MAX de tipo entero nullable
+        (Int64), alineado con el índice de `grupos`. Las etiquetas no
+        reconocidas y los valores nulos quedan como <NA>.
     """
-    logger.info("inicio de transformaciones del dataset")
+    import pandas as pd
 
-    # ======================
-    # CARGA DATASET CRUDO
-    # ======================
-    df = extract_csv(file_name)
+    codes, etiquetas = pd.factorize(grupos)
+
+    rangos = [parse_rango(etiqueta) for etiqueta in etiquetas]
+    minimos = pd.array([min_ for min_, _ in rangos], dtype="Int64")
+    maximos = pd.array([max_ for _, max_ in rangos], dtype="Int64")
+
+    # codes == -1 corresponde a valores nulos -> <NA>
+    return pd.DataFrame(
+        {
+            "EDAD_MIN": minimos.take(codes, allow_fill=True),
+            "EDAD_MAX": maximos.take(codes, allow_fill=True),
+        },
+        index=grupos.index,
+    )
+
+
+def _strip_categorical(values: pd.Series) -> pd.Categorical:
+    """
+    `str.strip` sobre una columna de texto en representación categórica:
+    se limpia cada etiqueta una sola vez y se recodifican las filas, sin
+    crear un string por fila. Las categorías quedan ordenadas, igual que
+    con `pd.Categorical`.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = pd.Categorical(values)
+    categories, inverse = np.unique(
+        np.asarray(values.categories.str.strip(), dtype = object), return_inverse = True
+    )
+    codes = np.where(values.codes >= 0, inverse[values.codes], -1) if len(inverse) else values.codes
+    return pd.Categorical.from_codes(codes, categories = categories)
+
+
+def _map_sexo_categorical(sexo: pd.Series) -> pd.Categorical:
+    """
+    Mapea SEXO numérico a una categórica con categorías fijas (SEXO_MAP)
+    asignando los códigos directamente; los valores no mapeados quedan nulos.
+    """
+    import numpy as np
+    import pandas as pd
+
+    categories = sorted(SEXO_MAP.values())
+    codes = np.full(len(sexo), -1, dtype = np.int8)
+    valores = sexo.to_numpy()
+    for numero, letra in SEXO_MAP.items():
+        codes[valores == numero] = categories.index(letra)
+    return pd.Categorical.from_codes(codes, categories = categories)
+
+
+def transform_chunk(df: pd.DataFrame, fecha_carga: Optional[date] = None, compact: bool = False) -> pd.DataFrame:
+    """
+    Aplica las transformaciones de negocio sobre un DataFrame crudo
+    (completo o un bloque) y lo retorna modificado.
+
+    Es la lógica común del modo batch y del modo streaming; `fecha_carga`
+    permite fijar una única fecha para todos los bloques de una ejecución.
+    Con `compact` las columnas de texto se procesan y entregan como
+    categóricas y el resultado pasa por `compact_frame`.
+    """
+
+    import numpy as np
 
     # ======================
     # LIMPIEZA DE DATOS
     # ======================
 
-    # Eliminación de espacios innecesarios
-    df["GRUPO_EDAD"] = df["GRUPO_EDAD"].str.strip()
-    df["REGION"] = df["REGION"].str.strip()
+    if compact:
+        df["GRUPO_EDAD"] = _strip_categorical(df["GRUPO_EDAD"])
+        df["REGION"] = _strip_categorical(df["REGION"])
+        df["SEXO"] = _map_sexo_categorical(df["SEXO"])
+    else:
+        # Eliminación de espacios innecesarios
+        df["GRUPO_EDAD"] = df["GRUPO_EDAD"].str.strip()
+        df["REGION"] = df["REGION"].str.strip()
 
-    # Mapea sexo numérico a categórico
-    df["SEXO"] = df["SEXO"].map({1: "M", 2: "F"})
+        # Mapea sexo numérico a categórico
+        df["SEXO"] = df["SEXO"].map(SEXO_MAP)
 
     # ======================
     # TRANSFORMACIÓN GRUPO_EDAD
     # ======================
 
-    df[["EDAD_MIN", "EDAD_MAX"]] = df["GRUPO_EDAD"].apply(
-        lambda x: pd.Series(parse_rango(x))
-    )
+    rangos = parse_rangos(df["GRUPO_EDAD"])
+    df["EDAD_MIN"] = rangos["EDAD_MIN"]
+    df["EDAD_MAX"] = rangos["EDAD_MAX"]
 
     # Edad promedio
     df["EDAD_PROMEDIO"] = (df["EDAD_MIN"] + df["EDAD_MAX"]) / 2
@@ -96,15 +210,297 @@ def transform_dataset(file_name: str) -> pd.DataFrame:
     #CREACIÓN COLUMNA FECHA_CARGA
     #============================
      
-    df["FECHA_CARGA"] = date.today()
+    fecha_carga = fecha_carga or date.today()
+    if compact:
+        df["FECHA_CARGA"] = np.datetime64(fecha_carga, "s")
+        return compact_frame(df)
+
+    df["FECHA_CARGA"] = fecha_carga
+
+    return df
+
+
+def _fits(values: pd.Series, dtype: str) -> bool:
+    """
+    Indica si los valores no nulos de `values` son enteros y caben en `dtype`.
+    """
+    import numpy as np
+    import pandas as pd
+
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype.lower()).type)
+    valores = values.dropna()
+    if valores.empty:
+        return True
+    if pd.api.types.is_float_dtype(valores) and not (valores % 1 == 0).all():
+        return False
+    return info.min <= valores.min() and valores.max() <= info.max
+
+
+def _integer_target(values: pd.Series, dtype: str) -> str:
+    """
+    dtype entero de destino: el nullable (Int32, ...) si la columna tiene
+    nulos o ya es nullable (bloques leídos con INTEGER_DTYPES), y el de numpy
+    en otro caso.
+    """
+    import pandas as pd
+
+    nullable = isinstance(values.dtype, pd.api.extensions.ExtensionDtype) or values.isna().any()
+    return dtype.capitalize() if nullable else dtype
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte un DataFrame transformado a su representación compacta:
+
+    - GRUPO_EDAD, REGION y SEXO como `category` (cada etiqueta se guarda
+      una sola vez en lugar de un string de Python por fila).
+    - Enteros con el dtype más pequeño de COMPACT_DTYPES, sólo si todos los
+      valores caben (en otro caso la columna conserva su dtype). Las columnas
+      con nulos o ya nullable usan la variante nullable (Int32, ...).
+    - EDAD_PROMEDIO como Float32 (los promedios son múltiplos de 0.5, exactos).
+    - FECHA_CARGA como datetime64 en lugar de objetos `date`.
+
+    El CSV que se genera a partir del resultado es idéntico al del modo normal.
+    """
+    import pandas as pd
+
+    for column, dtype in COMPACT_DTYPES.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+
+        if dtype == "category":
+            categories = sorted(SEXO_MAP.values()) if column == "SEXO" else None
+            df[column] = pd.Categorical(df[column], categories = categories)
+        elif dtype.startswith("Float"):
+            df[column] = df[column].astype(dtype)
+        elif _fits(df[column], dtype):
+            df[column] = df[column].astype(_integer_target(df[column], dtype))
+        else:
+            logger.warning(f"Columna {column} fuera de rango para {dtype}, se conserva {df[column].dtype}")
+
+    if "FECHA_CARGA" in df.columns:
+        df["FECHA_CARGA"] = pd.to_datetime(df["FECHA_CARGA"]).astype("datetime64[s]")
+
+    return df
+
+
+# metadato del esquema Arrow con las columnas de texto codificadas como diccionario
+_ENCODED_KEY = b"etl_dictionary_encoded"
+
+
+def _write_ipc(df: pd.DataFrame, path: Path) -> None:
+    """
+    Escribe `df` como Arrow IPC. Las columnas de texto (object) se envían
+    como categóricas, que Arrow guarda como diccionario: tienen pocas
+    etiquetas distintas y así se evita convertir millones de strings entre
+    Python y Arrow. Sus nombres quedan en el metadato del esquema.
+    """
+    import pandas as pd
+    import json
+    import pyarrow as pa
+
+    encoded = [
+        column for column in df.columns
+        if df[column].dtype == object and pd.api.types.infer_dtype(df[column], skipna = True) == "string"
+    ]
+    if encoded:
+        df = df.assign(**{column: pd.Categorical(df[column]) for column in encoded})
+
+    table = pa.Table.from_pandas(df, preserve_index = False)
+    metadata = {**(table.schema.metadata or {}), _ENCODED_KEY: json.dumps(encoded).encode()}
+    table = table.replace_schema_metadata(metadata)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_ipc_table(path: Path):
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as mm:
+        return pa.ipc.open_file(mm).read_all()
+
+
+def _ipc_to_pandas(tables) -> pd.DataFrame:
+    """
+    Une tablas escritas por `_write_ipc` y las convierte a un único
+    DataFrame, devolviendo las columnas de texto a dtype object.
+    """
+    import json
+    import pyarrow as pa
+
+    table = pa.concat_tables(tables, promote_options = "default")
+    df = table.to_pandas()
+    for column in json.loads(tables[0].schema.metadata[_ENCODED_KEY]):
+        df[column] = df[column].astype(object)
+    return df
+
+
+def _transform_partition(in_path: Path, out_path: Path, fecha_carga: date) -> Path:
+    """
+    Tarea de un proceso del pool: lee una partición cruda (Arrow IPC con
+    memory-map), la transforma y escribe el resultado como Arrow IPC.
+    """
+    df = _ipc_to_pandas([_read_ipc_table(in_path)])
+    _write_ipc(transform_chunk(df, fecha_carga), out_path)
+    return out_path
+
+
+def transform_parallel(
+    df: pd.DataFrame,
+    workers: int,
+    split_by: str = "ANO_ESTADISTICO",
+    fecha_carga: Optional[date] = None,
+) -> pd.DataFrame:
+    """
+    Aplica `transform_chunk` en paralelo sobre las particiones de `df`
+    definidas por los valores de `split_by`, usando `workers` procesos.
+
+    Las particiones viajan entre procesos como archivos Arrow IPC en memoria
+    compartida (/dev/shm) que cada proceso lee con memory-map, en lugar de
+    DataFrames serializados con pickle. El resultado conserva el orden de
+    filas y el índice de `df`, por lo que es idéntico al de `transform_chunk`.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    import numpy as np
+    import pandas as pd
+
+    if split_by not in SPLIT_COLUMNS:
+        raise ValueError(f"Columna de partición inválida: {split_by}. Opciones: {SPLIT_COLUMNS}")
+    if workers < 1:
+        raise ValueError("workers debe ser mayor o igual a 1")
+
+    fecha_carga = fecha_carga or date.today()
+
+    # códigos ordenados por valor; los nulos (-1) forman su propia partición
+    codes, _ = pd.factorize(df[split_by], sort = True)
+    order = np.argsort(codes, kind = "stable")
+    bounds = np.cumsum(np.bincount(codes + 1))[:-1]
+    partitions = [p for p in np.split(order, bounds) if len(p)]
+
+    logger.info(
+        f"Transform paralelo | particiones = {len(partitions)} por {split_by} | workers = {workers}"
+    )
+
+    with tempfile.TemporaryDirectory(prefix = "etl-transform-", dir = SHM_DIR) as tmp:
+        tmp = Path(tmp)
+        tasks = []
+        for i, positions in enumerate(partitions):
+            in_path = tmp / f"in-{i:05d}.arrow"
+            _write_ipc(df.iloc[positions], in_path)
+            tasks.append((in_path, tmp / f"out-{i:05d}.arrow"))
+
+        with ProcessPoolExecutor(max_workers = min(workers, len(tasks)) or 1) as pool:
+            futures = [pool.submit(_transform_partition, i, o, fecha_carga) for i, o in tasks]
+            # se recorren en el orden de envío, no de término: orden determinista
+            tables = [_read_ipc_table(f.result()) for f in futures]
+
+        if not tables:
+            return transform_chunk(df.copy(), fecha_carga)
+        result = _ipc_to_pandas(tables)
+
+    # la fila j del resultado concatenado corresponde a la fila order[j] de df
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    result = result.take(inverse)
+    result.index = df.index
+
+    return result
+
+
+@instrumented("transform_dataset")
+def transform_dataset(
+    file_name: str,
+    backend: str = "pandas",
+    since: Optional[Watermark] = None,
+    use_cache: bool = False,
+    workers: int = 1,
+    split_by: str = "ANO_ESTADISTICO",
+    compact: bool = False,
+    quality: str = "off",
+    rollups: Optional[RollupAccumulator] = None,
+) -> pd.DataFrame:
+    """
+    Ejecuta todas las transformaciones del dataset epidemiológico.
+    Retorna un DataFrame transformado.
+
+    `backend` selecciona el lector de `extract_csv` ('pandas' o 'pyarrow').
+    `since` (año, semana) limita el resultado a las filas posteriores a ese
+    watermark (modo incremental); el filtro se aplica antes de transformar.
+    `use_cache` reutiliza el parseo del raw guardado en el caché Arrow.
+    Con `workers` > 1 las transformaciones se ejecutan en un pool de
+    procesos, particionando por `split_by` (ver `transform_parallel`).
+    Con `compact` el resultado usa la representación compacta de
+    `compact_frame` (categóricas, enteros pequeños y FECHA_CARGA datetime64).
+    `quality` aplica las reglas de calidad en el extract (ver `src/quality.py`).
+    Con `rollups` se acumulan las tablas agregadas del resultado en la misma
+    pasada (ver `src/rollups.py`).
+
+    Incluye:
+    - Limpieza de columnas categóricas.
+    - Normalización de valores de sexo.
+    - Transformación de rangos etarios en variables numéricas.
+    - Cálculo de edad promedio.
+    - Incorporación de fecha de carga.
+
+    """
+    logger.info("inicio de transformaciones del dataset")
 
     # ======================
-    # VALIDACIÓN BÁSICA
+    # CARGA DATASET CRUDO
     # ======================
-    #print(df[["GRUPO_EDAD", "EDAD_MIN", "EDAD_MAX", "EDAD_PROMEDIO"]].head())
-    #print(df.info())
+    df = extract_csv(file_name, backend = backend, use_cache = use_cache, quality = quality)
+
+    if since is not None:
+        df = filter_after_watermark(df, since).copy()
+        logger.info(f"Filtro incremental aplicado | posteriores a {since} | Filas = {len(df)}")
+
+    if workers > 1:
+        df = transform_parallel(df, workers, split_by)
+        if compact:
+            df = compact_frame(df)
+    else:
+        df = transform_chunk(df, compact = compact)
+
+    if rollups is not None:
+        rollups.update(df)
 
     logger.info("Transformación completada 100%")
 
     return df
 
+
+def transform_dataset_chunks(
+    file_name: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    since: Optional[Watermark] = None,
+    compact: bool = False,
+    quality: str = "off",
+    rollups: Optional[RollupAccumulator] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Variante streaming de `transform_dataset`: lee el archivo raw por
+    bloques y entrega cada bloque ya transformado. Con `since`, los bloques
+    que quedan sin filas posteriores al watermark se omiten.
+
+    Todos los bloques comparten la misma FECHA_CARGA, de modo que el
+    resultado concatenado es idéntico al del modo batch. `compact` aplica
+    `compact_frame` a cada bloque y `quality` las reglas de calidad.
+    `rollups` acumula las tablas agregadas bloque a bloque.
+    """
+    logger.info(f"inicio de transformaciones del dataset por bloques | chunk_size = {chunk_size}")
+
+    chunks = extract_csv_chunks(file_name, chunk_size, quality = quality)
+    fecha_carga = date.today()
+
+    for chunk in chunks:
+        if since is not None:
+            chunk = filter_after_watermark(chunk, since).copy()
+            if chunk.empty:
+                continue
+        chunk = transform_chunk(chunk, fecha_carga, compact)
+        if rollups is not None:
+            rollups.update(chunk)
+        yield chunk
+
+    logger.info("Transformación por bloques completada 100%")
@@ -0,0 +1,157 @@
+"""
+watermark.py
+============
+
+Persistencia del high-watermark para la ingesta incremental semanal.
+
+La fuente MINSAL sólo agrega nuevas filas de SEMANA_ESTADISTICA, por lo que
+basta con recordar el último par (ANO_ESTADISTICO, SEMANA_ESTADISTICA)
+procesado para quedarse únicamente con las semanas nuevas en la siguiente
+ejecución.
+
+Responsabilidades:
+- Leer y guardar el watermark por dataset (JSON en data/state).
+- Retroceder el watermark N semanas para reprocesar revisiones tardías.
+- Filtrar de forma vectorizada las filas posteriores al watermark.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Tuple
+from src.logger import setup_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = setup_logger()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Directorio donde se guarda el estado entre ejecuciones
+STATE_DIR = BASE_DIR / "data" / "state"
+
+YEAR_COLUMN = "ANO_ESTADISTICO"
+WEEK_COLUMN = "SEMANA_ESTADISTICA"
+
+# Semanas por año asumidas al retroceder el watermark. Con 52, en años de
+# 53 semanas se reprocesa una semana extra (nunca una menos).
+WEEKS_PER_YEAR = 52
+
+Watermark = Tuple[int, int]
+
+
+def _watermark_path(dataset: str) -> Path:
+    return STATE_DIR / f"{dataset}_watermark.json"
+
+
+def read_watermark(dataset: str) -> Optional[Watermark]:
+    """
+    Retorna el último (año, semana) procesado para `dataset`,
+    o None si todavía no existe una carga previa.
+    """
+    path = _watermark_path(dataset)
+    if not path.exists():
+        return None
+
+    state = json.loads(path.read_text(encoding = "utf-8"))
+    watermark = (int(state[YEAR_COLUMN]), int(state[WEEK_COLUMN]))
+
+    logger.info(f"Watermark leído | dataset = {dataset} | {watermark}")
+    return watermark
+
+
+def write_watermark(dataset: str, watermark: Watermark) -> Path:
+    """
+    Guarda el watermark de `dataset` de forma atómica (archivo temporal +
+    rename), para que una caída a mitad de escritura no lo corrompa.
+    """
+    STATE_DIR.mkdir(parents = True, exist_ok = True)
+    path = _watermark_path(dataset)
+
+    year, week = watermark
+    state = {
+        YEAR_COLUMN: int(year),
+        WEEK_COLUMN: int(week),
+        "updated_at": datetime.now(UTC).isoformat(timespec = "seconds"),
+    }
+
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state, indent = 2), encoding = "utf-8")
+    os.replace(tmp_path, path)
+
+    logger.info(f"Watermark actualizado | dataset = {dataset} | {(int(year), int(week))}")
+    return path
+
+
+def shift_watermark(watermark: Watermark, weeks: int) -> Watermark:
+    """
+    Retrocede el watermark `weeks` semanas, de modo que esas últimas semanas
+    ya procesadas vuelvan a emitirse (corrección de revisiones tardías).
+
+    Ej: shift_watermark((2025, 2), 3) -> (2024, 51)
+    """
+    if weeks < 0:
+        raise ValueError("weeks no puede ser negativo")
+
+    year, week = watermark
+    week -= weeks
+    while week < 1:
+        year -= 1
+        week += WEEKS_PER_YEAR
+
+    return year, week
+
+
+def filter_after_watermark(df: pd.DataFrame, watermark: Optional[Watermark]) -> pd.DataFrame:
+    """
+    Retorna sólo las filas estrictamente posteriores a `watermark`.
+    Sin watermark retorna el DataFrame completo.
+    """
+    if watermark is None:
+        return df
+
+    year, week = watermark
+    years = df[YEAR_COLUMN]
+    mask = (years > year) | ((years == year) & (df[WEEK_COLUMN] > week))
+
+    return df.loc[mask]
+
+
+def max_watermark(df: pd.DataFrame) -> Optional[Watermark]:
+    """
+    Mayor (año, semana) presente en el DataFrame, o None si está vacío.
+    """
+    if df.empty:
+        return None
+
+    year = df[YEAR_COLUMN].max()
+    week = df.loc[df[YEAR_COLUMN] == year, WEEK_COLUMN].max()
+
+    return int(year), int(week)
+
+
+class WatermarkTracker:
+    """
+    Acumula el watermark máximo de los bloques que pasan por `track`,
+    para el modo streaming.
+    """
+
+    def __init__(self, watermark: Optional[Watermark] = None):
+        self.watermark = watermark
+
+    def update(self, df: pd.DataFrame) -> None:
+        chunk_max = max_watermark(df)
+        if chunk_max is not None and (self.watermark is None or chunk_max > self.watermark):
+            self.watermark = chunk_max
+
+    def track(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
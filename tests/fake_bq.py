@@ -0,0 +1,133 @@
+"""
+fake_bq.py
+==========
+
+Stand-in local y en memoria del subconjunto de `google.cloud.bigquery.Client`
+que usa la etapa de carga a BigQuery (create_table, get_table, delete_table,
+load_table_from_uri y query), para probarla sin credenciales ni red.
+
+Cada load job y cada query quedan registrados en `jobs`, con su
+configuración, para verificar particionado, clustering, disposición de
+escritura y el SQL emitido. Si el objeto de origen existe en el cliente GCS
+del proceso (por ejemplo un `FakeClient` de `benchmarks.fake_gcs`), el load job
+lee el archivo y reporta `output_rows` como el servicio real.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import io
+import threading
+from typing import Dict, List, Optional
+
+from google.api_core.exceptions import NotFound
+
+
+class FakeJob:
+    """
+    Job terminado de inmediato; `result()` retorna el propio job.
+    """
+
+    def __init__(self, job_type: str, output_rows: Optional[int] = None):
+        self.job_type = job_type
+        self.output_rows = output_rows
+        self.state = "DONE"
+
+    def result(self, timeout: Optional[float] = None) -> "FakeJob":
+        return self
+
+
+class FakeBigQueryClient:
+    """
+    Reemplazo de `bigquery.Client`. `tables` guarda las definiciones de
+    tabla por ID completo (proyecto.dataset.tabla); `jobs` registra los
+    load jobs y queries emitidos, en orden.
+    """
+
+    def __init__(self, project: str = "fake-project"):
+        self.project = project
+        self.tables: Dict[str, object] = {}
+        self.jobs: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _table_id(self, table) -> str:
+        if isinstance(table, str):
+            return table if table.count(".") == 2 else f"{self.project}.{table}"
+        return f"{table.project}.{table.dataset_id}.{table.table_id}"
+
+    def create_table(self, table, exists_ok: bool = False):
+        table_id = self._table_id(table)
+        with self._lock:
+            if table_id in self.tables:
+                if not exists_ok:
+                    raise ValueError(f"La tabla ya existe: {table_id}")
+                return self.tables[table_id]
+            self.tables[table_id] = table
+        return table
+
+    def get_table(self, table):
+        table_id = self._table_id(table)
+        if table_id not in self.tables:
+            raise NotFound(f"Tabla no encontrada: {table_id}")
+        return self.tables[table_id]
+
+    def delete_table(self, table, not_found_ok: bool = False) -> None:
+        table_id = self._table_id(table)
+        with self._lock:
+            if self.tables.pop(table_id, None) is None and not not_found_ok:
+                raise NotFound(f"Tabla no encontrada: {table_id}")
+
+    def load_table_from_uri(self, source_uris, destination, job_config = None) -> FakeJob:
+        from google.cloud import bigquery
+
+        table_id = self._table_id(destination)
+        with self._lock:
+            if table_id not in self.tables:
+                # el load job crea la tabla destino si no existe
+                self.tables[table_id] = bigquery.Table(table_id, schema = job_config.schema if job_config else None)
+
+        job = FakeJob("load", _count_rows(source_uris, job_config))
+        self.jobs.append({
+            "type": "load",
+            "source_uris": source_uris,
+            "destination": table_id,
+            "job_config": job_config,
+            "output_rows": job.output_rows,
+        })
+        return job
+
+    def query(self, sql: str, job_config = None) -> FakeJob:
+        self.jobs.append({"type": "query", "sql": sql, "job_config": job_config})
+        return FakeJob("query")
+
+
+def _count_rows(source_uri: str, job_config) -> Optional[int]:
+    """
+    Filas del objeto (o prefijo con '*') de origen en el cliente GCS ya
+    configurado en el proceso, o None si no hay cliente o no se puede leer
+    (no se crea un cliente real, para no salir a la red).
+    """
+    import src.gcs_client as gcs_client
+
+    client = gcs_client._client
+    if client is None:
+        return None
+
+    bucket_name, _, name = source_uri.removeprefix("gs://").partition("/")
+    try:
+        bucket = client.bucket(bucket_name)
+        if name.endswith("*"):
+            blobs = list(bucket.list_blobs(prefix = name[:-1]))
+        else:
+            blobs = [bucket.blob(name)]
+        payloads = [blob.download_as_bytes() for blob in blobs]
+    except Exception:
+        return None
+
+    if job_config is not None and job_config.source_format == "PARQUET":
+        import pyarrow.parquet as pq
+
+        return sum(pq.ParquetFile(io.BytesIO(data)).metadata.num_rows for data in payloads)
+    import pandas as pd
+
+    return sum(len(pd.read_csv(io.BytesIO(data))) for data in payloads)
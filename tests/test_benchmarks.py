@@ -0,0 +1,101 @@
+"""
+test_benchmarks.py
+==================
+
+Pruebas del generador sintético y de la comparación de resultados de la
+suite de benchmarks, y guardia de imports perezosos de los módulos del
+pipeline.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_import import MODULES, dependencies, heavy_imports, import_profile, parse_importtime
+from benchmarks.run_benchmarks import compare_results
+from benchmarks.synthetic import (
+    FILAS_POR_SEMANA,
+    GRUPOS_EDAD,
+    REGIONES,
+    generate_frame,
+    generate_raw_csv,
+    semanas_del_ano,
+)
+from src.extract import EXPECTED_COLUMNS
+
+
+def test_semanas_del_ano_52_y_53():
+    assert semanas_del_ano(2019) == 52
+    assert semanas_del_ano(2020) == 53
+
+
+def test_generate_frame_respeta_semanas_por_ano():
+    filas = (semanas_del_ano(2010) + semanas_del_ano(2011)) * FILAS_POR_SEMANA
+    filas_2015 = sum(semanas_del_ano(a) for a in range(2010, 2016)) * FILAS_POR_SEMANA
+
+    df = generate_frame(0, filas_2015)
+    semanas = df.groupby("ANO_ESTADISTICO")["SEMANA_ESTADISTICA"].agg(["max", "size"])
+
+    assert semanas.loc[2015, "max"] == 53
+    assert semanas.loc[2014, "max"] == 52
+    assert (semanas["size"] == semanas["max"] * FILAS_POR_SEMANA).all()
+    assert set(df["REGION"]) == set(REGIONES)
+    assert set(df["GRUPO_EDAD"]) == set(GRUPOS_EDAD)
+    assert df.iloc[filas]["ANO_ESTADISTICO"] == 2012
+
+
+def test_generate_raw_csv_es_determinista(tmp_path):
+    a = generate_raw_csv(tmp_path / "a.csv", 25_000, seed = 7, chunk_size = 10_000)
+    b = generate_raw_csv(tmp_path / "b.csv", 25_000, seed = 7, chunk_size = 10_000)
+
+    assert a.read_bytes() == b.read_bytes()
+    df = pd.read_csv(a, sep = "|")
+    assert len(df) == 25_000
+    assert set(df.columns) == EXPECTED_COLUMNS
+
+
+def _doc(commit, wall_s, peak_rss_mb):
+    return {"commit": commit, "results": [{
+        "stage": "extract", "rows": 100_000, "backend": "pandas",
+        "wall_s": wall_s, "cpu_s": wall_s, "peak_rss_mb": peak_rss_mb,
+    }]}
+
+
+def test_compare_results_detecta_regresion():
+    regresiones = compare_results(_doc("a", 1.0, 200.0), _doc("b", 1.5, 205.0), threshold = 0.10)
+
+    assert {r["metric"] for r in regresiones} == {"wall_s", "cpu_s"}
+    assert regresiones[0]["change"] == 0.5
+
+
+def test_compare_results_ignora_ruido_y_mejoras():
+    assert compare_results(_doc("a", 0.010, 100.0), _doc("b", 0.020, 80.0)) == []
+
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 | site
+import time:        50 |         50 |     pandas.core
+import time:       200 |        250 |   pandas
+import time:        10 |         10 |   src.logger
+import time:        30 |        290 | src.extract
+"""
+
+
+def test_parse_importtime_subarbol():
+    entries = parse_importtime(IMPORTTIME)
+
+    assert entries[-1] == ("src.extract", 30, 290, 0)
+    assert [e[0] for e in dependencies(entries, "src.extract")] == ["src.logger", "pandas", "pandas.core"]
+    assert heavy_imports(entries) == ["pandas"]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_modulos_no_importan_librerias_pesadas(module):
+    """
+    Guardia: importar los módulos del pipeline (p. ej. para `--help` o la
+    validación de credenciales) no debe cargar pandas, numpy, pyarrow ni los
+    SDK de Google; se importan dentro de las etapas que los usan.
+    """
+    assert heavy_imports(import_profile(module)) == []
@@ -0,0 +1,148 @@
+"""
+test_cdc.py
+===========
+
+Tests unitarios para el módulo cdc.py.
+
+Responsabilidades validadas:
+    - Delta con filas insertadas, actualizadas y eliminadas, ignorando
+      FECHA_CARGA, con el mismo resultado para cualquier tamaño de bloque.
+    - Hash estable entre el DataFrame compacto y el CSV releído.
+    - Llaves naturales repetidas en la versión anterior.
+    - Carga del delta junto al snapshot en GCS (FakeClient), y omisión si
+      no hay versión anterior.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import gzip
+import io
+
+import pandas as pd
+import pytest
+from src.cdc import CDC_SUFFIX, OPERATION_COLUMN, cdc_delta, load_cdc_to_gcs, row_hashes
+from benchmarks.fake_gcs import FakeClient
+from src.gcs_client import use_client
+from src.load_gcs import BUCKET_NAME
+
+
+def _snapshot(semanas, muertes, fecha = "2026-01-01"):
+    n = len(semanas)
+    return pd.DataFrame({
+        "ANO_ESTADISTICO": [2025] * n,
+        "SEMANA_ESTADISTICA": semanas,
+        "GRUPO_EDAD": ["80 +"] * n,
+        "SEXO": ["F"] * n,
+        "REGION": ["Biobío"] * n,
+        "POBLACION": [1000] * n,
+        "MUERTES_OBS": muertes,
+        "EDAD_MIN": [80] * n,
+        "EDAD_MAX": pd.array([None] * n, dtype = "Int64"),
+        "EDAD_PROMEDIO": [None] * n,
+        "FECHA_CARGA": [fecha] * n,
+    })
+
+
+def _read_delta(path):
+    with gzip.open(path, "rt", encoding = "utf-8") as f:
+        return pd.read_csv(f, keep_default_na = False, dtype = str)
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    previous = _snapshot([1, 2, 3, 4], [10, 20, 30, 40])
+    # semana 2 cambia, semana 4 se elimina, semana 5 es nueva; FECHA_CARGA cambia en todas
+    current = _snapshot([1, 2, 3, 5], [10, 21, 30, 50], fecha = "2026-01-08")
+    previous.to_csv(tmp_path / "previous.csv", index = False)
+    current.to_csv(tmp_path / "current.csv", index = False)
+    return tmp_path / "previous.csv", tmp_path / "current.csv"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_delta_insert_update_delete(snapshots, tmp_path, chunk_size):
+    """
+    Valida el delta y su resumen con distintos tamaños de bloque.
+    """
+    previous, current = snapshots
+    summary = cdc_delta(previous, current, tmp_path / "delta.csv.gz", chunk_size)
+
+    assert summary == {"inserted": 1, "updated": 1, "deleted": 1}
+    delta = _read_delta(tmp_path / "delta.csv.gz")
+    assert list(delta.columns) == [OPERATION_COLUMN, *pd.read_csv(current, nrows = 0).columns]
+    assert delta[[OPERATION_COLUMN, "SEMANA_ESTADISTICA", "MUERTES_OBS"]].values.tolist() == [
+        ["U", "2", "21"], ["I", "5", "50"], ["D", "4", "40"],
+    ]
+    # los valores se copian tal como están en los snapshots
+    assert delta["EDAD_MAX"].tolist() == ["", "", ""]
+
+
+def test_sin_cambios_genera_delta_vacio(snapshots, tmp_path):
+    """
+    Valida que dos snapshots iguales (salvo FECHA_CARGA) produzcan un delta
+    con sólo el encabezado.
+    """
+    previous, _ = snapshots
+    summary = cdc_delta(previous, previous, tmp_path / "delta.csv.gz")
+
+    assert summary == {"inserted": 0, "updated": 0, "deleted": 0}
+    assert _read_delta(tmp_path / "delta.csv.gz").empty
+
+
+def test_hash_estable_entre_representaciones():
+    """
+    Valida que el DataFrame compacto (categóricas, enteros pequeños) y el
+    CSV releído tengan los mismos hashes.
+    """
+    from src.transform import compact_frame
+
+    df = _snapshot([1, 2], [10, 20]).assign(EDAD_PROMEDIO = [85.0, 85.0])
+    reread = pd.read_csv(io.StringIO(df.to_csv(index = False)))
+
+    for a, b in zip(row_hashes(compact_frame(df)), row_hashes(reread)):
+        assert (a == b).all()
+
+
+def test_llaves_repetidas(tmp_path):
+    """
+    Valida que una versión anterior con llaves naturales repetidas falle.
+    """
+    _snapshot([1, 1], [10, 20]).to_csv(tmp_path / "previous.csv", index = False)
+    _snapshot([1], [10]).to_csv(tmp_path / "current.csv", index = False)
+
+    with pytest.raises(ValueError, match = "repetidas"):
+        cdc_delta(tmp_path / "previous.csv", tmp_path / "current.csv", tmp_path / "delta.csv.gz")
+
+
+def test_load_cdc_to_gcs(snapshots):
+    """
+    Valida que el delta se suba junto al snapshot, comparando contra la
+    versión anterior más reciente (no contra versiones posteriores ni el
+    propio snapshot).
+    """
+    previous, current = snapshots
+    fake = FakeClient()
+    bucket = fake.bucket(BUCKET_NAME)
+    bucket.blob("transformed/ds_2026-01-01.csv").upload_from_filename(previous)
+    bucket.blob("transformed/ds_2026-01-08.csv").upload_from_filename(current)
+    bucket.blob("transformed/ds_2026-01-15.csv").upload_from_string(b"posterior")
+
+    with use_client(fake):
+        uri = load_cdc_to_gcs("ds", f"gs://{BUCKET_NAME}/transformed/ds_2026-01-08.csv", current)
+
+    assert uri == f"gs://{BUCKET_NAME}/transformed/ds_2026-01-08{CDC_SUFFIX}"
+    data = bucket.get_blob(f"transformed/ds_2026-01-08{CDC_SUFFIX}").download_as_bytes()
+    assert _read_delta(io.BytesIO(data))[OPERATION_COLUMN].tolist() == ["U", "I", "D"]
+
+
+def test_load_cdc_to_gcs_sin_version_anterior(snapshots):
+    """
+    Valida que sin versión anterior no se genere delta.
+    """
+    _, current = snapshots
+    fake = FakeClient()
+    fake.bucket(BUCKET_NAME).blob("transformed/ds_2026-01-08.csv").upload_from_filename(current)
+
+    with use_client(fake):
+        assert load_cdc_to_gcs("ds", f"gs://{BUCKET_NAME}/transformed/ds_2026-01-08.csv", current) is None
+    assert len(list(fake.bucket(BUCKET_NAME).list_blobs())) == 1
@@ -0,0 +1,185 @@
+"""
+test_checkpoint.py
+==================
+
+Tests unitarios para el módulo checkpoint.py.
+
+Responsabilidades validadas:
+    - Una etapa completada se reutiliza sólo con las mismas entradas.
+    - Un artefacto local modificado o eliminado invalida la etapa.
+    - `force` ignora las etapas registradas.
+    - El hash de archivos se reutiliza mientras no cambien tamaño y mtime.
+    - `clean` elimina manifiestos obsoletos y conserva los vigentes.
+    - `list` informa los manifiestos ilegibles sin interrumpirse.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import json
+
+import pytest
+import src.checkpoint as checkpoint
+from src.checkpoint import RunManifest, clean, fingerprint
+
+
+@pytest.fixture(autouse = True)
+def _checkpoint_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+
+
+def test_fingerprint_estable():
+    """
+    Valida que la huella no dependa del orden de las llaves.
+    """
+    assert fingerprint({"a": 1, "b": [2, 3]}) == fingerprint({"b": [2, 3], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_etapa_completada_se_reutiliza(tmp_path):
+    """
+    Valida que una etapa registrada se reutilice desde un manifiesto nuevo
+    con las mismas entradas, y no con entradas distintas.
+    """
+    artefacto = tmp_path / "salida.csv"
+    artefacto.write_text("A\n1\n")
+
+    RunManifest("dataset").complete("transform", {"raw": "abc"}, artefacto, watermark = (2025, 3))
+
+    manifest = RunManifest("dataset")
+    record = manifest.completed("transform", {"raw": "abc"})
+    assert record["artifact"] == str(artefacto)
+    assert record["watermark"] == [2025, 3]
+    assert manifest.completed("transform", {"raw": "otro"}) is None
+
+
+def test_artefacto_modificado_invalida(tmp_path):
+    """
+    Valida que un artefacto local modificado o eliminado invalide la etapa.
+    """
+    artefacto = tmp_path / "salida.csv"
+    artefacto.write_text("A\n1\n")
+    RunManifest("dataset").complete("transform", {}, artefacto)
+
+    artefacto.write_text("A\n22\n")
+    assert RunManifest("dataset").completed("transform", {}) is None
+
+    artefacto.unlink()
+    assert RunManifest("dataset").completed("transform", {}) is None
+
+
+def test_artefacto_directorio(tmp_path):
+    """
+    Valida el hash de un dataset Parquet (directorio de archivos).
+    """
+    dataset = tmp_path / "dataset"
+    (dataset / "ANO=2010").mkdir(parents = True)
+    (dataset / "ANO=2010" / "part-0.parquet").write_bytes(b"x")
+    RunManifest("dataset").complete("transform", {}, dataset)
+
+    assert RunManifest("dataset").completed("transform", {}) is not None
+    (dataset / "ANO=2010" / "part-1.parquet").write_bytes(b"y")
+    assert RunManifest("dataset").completed("transform", {}) is None
+
+
+def test_artefacto_remoto_sin_hash():
+    """
+    Valida que los artefactos remotos (URIs) se registren sin hash local.
+    """
+    RunManifest("dataset").complete("load_gcs", {"artifact": "abc"}, "gs://bucket/x.csv")
+
+    record = RunManifest("dataset").completed("load_gcs", {"artifact": "abc"})
+    assert record["artifact"] == "gs://bucket/x.csv"
+    assert record["artifact_hash"] is None
+
+
+def test_force_ignora_etapas(tmp_path):
+    """
+    Valida que `force` ignore las etapas registradas.
+    """
+    RunManifest("dataset").complete("load_gcs", {}, "gs://bucket/x.csv")
+
+    assert RunManifest("dataset", force = True).completed("load_gcs", {}) is None
+
+
+def test_file_hash_reutiliza_hash(monkeypatch, tmp_path):
+    """
+    Valida que el hash de un archivo sin cambios de tamaño ni mtime no se
+    recalcule, y que sí se recalcule al cambiar.
+    """
+    archivo = tmp_path / "raw.csv"
+    archivo.write_text("A\n1\n")
+    calls = []
+    original = checkpoint.content_hash
+    monkeypatch.setattr(checkpoint, "content_hash", lambda path: calls.append(path) or original(path))
+
+    manifest = RunManifest("dataset")
+    primero = manifest.file_hash(archivo)
+    manifest.save()
+    assert RunManifest("dataset").file_hash(archivo) == primero
+    assert len(calls) == 1
+
+    archivo.write_text("A\n22\n")
+    assert RunManifest("dataset").file_hash(archivo) != primero
+    assert len(calls) == 2
+    assert manifest.file_hash(tmp_path / "no_existe.csv") is None
+
+
+def test_clean_elimina_obsoletos(tmp_path):
+    """
+    Valida que `clean` elimine manifiestos antiguos, con artefactos
+    inexistentes, ilegibles o con `updated_at` inválido, y conserve los vigentes.
+    """
+    artefacto = tmp_path / "salida.csv"
+    artefacto.write_text("A\n1\n")
+    RunManifest("vigente").complete("transform", {}, artefacto)
+
+    huerfano = tmp_path / "huerfano.csv"
+    huerfano.write_text("A\n1\n")
+    RunManifest("huerfano").complete("transform", {}, huerfano)
+    huerfano.unlink()
+
+    antiguo = RunManifest("antiguo")
+    antiguo.complete("load_gcs", {}, "gs://bucket/x.csv")
+    data = json.loads(antiguo.path.read_text())
+    data["updated_at"] = "2000-01-01T00:00:00+00:00"
+    antiguo.path.write_text(json.dumps(data))
+
+    (checkpoint.CHECKPOINT_DIR / "roto.json").write_text("{")
+    for name, updated_at in (("sin_fecha", "no-fecha"), ("fecha_numerica", 123)):
+        data["updated_at"] = updated_at
+        (checkpoint.CHECKPOINT_DIR / f"{name}.json").write_text(json.dumps(data))
+
+    removed = {path.stem for path in clean(max_age_days = 30)}
+
+    assert removed == {"huerfano", "antiguo", "roto", "sin_fecha", "fecha_numerica"}
+    assert RunManifest("vigente").path.exists()
+    assert [p.stem for p in clean(remove_all = True)] == ["vigente"]
+
+
+def test_main_cli_clean(capsys):
+    """
+    Valida los comandos `list` y `clean --all` del CLI.
+    """
+    RunManifest("dataset").complete("load_gcs", {}, "gs://bucket/x.csv")
+
+    checkpoint.main(["list"])
+    assert "gs://bucket/x.csv" in capsys.readouterr().out
+
+    checkpoint.main(["clean", "--all"])
+    assert "eliminado" in capsys.readouterr().out
+    assert not list(checkpoint.CHECKPOINT_DIR.glob("*.json"))
+
+
+def test_main_cli_list_manifiesto_ilegible(capsys):
+    """
+    Valida que `list` informe un manifiesto ilegible y siga con los demás.
+    """
+    RunManifest("dataset").complete("load_gcs", {}, "gs://bucket/x.csv")
+    (checkpoint.CHECKPOINT_DIR / "roto.json").write_text("{")
+
+    checkpoint.main(["list"])
+
+    out = capsys.readouterr().out
+    assert "roto | ilegible" in out
+    assert "gs://bucket/x.csv" in out
@@ -11,6 +11,7 @@ Valida:
 - Error ante esquema inválido.
 - Error ante CSV vacío.
 - Propagación de errores inesperados de pandas.
+- dtypes estables entre bloques cuando hay nulos.
 
 
 Proyecto: ETL Datos Públicos
@@ -126,3 +127,136 @@ def test_extract_csv_generic_pandas_error(monkeypatch, tmp_path):
     with patch("pandas.read_csv", side_effect=RuntimeError("Error interno")):
         with pytest.raises(RuntimeError):
             extract_csv("data.csv")
+
+def test_extract_csv_chunks_success(monkeypatch):
+    """
+    Valida que extract_csv_chunks entregue el archivo completo por bloques
+    del tamaño solicitado, con los enteros nullable de INTEGER_DTYPES.
+    """
+    test_data_dir = Path(__file__).parent / "data"
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", test_data_dir)
+
+    chunks = list(extract.extract_csv_chunks("raw_data.csv", chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True),
+        extract_csv("raw_data.csv"),
+    )
+
+def test_extract_csv_chunks_dtypes_estables_con_nulos(monkeypatch, tmp_path):
+    """
+    Valida que un nulo en un bloque no lo convierta a float: todos los
+    bloques tienen los mismos dtypes y el CSV escrito conserva los enteros.
+    """
+    df = pd.read_csv(Path(__file__).parent / "data" / "raw_data.csv", sep="|")
+    df["MUERTES_OBS"] = df["MUERTES_OBS"].astype(object)
+    df.loc[7, "MUERTES_OBS"] = None
+    df.to_csv(tmp_path / "con_nulos.csv", sep="|", index=False)
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path)
+
+    chunks = list(extract.extract_csv_chunks("con_nulos.csv", chunk_size=3))
+
+    assert len({tuple(chunk.dtypes.astype(str)) for chunk in chunks}) == 1
+    assert str(chunks[2]["MUERTES_OBS"].dtype) == "Int32"
+    salida = "".join(chunk.to_csv(index=False, header=False) for chunk in chunks)
+    assert salida == df.to_csv(index=False, header=False)
+    assert ".0|" not in salida and ".0\n" not in salida
+
+def test_extract_csv_chunks_invalid_schema(monkeypatch):
+    """
+    Valida que el esquema se verifique contra el encabezado
+    antes de iterar los bloques.
+    """
+    test_data_dir = Path(__file__).parent / "data"
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", test_data_dir)
+
+    with pytest.raises(ValueError):
+        extract.extract_csv_chunks("invalid_schema_raw.csv", chunk_size=3)
+
+def test_extract_csv_chunks_without_rows(monkeypatch, tmp_path):
+    """
+    Valida que se lance ValueError al iterar un archivo sólo con encabezado.
+    """
+    csv_file = tmp_path / "header_only.csv"
+    csv_file.write_text(
+        "ANO_ESTADISTICO|SEMANA_ESTADISTICA|GRUPO_EDAD|SEXO|REGION|POBLACION|MUERTES_OBS\n"
+    )
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path)
+
+    chunks = extract.extract_csv_chunks("header_only.csv", chunk_size=3)
+    with pytest.raises(ValueError):
+        list(chunks)
+
+def test_extract_csv_pyarrow_backend(monkeypatch):
+    """
+    Valida que el backend pyarrow entregue los mismos datos que pandas,
+    con las categóricas de COLUMN_DTYPES y los enteros nullable de
+    INTEGER_DTYPES.
+    """
+    test_data_dir = Path(__file__).parent / "data"
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", test_data_dir)
+
+    df_arrow = extract_csv("raw_data.csv", backend="pyarrow")
+    df_pandas = extract_csv("raw_data.csv")
+
+    assert {col: str(dtype) for col, dtype in df_arrow.dtypes.items()} == {
+        **extract.COLUMN_DTYPES, **extract.INTEGER_DTYPES
+    }
+    pd.testing.assert_frame_equal(df_arrow, df_pandas, check_dtype=False, check_categorical=False)
+
+def test_extract_csv_pyarrow_invalid_schema(monkeypatch):
+    """
+    Valida que el backend pyarrow también aplique la validación de esquema.
+    """
+    test_data_dir = Path(__file__).parent / "data"
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", test_data_dir)
+
+    with pytest.raises(ValueError):
+        extract_csv("invalid_schema_raw.csv", backend="pyarrow")
+
+def test_extract_csv_pyarrow_empty_file(monkeypatch, tmp_path):
+    """
+    Valida que un archivo vacío levante EmptyDataError también con pyarrow.
+    """
+    (tmp_path / "vacio.csv").write_text("")
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path)
+
+    with pytest.raises(pd_errors.EmptyDataError):
+        extract_csv("vacio.csv", backend="pyarrow")
+
+def test_extract_csv_pyarrow_parser_error(monkeypatch, tmp_path):
+    """
+    Valida que un valor no convertible al esquema tipado levante ParserError.
+    """
+    (tmp_path / "tipos.csv").write_text(
+        "ANO_ESTADISTICO|SEMANA_ESTADISTICA|GRUPO_EDAD|SEXO|REGION|POBLACION|MUERTES_OBS\n"
+        "2010|x|0 a 14|1|Metropolitana|100|1\n"
+    )
+
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path)
+
+    with pytest.raises(pd_errors.ParserError):
+        extract_csv("tipos.csv", backend="pyarrow")
+
+def test_extract_csv_invalid_backend():
+    """
+    Valida que un backend desconocido sea rechazado.
+    """
+    with pytest.raises(ValueError):
+        extract_csv("raw_data.csv", backend="polars")
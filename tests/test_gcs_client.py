@@ -0,0 +1,76 @@
+"""
+test_gcs_client.py
+==================
+
+Tests unitarios para el módulo gcs_client.py.
+
+Valida:
+- Creación perezosa y reutilización del cliente por proceso.
+- Cache de handles de bucket.
+- Inyección y restauración de un cliente alternativo.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+import src.gcs_client as gcs_client
+from benchmarks.fake_gcs import FakeClient
+from src.gcs_client import get_bucket, get_client, reset_client, set_client, use_client
+
+@pytest.fixture(autouse=True)
+def _cliente_limpio():
+    reset_client()
+    yield
+    reset_client()
+
+def test_get_client_lazy_y_reutilizado():
+    """
+    Valida que el cliente se cree sólo en el primer uso y luego se reutilice.
+    """
+    with patch.object(gcs_client, "_create_client", side_effect=lambda: FakeClient()) as mock_create:
+        mock_create.assert_not_called()
+
+        first = get_client()
+        second = get_client()
+
+    assert first is second
+    mock_create.assert_called_once()
+
+def test_get_client_recrea_tras_fork():
+    """
+    Valida que en un proceso distinto (pid diferente) se cree otro cliente.
+    """
+    with patch.object(gcs_client, "_create_client", side_effect=lambda: FakeClient()):
+        first = get_client()
+        with patch("src.gcs_client.os.getpid", return_value=-1):
+            second = get_client()
+
+    assert first is not second
+
+def test_get_bucket_cacheado():
+    """
+    Valida que el handle de bucket se reutilice entre llamadas.
+    """
+    set_client(FakeClient())
+
+    assert get_bucket("bucket") is get_bucket("bucket")
+    assert get_bucket("bucket") is not get_bucket("otro")
+
+def test_use_client_restaura_cliente_previo():
+    """
+    Valida que use_client inyecte el cliente sólo dentro del bloque.
+    """
+    original = FakeClient()
+    injected = FakeClient()
+    set_client(original)
+
+    with use_client(injected):
+        assert get_client() is injected
+        assert get_bucket("bucket").client is injected
+
+    assert get_client() is original
+    assert get_bucket("bucket").client is original
@@ -16,16 +16,20 @@ Casos cubiertos
 - Archivo vacío debe lanzar EmptyDataError.
 - Archivo malformado (separador incorrecto) debe lanzar ParserError.
 - CSV con valores nulos debe ejecutarse sin errores y mostrar conteo de nulos.
+- Estadísticos en línea iguales a los de pandas e independientes del tamaño de bloque.
+- Valores más frecuentes, estimación de distintos y salida JSON del CLI.
 
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez. N.
 Fecha: 9 de enero de 2026.
 """
 
+import json
+import numpy as np
 import pytest
 import pandas as pd
 from pathlib import Path
-from src.inspect_csv import inspect_csv
+from src.inspect_csv import HyperLogLog, inspect_csv, main
 
 # Columnas esperadas en tu esquema
 EXPECTED_COLUMNS = [ 
@@ -95,3 +99,102 @@ def test_inspect_csv_with_nulls(tmp_path):
     
     df.to_csv(file, sep="|", index=False) 
     inspect_csv(file)
+
+
+def _write_numeric_csv(path, rows = 5_000, seed = 7):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ANO_ESTADISTICO": rng.integers(2000, 2025, rows),
+        "REGION": rng.choice(["Metropolitana", "Valparaíso", "Biobío"], rows, p = [0.6, 0.3, 0.1]),
+        "POBLACION": rng.normal(50_000, 1_000, rows).round(2),
+    })
+    df.loc[::10, "POBLACION"] = None
+    df.to_csv(path, sep = "|", index = False)
+    return pd.read_csv(path, sep = "|")
+
+
+def test_inspect_csv_stats_match_pandas(tmp_path):
+    """
+    Verifica que los estadísticos en línea coinciden con los de pandas.
+    """
+    file = tmp_path / "numerico.csv"
+    df = _write_numeric_csv(file)
+
+    perfil = inspect_csv(file, chunk_size = 700)
+
+    assert perfil["rows"] == len(df)
+    assert perfil["columns"] == 3
+    poblacion = perfil["profile"]["POBLACION"]
+    assert poblacion["count"] == df["POBLACION"].count()
+    assert poblacion["nulls"] == df["POBLACION"].isna().sum()
+    assert poblacion["min"] == df["POBLACION"].min()
+    assert poblacion["max"] == df["POBLACION"].max()
+    assert poblacion["mean"] == pytest.approx(df["POBLACION"].mean())
+    assert poblacion["stddev"] == pytest.approx(df["POBLACION"].std())
+
+    ano = perfil["profile"]["ANO_ESTADISTICO"]
+    assert isinstance(ano["min"], int)
+    assert ano["distinct_approx"] == df["ANO_ESTADISTICO"].nunique()
+
+
+def test_inspect_csv_chunk_size_does_not_change_profile(tmp_path):
+    """
+    Verifica que el perfil por bloques coincide con el de un solo bloque.
+    """
+    file = tmp_path / "numerico.csv"
+    _write_numeric_csv(file)
+
+    por_bloques = inspect_csv(file, chunk_size = 333)["profile"]
+    completo = inspect_csv(file, chunk_size = 1_000_000)["profile"]
+
+    for column, perfil in completo.items():
+        for key in ("count", "nulls", "min", "max", "distinct_approx"):
+            assert por_bloques[column][key] == perfil[key]
+        # sobre la capacidad de Misra-Gries los conteos son aproximados
+        if perfil["top_exact"] and por_bloques[column]["top_exact"]:
+            assert por_bloques[column]["top"] == perfil["top"]
+        if "mean" in perfil:
+            assert por_bloques[column]["mean"] == pytest.approx(perfil["mean"])
+            assert por_bloques[column]["stddev"] == pytest.approx(perfil["stddev"])
+
+
+def test_inspect_csv_top_values(tmp_path):
+    """
+    Verifica los valores más frecuentes de una columna de texto.
+    """
+    file = tmp_path / "numerico.csv"
+    df = _write_numeric_csv(file)
+
+    region = inspect_csv(file, chunk_size = 500, top_k = 2)["profile"]["REGION"]
+    esperado = df["REGION"].value_counts().head(2)
+
+    assert region["top"] == [{"value": v, "count": int(c)} for v, c in esperado.items()]
+    assert region["top_exact"] is True
+    assert "mean" not in region
+
+
+def test_hyperloglog_estimate():
+    """
+    Verifica que el error de HyperLogLog está dentro de lo esperado.
+    """
+    hll = HyperLogLog()
+    valores = pd.Series(np.arange(200_000))
+    hll.add_hashes(pd.util.hash_pandas_object(valores, index = False).to_numpy())
+
+    assert hll.estimate() == pytest.approx(200_000, rel = 0.03)
+
+
+def test_inspect_csv_main_writes_json(tmp_path):
+    """
+    Verifica que el CLI guarda el perfil como JSON válido.
+    """
+    file = tmp_path / "numerico.csv"
+    _write_numeric_csv(file)
+    salida = tmp_path / "perfil" / "perfil.json"
+
+    main([str(file), "--output", str(salida), "--chunk-size", "1000"])
+
+    perfil = json.loads(salida.read_text(encoding = "utf-8"))
+    assert perfil["rows"] == 5_000
+    assert set(perfil["profile"]) == {"ANO_ESTADISTICO", "REGION", "POBLACION"}
+    assert len(perfil["head"]) == 5
@@ -8,6 +8,7 @@ Responsabilidades validadas:
     - Escritura correcta de DataFrame a CSV
     - Creación automática del directorio destino
     - Manejo de errores ante entradas inválidas
+    - Escritura atómica y comprimida de CSV (write_csv)
 
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez N.
@@ -18,7 +19,15 @@ from pathlib import Path
 import pandas as pd
 import pytest
 
-from src.load import load_csv
+from src.load import (
+    load_csv,
+    load_csv_chunks,
+    load_parquet,
+    load_parquet_chunks,
+    write_csv,
+    written_crc32c,
+)
+from src.load_gcs import file_crc32c
 
 def test_load_csv_success(tmp_path):
     """
@@ -87,3 +96,229 @@ def test_load_csv_empty_df(tmp_path):
             file_name = "empty.csv"
         )
 
+
+def test_load_csv_chunks_identico_a_load_csv(tmp_path):
+    """
+    Valida que la escritura por bloques produzca un archivo
+    idéntico byte a byte al de load_csv.
+    """
+    df = pd.DataFrame({
+        "A": [1, 2, 3, 4, 5],
+        "B": ["x", "y", "z", "w", "v"],
+        "C": [0.5, 1.0, 1.5, 2.0, 2.5],
+    })
+
+    batch_path = load_csv(df, tmp_path / "batch", "data.csv")
+    chunks = (df.iloc[i:i + 2] for i in range(0, len(df), 2))
+    stream_path = load_csv_chunks(chunks, tmp_path / "stream", "data.csv")
+
+    assert stream_path.read_bytes() == batch_path.read_bytes()
+
+def test_load_csv_chunks_sin_filas(tmp_path):
+    """
+    Valida que load_csv_chunks lance ValueError y no deje archivo
+    cuando no recibe filas.
+    """
+    with pytest.raises(ValueError):
+        load_csv_chunks(iter([]), tmp_path, "empty.csv")
+
+    assert not (tmp_path / "empty.csv").exists()
+
+#=========================
+#write_csv
+#=========================
+
+def _frame(rows: int = 1000) -> pd.DataFrame:
+    return pd.DataFrame({
+        "A": range(rows),
+        "B": [f"valor {i % 7}" for i in range(rows)],
+        "C": [i / 4 for i in range(rows)],
+    })
+
+def test_write_csv_identico_a_to_csv(tmp_path):
+    """
+    Valida que sin compresión el archivo sea idéntico a df.to_csv, aunque se
+    serialice por bloques, y que no quede el temporal .part.
+    """
+    df = _frame()
+    df.to_csv(tmp_path / "ref.csv", index=False)
+
+    written = write_csv(df, tmp_path / "data.csv", chunk_rows=64, buffer_size=1024)
+
+    assert written.path.read_bytes() == (tmp_path / "ref.csv").read_bytes()
+    assert written.rows == len(df)
+    assert written.size == written.path.stat().st_size
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.csv", "ref.csv"]
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_write_csv_comprimido_ida_y_vuelta(tmp_path, compression):
+    """
+    Valida que el CSV comprimido (desde un DataFrame o desde bloques) se
+    descomprima al mismo contenido, y que el tamaño y el CRC32C retornados
+    correspondan a los bytes escritos.
+    """
+    import pyarrow as pa
+
+    df = _frame()
+    chunks = (df.iloc[i:i + 300] for i in range(0, len(df), 300))
+    written = write_csv(chunks, tmp_path / "data.csv.x", compression=compression, chunk_rows=128)
+
+    with pa.CompressedInputStream(pa.OSFile(str(written.path)), compression) as stream:
+        assert stream.read() == df.to_csv(index=False).encode("utf-8")
+
+    assert written.size == written.path.stat().st_size
+    assert written.crc32c == file_crc32c(tmp_path / "data.csv.x", block_size=7)
+
+def test_write_csv_gzip_determinista(tmp_path):
+    """
+    Valida que el mismo contenido produzca los mismos bytes gzip (lo que
+    permite omitir la carga a GCS si no cambió) y que pandas lo lea.
+    """
+    df = _frame()
+    first = write_csv(df, tmp_path / "a.csv.gz", compression="gzip")
+    second = write_csv(df, tmp_path / "b.csv.gz", compression="gzip", chunk_rows=100)
+
+    assert first.crc32c == second.crc32c
+    pd.testing.assert_frame_equal(pd.read_csv(first.path), df)
+
+def test_write_csv_falla_conserva_archivo_anterior(tmp_path):
+    """
+    Valida que si la escritura falla a mitad de camino el archivo final
+    anterior quede intacto y no quede el temporal .part.
+    """
+    output_path = tmp_path / "data.csv"
+    output_path.write_bytes(b"anterior")
+
+    def chunks():
+        yield _frame(10)
+        raise RuntimeError("fallo del transform")
+
+    with pytest.raises(RuntimeError):
+        write_csv(chunks(), output_path)
+
+    assert output_path.read_bytes() == b"anterior"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.csv"]
+
+def test_write_csv_compresion_invalida(tmp_path):
+    with pytest.raises(ValueError):
+        write_csv(_frame(10), tmp_path / "data.csv", compression="bz2")
+
+def test_written_crc32c_invalida_si_cambia(tmp_path):
+    """
+    Valida que el CRC32C registrado se reutilice sólo mientras el archivo
+    no cambie.
+    """
+    written = write_csv(_frame(10), tmp_path / "data.csv")
+    assert written_crc32c(written.path) == written.crc32c
+
+    written.path.write_bytes(b"otro contenido")
+    assert written_crc32c(written.path) is None
+    assert written_crc32c(tmp_path / "no_existe.csv") is None
+
+def test_load_parquet_particionado(tmp_path):
+    """
+    Valida que load_parquet escriba un árbol Hive por ANO_ESTADISTICO
+    cuyo contenido, leído completo, coincide con el DataFrame original.
+    """
+    import pyarrow.dataset as ds
+
+    df = pd.DataFrame({
+        "ANO_ESTADISTICO": [2010, 2010, 2011],
+        "REGION": ["Metropolitana", "De Atacama", "Metropolitana"],
+        "SEXO": ["M", "F", "M"],
+        "MUERTES_OBS": [1, 2, 3],
+    })
+
+    dataset_dir = load_parquet(df, tmp_path, "dataset", partition_cols=["ANO_ESTADISTICO"])
+
+    assert sorted(p.name for p in dataset_dir.iterdir()) == ["ANO_ESTADISTICO=2010", "ANO_ESTADISTICO=2011"]
+
+    df_loaded = (
+        ds.dataset(dataset_dir, partitioning="hive").to_table().to_pandas()
+        .sort_values("MUERTES_OBS").reset_index(drop=True)
+    )
+    assert df_loaded["ANO_ESTADISTICO"].tolist() == [2010, 2010, 2011]
+    pd.testing.assert_frame_equal(
+        df_loaded[["REGION", "SEXO", "MUERTES_OBS"]], df[["REGION", "SEXO", "MUERTES_OBS"]]
+    )
+
+def test_load_parquet_reemplaza_dataset_anterior(tmp_path):
+    """
+    Valida que una nueva escritura no deje particiones de corridas anteriores.
+    """
+    df_old = pd.DataFrame({"ANO_ESTADISTICO": [2009], "A": [1]})
+    df_new = pd.DataFrame({"ANO_ESTADISTICO": [2010], "A": [2]})
+
+    load_parquet(df_old, tmp_path, "dataset", partition_cols=["ANO_ESTADISTICO"])
+    dataset_dir = load_parquet(df_new, tmp_path, "dataset", partition_cols=["ANO_ESTADISTICO"])
+
+    assert [p.name for p in dataset_dir.iterdir()] == ["ANO_ESTADISTICO=2010"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dataset"]
+
+def test_load_parquet_chunks_falla_conserva_dataset_anterior(tmp_path):
+    """
+    Valida que, si un bloque falla a mitad de la escritura, el dataset
+    anterior quede intacto y no quede el directorio temporal.
+    """
+    import pyarrow.dataset as ds
+
+    load_parquet(pd.DataFrame({"A": [1, 2]}), tmp_path, "dataset")
+
+    def chunks():
+        yield pd.DataFrame({"A": [3]})
+        raise RuntimeError("falla en el bloque")
+
+    with pytest.raises(RuntimeError, match="falla en el bloque"):
+        load_parquet_chunks(chunks(), tmp_path, "dataset")
+
+    assert ds.dataset(tmp_path / "dataset").to_table()["A"].to_pylist() == [1, 2]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dataset"]
+
+def test_load_parquet_chunks_sin_particion(tmp_path):
+    """
+    Valida que la escritura por bloques genere un archivo por bloque
+    y conserve todas las filas.
+    """
+    import pyarrow.dataset as ds
+
+    df = pd.DataFrame({"A": range(5), "B": list("abcde")})
+    chunks = (df.iloc[i:i + 2] for i in range(0, len(df), 2))
+
+    dataset_dir = load_parquet_chunks(chunks, tmp_path, "dataset")
+
+    assert len(list(dataset_dir.glob("*.parquet"))) == 3
+    assert ds.dataset(dataset_dir).to_table().num_rows == 5
+
+def test_load_parquet_fecha_carga_compacta_como_date(tmp_path):
+    """
+    Valida que FECHA_CARGA del modo compacto (datetime64) se escriba como
+    date32, el tipo DATE del esquema de BigQuery, igual que en el modo normal.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from datetime import date
+
+    normal = pd.DataFrame({"A": [1, 2], "FECHA_CARGA": [date(2026, 1, 1)] * 2})
+    compacto = normal.assign(FECHA_CARGA=pd.to_datetime(normal["FECHA_CARGA"]).astype("datetime64[s]"))
+
+    for nombre, df in (("normal", normal), ("compacto", compacto)):
+        dataset_dir = load_parquet(df, tmp_path, nombre)
+        table = ds.dataset(dataset_dir).to_table()
+        assert table.schema.field("FECHA_CARGA").type == pa.date32()
+        assert table["FECHA_CARGA"].to_pylist() == [date(2026, 1, 1)] * 2
+
+def test_load_parquet_particion_invalida(tmp_path):
+    """
+    Valida que se rechacen columnas de particionado no soportadas.
+    """
+    df = pd.DataFrame({"A": [1]})
+
+    with pytest.raises(ValueError):
+        load_parquet(df, tmp_path, "dataset", partition_cols=["A"])
+
+def test_load_parquet_empty_df(tmp_path):
+    """
+    Valida que load_parquet lance ValueError cuando el DataFrame está vacío.
+    """
+    with pytest.raises(ValueError):
+        load_parquet(pd.DataFrame(), tmp_path, "dataset")
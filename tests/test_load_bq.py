@@ -0,0 +1,170 @@
+"""
+test_load_bq.py
+===============
+
+Tests unitarios para el módulo load_bq.py, con FakeBigQueryClient y
+FakeClient (GCS) en memoria, sin credenciales ni red.
+
+Responsabilidades validadas:
+    - Tabla destino particionada por año y clusterizada por semana/región/sexo.
+    - Estrategia append: un load job WRITE_APPEND directo sobre la tabla.
+    - Estrategia merge: staging + MERGE acotado a los años cargados, y
+      limpieza del staging también si el MERGE falla.
+    - Carga de datasets Parquet particionados estilo Hive.
+    - Validaciones de estrategia, formato y URI.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import pandas as pd
+import pytest
+from tests.fake_bq import FakeBigQueryClient
+from benchmarks.fake_gcs import FakeClient
+from src.gcs_client import use_client
+from src.load_bq import (
+    CLUSTERING_FIELDS,
+    KEY_COLUMNS,
+    PARTITION_FIELD,
+    STAGING_SUFFIX,
+    load_gcs_to_bigquery,
+    merge_sql,
+    use_bq_client,
+)
+from src.load_gcs import BUCKET_NAME, load_dataframe_to_gcs
+
+TABLE = "epidemiologia.defunciones"
+
+
+def _df():
+    return pd.DataFrame({
+        "ANO_ESTADISTICO": [2024, 2024, 2025],
+        "SEMANA_ESTADISTICA": [52, 53, 1],
+        "GRUPO_EDAD": ["0 a 14", "0 a 14", "0 a 14"],
+        "SEXO": ["M", "M", "F"],
+        "REGION": ["Metropolitana", "Metropolitana", "Biobío"],
+        "POBLACION": [100, 100, 200],
+        "MUERTES_OBS": [1, 2, 3],
+        "EDAD_MIN": [0, 0, 0],
+        "EDAD_MAX": [14, 14, 14],
+        "EDAD_PROMEDIO": [7.0, 7.0, 7.0],
+        "FECHA_CARGA": ["2026-01-01"] * 3,
+    })
+
+
+def test_append_crea_tabla_particionada():
+    """
+    Valida que append cree la tabla particionada/clusterizada y emita un
+    único load job WRITE_APPEND sobre ella.
+    """
+    bq = FakeBigQueryClient()
+    with use_bq_client(bq):
+        table_id = load_gcs_to_bigquery(f"gs://{BUCKET_NAME}/transformed/x.csv", TABLE, strategy = "append")
+
+    assert table_id == f"fake-project.{TABLE}"
+    table = bq.tables[table_id]
+    assert table.range_partitioning.field == PARTITION_FIELD
+    assert table.clustering_fields == CLUSTERING_FIELDS
+
+    assert [job["type"] for job in bq.jobs] == ["load"]
+    config = bq.jobs[0]["job_config"]
+    assert bq.jobs[0]["destination"] == table_id
+    assert config.write_disposition == "WRITE_APPEND"
+    assert config.source_format == "CSV"
+    assert config.skip_leading_rows == 1
+
+
+def test_merge_usa_staging_y_lo_elimina():
+    """
+    Valida que merge cargue a un staging, haga MERGE sobre la tabla
+    destino y elimine el staging.
+    """
+    bq = FakeBigQueryClient()
+    with use_bq_client(bq):
+        table_id = load_gcs_to_bigquery(f"gs://{BUCKET_NAME}/transformed/x.csv", TABLE)
+
+    load, query = bq.jobs
+    assert load["destination"].startswith(f"{table_id}{STAGING_SUFFIX}_")
+    assert load["job_config"].write_disposition == "WRITE_TRUNCATE"
+    assert f"MERGE `{table_id}` T" in query["sql"]
+    assert f"USING `{load['destination']}` S" in query["sql"]
+    assert set(bq.tables) == {table_id}
+
+
+def test_merge_sql_poda_particiones_por_llave():
+    """
+    Valida que el MERGE se acote a los años del staging y use la llave natural.
+    """
+    sql = merge_sql("p.d.t", "p.d.s")
+
+    assert "ARRAY_AGG(DISTINCT ANO_ESTADISTICO IGNORE NULLS) FROM `p.d.s`" in sql
+    assert "T.ANO_ESTADISTICO IN UNNEST(anos)" in sql
+    for column in KEY_COLUMNS:
+        #las columnas de la llave admiten nulos: NULL = NULL no calza en SQL
+        assert f"T.{column} IS NOT DISTINCT FROM S.{column}" in sql
+        assert f"T.{column} = S.{column}" not in sql
+        assert f"{column} = S.{column}," not in sql
+    assert "MUERTES_OBS = S.MUERTES_OBS" in sql
+
+
+def test_merge_elimina_staging_si_falla(monkeypatch):
+    """
+    Valida que el staging se elimine aunque el MERGE falle.
+    """
+    bq = FakeBigQueryClient()
+
+    def falla(sql, job_config = None):
+        raise RuntimeError("MERGE fallido")
+
+    monkeypatch.setattr(bq, "query", falla)
+    with use_bq_client(bq), pytest.raises(RuntimeError):
+        load_gcs_to_bigquery(f"gs://{BUCKET_NAME}/transformed/x.csv", TABLE)
+
+    assert set(bq.tables) == {f"fake-project.{TABLE}"}
+
+
+def test_carga_desde_objeto_gcs_reporta_filas():
+    """
+    Valida la carga encadenada GCS -> BigQuery: el load job lee el objeto
+    subido y reporta sus filas.
+    """
+    bq = FakeBigQueryClient()
+    with use_client(FakeClient()), use_bq_client(bq):
+        uri = load_dataframe_to_gcs(_df(), "dataset")
+        load_gcs_to_bigquery(uri, TABLE, strategy = "append")
+
+    assert bq.jobs[0]["source_uris"] == uri
+    assert bq.jobs[0]["output_rows"] == 3
+
+
+def test_parquet_hive():
+    """
+    Valida que un dataset Parquet particionado se cargue con comodín y
+    opciones de particionado Hive sobre el prefijo.
+    """
+    bq = FakeBigQueryClient()
+    prefix = f"gs://{BUCKET_NAME}/transformed/dataset_2026-01-01/"
+    with use_bq_client(bq):
+        load_gcs_to_bigquery(prefix, TABLE, file_format = "parquet", strategy = "append", hive_partitioned = True)
+
+    job = bq.jobs[0]
+    assert job["source_uris"] == f"{prefix}*"
+    assert job["job_config"].source_format == "PARQUET"
+    assert job["job_config"].hive_partitioning.source_uri_prefix == prefix
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"strategy": "replace"},
+    {"file_format": "json"},
+    {"source_uri": "/tmp/archivo.csv"},
+])
+def test_validaciones(kwargs):
+    """
+    Valida que estrategias, formatos o URIs inválidos levanten ValueError
+    antes de usar el cliente.
+    """
+    params = {"source_uri": f"gs://{BUCKET_NAME}/x.csv", "table_id": TABLE, **kwargs}
+    bq = FakeBigQueryClient()
+    with use_bq_client(bq), pytest.raises(ValueError):
+        load_gcs_to_bigquery(**params)
+    assert bq.jobs == []
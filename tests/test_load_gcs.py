@@ -8,16 +8,29 @@ Responsabilidades validadas:
     - Manejo de error si el archivo local no existe
     - Construcción correcta del nombre versionado
     - Invocación de upload_from_filename al cliente gcs
+    - Omisión de cargas sin cambios, también en otro día (hash sin FECHA_CARGA)
 
 Proyecto: ETL Datos Públicos
 Autor: E. Henríquez N.
 Fecha: 9 de enero de 2026
 """
 
+import pandas as pd
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
-from src.load_gcs import load_csv_to_gcs
+from benchmarks.fake_gcs import FakeClient
+from src.gcs_client import use_client
+from src.load_gcs import (
+    BUCKET_NAME,
+    TMP_PARTS_PREFIX,
+    UPLOAD_STATS,
+    file_crc32c,
+    latest_version_blob,
+    load_csv_to_gcs,
+    load_dataframe_to_gcs,
+    upload_composite,
+)
 
 def test_load_csv_to_gcs_file_not_found(tmp_path):
     """
@@ -27,9 +40,9 @@ def test_load_csv_to_gcs_file_not_found(tmp_path):
     with pytest.raises(FileNotFoundError):
         load_csv_to_gcs(base_file_name)
 
-#se mockea el cliente de GCS para evitar conexión real 
-@patch("src.load_gcs.storage.Client")
-def test_load_csv_to_gcs_success(mock_client, tmp_path):
+#se mockea el bucket del cliente GCS compartido para evitar conexión real 
+@patch("src.load_gcs.get_bucket")
+def test_load_csv_to_gcs_success(mock_get_bucket, tmp_path):
     """
     Valida que se invoque upload_from_filename correctamente cuando
     el archivo existe.
@@ -43,10 +56,324 @@ def test_load_csv_to_gcs_success(mock_client, tmp_path):
     with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path):
         mock_bucket = MagicMock()
         mock_blob = MagicMock()
-        mock_client.return_value.bucket.return_value = mock_bucket
+        mock_get_bucket.return_value = mock_bucket
         mock_bucket.blob.return_value = mock_blob
 
         load_csv_to_gcs(base_file_name)
         mock_blob.upload_from_filename.assert_called_once_with(local_file)
 
 
+
+@patch("src.load_gcs.get_bucket")
+def test_load_csv_to_gcs_parquet_sube_arbol(mock_get_bucket, tmp_path):
+    """
+    Valida que en formato parquet se suba cada archivo del árbol de
+    particiones bajo un prefijo versionado, conservando la ruta relativa.
+    """
+    base_file_name = "dataset"
+    for year in (2010, 2011):
+        partition = tmp_path / base_file_name / f"ANO_ESTADISTICO={year}"
+        partition.mkdir(parents=True)
+        (partition / "part-00000-0.parquet").write_bytes(b"PAR1")
+
+    mock_bucket = MagicMock()
+    mock_get_bucket.return_value = mock_bucket
+
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path):
+        uri = load_csv_to_gcs(base_file_name, file_format="parquet")
+
+    object_paths = [c.args[0] for c in mock_bucket.blob.call_args_list]
+    assert len(object_paths) == 2
+    assert all(p.startswith("transformed/dataset_") for p in object_paths)
+    assert object_paths[0].endswith("/ANO_ESTADISTICO=2010/part-00000-0.parquet")
+    assert uri.startswith("gs://") and uri.endswith("/")
+
+def test_load_csv_to_gcs_parquet_not_found(tmp_path):
+    """
+    Valida que se lance FileNotFoundError si el dataset Parquet no existe.
+    """
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_csv_to_gcs("no_existe", file_format="parquet")
+
+#=========================
+#Skip si no hay cambios
+#=========================
+
+def test_file_crc32c_por_bloques(tmp_path):
+    """
+    Valida el CRC32C en formato GCS (base64 big-endian) leyendo por bloques.
+    Valor de referencia: crc32c('123456789') = 0xE3069283.
+    """
+    local_file = tmp_path / "check.csv"
+    local_file.write_bytes(b"123456789")
+
+    assert file_crc32c(local_file, block_size=2) == "4waSgw=="
+
+def test_load_csv_to_gcs_skip_sin_cambios(tmp_path):
+    """
+    Valida que no se suba el archivo cuando su contenido coincide con la
+    última versión existente, y que la omisión quede contabilizada.
+    """
+    base_file_name = "test_file"
+    content = b"A,B\n1,x\n"
+    (tmp_path / f"{base_file_name}.csv").write_bytes(content)
+
+    fake = FakeClient()
+    bucket = fake.bucket(BUCKET_NAME)
+    bucket.blob(f"transformed/{base_file_name}_2025-12-30.csv").upload_from_string(b"viejo")
+    bucket.blob(f"transformed/{base_file_name}_2026-01-01.csv").upload_from_string(content)
+    uploads_before = fake.uploads
+    skipped_before = UPLOAD_STATS["skipped"]
+
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path), \
+         use_client(fake):
+        uri = load_csv_to_gcs(base_file_name)
+
+    assert fake.uploads == uploads_before
+    assert UPLOAD_STATS["skipped"] == skipped_before + 1
+    assert uri == f"gs://{BUCKET_NAME}/transformed/{base_file_name}_2026-01-01.csv"
+
+def test_load_csv_to_gcs_sube_si_cambia(tmp_path):
+    """
+    Valida que se suba una nueva versión cuando el contenido cambió
+    respecto de la última versión, aunque una anterior coincida.
+    """
+    base_file_name = "test_file"
+    content = b"A,B\n1,x\n"
+    (tmp_path / f"{base_file_name}.csv").write_bytes(content)
+
+    fake = FakeClient()
+    bucket = fake.bucket(BUCKET_NAME)
+    bucket.blob(f"transformed/{base_file_name}_2025-12-30.csv").upload_from_string(content)
+    bucket.blob(f"transformed/{base_file_name}_2026-01-01.csv").upload_from_string(b"distinto")
+
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path), \
+         use_client(fake):
+        uri = load_csv_to_gcs(base_file_name)
+
+    object_path = uri.removeprefix(f"gs://{BUCKET_NAME}/")
+    assert bucket.get_blob(object_path).download_as_bytes() == content
+    assert fake.uploads == 3
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_load_csv_to_gcs_skip_otro_dia_mismo_contenido(tmp_path, compression):
+    """
+    Valida que una ejecución de otro día con los mismos datos (sólo cambia
+    FECHA_CARGA) se omita usando el hash del contenido guardado en la
+    metadata, y que un cambio en los datos sí se suba.
+    """
+    from src.load import load_csv
+
+    base_file_name = "test_file"
+    file_name = f"{base_file_name}.csv" + (".gz" if compression else "")
+    df = pd.DataFrame({"A": [1, 2], "B": ["x", "y"]})
+
+    fake = FakeClient()
+    bucket = fake.bucket(BUCKET_NAME)
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path), \
+         use_client(fake):
+        load_csv(df.assign(FECHA_CARGA="2026-01-01"), tmp_path, file_name, compression=compression)
+        with patch("src.load_gcs._execution_date", return_value="2026-01-01"):
+            primera = load_csv_to_gcs(base_file_name, compression=compression)
+
+        load_csv(df.assign(FECHA_CARGA="2026-01-02"), tmp_path, file_name, compression=compression)
+        with patch("src.load_gcs._execution_date", return_value="2026-01-02"):
+            assert load_csv_to_gcs(base_file_name, compression=compression) == primera
+        assert fake.uploads == 1
+
+        load_csv(df.assign(A=[1, 3], FECHA_CARGA="2026-01-02"), tmp_path, file_name, compression=compression)
+        with patch("src.load_gcs._execution_date", return_value="2026-01-02"):
+            segunda = load_csv_to_gcs(base_file_name, compression=compression)
+
+    assert segunda != primera
+    assert fake.uploads == 2
+    assert bucket.get_blob(primera.removeprefix(f"gs://{BUCKET_NAME}/")).metadata["etl-content-hash"]
+
+def test_latest_version_blob_ignora_otros_objetos():
+    """
+    Valida que sólo se consideren objetos con el patrón de versionado
+    del mismo dataset.
+    """
+    fake = FakeClient()
+    bucket = fake.bucket(BUCKET_NAME)
+    for name in (
+        "transformed/test_file_2026-01-01.csv",
+        "transformed/test_file_delta_2026-02-01.csv",
+        "transformed/test_file_2026-03-01/ANO_ESTADISTICO=2010/part-00000-0.parquet",
+    ):
+        bucket.blob(name).upload_from_string(b"x")
+
+    assert latest_version_blob(bucket, "test_file").name == "transformed/test_file_2026-01-01.csv"
+    assert latest_version_blob(bucket, "otro") is None
+
+#=========================
+#Carga paralela (compose)
+#=========================
+
+def test_upload_composite_reconstruye_archivo(tmp_path):
+    """
+    Valida que la carga por slices componga un objeto idéntico al archivo
+    local (incluyendo compose jerárquico con más de 32 slices) y que no
+    queden objetos temporales.
+    """
+    local_file = tmp_path / "grande.csv"
+    local_file.write_bytes(bytes(range(256)) * 40)  # 10.240 bytes -> 41 slices
+
+    fake = FakeClient()
+    bucket = fake.bucket(BUCKET_NAME)
+
+    upload_composite(bucket, local_file, "transformed/grande_2026-01-01.csv", slice_size=250, workers=4)
+
+    assert [b.name for b in bucket.list_blobs()] == ["transformed/grande_2026-01-01.csv"]
+    blob = bucket.get_blob("transformed/grande_2026-01-01.csv")
+    assert blob.download_as_bytes() == local_file.read_bytes()
+    assert blob.crc32c == file_crc32c(local_file)
+
+def test_upload_composite_reintenta_slices(tmp_path, monkeypatch):
+    """
+    Valida que un fallo transitorio de un slice se recupere con reintentos.
+    """
+    import src.load_gcs as load_gcs
+    monkeypatch.setattr(load_gcs, "RETRY_BACKOFF_S", 0)
+
+    local_file = tmp_path / "archivo.csv"
+    local_file.write_bytes(b"x" * 1000)
+
+    fake = FakeClient(fail_uploads=TMP_PARTS_PREFIX, max_failures=2)
+    bucket = fake.bucket(BUCKET_NAME)
+
+    upload_composite(bucket, local_file, "transformed/archivo.csv", slice_size=300, workers=2, retries=3)
+
+    assert fake.failures == 2
+    assert bucket.get_blob("transformed/archivo.csv").download_as_bytes() == local_file.read_bytes()
+
+def test_upload_composite_limpia_temporales_si_falla(tmp_path, monkeypatch):
+    """
+    Valida que ante un slice que agota sus reintentos se propague el error,
+    no se cree el objeto final y se eliminen los slices ya subidos.
+    """
+    import src.load_gcs as load_gcs
+    monkeypatch.setattr(load_gcs, "RETRY_BACKOFF_S", 0)
+
+    local_file = tmp_path / "archivo.csv"
+    local_file.write_bytes(b"x" * 1000)
+
+    # sólo falla el slice 3, siempre
+    fake = FakeClient(fail_uploads="part-00003")
+    bucket = fake.bucket(BUCKET_NAME)
+
+    with pytest.raises(ConnectionError):
+        upload_composite(bucket, local_file, "transformed/archivo.csv", slice_size=300, workers=2, retries=2)
+
+    assert list(bucket.list_blobs()) == []
+
+def test_load_csv_to_gcs_paralelo(tmp_path):
+    """
+    Valida que load_csv_to_gcs use la carga paralela cuando el archivo
+    supera el tamaño de slice.
+    """
+    base_file_name = "test_file"
+    local_file = tmp_path / f"{base_file_name}.csv"
+    local_file.write_bytes(b"A,B\n" + b"1,x\n" * 500)
+
+    fake = FakeClient()
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path), \
+         use_client(fake):
+        uri = load_csv_to_gcs(base_file_name, parallel_workers=4, slice_size=512)
+
+    object_path = uri.removeprefix(f"gs://{BUCKET_NAME}/")
+    bucket = fake.bucket(BUCKET_NAME)
+    assert bucket.get_blob(object_path).download_as_bytes() == local_file.read_bytes()
+    assert [b.name for b in bucket.list_blobs()] == [object_path]
+
+def test_load_csv_to_gcs_comprimido_reutiliza_crc32c(tmp_path):
+    """
+    Valida que un CSV gzip escrito por load_csv se suba como
+    `<base>_<fecha>.csv.gz`, y que la segunda carga se omita usando el
+    CRC32C calculado al escribirlo, sin releer el archivo.
+    """
+    from src.load import load_csv
+
+    base_file_name = "test_file"
+    df = pd.DataFrame({"A": [1, 2], "B": ["x", "y"]})
+    load_csv(df, tmp_path, f"{base_file_name}.csv.gz", compression="gzip")
+
+    fake = FakeClient()
+    with patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path), \
+         use_client(fake):
+        uri = load_csv_to_gcs(base_file_name, compression="gzip")
+        with patch("builtins.open", side_effect=AssertionError("no debe releer el archivo")):
+            assert load_csv_to_gcs(base_file_name, compression="gzip") == uri
+
+    assert uri.endswith(".csv.gz")
+    object_path = uri.removeprefix(f"gs://{BUCKET_NAME}/")
+    assert fake.bucket(BUCKET_NAME).get_blob(object_path).download_as_bytes() == \
+        (tmp_path / f"{base_file_name}.csv.gz").read_bytes()
+    assert fake.uploads == 1
+
+#=========================
+#Carga directa desde memoria
+#=========================
+
+def test_load_dataframe_to_gcs_identico_a_csv_local(tmp_path):
+    """
+    Valida que la carga directa produzca el mismo contenido que load_csv,
+    serializando un bloque a la vez y sin archivo local.
+    """
+    from src.load import load_csv
+
+    df = pd.DataFrame({"A": range(10), "B": list("abcdefghij")})
+    local_path = load_csv(df, tmp_path, "ref.csv")
+
+    fake = FakeClient()
+    with use_client(fake):
+        uri = load_dataframe_to_gcs(df, "test_file", chunk_size=3)
+
+    object_path = uri.removeprefix(f"gs://{BUCKET_NAME}/")
+    assert object_path.startswith("transformed/test_file_") and object_path.endswith(".csv")
+    assert fake.bucket(BUCKET_NAME).get_blob(object_path).download_as_bytes() == local_path.read_bytes()
+
+    writer = fake.writers[0]
+    assert writer.max_buffered < len(local_path.read_bytes()) / 2
+
+def test_load_dataframe_to_gcs_desde_bloques():
+    """
+    Valida la carga directa a partir de un iterador de bloques.
+    """
+    df = pd.DataFrame({"A": [1, 2, 3]})
+    chunks = iter([df.iloc[:2], df.iloc[2:]])
+
+    fake = FakeClient()
+    with use_client(fake):
+        uri = load_dataframe_to_gcs(chunks, "test_file")
+
+    object_path = uri.removeprefix(f"gs://{BUCKET_NAME}/")
+    assert fake.bucket(BUCKET_NAME).get_blob(object_path).download_as_bytes() == b"A\n1\n2\n3\n"
+
+def test_load_dataframe_to_gcs_falla_no_crea_objeto():
+    """
+    Valida que si la serialización falla a mitad de camino el upload se
+    cancele y no quede un objeto parcial.
+    """
+    def chunks():
+        yield pd.DataFrame({"A": [1]})
+        raise RuntimeError("fallo en transform")
+
+    fake = FakeClient()
+    with use_client(fake):
+        with pytest.raises(RuntimeError):
+            load_dataframe_to_gcs(chunks(), "test_file")
+
+    assert list(fake.bucket(BUCKET_NAME).list_blobs()) == []
+
+def test_load_dataframe_to_gcs_sin_filas():
+    """
+    Valida que no se cree un objeto vacío.
+    """
+    fake = FakeClient()
+    with use_client(fake):
+        with pytest.raises(ValueError):
+            load_dataframe_to_gcs(iter([]), "test_file")
+
+    assert list(fake.bucket(BUCKET_NAME).list_blobs()) == []
@@ -0,0 +1,126 @@
+"""
+test_logger.py
+==============
+
+Tests unitarios para el módulo logger.py.
+
+Valida:
+- Formato JSON con campos de Cloud Logging y contexto de la ejecución.
+- Escritura fuera del thread que emite (QueueHandler + QueueListener).
+- Configuración idempotente y reemplazo sin duplicar handlers.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from src.logger import LOGGER_NAME, configure_logging, setup_logger
+from src.metrics import stage, start_run
+
+
+class _ThreadStream(io.StringIO):
+    """
+    Stream que registra el thread de cada escritura.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def write(self, s):
+        self.threads.add(threading.current_thread().name)
+        return super().write(s)
+
+
+@pytest.fixture(autouse=True)
+def _restaurar_logging():
+    yield
+    configure_logging("text", logging.INFO)
+
+
+def _lines(stream) -> list:
+    """
+    Líneas JSON escritas, después de vaciar la cola del listener.
+    """
+    configure_logging("text", logging.INFO)
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_campos_cloud_logging():
+    """
+    Valida severity, message, sourceLocation, el contexto de la ejecución
+    (run_id y etapa activa) y los campos de `extra`.
+    """
+    stream = io.StringIO()
+    logger = configure_logging("json", logging.INFO, stream=stream)
+    start_run("run-log")
+
+    with stage("etapa.log"):
+        logger.warning("bloque %s procesado", 3, extra={"rows_out": 10})
+
+    first, metrics = _lines(stream)
+    assert first["severity"] == "WARNING"
+    assert first["message"] == "bloque 3 procesado"
+    assert first["run_id"] == "run-log" and first["stage"] == "etapa.log"
+    assert first["rows_out"] == 10
+    assert first["logging.googleapis.com/labels"] == {"run_id": "run-log"}
+    assert first["logging.googleapis.com/sourceLocation"]["function"] == "test_json_campos_cloud_logging"
+
+    assert metrics["stage"] == "etapa.log" and metrics["status"] == "ok"
+    assert metrics["wall_s"] >= 0 and "cpu_s" in metrics
+
+def test_json_stack_trace():
+    """
+    Valida que el traceback de una excepción quede en `stack_trace`.
+    """
+    stream = io.StringIO()
+    logger = configure_logging("json", logging.INFO, stream=stream)
+
+    try:
+        raise RuntimeError("falla de prueba")
+    except RuntimeError:
+        logger.exception("etapa fallida")
+
+    (entry,) = _lines(stream)
+    assert entry["severity"] == "ERROR"
+    assert "RuntimeError: falla de prueba" in entry["stack_trace"]
+
+def test_escritura_fuera_del_thread_que_emite():
+    """
+    Valida que la E/S ocurra en el thread del listener y no en el que emite.
+    """
+    stream = _ThreadStream()
+    logger = configure_logging("text", logging.INFO, stream=stream)
+
+    logger.info("mensaje")
+    configure_logging("text", logging.INFO)
+
+    assert "mensaje" in stream.getvalue()
+    assert threading.current_thread().name not in stream.threads
+
+def test_configuracion_idempotente():
+    """
+    Valida que repetir la configuración no agregue handlers ni duplique
+    registros, y que setup_logger no la reemplace.
+    """
+    stream = io.StringIO()
+    logger = configure_logging("json", logging.INFO, stream=stream)
+    handlers = list(logger.handlers)
+
+    assert configure_logging("json", logging.INFO, stream=stream) is logger
+    assert setup_logger() is logger
+    assert logger.handlers == handlers
+
+    logger.info("una vez")
+    assert len(_lines(stream)) == 1
+    assert len(logging.getLogger(LOGGER_NAME).handlers) == 1
+
+def test_formato_invalido():
+    with pytest.raises(ValueError):
+        configure_logging("xml")
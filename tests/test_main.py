@@ -22,6 +22,20 @@ import pytest
 import pandas as pd
 from unittest.mock import patch
 from src.main import main
+from src.pipeline import run_pipelined
+from src.cdc import load_cdc_to_gcs
+from src.rollups import load_rollups_to_gcs
+
+@pytest.fixture(autouse=True)
+def _metrics_tmp(monkeypatch, tmp_path):
+    """
+    Redirige el archivo de métricas y los checkpoints de cada ejecución a un
+    directorio temporal.
+    """
+    import src.metrics as metrics
+    monkeypatch.setattr(metrics, "METRICS_DIR", tmp_path / "metrics")
+    import src.checkpoint as checkpoint
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", tmp_path / "checkpoints")
 
 @patch("src.main.load_csv_to_gcs") #se mockea para evitar la subida real a GCS
 @patch("src.main.load_csv") #se mockea para evitar escritura real en directorio
@@ -87,7 +101,391 @@ def test_main_transform_error(monkeypatch):
     monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
 
     #Forzar error en transform_dataset
-    monkeypatch.setattr("src.main.transform_dataset", lambda _:(_ for _ in ()).throw(RuntimeError("Error en la transformacion")))
+    monkeypatch.setattr("src.main.transform_dataset", lambda *args, **kwargs:(_ for _ in ()).throw(RuntimeError("Error en la transformacion")))
 
     with pytest.raises(RuntimeError):
         main()
+
+
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.load_csv_chunks")
+@patch("src.main.transform_dataset_chunks")
+@patch("src.main.transform_dataset")
+def test_main_streaming(mock_transform_dataset, mock_transform_chunks, mock_load_chunks, mock_load_gcs, monkeypatch):
+    """
+    Valida que el modo streaming use las variantes por bloques
+    y no cargue el dataset completo.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+
+    main(mode="streaming", chunk_size=10)
+
+    mock_transform_dataset.assert_not_called()
+    mock_transform_chunks.assert_called_once_with("def_semana_epidemiologica.csv", 10, since=None, compact=False, quality="off", rollups=None)
+    mock_load_chunks.assert_called_once()
+    mock_load_gcs.assert_called_once()
+
+def test_main_invalid_mode():
+    """
+    Verifica que un modo de ejecución desconocido sea rechazado.
+    """
+    with pytest.raises(ValueError):
+        main(mode="desconocido")
+
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.load_parquet")
+@patch("src.main.load_csv")
+@patch("src.main.transform_dataset")
+def test_main_parquet(mock_transform_dataset, mock_load_csv, mock_load_parquet, mock_load_gcs, monkeypatch):
+    """
+    Valida que con formato parquet se escriba el dataset particionado
+    y se suba el árbol completo.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+
+    main(output_format="parquet", partition_cols=["ANO_ESTADISTICO"])
+
+    mock_load_csv.assert_not_called()
+    mock_load_parquet.assert_called_once()
+    assert mock_load_parquet.call_args.kwargs["partition_cols"] == ["ANO_ESTADISTICO"]
+    mock_load_gcs.assert_called_once()
+    assert mock_load_gcs.call_args.args == ("def_semana_epidemiologica_transformed",)
+    assert mock_load_gcs.call_args.kwargs["file_format"] == "parquet"
+
+@patch("src.main.write_watermark")
+@patch("src.main.read_watermark", return_value=(2025, 2))
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.load_csv")
+@patch("src.main.transform_dataset")
+def test_main_incremental(mock_transform_dataset, mock_load_csv, mock_load_gcs, mock_read_wm, mock_write_wm, monkeypatch):
+    """
+    Valida que el modo incremental procese desde el watermark (menos el
+    lookback), suba sólo el delta y luego avance el watermark.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    mock_transform_dataset.return_value = pd.DataFrame({
+        "ANO_ESTADISTICO": [2025, 2025],
+        "SEMANA_ESTADISTICA": [2, 3],
+    })
+
+    main(incremental=True, lookback_weeks=1)
+
+    assert mock_transform_dataset.call_args.kwargs["since"] == (2025, 1)
+    assert mock_load_csv.call_args.kwargs["file_name"] == "def_semana_epidemiologica_transformed_delta.csv"
+    mock_load_gcs.assert_called_once()
+    assert mock_load_gcs.call_args.args == ("def_semana_epidemiologica_transformed_delta",)
+    mock_write_wm.assert_called_once_with("def_semana_epidemiologica_transformed", (2025, 3))
+
+@patch("src.main.write_watermark")
+@patch("src.main.read_watermark", return_value=(2025, 3))
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.transform_dataset")
+def test_main_incremental_sin_semanas_nuevas(mock_transform_dataset, mock_load_gcs, mock_read_wm, mock_write_wm, monkeypatch):
+    """
+    Valida que sin semanas nuevas no se cargue nada ni se mueva el watermark.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    mock_transform_dataset.return_value = pd.DataFrame()
+
+    main(incremental=True)
+
+    mock_load_gcs.assert_not_called()
+    mock_write_wm.assert_not_called()
+
+@patch("src.main.write_watermark")
+@patch("src.main.read_watermark")
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.load_csv")
+@patch("src.main.transform_dataset")
+def test_main_full_refresh(mock_transform_dataset, mock_load_csv, mock_load_gcs, mock_read_wm, mock_write_wm, monkeypatch):
+    """
+    Valida que el full refresh ignore el watermark y genere el snapshot completo.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    mock_transform_dataset.return_value = pd.DataFrame({
+        "ANO_ESTADISTICO": [2010, 2025],
+        "SEMANA_ESTADISTICA": [1, 3],
+    })
+
+    main(incremental=True, full_refresh=True)
+
+    mock_read_wm.assert_not_called()
+    assert mock_transform_dataset.call_args.kwargs["since"] is None
+    mock_load_gcs.assert_called_once()
+    assert mock_load_gcs.call_args.args == ("def_semana_epidemiologica_transformed",)
+    mock_write_wm.assert_called_once_with("def_semana_epidemiologica_transformed", (2025, 3))
+
+@patch("src.main.load_dataframe_to_gcs")
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.load_csv")
+@patch("src.main.transform_dataset")
+def test_main_sin_archivo_local(mock_transform_dataset, mock_load_csv, mock_load_gcs, mock_load_direct, monkeypatch):
+    """
+    Valida que con keep_local=False el dataset se suba directo a GCS
+    sin escribir el CSV local.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+
+    main(keep_local=False)
+
+    mock_load_csv.assert_not_called()
+    mock_load_gcs.assert_not_called()
+    mock_load_direct.assert_called_once()
+    assert mock_load_direct.call_args.args[1] == "def_semana_epidemiologica_transformed"
+
+def test_main_sin_archivo_local_parquet():
+    """
+    Verifica que la carga directa rechace el formato parquet.
+    """
+    with pytest.raises(ValueError):
+        main(keep_local=False, output_format="parquet")
+
+@patch("src.main.load_csv_to_gcs")
+@patch("src.main.transform_dataset")
+def test_main_escribe_metricas(mock_transform_dataset, mock_load_gcs, monkeypatch, tmp_path):
+    """
+    Valida que cada ejecución agregue al JSONL una línea por etapa
+    y una línea de resumen.
+    """
+    import json
+    import src.metrics as metrics
+
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    monkeypatch.setattr("src.main.OUTPUT_DIR", tmp_path / "transformed")
+    mock_transform_dataset.return_value = pd.DataFrame({"A": [1, 2, 3]})
+
+    main()
+
+    lines = [json.loads(l) for l in (metrics.METRICS_DIR / metrics.METRICS_FILE).read_text().splitlines()]
+    stages = {l["stage"]: l for l in lines if l["type"] == "stage"}
+
+    assert set(stages) >= {"main.transform", "main.load_local", "main.load_gcs", "load_csv"}
+    assert stages["main.transform"]["rows_out"] == 3
+    assert stages["main.load_local"]["bytes_written"] > 0
+    assert stages["load_csv"]["parent"] == "main.load_local"
+    assert lines[-1]["type"] == "run_summary"
+    assert lines[-1]["status"] == "ok"
+    assert {"wall_s", "cpu_s", "peak_rss_mb"} <= set(lines[-1])
+
+@patch("src.main.load_gcs_to_bigquery")
+@patch("src.main.load_csv_to_gcs", return_value="gs://etl-dp-bucket/transformed/x_2026-01-01.csv")
+@patch("src.main.load_csv")
+@patch("src.main.transform_dataset")
+def test_main_bigquery(mock_transform_dataset, mock_load_csv, mock_load_gcs, mock_load_bq, monkeypatch):
+    """
+    Valida que con `bq_table` se cargue en BigQuery el objeto subido a GCS,
+    y que sin `bq_table` la etapa no se ejecute.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    mock_transform_dataset.return_value = pd.DataFrame({"A": [1]})
+
+    main()
+    mock_load_bq.assert_not_called()
+
+    main(bq_table="epidemiologia.defunciones", bq_strategy="append")
+    mock_load_bq.assert_called_once_with(
+        "gs://etl-dp-bucket/transformed/x_2026-01-01.csv",
+        "epidemiologia.defunciones",
+        file_format="csv",
+        strategy="append",
+        hive_partitioned=False,
+    )
+
+def test_main_bigquery_estrategia_invalida():
+    """
+    Valida que una estrategia BigQuery inválida levante ValueError.
+    """
+    with pytest.raises(ValueError):
+        main(bq_strategy="replace")
+
+@pytest.fixture
+def _raw_real(monkeypatch, tmp_path):
+    """
+    Pipeline con el CSV raw de prueba real y salidas en directorios temporales.
+    """
+    import shutil
+    from pathlib import Path
+    import src.extract as extract
+    import src.parse_cache as parse_cache
+    import src.quality as quality
+
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    shutil.copy(Path("tests/data/raw_data.csv"), raw_dir / "def_semana_epidemiologica.csv")
+    monkeypatch.setattr(extract, "RAW_DIR", raw_dir)
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(quality, "QUALITY_DIR", tmp_path / "quality")
+    monkeypatch.setattr("src.main.OUTPUT_DIR", tmp_path / "transformed")
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    return raw_dir / "def_semana_epidemiologica.csv"
+
+def test_main_reanuda_desde_etapa_fallida(_raw_real):
+    """
+    Valida que, si falla la carga a GCS, la siguiente ejecución no repita el
+    transform ni la carga local y continúe desde la carga a GCS; y que una
+    tercera ejecución sin cambios omita todas las etapas.
+    """
+    from src.transform import transform_dataset
+
+    with patch("src.main.transform_dataset", wraps=transform_dataset) as spy, \
+         patch("src.main.load_csv_to_gcs", side_effect=[ConnectionError("red"), "gs://b/x.csv"]) as gcs:
+        with pytest.raises(ConnectionError):
+            main()
+        main()
+        main()
+
+    assert spy.call_count == 1
+    assert gcs.call_count == 2
+
+def test_main_reanuda_invalida_si_cambia_raw(_raw_real):
+    """
+    Valida que un raw distinto o `force` vuelvan a ejecutar todas las etapas.
+    """
+    from src.transform import transform_dataset
+
+    with patch("src.main.transform_dataset", wraps=transform_dataset) as spy, \
+         patch("src.main.load_csv_to_gcs", return_value="gs://b/x.csv") as gcs:
+        main()
+        main(force=True)
+        lines = _raw_real.read_text().splitlines()
+        _raw_real.write_text("\n".join(lines[:-1]) + "\n")
+        main()
+
+    assert spy.call_count == 3
+    assert gcs.call_count == 3
+
+def test_main_pipelined(_raw_real, tmp_path):
+    """
+    Valida que el modo pipelined escriba el mismo CSV que el modo batch,
+    lo suba a GCS y registre checkpoints: la segunda ejecución no repite
+    ninguna etapa.
+    """
+    from benchmarks.fake_gcs import FakeClient
+    from src.gcs_client import use_client
+    from src.load_gcs import BUCKET_NAME
+
+    with patch("src.main.load_csv_to_gcs", return_value="gs://b/x.csv"):
+        main()
+    output = tmp_path / "transformed" / "def_semana_epidemiologica_transformed.csv"
+    expected = output.read_bytes()
+    output.unlink()
+
+    fake = FakeClient()
+    with use_client(fake), patch("src.main.run_pipelined", wraps=run_pipelined) as spy:
+        main(mode="pipelined", chunk_size=3)
+        main(mode="pipelined", chunk_size=3)
+
+    assert spy.call_count == 1
+    assert output.read_bytes() == expected
+    blob, = fake.bucket(BUCKET_NAME).list_blobs()
+    assert blob.download_as_bytes() == expected
+
+def test_main_pipelined_solo_csv(monkeypatch):
+    """
+    Valida que el modo pipelined rechace el formato Parquet.
+    """
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "fake_credentials.json")
+    with pytest.raises(ValueError):
+        main(mode="pipelined", output_format="parquet")
+
+def test_main_cdc(_raw_real, tmp_path):
+    """
+    Valida que con `cdc` se publique junto al snapshot el delta respecto de
+    la versión anterior del bucket, y que una segunda ejecución lo omita.
+    """
+    from benchmarks.fake_gcs import FakeClient
+    from src.gcs_client import use_client
+    from src.load_gcs import BUCKET_NAME
+
+    fake = FakeClient()
+    with use_client(fake), patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path / "transformed"):
+        main()
+        blob, = fake.bucket(BUCKET_NAME).list_blobs()
+        previous = fake.bucket(BUCKET_NAME).blob("transformed/def_semana_epidemiologica_transformed_2000-01-01.csv")
+        previous.upload_from_string(blob.download_as_bytes().rsplit(b"\n", 2)[0] + b"\n")
+        blob.delete()
+
+        with patch("src.main.load_cdc_to_gcs", wraps=load_cdc_to_gcs) as spy:
+            main(cdc=True, force=True)
+            main(cdc=True)
+
+    assert spy.call_count == 1
+    names = sorted(b.name for b in fake.bucket(BUCKET_NAME).list_blobs())
+    assert len(names) == 3 and names[-1].endswith("_cdc.csv.gz")
+
+@pytest.mark.parametrize("mode", ["batch", "streaming", "pipelined"])
+def test_main_rollups(_raw_real, tmp_path, mode):
+    """
+    Valida que los rollups se escriban junto al dataset local y se carguen
+    a GCS en todos los modos, y que una segunda ejecución los omita.
+    """
+    from benchmarks.fake_gcs import FakeClient
+    from src.gcs_client import use_client
+    from src.load_gcs import BUCKET_NAME
+
+    fake = FakeClient()
+    with use_client(fake), patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path / "transformed"), \
+         patch("src.main.load_rollups_to_gcs", wraps=load_rollups_to_gcs) as spy:
+        main(mode=mode, chunk_size=3, rollups=["muertes_region_semana", "muertes_grupo_edad_ano"])
+        main(mode=mode, chunk_size=3, rollups=["muertes_region_semana", "muertes_grupo_edad_ano"])
+
+    assert spy.call_count == 1
+    rollups_dir = tmp_path / "transformed" / "def_semana_epidemiologica_transformed_rollups"
+    assert sorted(p.name for p in rollups_dir.iterdir()) == ["muertes_grupo_edad_ano.csv", "muertes_region_semana.csv"]
+    names = [b.name for b in fake.bucket(BUCKET_NAME).list_blobs()]
+    assert sum("_rollups_" in name for name in names) == 2
+
+@pytest.mark.parametrize("mode", ["batch", "streaming"])
+def test_main_compression_gzip(_raw_real, tmp_path, mode):
+    """
+    Valida que con compresión gzip el CSV local y el objeto en GCS sean
+    `.csv.gz` con el mismo contenido que el CSV sin comprimir.
+    """
+    import gzip
+    from benchmarks.fake_gcs import FakeClient
+    from src.gcs_client import use_client
+    from src.load_gcs import BUCKET_NAME
+
+    fake = FakeClient()
+    with use_client(fake), patch("src.load_gcs.LOCAL_TRANSFORMED_DIR", tmp_path / "transformed"):
+        main(mode=mode, chunk_size=3, compression="gzip")
+
+    local = tmp_path / "transformed" / "def_semana_epidemiologica_transformed.csv.gz"
+    blob, = fake.bucket(BUCKET_NAME).list_blobs()
+    assert blob.name.endswith(".csv.gz")
+    assert blob.download_as_bytes() == local.read_bytes()
+    assert gzip.decompress(local.read_bytes()).startswith(b"ANO_ESTADISTICO,")
+
+@pytest.mark.parametrize("kwargs", [
+    {"compression": "bz2"},
+    {"compression": "gzip", "mode": "pipelined"},
+    {"compression": "gzip", "keep_local": False},
+    {"compression": "gzip", "cdc": True},
+    {"compression": "zstd", "bq_table": "dataset.tabla"},
+])
+def test_main_compression_invalida(kwargs):
+    """
+    Valida las combinaciones no soportadas de compresión.
+    """
+    with pytest.raises(ValueError):
+        main(**kwargs)
+
+def test_main_rollups_reanuda_tras_falla_gcs(_raw_real, tmp_path):
+    """
+    Regresión: si la carga a GCS falla después del checkpoint del
+    transform, la ejecución reanudada (sin transform) carga los rollups
+    escritos junto a ese checkpoint.
+    """
+    from src.transform import transform_dataset
+
+    rollups = ["muertes_region_ano"]
+    with patch("src.main.transform_dataset", wraps=transform_dataset) as spy, \
+         patch("src.main.load_csv_to_gcs", side_effect=[ConnectionError("red"), "gs://b/x.csv"]), \
+         patch("src.main.load_rollups_to_gcs", return_value="gs://b/rollups/") as carga:
+        with pytest.raises(ConnectionError):
+            main(rollups=rollups)
+        main(rollups=rollups)
+
+    assert spy.call_count == 1
+    (tables, name), _ = carga.call_args
+    assert list(tables) == rollups and not tables["muertes_region_ano"].empty
@@ -0,0 +1,155 @@
+"""
+test_metrics.py
+===============
+
+Tests unitarios para el módulo metrics.py.
+
+Valida:
+- Registro de tiempos, filas y estado por etapa.
+- Etapas anidadas y pico de memoria con tracemalloc.
+- Inferencia de filas y bytes en funciones instrumentadas.
+- Escritura de métricas como JSON lines con resumen de la ejecución.
+- Un error al escribir las métricas no oculta el error de la ejecución.
+- Pico de memoria sin /proc ni el módulo `resource`.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import src.metrics as metrics
+from src.metrics import annotate, instrumented, records, run_metrics, stage, start_run
+
+def test_stage_registra_metricas():
+    """
+    Valida los campos básicos de una etapa y su estado.
+    """
+    run_id = start_run("run-test")
+
+    with stage("etapa", rows_in=10) as m:
+        m["rows_out"] = 8
+
+    (record,) = records()
+    assert record["run_id"] == run_id
+    assert record["stage"] == "etapa"
+    assert record["rows_in"] == 10 and record["rows_out"] == 8
+    assert record["status"] == "ok"
+    assert record["wall_s"] >= 0 and record["cpu_s"] >= 0
+    assert record["peak_rss_mb"] > 0
+
+def test_stage_error_y_anidado():
+    """
+    Valida que una etapa con error quede marcada y que las etapas
+    anidadas registren a su etapa padre.
+    """
+    start_run()
+
+    with pytest.raises(RuntimeError):
+        with stage("externa"):
+            with stage("interna"):
+                annotate(bytes_written=123)
+                raise RuntimeError("fallo")
+
+    interna, externa = records()
+    assert interna["parent"] == "externa" and interna["bytes_written"] == 123
+    assert interna["status"] == externa["status"] == "error"
+
+def test_stage_tracemalloc_anidado():
+    """
+    Valida que el pico de memoria de una etapa interna también se
+    refleje en la etapa externa.
+    """
+    start_run()
+    tracemalloc.start()
+    try:
+        with stage("externa"):
+            with stage("interna"):
+                buffer = bytearray(5 * 1024 * 1024)
+                del buffer
+    finally:
+        tracemalloc.stop()
+
+    interna, externa = records()
+    assert interna["tracemalloc_peak_mb"] >= 5
+    assert externa["tracemalloc_peak_mb"] >= interna["tracemalloc_peak_mb"]
+
+def test_instrumented_infiere_filas_y_bytes(tmp_path):
+    """
+    Valida que el decorador tome filas de entrada/salida de DataFrames
+    y bytes escritos de un Path retornado.
+    """
+    @instrumented("filtra")
+    def filtra(df):
+        return df.iloc[:2]
+
+    @instrumented("escribe")
+    def escribe(df, path: Path):
+        df.to_csv(path, index=False)
+        return path
+
+    start_run()
+    df = filtra(pd.DataFrame({"A": [1, 2, 3]}))
+    path = escribe(df, tmp_path / "out.csv")
+
+    filtro, escritura = records()
+    assert (filtro["rows_in"], filtro["rows_out"]) == (3, 2)
+    assert escritura["bytes_written"] == path.stat().st_size
+
+def test_run_metrics_escribe_jsonl(tmp_path):
+    """
+    Valida que cada ejecución agregue sus etapas y un resumen al JSONL,
+    también cuando la ejecución falla.
+    """
+    path = tmp_path / "metrics.jsonl"
+
+    with run_metrics("ok-run", path=path):
+        with stage("a"):
+            pass
+
+    with pytest.raises(ValueError):
+        with run_metrics("error-run", path=path):
+            with stage("b"):
+                raise ValueError("fallo")
+
+    lines = [json.loads(l) for l in path.read_text().splitlines()]
+    assert [(l["type"], l["run_id"]) for l in lines] == [
+        ("stage", "ok-run"), ("run_summary", "ok-run"),
+        ("stage", "error-run"), ("run_summary", "error-run"),
+    ]
+    assert lines[1]["status"] == "ok" and lines[3]["status"] == "error"
+    assert lines[1]["stages"] == 1
+
+
+def test_run_metrics_error_al_escribir_no_oculta_el_error(tmp_path):
+    """
+    Valida que un error de E/S al escribir las métricas no reemplace la
+    excepción de la ejecución ni haga fallar una ejecución exitosa.
+    """
+    bloqueado = tmp_path / "archivo"
+    bloqueado.write_text("")
+    path = bloqueado / "metrics.jsonl"  #el padre es un archivo: mkdir falla
+
+    with run_metrics("ok-run", path=path):
+        pass
+
+    with pytest.raises(ValueError, match="fallo"):
+        with run_metrics("error-run", path=path):
+            raise ValueError("fallo")
+
+
+def test_peak_rss_sin_resource(monkeypatch):
+    """
+    Valida que sin /proc ni el módulo `resource` (Windows) el pico de
+    memoria sea 0 en lugar de un error.
+    """
+    monkeypatch.setattr(metrics, "_proc_status_mb", lambda field: None)
+    monkeypatch.setitem(sys.modules, "resource", None)
+
+    assert metrics.peak_rss_mb() == 0.0
@@ -0,0 +1,166 @@
+"""
+test_parse_cache.py
+===================
+
+Pruebas del caché Arrow del CSV raw parseado (`src/parse_cache.py`) y de su
+uso desde `extract_csv`.
+
+Valida:
+- La lectura desde el caché es idéntica al parseo del CSV (ambos backends).
+- Un cambio de mtime con el mismo contenido reutiliza la entrada.
+- Un cambio de contenido invalida la entrada y elimina la versión obsoleta.
+- Un cambio de esquema o de CACHE_VERSION invalida la entrada.
+- El límite de tamaño expulsa las entradas menos usadas.
+- Una entrada corrupta se descarta y se vuelve a parsear el CSV.
+- Sin `use_cache` no se lee ni se escribe el caché.
+- Un error al guardar el caché no interrumpe la extracción.
+- Archivos homónimos de distintos directorios tienen entradas separadas.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import src.extract as extract
+from src import parse_cache
+from src.extract import extract_csv
+
+TEST_DATA = Path(__file__).parent / "data" / "raw_data.csv"
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    shutil.copy(TEST_DATA, raw / "raw_data.csv")
+    monkeypatch.setattr(extract, "RAW_DIR", raw)
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", tmp_path / "cache")
+    return raw
+
+
+@pytest.mark.parametrize("backend", ["pandas", "pyarrow"])
+def test_cache_hit_identico_al_parseo(raw_dir, backend):
+    esperado = extract_csv("raw_data.csv", backend = backend)
+
+    primero = extract_csv("raw_data.csv", backend = backend, use_cache = True)
+    assert len(list(parse_cache.CACHE_DIR.glob("*.arrow"))) == 1
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(pd, "read_csv", lambda *a, **k: pytest.fail("no debe parsear el CSV"))
+        mp.setattr(extract, "_read_csv_pyarrow", lambda *a, **k: pytest.fail("no debe parsear el CSV"))
+        cacheado = extract_csv("raw_data.csv", backend = backend, use_cache = True)
+
+    pd.testing.assert_frame_equal(primero, esperado)
+    pd.testing.assert_frame_equal(cacheado, esperado)
+
+
+def test_cache_mismo_contenido_distinto_mtime(raw_dir):
+    path = raw_dir / "raw_data.csv"
+    extract_csv("raw_data.csv", use_cache = True)
+
+    stat = path.stat()
+    os.utime(path, ns = (stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert parse_cache.load(path, "pandas") is not None
+
+
+def test_cache_invalida_y_elimina_version_obsoleta(raw_dir):
+    path = raw_dir / "raw_data.csv"
+    extract_csv("raw_data.csv", use_cache = True)
+    anterior = next(parse_cache.CACHE_DIR.glob("*.arrow"))
+
+    with open(path, "a", encoding = "utf-8") as f:
+        f.write("2030|1|0 a 14|1|Región de Aisén del Gral. Carlos Ibáñez del Campo|100|1\n")
+
+    assert parse_cache.load(path, "pandas") is None
+    df = extract_csv("raw_data.csv", use_cache = True)
+
+    entradas = list(parse_cache.CACHE_DIR.glob("*.arrow"))
+    assert len(entradas) == 1 and entradas[0] != anterior
+    assert df["ANO_ESTADISTICO"].max() == 2030
+
+
+def test_cache_invalida_con_otra_version_del_parseo(raw_dir, monkeypatch):
+    path = raw_dir / "raw_data.csv"
+    extract_csv("raw_data.csv", use_cache = True)
+    anterior = next(parse_cache.CACHE_DIR.glob("*.arrow"))
+
+    monkeypatch.setitem(extract.COLUMN_DTYPES, "POBLACION", "int64")
+    assert parse_cache.load(path, "pandas") is None
+
+    monkeypatch.setattr(parse_cache, "CACHE_VERSION", parse_cache.CACHE_VERSION + 1)
+    assert parse_cache.load(path, "pandas") is None
+    extract_csv("raw_data.csv", use_cache = True)
+
+    entradas = list(parse_cache.CACHE_DIR.glob("*.arrow"))
+    assert len(entradas) == 1 and entradas[0] != anterior
+    assert parse_cache.load(path, "pandas") is not None
+
+
+def test_cache_expulsa_por_tamano(raw_dir):
+    extract_csv("raw_data.csv", use_cache = True)
+    extract_csv("raw_data.csv", backend = "pyarrow", use_cache = True)
+    pandas_entry, = parse_cache.CACHE_DIR.glob("*.pandas.*.arrow")
+    pyarrow_entry, = parse_cache.CACHE_DIR.glob("*.pyarrow.*.arrow")
+    os.utime(pandas_entry, (0, 0))  # la menos usada recientemente
+
+    assert parse_cache.evict(max_bytes = pyarrow_entry.stat().st_size) == 1
+    assert list(parse_cache.CACHE_DIR.glob("*.arrow")) == [pyarrow_entry]
+    assert not pandas_entry.with_suffix(".json").exists()
+
+
+def test_cache_evict_conserva_entrada_nueva(raw_dir):
+    extract_csv("raw_data.csv", use_cache = True)
+    entrada = parse_cache.store(raw_dir / "raw_data.csv", "pyarrow", extract_csv("raw_data.csv", backend = "pyarrow"), max_bytes = 1)
+
+    assert list(parse_cache.CACHE_DIR.glob("*.arrow")) == [entrada]
+
+
+def test_cache_corrupto_se_descarta(raw_dir):
+    esperado = extract_csv("raw_data.csv", use_cache = True)
+    entrada = next(parse_cache.CACHE_DIR.glob("*.arrow"))
+    entrada.write_bytes(b"no es arrow")
+
+    df = extract_csv("raw_data.csv", use_cache = True)
+
+    pd.testing.assert_frame_equal(df, esperado)
+    assert next(parse_cache.CACHE_DIR.glob("*.arrow")).read_bytes()[:6] == b"ARROW1"
+
+
+def test_sin_cache_no_escribe(raw_dir):
+    extract_csv("raw_data.csv")
+    assert not parse_cache.CACHE_DIR.exists()
+    assert parse_cache.clear() == 0
+
+
+def test_cache_homonimos_en_distintos_directorios(raw_dir, tmp_path):
+    otro = tmp_path / "otro" / "raw_data.csv"
+    otro.parent.mkdir()
+    original = pd.read_csv(raw_dir / "raw_data.csv", sep = "|")
+    original.head(5).to_csv(otro, sep = "|", index = False)
+
+    parse_cache.store(raw_dir / "raw_data.csv", "pandas", original)
+    parse_cache.store(otro, "pandas", original.head(5))
+
+    assert len(list(parse_cache.CACHE_DIR.glob("raw_data.*.pandas.*.arrow"))) == 2
+    assert len(parse_cache.load(raw_dir / "raw_data.csv", "pandas")) == len(original)
+    assert len(parse_cache.load(otro, "pandas")) == 5
+
+
+def test_error_al_guardar_cache_no_interrumpe(raw_dir, monkeypatch):
+    esperado = extract_csv("raw_data.csv")
+
+    def sin_espacio(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(parse_cache, "store", sin_espacio)
+    df = extract_csv("raw_data.csv", use_cache = True)
+
+    pd.testing.assert_frame_equal(df, esperado)
+    assert not list(parse_cache.CACHE_DIR.glob("*.arrow"))
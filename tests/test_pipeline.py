@@ -0,0 +1,200 @@
+"""
+test_pipeline.py
+================
+
+Tests unitarios para el módulo pipeline.py (modo pipelined), sobre el CSV
+raw de prueba y el cliente GCS en memoria `FakeClient`.
+
+Responsabilidades validadas:
+    - CSV local y objeto GCS idénticos al resultado del modo batch.
+    - Carga directa sin archivo local.
+    - Backpressure: bloques en vuelo acotados por el tamaño de las colas.
+    - Superposición de etapas: el tiempo total es menor que la suma.
+    - Un error en cualquier etapa cancela el upload y elimina el parcial.
+    - Watermark: sin filas nuevas no se crea archivo ni objeto.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import shutil
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from benchmarks.fake_gcs import FakeClient
+from src.gcs_client import use_client
+from src.load import load_csv, written_crc32c
+from src.load_gcs import BUCKET_NAME
+from src.pipeline import run_pipelined
+from src.transform import transform_dataset
+from src.watermark import WatermarkTracker, max_watermark
+
+RAW = "def_semana_epidemiologica.csv"
+
+
+@pytest.fixture(autouse = True)
+def raw_dir(monkeypatch, tmp_path):
+    import src.extract as extract
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    shutil.copy(Path("tests/data/raw_data.csv"), raw / RAW)
+    monkeypatch.setattr(extract, "RAW_DIR", raw)
+    return raw
+
+
+def _object(fake, uri):
+    return fake.bucket(BUCKET_NAME).get_blob(uri.removeprefix(f"gs://{BUCKET_NAME}/")).download_as_bytes()
+
+
+def test_identico_al_modo_batch(tmp_path):
+    """
+    Valida que el CSV local y el objeto subido sean idénticos al CSV del
+    modo batch, con bloques pequeños.
+    """
+    expected = load_csv(transform_dataset(RAW), tmp_path / "batch", "ref.csv").read_bytes()
+
+    fake = FakeClient()
+    with use_client(fake):
+        result = run_pipelined(RAW, "dataset", tmp_path / "out", chunk_size = 7, queue_size = 1)
+
+    assert result.output_path.read_bytes() == expected
+    assert _object(fake, result.gcs_uri) == expected
+    assert result.rows == expected.count(b"\n") - 1
+    assert set(result.busy_s) == {"reader", "transform", "writer", "uploader"}
+    assert not list((tmp_path / "out").glob("*.part"))
+    assert written_crc32c(result.output_path) == written_crc32c(tmp_path / "batch" / "ref.csv") is not None
+
+
+def test_carga_directa_sin_archivo_local(tmp_path):
+    """
+    Valida que sin output_dir se suba el objeto sin escribir archivos.
+    """
+    fake = FakeClient()
+    with use_client(fake):
+        result = run_pipelined(RAW, "dataset", chunk_size = 10)
+
+    assert result.output_path is None
+    assert _object(fake, result.gcs_uri).startswith(b"ANO_ESTADISTICO,")
+
+
+def test_backpressure_acota_bloques_en_vuelo(raw_dir):
+    """
+    Valida que, con una carga lenta, el lector no se adelante más allá de
+    lo que admiten las colas: 100 bloques leídos, a lo sumo 7 en vuelo.
+    """
+    from benchmarks.synthetic import generate_raw_csv
+
+    generate_raw_csv(raw_dir / "sintetico.csv", 1000)
+    fake = FakeClient(latency_s = 0.002)
+    with use_client(fake):
+        result = run_pipelined("sintetico.csv", "dataset", chunk_size = 10, queue_size = 1)
+
+    assert result.rows == 1000
+    assert result.max_in_flight <= 3 * 1 + 4
+
+
+def test_etapas_superpuestas(raw_dir):
+    """
+    Valida que lectura/transform y carga se superpongan: con una carga
+    lenta, el tiempo total es menor que la suma de las etapas.
+    """
+    from benchmarks.synthetic import generate_raw_csv
+
+    generate_raw_csv(raw_dir / "sintetico.csv", 1000)
+    fake = FakeClient(latency_s = 0.01)
+    with use_client(fake):
+        result = run_pipelined("sintetico.csv", "dataset", chunk_size = 50, queue_size = 2)
+
+    assert result.wall_s < sum(result.busy_s.values())
+    assert result.wall_s >= max(result.busy_s.values())
+
+
+@pytest.mark.parametrize("target", ["src.pipeline.transform_chunk", "src.pipeline.get_bucket"])
+def test_error_cancela_todo(tmp_path, target):
+    """
+    Valida que un error en el transform o en la carga se relance, no deje
+    objeto en el bucket ni archivo local (ni parcial).
+    """
+    calls = []
+
+    def falla(*args, **kwargs):
+        calls.append(1)
+        raise RuntimeError("falla")
+
+    fake = FakeClient()
+    with use_client(fake), patch(target, side_effect = falla), pytest.raises(RuntimeError, match = "falla"):
+        run_pipelined(RAW, "dataset", tmp_path / "out", chunk_size = 3)
+
+    assert calls
+    assert list(fake.bucket(BUCKET_NAME).list_blobs()) == []
+    assert not (tmp_path / "out").exists() or not list((tmp_path / "out").iterdir())
+
+
+def test_upload_cancelado_si_falla_la_escritura(tmp_path):
+    """
+    Valida que, si la carga ya empezó y luego falla una etapa, el upload
+    resumable se cancele sin finalizar un objeto parcial.
+    """
+    from src.transform import transform_chunk
+
+    def lento(chunk, *args):
+        if len(calls) == 3:
+            raise RuntimeError("falla tardía")
+        calls.append(1)
+        time.sleep(0.01)
+        return transform_chunk(chunk, *args)
+
+    calls = []
+    fake = FakeClient()
+    with use_client(fake), patch("src.pipeline.transform_chunk", side_effect = lento), pytest.raises(RuntimeError):
+        run_pipelined(RAW, "dataset", chunk_size = 3)
+
+    assert fake.writers and all(writer.closed for writer in fake.writers)
+    assert list(fake.bucket(BUCKET_NAME).list_blobs()) == []
+
+
+def test_falla_de_subida_no_deja_archivo_local_parcial(tmp_path):
+    """
+    Valida que, si la subida falla a mitad de la escritura local, no quede
+    el temporal `.part` y el CSV local anterior quede intacto.
+    """
+    from benchmarks.fake_gcs import FakeBlobWriter
+
+    write = FakeBlobWriter.write
+
+    def falla(self, data):
+        if self._parts:
+            raise RuntimeError("falla de red")
+        return write(self, data)
+
+    previous = tmp_path / "out" / "dataset.csv"
+    previous.parent.mkdir()
+    previous.write_bytes(b"anterior")
+
+    fake = FakeClient()
+    with use_client(fake), patch.object(FakeBlobWriter, "write", falla), pytest.raises(RuntimeError, match = "falla de red"):
+        run_pipelined(RAW, "dataset", tmp_path / "out", chunk_size = 1, queue_size = 1)
+
+    assert previous.read_bytes() == b"anterior"
+    assert not list((tmp_path / "out").glob("*.part"))
+    assert list(fake.bucket(BUCKET_NAME).list_blobs()) == []
+
+
+def test_watermark(tmp_path):
+    """
+    Valida que con un watermark igual al máximo no se cree nada y retorne
+    None, y que el tracker acumule el watermark de las filas cargadas.
+    """
+    latest = max_watermark(transform_dataset(RAW))
+
+    fake = FakeClient()
+    tracker = WatermarkTracker()
+    with use_client(fake):
+        assert run_pipelined(RAW, "dataset", tmp_path / "out", chunk_size = 5, since = latest) is None
+        result = run_pipelined(RAW, "dataset", tmp_path / "out", chunk_size = 5, tracker = tracker)
+
+    assert tracker.watermark == latest
+    assert [b.name for b in fake.bucket(BUCKET_NAME).list_blobs()] == [result.gcs_uri.removeprefix(f"gs://{BUCKET_NAME}/")]
@@ -0,0 +1,202 @@
+"""
+test_quality.py
+===============
+
+Pruebas de las reglas de calidad de datos (`src/quality.py`) y de su uso
+en la etapa extract.
+
+Valida:
+- Cada regla detecta su caso (semana 60, población negativa, muertes mayores
+  a la población, SEXO desconocido, GRUPO_EDAD no parseable, nulos, texto
+  en columnas numéricas).
+- Conteos por regla, muestras y archivo de cuarentena con las reglas
+  incumplidas por fila.
+- El resultado por bloques es idéntico al del dataset completo.
+- El modo 'fail' levanta ValueError.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.extract as extract
+from src import quality
+from src.extract import extract_csv, extract_csv_chunks
+from src.quality import RULES_COLUMN, QualityGate, check_quality
+
+TEST_DATA = Path(__file__).parent / "data" / "raw_data.csv"
+REGION = "De Aisén del Gral. C. Ibáñez del Campo"
+
+
+@pytest.fixture(autouse = True)
+def quality_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(quality, "QUALITY_DIR", tmp_path / "quality")
+    return tmp_path / "quality"
+
+
+def _raw(filas):
+    return pd.DataFrame(filas, columns = [
+        "ANO_ESTADISTICO", "SEMANA_ESTADISTICA", "GRUPO_EDAD", "SEXO", "REGION", "POBLACION", "MUERTES_OBS",
+    ])
+
+
+def _con_errores():
+    return _raw([
+        [2010, 1, "0 a 14", 1, REGION, 100, 1],      # válida
+        [2010, 60, "0 a 14", 1, REGION, 100, 1],     # semana_rango
+        [2010, 2, "0 a 14", 2, REGION, -5, 0],       # poblacion_no_negativa
+        [2010, 3, "80 +", 1, REGION, 10, 11],        # muertes_menor_o_igual_poblacion
+        [2010, 4, "0 a 14", 3, REGION, 100, 1],      # sexo_conocido
+        [2010, 5, "sin dato", 1, REGION, 100, 1],    # grupo_edad_valido
+        [2010, 6, "0 a 14", 1, None, 100, 1],        # campos_obligatorios
+        [2010, 70, "x +", 9, REGION, 5, 6],          # varias reglas
+    ])
+
+
+def test_reglas_conteos_y_cuarentena(quality_dir):
+    gate = QualityGate("raw.csv", "quarantine")
+    validas = gate.filter(_con_errores())
+    report = gate.close()
+
+    assert validas.index.tolist() == [0]
+    violaciones = {name: r["violations"] for name, r in report["rules"].items()}
+    assert violaciones == {
+        "campos_obligatorios": 1,
+        "tipos_numericos": 0,
+        "ano_valido": 0,
+        "semana_rango": 2,
+        "sexo_conocido": 2,
+        "grupo_edad_valido": 2,
+        "poblacion_no_negativa": 1,
+        "muertes_no_negativas": 0,
+        "muertes_menor_o_igual_poblacion": 3,  # incluye la fila con población negativa
+    }
+    assert report["rows_quarantined"] == 7
+    assert report["rules"]["semana_rango"]["samples"][0]["fila"] == 1
+    assert report["rules"]["semana_rango"]["samples"][0]["SEMANA_ESTADISTICA"] == 60
+
+    cuarentena = pd.read_csv(quality_dir / "raw_quarantine.csv", sep = "|")
+    assert len(cuarentena) == 7
+    assert cuarentena[RULES_COLUMN].iloc[-1] == (
+        "semana_rango;sexo_conocido;grupo_edad_valido;muertes_menor_o_igual_poblacion"
+    )
+    assert json.loads((quality_dir / "raw_quality.json").read_text())["rows"] == 8
+
+
+def test_tipos_numericos_con_texto():
+    df = _raw([[2010, "abc", "0 a 14", 1, REGION, 100, 1], [2010, 2, "0 a 14", 1, REGION, 100, 1]])
+
+    gate = QualityGate("raw.csv")
+    validas = gate.filter(df)
+
+    assert validas.index.tolist() == [1]
+    assert gate.violations["tipos_numericos"] == 1
+
+
+def test_bloques_igual_a_completo(tmp_path, quality_dir):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    df = _con_errores()
+    df = pd.concat([df] * 3, ignore_index = True)
+    df.to_csv(raw_dir / "raw.csv", sep = "|", index = False)
+    extract.RAW_DIR, original = raw_dir, extract.RAW_DIR
+
+    try:
+        completo = extract_csv("raw.csv", quality = "quarantine")
+        reporte_completo = json.loads((quality_dir / "raw_quality.json").read_text())
+        cuarentena_completa = (quality_dir / "raw_quarantine.csv").read_bytes()
+
+        bloques = pd.concat(extract_csv_chunks("raw.csv", chunk_size = 5, quality = "quarantine"))
+        reporte_bloques = json.loads((quality_dir / "raw_quality.json").read_text())
+    finally:
+        extract.RAW_DIR = original
+
+    pd.testing.assert_frame_equal(bloques, completo)
+    assert reporte_bloques["rules"] == reporte_completo["rules"]
+    assert (quality_dir / "raw_quarantine.csv").read_bytes() == cuarentena_completa
+
+
+def test_datos_validos_sin_cuarentena(monkeypatch, quality_dir):
+    monkeypatch.setattr(extract, "RAW_DIR", TEST_DATA.parent)
+
+    df = extract_csv(TEST_DATA.name, quality = "quarantine")
+
+    assert len(df) == 10
+    assert not (quality_dir / "raw_data_quarantine.csv").exists()
+    assert json.loads((quality_dir / "raw_data_quality.json").read_text())["rows_valid"] == 10
+
+
+def test_modo_fail():
+    with pytest.raises(ValueError, match = "reglas de calidad"):
+        check_quality(_con_errores(), "raw.csv", mode = "fail")
+
+
+def test_modo_invalido(monkeypatch):
+    monkeypatch.setattr(extract, "RAW_DIR", TEST_DATA.parent)
+
+    with pytest.raises(ValueError):
+        extract_csv(TEST_DATA.name, quality = "estricto")
+
+
+def test_cuarentena_restaura_tipos_numericos(tmp_path, monkeypatch):
+    """
+    Regresión: un valor de texto en SEXO deja la columna como object; tras
+    la cuarentena las filas válidas deben volver a ser numéricas, para que
+    el transform mapee SEXO a 'M'/'F' en lugar de nulos (batch y bloques).
+    """
+    from src.transform import transform_dataset, transform_dataset_chunks
+
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    df = _raw([
+        [2010, 1, "0 a 14", 1, REGION, 100, 1],
+        [2010, 2, "0 a 14", 2, REGION, 100, 1],
+        [2010, 3, "0 a 14", "x", REGION, 100, 1],
+        [2010, 4, "0 a 14", 2, REGION, 100, 1],
+    ])
+    df.to_csv(raw_dir / "raw.csv", sep = "|", index = False)
+    monkeypatch.setattr(extract, "RAW_DIR", raw_dir)
+
+    completo = transform_dataset("raw.csv", quality = "quarantine")
+    bloques = pd.concat(transform_dataset_chunks("raw.csv", 2, quality = "quarantine"))
+
+    for resultado in (completo, bloques):
+        assert resultado["SEXO"].tolist() == ["M", "F", "F"]
+        assert pd.api.types.is_integer_dtype(resultado["SEMANA_ESTADISTICA"])
+        assert resultado["POBLACION"].sum() == 300
+
+
+def test_cuarentena_de_decimales_y_fuera_de_rango(tmp_path, monkeypatch):
+    """
+    Regresión: un decimal o un valor fuera del rango del tipo entero de su
+    columna va a cuarentena por `tipos_numericos` en lugar de romper la
+    conversión a INTEGER_DTYPES (batch y bloques).
+    """
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    df = _raw([
+        [2010, 1, "0 a 14", 1, REGION, 100, 1],
+        [2010, 2, "0 a 14", 2, REGION, 3.5, 1],
+        [40000, 3, "0 a 14", 1, REGION, 100, 1],
+        [2010, 4, "0 a 14", 2, REGION, 3_000_000_000, 1],
+    ])
+    df.to_csv(raw_dir / "raw.csv", sep = "|", index = False)
+    monkeypatch.setattr(extract, "RAW_DIR", raw_dir)
+
+    completo = extract_csv("raw.csv", quality = "quarantine")
+    bloques = pd.concat(extract_csv_chunks("raw.csv", chunk_size = 2, quality = "quarantine"))
+
+    for resultado in (completo, bloques):
+        assert resultado["SEMANA_ESTADISTICA"].tolist() == [1]
+        assert resultado["POBLACION"].dtype == "Int32"
+
+    gate = QualityGate("raw.csv")
+    assert gate.filter(df).index.tolist() == [0]
+    assert gate.violations["tipos_numericos"] == 3
@@ -0,0 +1,86 @@
+"""
+test_registry.py
+================
+
+Tests unitarios para el módulo registry.py.
+
+Responsabilidades validadas:
+    - El registro del repositorio (config/datasets.json) es válido.
+    - Valores por defecto de los campos opcionales.
+    - Errores de validación: campos faltantes o desconocidos, transformación
+      o formato inválidos, esquema incompleto, particionado sin parquet y
+      nombres repetidos.
+    - Filtro por nombre de dataset.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import json
+
+import pytest
+from src.registry import TRANSFORMS, load_registry, parse_registry
+
+
+def _entry(**kwargs):
+    return {"name": "a", "input": "a.csv", "output": "a_transformed", **kwargs}
+
+
+def test_registro_del_repositorio_es_valido():
+    """
+    Valida que el registro versionado cargue sin errores.
+    """
+    specs = load_registry()
+    assert [spec.name for spec in specs] == ["defunciones_semanales"]
+    assert specs[0].input == "def_semana_epidemiologica.csv"
+
+
+def test_valores_por_defecto():
+    """
+    Valida que los campos opcionales tomen los valores por defecto y que
+    las listas se conviertan en tuplas (especificación inmutable).
+    """
+    spec, = parse_registry({"datasets": [_entry(format = "parquet", partition_by = ["ANO_ESTADISTICO"])]})
+
+    assert spec.transform == "semana_epidemiologica"
+    assert spec.schema == TRANSFORMS["semana_epidemiologica"]
+    assert spec.partition_by == ("ANO_ESTADISTICO",)
+    assert spec.quality == "off"
+    assert spec.bq_table is None
+
+
+@pytest.mark.parametrize("data", [
+    {"datasets": []},
+    {"datasets": [{"name": "a", "input": "a.csv"}]},
+    {"datasets": [_entry(destino = "x")]},
+    {"datasets": [_entry(transform = "otra")]},
+    {"datasets": [_entry(schema = ["ANO_ESTADISTICO"])]},
+    {"datasets": [_entry(format = "json")]},
+    {"datasets": [_entry(quality = "estricto")]},
+    {"datasets": [_entry(partition_by = ["ANO_ESTADISTICO"])]},
+    {"datasets": [_entry(format = "parquet", partition_by = ["GRUPO_EDAD"])]},
+    {"datasets": [_entry(), _entry(output = "b")]},
+    {"datasets": [_entry(), _entry(name = "b")]},
+])
+def test_validaciones(data):
+    """
+    Valida que un registro inválido falle completo al cargarlo.
+    """
+    with pytest.raises(ValueError):
+        parse_registry(data)
+
+
+def test_filtro_por_nombre(tmp_path):
+    """
+    Valida el filtro por nombre (en el orden del registro) y el error ante
+    nombres no registrados.
+    """
+    path = tmp_path / "datasets.json"
+    entries = [_entry(name = name, output = f"{name}_out") for name in ("a", "b", "c")]
+    path.write_text(json.dumps({"datasets": entries}), encoding = "utf-8")
+
+    assert [spec.name for spec in load_registry(path, ["c", "a"])] == ["a", "c"]
+    with pytest.raises(ValueError):
+        load_registry(path, ["z"])
+    with pytest.raises(FileNotFoundError):
+        load_registry(tmp_path / "no_existe.json")
@@ -0,0 +1,151 @@
+"""
+test_rollups.py
+===============
+
+Tests unitarios para el módulo rollups.py.
+
+Responsabilidades validadas:
+    - Sumas y TASA_MORTALIDAD iguales a un groupby sobre el dataset completo.
+    - Mismo resultado en batch, por bloques y en modo compacto (categóricas).
+    - Rollups acumulados dentro de transform_dataset / transform_dataset_chunks.
+    - Escritura local, relectura y carga a GCS (FakeClient).
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic import generate_frame
+from benchmarks.fake_gcs import FakeClient
+from src.gcs_client import use_client
+from src.load_gcs import BUCKET_NAME
+from src.rollups import (
+    RATE_COLUMN,
+    ROLLUPS,
+    RollupAccumulator,
+    load_rollups_to_gcs,
+    read_rollups,
+    select_rollups,
+    write_rollups,
+)
+from src.transform import transform_chunk, transform_dataset, transform_dataset_chunks
+
+
+@pytest.fixture
+def transformed():
+    return transform_chunk(generate_frame(0, 5000, seed = 1))
+
+
+def test_rollups_iguales_a_groupby(transformed):
+    """
+    Valida cada rollup contra un groupby directo sobre el dataset completo.
+    """
+    acc = RollupAccumulator(select_rollups())
+    acc.update(transformed)
+
+    for rollup in ROLLUPS.values():
+        table = acc.tables()[rollup.name]
+        expected = transformed.groupby(list(rollup.keys))[["MUERTES_OBS", "POBLACION"]].sum().reset_index()
+        pd.testing.assert_frame_equal(table.drop(columns = RATE_COLUMN), expected)
+        assert (table[RATE_COLUMN] == table["MUERTES_OBS"] / table["POBLACION"]).all()
+
+
+def test_bloques_y_compacto_igual_a_batch(transformed):
+    """
+    Valida que acumular por bloques, con llaves categóricas distintas por
+    bloque, produzca las mismas tablas que un único DataFrame.
+    """
+    from src.transform import compact_frame
+
+    batch = RollupAccumulator(select_rollups())
+    batch.update(transformed)
+
+    chunked = RollupAccumulator(select_rollups())
+    for start in range(0, len(transformed), 700):
+        chunk = transformed.iloc[start:start + 700].copy()
+        chunked.update(compact_frame(chunk) if start % 1400 else chunk)
+
+    assert chunked.rows == batch.rows == len(transformed)
+    for name, table in batch.tables().items():
+        pd.testing.assert_frame_equal(chunked.tables()[name], table, check_dtype = False)
+
+
+def test_rollups_en_transform(tmp_path, monkeypatch):
+    """
+    Valida que transform_dataset y transform_dataset_chunks acumulen los
+    rollups en la misma pasada, con el mismo resultado.
+    """
+    import src.extract as extract
+
+    monkeypatch.setattr(extract, "RAW_DIR", Path("tests/data"))
+    batch = RollupAccumulator(select_rollups(["muertes_region_semana"]))
+    df = transform_dataset("raw_data.csv", rollups = batch)
+
+    chunked = RollupAccumulator(select_rollups(["muertes_region_semana"]))
+    for _ in transform_dataset_chunks("raw_data.csv", 3, rollups = chunked):
+        pass
+
+    table = batch.tables()["muertes_region_semana"]
+    pd.testing.assert_frame_equal(chunked.tables()["muertes_region_semana"], table)
+    assert table["MUERTES_OBS"].sum() == df["MUERTES_OBS"].sum()
+
+
+def test_seleccion_invalida():
+    """
+    Valida que rollups desconocidos o una selección vacía fallen.
+    """
+    with pytest.raises(ValueError):
+        select_rollups(["no_existe"])
+    with pytest.raises(ValueError):
+        RollupAccumulator([])
+
+
+def test_escritura_y_carga(transformed, tmp_path):
+    """
+    Valida la escritura local, su relectura y la carga de cada rollup bajo
+    el prefijo versionado en GCS.
+    """
+    acc = RollupAccumulator(select_rollups())
+    acc.update(transformed)
+    tables = acc.tables()
+
+    rollups_dir = write_rollups(tables, tmp_path, "dataset")
+    assert rollups_dir.name == "dataset_rollups"
+    reread = read_rollups(rollups_dir, ROLLUPS)
+    for name, table in tables.items():
+        pd.testing.assert_frame_equal(reread[name], table)
+    assert read_rollups(tmp_path / "no_existe", ROLLUPS) is None
+
+    fake = FakeClient()
+    with use_client(fake):
+        uri = load_rollups_to_gcs(tables, "dataset")
+
+    prefix = uri.removeprefix(f"gs://{BUCKET_NAME}/")
+    assert prefix.startswith("transformed/dataset_rollups_") and prefix.endswith("/")
+    names = sorted(blob.name.removeprefix(prefix) for blob in fake.bucket(BUCKET_NAME).list_blobs())
+    assert names == sorted(f"{name}.csv" for name in ROLLUPS)
+
+
+def test_medidas_nulas(transformed):
+    """
+    Regresión: con quality = 'off' las medidas pueden traer nulos; se
+    ignoran en las sumas y una llave sin valores queda nula (sin fallar).
+    """
+    df = transformed.copy()
+    df["POBLACION"] = df["POBLACION"].astype("float64")
+    df.loc[df.index[:10], "POBLACION"] = float("nan")
+    solo_nulos = df["ANO_ESTADISTICO"] == df["ANO_ESTADISTICO"].iloc[0]
+    df.loc[solo_nulos, "MUERTES_OBS"] = None
+
+    acc = RollupAccumulator([ROLLUPS["muertes_region_ano"]])
+    acc.update(df)
+    table = acc.tables()["muertes_region_ano"]
+
+    expected = df.groupby(["ANO_ESTADISTICO", "REGION"])["POBLACION"].sum().to_numpy()
+    assert table["POBLACION"].tolist() == expected.tolist()
+    ano = table["ANO_ESTADISTICO"] == df["ANO_ESTADISTICO"].iloc[0]
+    assert table.loc[ano, "MUERTES_OBS"].isna().all()
+    assert table.loc[ano, RATE_COLUMN].isna().all()
@@ -0,0 +1,160 @@
+"""
+test_runner.py
+==============
+
+Tests unitarios para el módulo runner.py. Los transforms corren en procesos
+reales (spawn) sobre el CSV raw de prueba; las cargas a GCS/BigQuery se
+reemplazan por mocks en el proceso principal.
+
+Responsabilidades validadas:
+    - Ejecución concurrente de varios datasets con resumen por dataset.
+    - Aislamiento de errores: un dataset fallido no detiene a los demás.
+    - Reanudación desde checkpoints, incluida una carga BigQuery fallida.
+    - Métricas de etapas de los workers agregadas a la ejecución principal.
+    - Validación de los límites de concurrencia.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from src.registry import DatasetSpec
+from src.runner import run_datasets
+
+
+@pytest.fixture
+def raw_dir(monkeypatch, tmp_path):
+    """
+    Directorios raw, transformed y de checkpoints temporales, con dos
+    copias del CSV raw de prueba.
+    """
+    import src.checkpoint as checkpoint
+    import src.extract as extract
+    import src.load_gcs as load_gcs
+
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for name in ("a.csv", "b.csv"):
+        shutil.copy(Path("tests/data/raw_data.csv"), raw / name)
+    shutil.copy(Path("tests/data/invalid_schema_raw.csv"), raw / "invalido.csv")
+
+    monkeypatch.setattr(extract, "RAW_DIR", raw)
+    monkeypatch.setattr(load_gcs, "LOCAL_TRANSFORMED_DIR", tmp_path / "transformed")
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+    return raw
+
+
+def _spec(name, **kwargs):
+    return DatasetSpec(name = name, input = f"{name}.csv", output = f"{name}_transformed", quality = "off", **kwargs)
+
+
+def _run(specs, **kwargs):
+    return run_datasets(specs, cpu_workers = 2, use_cache = False, **kwargs)
+
+
+def test_datasets_concurrentes(raw_dir):
+    """
+    Valida que cada dataset se transforme, se escriba localmente y se cargue
+    a GCS, con su resumen en el orden del registro.
+    """
+    specs = [_spec("a"), _spec("b", format = "parquet", partition_by = ("ANO_ESTADISTICO",))]
+    with patch("src.runner.load_csv_to_gcs", side_effect = lambda name, file_format: f"gs://b/{name}") as gcs:
+        summaries = _run(specs)
+
+    assert [s["dataset"] for s in summaries] == ["a", "b"]
+    assert all(s["status"] == "ok" for s in summaries)
+    assert summaries[0]["rows"] == summaries[1]["rows"] > 0
+    assert Path(summaries[0]["artifact"]).name == "a_transformed.csv"
+    assert Path(summaries[1]["artifact"]).is_dir()
+    assert summaries[1]["gcs_uri"] == "gs://b/b_transformed"
+    assert sorted(c.kwargs["file_format"] for c in gcs.call_args_list) == ["csv", "parquet"]
+
+
+def test_error_de_un_dataset_no_detiene_a_los_demas(raw_dir):
+    """
+    Valida que un raw inexistente, un esquema incompatible y una carga
+    fallida se reporten por dataset sin afectar al resto.
+    """
+    specs = [_spec("a"), _spec("no_existe"), _spec("invalido"), _spec("b")]
+
+    def upload(name, file_format):
+        if name == "b_transformed":
+            raise ConnectionError("red")
+        return f"gs://b/{name}"
+
+    with patch("src.runner.load_csv_to_gcs", side_effect = upload):
+        summaries = _run(specs, max_concurrent = 2)
+
+    assert [s["status"] for s in summaries] == ["ok", "error", "error", "error"]
+    assert "FileNotFoundError" in summaries[1]["error"]
+    assert "esquema" in summaries[2]["error"]
+    assert "ConnectionError" in summaries[3]["error"]
+    assert summaries[3]["rows"] > 0
+
+
+def test_reanuda_desde_checkpoints(raw_dir):
+    """
+    Valida que, si falla la carga a BigQuery, la siguiente ejecución omita
+    transform y carga a GCS y sólo repita BigQuery; y que una tercera
+    ejecución omita todas las etapas.
+    """
+    specs = [_spec("a", bq_table = "epidemiologia.a")]
+
+    with patch("src.runner.load_csv_to_gcs", return_value = "gs://b/a") as gcs, \
+         patch("src.runner.load_gcs_to_bigquery", side_effect = [RuntimeError("bq"), "p.epidemiologia.a"]) as bq:
+        first, = _run(specs)
+        second, = _run(specs)
+        third, = _run(specs)
+
+    assert first["status"] == "error" and first["gcs_uri"] == "gs://b/a"
+    assert second["status"] == "ok" and second["skipped"] == ["transform", "load_gcs"]
+    assert second["bq_table"] == "p.epidemiologia.a"
+    assert third["skipped"] == ["transform", "load_gcs", "load_bq"]
+    assert gcs.call_count == 1
+    assert bq.call_count == 2
+
+    # force rehace todo
+    with patch("src.runner.load_csv_to_gcs", return_value = "gs://b/a"), \
+         patch("src.runner.load_gcs_to_bigquery", return_value = "p.epidemiologia.a"):
+        forced, = _run(specs, force = True)
+    assert forced["skipped"] == []
+
+
+def test_sin_carga(raw_dir):
+    """
+    Valida que con upload = False sólo se ejecuten las etapas locales.
+    """
+    with patch("src.runner.load_csv_to_gcs") as gcs:
+        summary, = _run([_spec("a")], upload = False)
+
+    assert summary["status"] == "ok" and summary["gcs_uri"] is None
+    gcs.assert_not_called()
+
+
+def test_metricas_de_los_workers_en_la_ejecucion(raw_dir):
+    """
+    Valida que las etapas medidas en los procesos del transform se agreguen
+    a la ejecución del proceso principal, con su run_id.
+    """
+    from src.metrics import run_metrics, records
+
+    with run_metrics("runner-run", path = raw_dir.parent / "metrics.jsonl"):
+        _run([_spec("a"), _spec("b")], upload = False)
+        etapas = {(r["stage"], r["run_id"]) for r in records()}
+
+    for name in ("a", "b"):
+        assert (f"runner.{name}.transform", "runner-run") in etapas
+    assert ("transform_dataset", "runner-run") in etapas
+    assert ("load_csv", "runner-run") in etapas
+
+
+def test_limites_invalidos():
+    """
+    Valida que los límites de concurrencia deban ser positivos.
+    """
+    with pytest.raises(ValueError):
+        run_datasets([_spec("a")], max_concurrent = 0)
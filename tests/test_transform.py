@@ -19,7 +19,7 @@ import pandas as pd
 import pytest
 from datetime import date
 
-from src.transform import parse_rango, transform_dataset
+from src.transform import parse_rango, parse_rangos, transform_dataset
 
 #===============
 #Tests unitarios
@@ -50,6 +50,39 @@ def test_parse_rango_invalid():
     assert min_ is None
     assert max_ is None
 
+def test_parse_rangos_equivalente_a_parse_rango():
+    """
+    Valida que la versión vectorizada entregue los mismos valores que
+    parse_rango fila a fila, incluyendo rangos abiertos, inválidos y nulos.
+    """
+    grupos = pd.Series(["0 a 14", "80 +", "desconocido", "15 a 39", None, "0 a 14"])
+
+    rangos = parse_rangos(grupos)
+
+    assert list(rangos.columns) == ["EDAD_MIN", "EDAD_MAX"]
+    assert str(rangos["EDAD_MIN"].dtype) == "Int64"
+    assert str(rangos["EDAD_MAX"].dtype) == "Int64"
+
+    for i, grupo in grupos.items():
+        min_, max_ = parse_rango(grupo)
+        if min_ is None:
+            assert pd.isna(rangos.loc[i, "EDAD_MIN"])
+            assert pd.isna(rangos.loc[i, "EDAD_MAX"])
+        else:
+            assert rangos.loc[i, "EDAD_MIN"] == min_
+            assert rangos.loc[i, "EDAD_MAX"] == max_
+
+def test_parse_rangos_respeta_indice():
+    """
+    Valida que el resultado quede alineado con el índice original.
+    """
+    grupos = pd.Series(["80 +", "0 a 14"], index=[10, 3])
+
+    rangos = parse_rangos(grupos)
+
+    assert list(rangos.index) == [10, 3]
+    assert rangos.loc[3, "EDAD_MAX"] == 14
+
 #======================
 #Test de transformación
 #======================
@@ -75,7 +108,7 @@ def test_transform_dataset_success(monkeypatch):
     })
     
     #Mock de extract.csv
-    def mock_extract_csv(file_name: str):
+    def mock_extract_csv(file_name: str, **kwargs):
         return raw_df.copy()
 
     import src.transform as transform
@@ -102,3 +135,210 @@ def test_transform_dataset_success(monkeypatch):
     assert df.loc[0, "REGION"] == "Metropolitana"
     assert df.loc[0, "FECHA_CARGA"] == date.today()
 
+
+def test_transform_dataset_chunks_equivalente_a_batch(monkeypatch):
+    """
+    Valida que el modo streaming entregue, concatenado, el mismo
+    resultado que transform_dataset.
+    """
+    from pathlib import Path
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", Path(__file__).parent / "data")
+
+    import src.transform as transform
+    df_batch = transform.transform_dataset("raw_data.csv")
+    chunks = list(transform.transform_dataset_chunks("raw_data.csv", chunk_size=4))
+
+    assert len(chunks) == 3
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df_batch)
+
+@pytest.mark.parametrize("backend", ["pandas", "pyarrow"])
+def test_transform_chunks_igual_a_batch_con_nulos(monkeypatch, tmp_path, backend):
+    """
+    Valida que con nulos en columnas enteras el modo batch (ambos backends)
+    y el modo streaming entreguen los mismos dtypes y el mismo CSV (12841
+    y no 12841.0).
+    """
+    from pathlib import Path
+    import src.extract as extract
+    import src.transform as transform
+
+    raw = pd.read_csv(Path(__file__).parent / "data" / "raw_data.csv", sep="|")
+    raw["POBLACION"] = raw["POBLACION"].astype(object)
+    raw.loc[[1, 6], "POBLACION"] = None
+    raw.to_csv(tmp_path / "con_nulos.csv", sep="|", index=False)
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path)
+
+    df_batch = transform.transform_dataset("con_nulos.csv", backend=backend)
+    chunks = list(transform.transform_dataset_chunks("con_nulos.csv", chunk_size=4))
+
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df_batch)
+    csv = df_batch.to_csv(index=False)
+    assert csv == "".join(c.to_csv(index=False, header=i == 0) for i, c in enumerate(chunks))
+    assert "12841.0" not in csv and ",," in csv
+
+def test_transform_dataset_pyarrow_mismo_csv(monkeypatch, tmp_path):
+    """
+    Valida que con el backend pyarrow el CSV transformado sea
+    idéntico al del backend pandas.
+    """
+    from pathlib import Path
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", Path(__file__).parent / "data")
+
+    df_pandas = transform_dataset("raw_data.csv")
+    df_arrow = transform_dataset("raw_data.csv", backend="pyarrow")
+
+    assert df_arrow.to_csv(index=False) == df_pandas.to_csv(index=False)
+
+def test_transform_dataset_since(monkeypatch):
+    """
+    Valida que con `since` sólo se transformen las semanas posteriores
+    al watermark, tanto en batch como por bloques.
+    """
+    from pathlib import Path
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", Path(__file__).parent / "data")
+
+    import src.transform as transform
+    df = transform.transform_dataset("raw_data.csv", since=(2010, 7))
+    chunks = list(transform.transform_dataset_chunks("raw_data.csv", chunk_size=4, since=(2010, 7)))
+
+    assert df["SEMANA_ESTADISTICA"].tolist() == [8, 9, 10]
+    # el primer bloque (semanas 1-4) queda vacío y se omite
+    assert len(chunks) == 2
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+#======================
+#Transform paralelo
+#======================
+
+@pytest.mark.parametrize("split_by", ["ANO_ESTADISTICO", "REGION"])
+def test_transform_parallel_identico_al_serial(split_by):
+    """
+    Valida que el transform paralelo entregue exactamente el mismo
+    DataFrame (orden, índice, dtypes y valores) que el serial.
+    """
+    import numpy as np
+    from benchmarks.synthetic import generate_frame
+    from src.transform import transform_chunk, transform_parallel
+
+    raw = generate_frame(0, 20_000).sample(frac=1, random_state=3)
+    raw.loc[raw.index[:3], "SEXO"] = 9
+    raw.loc[raw.index[3:5], "GRUPO_EDAD"] = np.nan
+    fecha = date(2026, 1, 4)
+
+    serial = transform_chunk(raw.copy(), fecha)
+    paralelo = transform_parallel(raw, workers=2, split_by=split_by, fecha_carga=fecha)
+
+    pd.testing.assert_frame_equal(paralelo, serial)
+
+def test_transform_dataset_workers_mismo_csv(monkeypatch):
+    """
+    Valida que transform_dataset con workers > 1 genere el mismo CSV,
+    también con columnas categóricas del backend pyarrow.
+    """
+    from pathlib import Path
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", Path(__file__).parent / "data")
+
+    serial = transform_dataset("raw_data.csv", backend="pyarrow")
+    paralelo = transform_dataset("raw_data.csv", backend="pyarrow", workers=2, split_by="REGION")
+
+    assert paralelo.to_csv(index=False) == serial.to_csv(index=False)
+
+def test_transform_parallel_split_invalido():
+    from src.transform import transform_parallel
+
+    with pytest.raises(ValueError):
+        transform_parallel(pd.DataFrame({"SEXO": [1]}), workers=2, split_by="SEXO")
+
+#======================
+#Modo compacto
+#======================
+
+def test_transform_compacto_mismo_csv_y_menos_memoria(monkeypatch):
+    """
+    Valida que el modo compacto use categóricas, enteros pequeños y
+    FECHA_CARGA datetime64, ocupe menos memoria y genere el mismo CSV.
+    """
+    from pathlib import Path
+    import src.extract as extract
+    monkeypatch.setattr(extract, "RAW_DIR", Path(__file__).parent / "data")
+
+    normal = transform_dataset("raw_data.csv")
+    compacto = transform_dataset("raw_data.csv", compact=True)
+
+    for column in ("GRUPO_EDAD", "SEXO", "REGION"):
+        assert compacto[column].dtype == "category"
+    assert compacto["SEMANA_ESTADISTICA"].dtype == "Int8"
+    assert compacto["EDAD_MIN"].dtype == "Int8"
+    assert str(compacto["FECHA_CARGA"].dtype).startswith("datetime64")
+    assert list(compacto["SEXO"].cat.categories) == ["F", "M"]
+
+    assert compacto.memory_usage(deep=True).sum() < normal.memory_usage(deep=True).sum()
+    assert compacto.to_csv(index=False) == normal.to_csv(index=False)
+
+def test_transform_chunk_compacto_igual_a_compact_frame():
+    """
+    Valida que la ruta categórica del modo compacto sea equivalente a
+    compactar el resultado normal, incluyendo nulos, códigos de SEXO no
+    mapeados y etiquetas que sólo difieren en espacios.
+    """
+    import numpy as np
+    from benchmarks.synthetic import generate_frame
+    from src.transform import compact_frame, transform_chunk
+
+    raw = generate_frame(0, 5_000)
+    raw.loc[:2, "SEXO"] = 9
+    raw.loc[3:4, "GRUPO_EDAD"] = np.nan
+    raw.loc[5, "REGION"] = f"  {raw.loc[5, 'REGION']} "
+    fecha = date(2026, 1, 4)
+
+    esperado = compact_frame(transform_chunk(raw.copy(), fecha))
+    compacto = transform_chunk(raw.copy(), fecha, compact=True)
+
+    pd.testing.assert_frame_equal(compacto, esperado)
+    assert compacto["REGION"].cat.categories.is_unique
+
+def test_compact_frame_conserva_enteros_fuera_de_rango():
+    from src.transform import compact_frame
+
+    df = compact_frame(pd.DataFrame({"POBLACION": [1, 2**40], "MUERTES_OBS": [1, 2]}))
+
+    assert df["POBLACION"].dtype == "int64"
+    assert df["MUERTES_OBS"].dtype == "int32"
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_compacto_con_nulo_numerico(monkeypatch, tmp_path, streaming):
+    """
+    Valida que un nulo en POBLACION no haga fallar el modo compacto
+    (batch y por bloques): la columna pasa al entero nullable.
+    """
+    from pathlib import Path
+    import src.extract as extract
+    import src.transform as transform
+
+    raw = pd.read_csv(Path(__file__).parent / "data" / "raw_data.csv", sep="|")
+    raw["POBLACION"] = raw["POBLACION"].astype(object)
+    raw.loc[5, "POBLACION"] = None
+    raw.to_csv(tmp_path / "con_nulos.csv", sep="|", index=False)
+    monkeypatch.setattr(extract, "RAW_DIR", tmp_path)
+
+    if streaming:
+        df = pd.concat(transform.transform_dataset_chunks("con_nulos.csv", chunk_size=4, compact=True))
+    else:
+        df = transform_dataset("con_nulos.csv", compact=True)
+
+    assert df["POBLACION"].dtype == "Int32"
+    assert df["POBLACION"].isna().sum() == 1
+    assert df["MUERTES_OBS"].tolist() == raw["MUERTES_OBS"].tolist()
+
+
+def test_compact_frame_no_convierte_decimales():
+    from src.transform import compact_frame
+
+    df = compact_frame(pd.DataFrame({"POBLACION": [1.5, None], "MUERTES_OBS": [1.0, None]}))
+
+    assert df["POBLACION"].dtype == "float64"
+    assert df["MUERTES_OBS"].dtype == "Int32"
@@ -0,0 +1,90 @@
+"""
+test_watermark.py
+=================
+
+Tests unitarios para el módulo watermark.py.
+
+Valida:
+- Lectura y escritura del watermark por dataset.
+- Retroceso del watermark entre años (revisiones tardías).
+- Filtro de filas posteriores al watermark.
+- Cálculo del watermark máximo en batch y por bloques.
+
+Proyecto: ETL Datos Públicos
+Autor: E. Henríquez N.
+"""
+
+import pandas as pd
+import pytest
+
+import src.watermark as watermark
+from src.watermark import (
+    WatermarkTracker,
+    filter_after_watermark,
+    max_watermark,
+    read_watermark,
+    shift_watermark,
+    write_watermark,
+)
+
+def _df():
+    return pd.DataFrame({
+        "ANO_ESTADISTICO": [2024, 2024, 2025, 2025, 2025],
+        "SEMANA_ESTADISTICA": [51, 52, 1, 2, 3],
+        "MUERTES_OBS": [1, 2, 3, 4, 5],
+    })
+
+def test_read_watermark_sin_estado(monkeypatch, tmp_path):
+    """
+    Valida que sin carga previa no exista watermark.
+    """
+    monkeypatch.setattr(watermark, "STATE_DIR", tmp_path)
+
+    assert read_watermark("dataset") is None
+
+def test_write_read_watermark(monkeypatch, tmp_path):
+    """
+    Valida que el watermark guardado se lea de vuelta por dataset.
+    """
+    monkeypatch.setattr(watermark, "STATE_DIR", tmp_path / "state")
+
+    write_watermark("dataset", (2025, 3))
+
+    assert read_watermark("dataset") == (2025, 3)
+    assert read_watermark("otro_dataset") is None
+    assert not list((tmp_path / "state").glob("*.tmp"))
+
+def test_shift_watermark():
+    """
+    Valida el retroceso de semanas, incluyendo el cambio de año.
+    """
+    assert shift_watermark((2025, 10), 0) == (2025, 10)
+    assert shift_watermark((2025, 10), 3) == (2025, 7)
+    assert shift_watermark((2025, 2), 3) == (2024, 51)
+
+    with pytest.raises(ValueError):
+        shift_watermark((2025, 2), -1)
+
+def test_filter_after_watermark():
+    """
+    Valida que sólo queden las filas estrictamente posteriores al watermark.
+    """
+    df = _df()
+
+    assert filter_after_watermark(df, None) is df
+    assert filter_after_watermark(df, (2024, 52))["MUERTES_OBS"].tolist() == [3, 4, 5]
+    assert filter_after_watermark(df, (2025, 3)).empty
+
+def test_max_watermark_y_tracker():
+    """
+    Valida el watermark máximo en batch y acumulado por bloques.
+    """
+    df = _df()
+    assert max_watermark(df) == (2025, 3)
+    assert max_watermark(df.iloc[0:0]) is None
+
+    tracker = WatermarkTracker((2024, 1))
+    chunks = list(tracker.track([df.iloc[:2], df.iloc[2:]]))
+
+    assert len(chunks) == 2
+    assert tracker.watermark == (2025, 3)